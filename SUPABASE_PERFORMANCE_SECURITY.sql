@@ -15,7 +15,7 @@ CREATE INDEX IF NOT EXISTS idx_users_kyc_status ON public.users(is_kyc_verified)
 CREATE INDEX IF NOT EXISTS idx_users_balance ON public.users(total_balance_aud DESC) WHERE total_balance_aud > 0;
 
 -- Licensed games - optimize catalog queries
-CREATE INDEX IF NOT EXISTS idx_licensed_games_status_category ON public.licensed_games(status, category) WHERE status = 'active';
+CREATE INDEX IF NOT EXISTS idx_licensed_games_active_category ON public.licensed_games(category, name) WHERE status = 'active';
 CREATE INDEX IF NOT EXISTS idx_licensed_games_thumbnail ON public.licensed_games(thumbnail_url) WHERE thumbnail_url IS NOT NULL;
 CREATE INDEX IF NOT EXISTS idx_licensed_games_provider_status ON public.licensed_games(provider_id, status);
 
@@ -23,23 +23,15 @@ CREATE INDEX IF NOT EXISTS idx_licensed_games_provider_status ON public.licensed
 CREATE INDEX IF NOT EXISTS idx_game_spins_user_created ON public.game_spins(user_id, created_at DESC);
 CREATE INDEX IF NOT EXISTS idx_game_spins_game_created ON public.game_spins(game_id, created_at DESC);
 CREATE INDEX IF NOT EXISTS idx_game_spins_win_amount ON public.game_spins(win_amount DESC) WHERE win_amount > 0;
-CREATE INDEX IF NOT EXISTS idx_game_spins_status ON public.game_spins(status) WHERE status = 'completed';
-CREATE INDEX IF NOT EXISTS idx_game_spins_created_at_range ON public.game_spins(created_at) WHERE created_at > NOW() - INTERVAL '30 days';
 
 -- User bonuses - optimize bonus queries
 CREATE INDEX IF NOT EXISTS idx_user_bonuses_user_status ON public.user_bonuses(user_id, status);
-CREATE INDEX IF NOT EXISTS idx_user_bonuses_expires_active ON public.user_bonuses(expires_at) WHERE status = 'active' AND expires_at > NOW();
+CREATE INDEX IF NOT EXISTS idx_user_bonuses_expires_active ON public.user_bonuses(expires_at) WHERE status = 'active';
 CREATE INDEX IF NOT EXISTS idx_user_bonuses_type_status ON public.user_bonuses(bonus_type, status);
 
--- Rate limiting - optimize abuse detection
-CREATE INDEX IF NOT EXISTS idx_rate_limit_user_time ON public.rate_limit_logs(user_id, created_at DESC);
-CREATE INDEX IF NOT EXISTS idx_rate_limit_ip_time ON public.rate_limit_logs(ip_address, created_at DESC);
-CREATE INDEX IF NOT EXISTS idx_rate_limit_action_time ON public.rate_limit_logs(action_type, created_at DESC);
-CREATE INDEX IF NOT EXISTS idx_rate_limit_recent ON public.rate_limit_logs(created_at DESC) WHERE created_at > NOW() - INTERVAL '1 hour';
-
 -- User tiers - optimize tier lookups
 CREATE INDEX IF NOT EXISTS idx_user_tiers_user_tier ON public.user_tiers(user_id, tier);
-CREATE INDEX IF NOT EXISTS idx_user_tiers_tier_xp ON public.user_tiers(tier, xp_earned DESC);
+CREATE INDEX IF NOT EXISTS idx_user_tiers_tier_wagered ON public.user_tiers(tier, lifetime_wagered DESC);
 
 -- =====================================================
 -- PART 2: CONNECTION POOLING & QUERY OPTIMIZATION
@@ -98,34 +90,73 @@ CREATE TRIGGER prevent_bonus_modification_trigger
 -- PART 4: RATE LIMITING FUNCTIONS (OPTIMIZED)
 -- =====================================================
 
--- Optimized rate limit check function
-CREATE OR REPLACE FUNCTION public.check_rate_limit(
+-- Actions are counted in 10-second buckets (one upsert per action, at most
+-- window/10 + 1 rows read per check) instead of one rate_limit_logs row per
+-- action; see supabase/migrations/20251221000000_rate_limit_counters.sql
+
+CREATE TABLE IF NOT EXISTS public.rate_limit_counters (
+  user_id UUID NOT NULL,
+  action_type TEXT NOT NULL,
+  bucket_start TIMESTAMP WITH TIME ZONE NOT NULL,
+  hits INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (user_id, action_type, bucket_start)
+);
+
+ALTER TABLE public.rate_limit_counters ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Admins can view rate limit counters" ON public.rate_limit_counters;
+CREATE POLICY "Admins can view rate limit counters"
+  ON public.rate_limit_counters FOR SELECT
+  USING (public.has_role(auth.uid(), 'admin'));
+
+-- Global pruning walks buckets by age
+CREATE INDEX IF NOT EXISTS idx_rate_limit_counters_bucket ON public.rate_limit_counters(bucket_start);
+
+-- Drop every expired bucket; also called now and then by log_rate_limit_action
+CREATE OR REPLACE FUNCTION public.prune_rate_limit_counters()
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  v_deleted INTEGER;
+BEGIN
+  DELETE FROM public.rate_limit_counters
+  WHERE bucket_start < now() - INTERVAL '24 hours';
+  GET DIAGNOSTICS v_deleted = ROW_COUNT;
+  RETURN v_deleted;
+END;
+$$;
+
+-- Dropped first: an older copy may name the limit p_max_requests, and
+-- CREATE OR REPLACE cannot rename parameters
+DROP FUNCTION IF EXISTS public.check_rate_limit(UUID, TEXT, INTEGER, INTEGER);
+CREATE FUNCTION public.check_rate_limit(
   p_user_id UUID,
   p_action_type TEXT,
-  p_max_requests INTEGER DEFAULT 60,
+  p_max_actions INTEGER DEFAULT 60,
   p_window_seconds INTEGER DEFAULT 60
 )
 RETURNS BOOLEAN
-LANGUAGE plpgsql
+LANGUAGE sql
+STABLE
 SECURITY DEFINER
+SET search_path = public
 AS $$
-DECLARE
-  request_count INTEGER;
-BEGIN
-  -- Count requests in the time window
-  SELECT COUNT(*) INTO request_count
-  FROM public.rate_limit_logs
+  SELECT COALESCE(SUM(
+           hits * LEAST(1.0, EXTRACT(EPOCH FROM
+             bucket_start + INTERVAL '10 seconds' - (now() - make_interval(secs => p_window_seconds))
+           ) / 10.0)
+         ), 0) < p_max_actions
+  FROM public.rate_limit_counters
   WHERE user_id = p_user_id
     AND action_type = p_action_type
-    AND created_at > NOW() - (p_window_seconds || ' seconds')::INTERVAL;
-  
-  -- Return true if under limit
-  RETURN request_count < p_max_requests;
-END;
+    AND bucket_start > now() - make_interval(secs => p_window_seconds) - INTERVAL '10 seconds';
 $$;
 
--- Optimized rate limit logging (with cleanup)
-CREATE OR REPLACE FUNCTION public.log_rate_limit_action(
+DROP FUNCTION IF EXISTS public.log_rate_limit_action(UUID, TEXT, INET);
+CREATE FUNCTION public.log_rate_limit_action(
   p_user_id UUID,
   p_action_type TEXT,
   p_ip_address INET DEFAULT NULL
@@ -133,23 +164,39 @@ CREATE OR REPLACE FUNCTION public.log_rate_limit_action(
 RETURNS UUID
 LANGUAGE plpgsql
 SECURITY DEFINER
+SET search_path = public
 AS $$
 DECLARE
-  log_id UUID;
+  v_bucket TIMESTAMP WITH TIME ZONE := to_timestamp(floor(EXTRACT(EPOCH FROM now()) / 10) * 10);
+  v_new_bucket BOOLEAN;
 BEGIN
-  -- Insert log entry
-  INSERT INTO public.rate_limit_logs (user_id, action_type, ip_address)
-  VALUES (p_user_id, p_action_type, p_ip_address)
-  RETURNING id INTO log_id;
-  
-  -- Cleanup old logs (older than 24 hours) - run periodically
-  DELETE FROM public.rate_limit_logs
-  WHERE created_at < NOW() - INTERVAL '24 hours';
-  
-  RETURN log_id;
+  INSERT INTO public.rate_limit_counters AS c (user_id, action_type, bucket_start, hits)
+  VALUES (p_user_id, p_action_type, v_bucket, 1)
+  ON CONFLICT (user_id, action_type, bucket_start)
+  DO UPDATE SET hits = c.hits + 1
+  RETURNING (xmax = 0) INTO v_new_bucket;
+
+  -- Opening a bucket prunes this key's expired ones (a short primary-key
+  -- range) and, about once per thousand buckets, everyone else's
+  IF v_new_bucket THEN
+    DELETE FROM public.rate_limit_counters
+    WHERE user_id = p_user_id
+      AND action_type = p_action_type
+      AND bucket_start < now() - INTERVAL '24 hours';
+    IF random() < 0.001 THEN
+      PERFORM public.prune_rate_limit_counters();
+    END IF;
+  END IF;
+
+  -- Kept for callers of the old signature; no log row is written any more
+  RETURN gen_random_uuid();
 END;
 $$;
 
+GRANT EXECUTE ON FUNCTION public.check_rate_limit(UUID, TEXT, INTEGER, INTEGER) TO authenticated, service_role;
+GRANT EXECUTE ON FUNCTION public.log_rate_limit_action(UUID, TEXT, INET) TO authenticated, service_role;
+GRANT EXECUTE ON FUNCTION public.prune_rate_limit_counters() TO service_role;
+
 -- =====================================================
 -- PART 5: ONBOARDING QUEUE SYSTEM
 -- =====================================================
@@ -297,7 +344,6 @@ CREATE TABLE IF NOT EXISTS public.system_health (
 );
 
 CREATE INDEX IF NOT EXISTS idx_system_health_metric_time ON public.system_health(metric_name, recorded_at DESC);
-CREATE INDEX IF NOT EXISTS idx_system_health_recent ON public.system_health(recorded_at DESC) WHERE recorded_at > NOW() - INTERVAL '24 hours';
 
 -- Function to record system metrics
 CREATE OR REPLACE FUNCTION public.record_system_metric(
@@ -500,28 +546,26 @@ GRANT EXECUTE ON FUNCTION public.get_system_load() TO service_role;
 -- Note: These require pg_cron extension
 -- Uncomment if pg_cron is enabled in your Supabase project
 
-/*
 -- Refresh game catalog every 5 minutes
-SELECT cron.schedule(
-  'refresh-game-catalog',
-  '*/5 * * * *',
-  'SELECT public.refresh_game_catalog_cache();'
-);
+-- SELECT cron.schedule(
+--   'refresh-game-catalog',
+--   '*/5 * * * *',
+--   'SELECT public.refresh_game_catalog_cache();'
+-- );
 
 -- Cleanup expired sessions every hour
-SELECT cron.schedule(
-  'cleanup-sessions',
-  '0 * * * *',
-  'SELECT public.cleanup_expired_sessions();'
-);
+-- SELECT cron.schedule(
+--   'cleanup-sessions',
+--   '0 * * * *',
+--   'SELECT public.cleanup_expired_sessions();'
+-- );
 
 -- Process onboarding queue every minute
-SELECT cron.schedule(
-  'process-onboarding',
-  '* * * * *',
-  'SELECT public.process_onboarding_queue(10);'
-);
-*/
+-- SELECT cron.schedule(
+--   'process-onboarding',
+--   '* * * * *',
+--   'SELECT public.process_onboarding_queue(10);'
+-- );
 
 -- =====================================================
 -- COMPLETE
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Advise indexes from a measured workload
+Replays the edge-function traffic, a captured log or a staging database's
+pg_stat_statements against a seeded scratch schema, ranks missing indexes by
+planner-cost benefit and unused ones by write cost, and drafts a migration
+"""
+
+import sys
+import json
+import time
+import argparse
+from dataclasses import asdict
+from datetime import datetime, timezone
+from pathlib import Path
+
+from supabase_tools.db import database_url
+from supabase_tools.index_advisor import (
+    DEFAULT_STATEMENTS, MIN_GAIN, advise, edge_workload, load_log, migration_sql,
+    read_pg_stat_statements, staging_index_usage, unused_indexes
+)
+from supabase_tools.localdb import LocalPostgres, prepare_supabase_schema, scratch_database
+from supabase_tools.migrations import MIGRATIONS_DIR
+from supabase_tools.query_plans import DEFAULT_SCALE, build_schema, schema_sources, seed
+
+
+def default_migration_path() -> Path:
+    return MIGRATIONS_DIR / f"{datetime.now(timezone.utc):%Y%m%d%H%M%S}_advised_indexes.sql"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rank missing and unused indexes for a workload")
+    parser.add_argument("--log", type=Path, action="append",
+                        help="Captured access log or JSON lines of SQL (repeatable; default: edge-function workload)")
+    parser.add_argument("--stats-url",
+                        help="Staging database to read pg_stat_statements and index usage from")
+    parser.add_argument("--statements", type=int, default=DEFAULT_STATEMENTS,
+                        help="Top statements by total time to take from pg_stat_statements")
+    parser.add_argument("--database-url", default=database_url(),
+                        help="Server to create the scratch database on (default: start a local one)")
+    parser.add_argument("--scale", type=float, default=DEFAULT_SCALE,
+                        help="Seed volume multiplier (1.0 = 1M spins, 20k players)")
+    parser.add_argument("--min-gain", type=float, default=MIN_GAIN,
+                        help="Share of its queries' cost a candidate must save")
+    parser.add_argument("--write-migration", type=Path, nargs="?", const=default_migration_path(),
+                        help="Write the candidate migration (default: a new file in supabase/migrations)")
+    parser.add_argument("--json", type=Path, help="Also write the advice to this file")
+    args = parser.parse_args()
+
+    print("🧭 INDEX ADVISOR")
+    print("=" * 60)
+
+    try:
+        workload = []
+        for path in args.log or []:
+            workload += load_log(path)
+        if args.stats_url:
+            workload += read_pg_stat_statements(args.stats_url, args.statements)
+            staging_usage = staging_index_usage(args.stats_url)
+    except (OSError, ValueError, RuntimeError) as e:
+        print(f"❌ {e}")
+        return 1
+    source = ", ".join([str(path) for path in args.log or []] + (["pg_stat_statements"] if args.stats_url else []))
+    if not source:
+        workload = edge_workload()
+        source = "the edge-function workload (calls per 1,000 spins)"
+    if not workload:
+        print("❌ No queries found in the workload")
+        return 1
+    reads = sum(1 for query in workload if query.sql)
+    print(f"📋 {len(workload)} queries from {source}: {reads} planned, {len(workload) - reads} inserts")
+
+    server = None
+    try:
+        if args.database_url:
+            dsn = args.database_url
+        else:
+            server = LocalPostgres().start()
+            dsn = server.dsn
+            print(f"✅ PostgreSQL started ({server.root})")
+
+        with scratch_database(dsn, "index_advisor") as advisor_dsn:
+            prepare_supabase_schema(advisor_dsn)
+            sources = schema_sources()
+            print(f"📦 Building schema from {len(sources)} files")
+            failures = build_schema(advisor_dsn, sources)
+            if failures:
+                print(f"   ⚠️  {len(failures)} statements did not apply")
+            print(f"🌱 Seeding at scale {args.scale:g}")
+            started = time.perf_counter()
+            seed(advisor_dsn, args.scale)
+            print(f"   done in {time.perf_counter() - started:.0f}s")
+            started = time.perf_counter()
+            advice = advise(advisor_dsn, workload, args.min_gain)
+            print(f"🔬 Planned {len(advice.baseline)} queries and measured candidates "
+                  f"in {time.perf_counter() - started:.0f}s")
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        if server:
+            server.stop()
+
+    if args.stats_url:
+        advice.unused = unused_indexes(staging_usage)
+
+    for name, reason in advice.skipped:
+        print(f"   ⚠️  skipped {name}: {reason}")
+    if advice.empty_tables:
+        print(f"   ➖ Not seeded, so no benefit can show: {', '.join(advice.empty_tables)}")
+
+    print("\n📈 Missing indexes, by estimated benefit")
+    if not advice.candidates:
+        print("   ✅ None: every planned query already has a good index")
+    for rank, candidate in enumerate(advice.candidates, 1):
+        helped = [name for name, cost in candidate.costs.items() if cost < advice.baseline[name]]
+        print(f"   {rank}. {candidate.sql()}")
+        print(f"      saves ~{candidate.benefit:,.0f} cost units, {candidate.size / 1e6:.1f} MB, "
+              f"{candidate.writes:,.0f} table writes")
+        for name in helped:
+            print(f"      {name}: {advice.baseline[name]:,.1f} -> {candidate.costs[name]:,.1f}")
+
+    print(f"\n📉 Unused indexes, by write cost ({'staging statistics' if args.stats_url else 'this workload'})")
+    if not advice.unused:
+        print("   ✅ None")
+    for entry in advice.unused:
+        print(f"   🗑️  {entry.index} on {entry.table}: {entry.writes:,.0f} table writes, "
+              f"{entry.size / 1e6:.1f} MB")
+
+    migration = migration_sql(advice, source)
+    if args.write_migration:
+        args.write_migration.write_text(migration)
+        print(f"\n📝 Candidate migration written to {args.write_migration}")
+    else:
+        print("\n📝 Candidate migration (write it with --write-migration):\n")
+        print(migration)
+
+    if args.json:
+        args.json.write_text(json.dumps({
+            "source": source,
+            "scale": args.scale,
+            "baseline": advice.baseline,
+            "candidates": [dict(asdict(candidate), name=candidate.name, sql=candidate.sql())
+                           for candidate in advice.candidates],
+            "unused": [asdict(entry) for entry in advice.unused],
+            "skipped": [{"name": name, "reason": reason} for name, reason in advice.skipped],
+        }, indent=2) + "\n")
+        print(f"📝 Advice written to {args.json}")
+
+    print("=" * 60)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
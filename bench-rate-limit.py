@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Benchmark the spin rate limiter before and after the counter table
+Seeds rate_limit_logs with millions of rows in a scratch database - a week of
+history plus a busy last hour for the players online - then times
+check_rate_limit + log_rate_limit_action pairs on each backend
+"""
+
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+import uuid
+from pathlib import Path
+
+from supabase_tools.db import connect, database_url
+from supabase_tools.localdb import LocalPostgres, prepare_supabase_schema, scratch_database
+from supabase_tools.migrations import MIGRATIONS_DIR, Migration, print_migration_report, run_migrations
+
+LEGACY_MIGRATION = MIGRATIONS_DIR / "20251220092643_add_rate_limiting.sql"
+COUNTER_MIGRATION = MIGRATIONS_DIR / "20251221000000_rate_limit_counters.sql"
+
+# Enough of the platform for the two rate limiting migrations to apply alone
+BENCH_STUBS = [
+    "CREATE TABLE IF NOT EXISTS public.users (id UUID PRIMARY KEY)",
+    """CREATE OR REPLACE FUNCTION public.has_role(UUID, TEXT) RETURNS BOOLEAN
+       LANGUAGE sql AS 'SELECT false'""",
+]
+# The extra rate_limit_logs indexes SUPABASE_PERFORMANCE_SECURITY.sql used to
+# add, which the counter migration drops again
+LEGACY_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_rate_limit_user_time ON public.rate_limit_logs(user_id, created_at DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_rate_limit_ip_time ON public.rate_limit_logs(ip_address, created_at DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_rate_limit_action_time ON public.rate_limit_logs(action_type, created_at DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_rate_limit_recent ON public.rate_limit_logs(created_at DESC) "
+    "WHERE created_at > NOW() - INTERVAL '1 hour'",
+]
+SEED_CHUNK = 1_000_000
+# Seeding takes minutes, so the newest slice of the online players' hour is
+# written just before each timing run instead
+FRESH_MINUTES = 2
+
+
+def seed(dsn: str, users: list, active: list, rows: int, per_minute: float) -> int:
+    """
+    A week of history spread over every player, then the last hour for the
+    `active` players at `per_minute` spins each - the rows the old limiter's
+    60-second COUNT(*) actually has to walk, up to FRESH_MINUTES ago.
+    Returns the recent rows seeded.
+    """
+    recent = min(rows, int(len(active) * per_minute * (60 - FRESH_MINUTES)))
+    conn = connect(dsn, autocommit=True)
+    try:
+        with conn.cursor() as cur:
+            cur.execute("INSERT INTO public.users (id) SELECT unnest(%s::uuid[])", (users,))
+            # The recent hour goes in last; fresh_window() tops up its newest minutes
+            for start in range(0, rows, SEED_CHUNK):
+                count = min(SEED_CHUNK, rows - start)
+                history = max(0, min(count, rows - recent - start))
+                if history:
+                    cur.execute(
+                        """INSERT INTO public.rate_limit_logs (user_id, action_type, ip_address, created_at)
+                           SELECT (%s::uuid[])[1 + (i %% %s)], 'spin', '10.0.0.1',
+                                  now() - INTERVAL '1 hour' - random() * INTERVAL '7 days'
+                           FROM generate_series(1, %s) AS i""",
+                        (users, len(users), history)
+                    )
+                if count - history:
+                    cur.execute(
+                        """INSERT INTO public.rate_limit_logs (user_id, action_type, ip_address, created_at)
+                           SELECT (%s::uuid[])[1 + (i %% %s)], 'spin', '10.0.0.1',
+                                  now() - make_interval(mins => %s) - random() * make_interval(mins => %s)
+                           FROM generate_series(1, %s) AS i""",
+                        (active, len(active), FRESH_MINUTES, 60 - FRESH_MINUTES, count - history)
+                    )
+                print(f"\r   {start + count:,}/{rows:,} log rows", end="", flush=True)
+            print()
+            cur.execute("ANALYZE public.rate_limit_logs")
+    finally:
+        conn.close()
+    return recent
+
+
+def fresh_window(dsn: str, active: list, per_minute: float) -> int:
+    """The online players' last FRESH_MINUTES of spins, as of now"""
+    rows = int(len(active) * per_minute * FRESH_MINUTES)
+    conn = connect(dsn, autocommit=True)
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                """INSERT INTO public.rate_limit_logs (user_id, action_type, ip_address, created_at)
+                   SELECT (%s::uuid[])[1 + (i %% %s)], 'spin', '10.0.0.1',
+                          now() - random() * make_interval(mins => %s)
+                   FROM generate_series(1, %s) AS i""",
+                (active, len(active), FRESH_MINUTES, rows)
+            )
+    finally:
+        conn.close()
+    return rows
+
+
+def spin_workload(dsn: str, users: list, threads: int, duration: float) -> dict:
+    """check + log pairs, as the spin function issues them, from `threads` sessions"""
+    latencies = []
+    limited = [0]
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def worker(seed_value: int) -> None:
+        rng = random.Random(seed_value)
+        conn = connect(dsn, autocommit=True)
+        local, local_limited = [], 0
+        try:
+            with conn.cursor() as cur:
+                while time.perf_counter() < deadline:
+                    user = rng.choice(users)
+                    started = time.perf_counter()
+                    cur.execute("SELECT public.check_rate_limit(%s, 'spin', 60, 60)", (user,))
+                    if cur.fetchone()[0]:
+                        cur.execute("SELECT public.log_rate_limit_action(%s, 'spin', '10.0.0.1')", (user,))
+                        cur.fetchone()
+                    else:
+                        local_limited += 1
+                    local.append(time.perf_counter() - started)
+        finally:
+            conn.close()
+        with lock:
+            latencies.extend(local)
+            limited[0] += local_limited
+
+    started = time.perf_counter()
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    pick = lambda q: 1000 * latencies[min(len(latencies) - 1, int(q * len(latencies)))] if latencies else 0.0
+    return {
+        "spins": len(latencies),
+        "spins_per_second": len(latencies) / elapsed,
+        "rate_limited": limited[0],
+        "p50_ms": pick(0.50),
+        "p99_ms": pick(0.99),
+        "max_ms": 1000 * latencies[-1] if latencies else 0.0,
+    }
+
+
+def table_size(dsn: str, table: str) -> str:
+    conn = connect(dsn, autocommit=True)
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT pg_size_pretty(pg_total_relation_size(%s))", (table,))
+            return cur.fetchone()[0]
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the rate limiter backends")
+    parser.add_argument("--database-url", default=database_url(),
+                        help="Server to create the scratch database on (default: start a local one)")
+    parser.add_argument("--log-rows", type=int, default=10_000_000,
+                        help="rate_limit_logs rows to seed before measuring")
+    parser.add_argument("--users", type=int, default=10_000, help="Distinct players")
+    parser.add_argument("--active-users", type=int, default=2_000,
+                        help="Players online: they have the last hour of logs and do the spinning")
+    parser.add_argument("--spins-per-minute", type=float, default=20.0,
+                        help="Each online player's spin rate over the seeded last hour")
+    parser.add_argument("--threads", type=int, default=8, help="Concurrent sessions")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds per backend")
+    parser.add_argument("--json", type=Path, help="Also write the results to this file")
+    args = parser.parse_args()
+
+    print("⏱️  RATE LIMITER BENCHMARK")
+    print("=" * 60)
+
+    server = None
+    try:
+        if args.database_url:
+            dsn = args.database_url
+        else:
+            server = LocalPostgres().start()
+            dsn = server.dsn
+            print(f"✅ PostgreSQL started ({server.root})")
+
+        with scratch_database(dsn, "rate_limit_bench") as bench_dsn:
+            prepare_supabase_schema(bench_dsn)
+            conn = connect(bench_dsn, autocommit=True)
+            try:
+                with conn.cursor() as cur:
+                    for statement in BENCH_STUBS:
+                        cur.execute(statement)
+            finally:
+                conn.close()
+
+            report = run_migrations(bench_dsn, [Migration.from_path(LEGACY_MIGRATION)])
+            if not report.ok:
+                print_migration_report(report)
+                return 1
+            conn = connect(bench_dsn, autocommit=True)
+            try:
+                with conn.cursor() as cur:
+                    for statement in LEGACY_INDEXES:
+                        try:
+                            cur.execute(statement)
+                        except Exception as e:
+                            # e.g. the NOW()-based partial index Postgres rejects
+                            print(f"⚠️  Skipped: {statement[:70]}... ({str(e).strip()})")
+            finally:
+                conn.close()
+
+            users = [str(uuid.uuid4()) for _ in range(args.users)]
+            active = users[:min(args.active_users, args.users)]
+            print(f"🌱 Seeding {args.log_rows:,} rate_limit_logs rows for {args.users:,} players, "
+                  f"{len(active):,} online at {args.spins_per_minute:g} spins/min")
+            started = time.perf_counter()
+            recent = seed(bench_dsn, users, active, args.log_rows, args.spins_per_minute)
+            print(f"   done in {time.perf_counter() - started:.0f}s, {recent:,} in the last hour, "
+                  f"{table_size(bench_dsn, 'public.rate_limit_logs')} with indexes")
+
+            recent += fresh_window(bench_dsn, active, args.spins_per_minute)
+            print(f"\n🐢 COUNT(*) over rate_limit_logs: {args.threads} sessions, {args.duration:g}s")
+            before = spin_workload(bench_dsn, active, args.threads, args.duration)
+
+            report = run_migrations(bench_dsn, [Migration.from_path(COUNTER_MIGRATION)])
+            if not report.ok:
+                print_migration_report(report)
+                return 1
+            print(f"🐇 Bucketed counters: {args.threads} sessions, {args.duration:g}s")
+            after = spin_workload(bench_dsn, active, args.threads, args.duration)
+            counters_size = table_size(bench_dsn, "public.rate_limit_counters")
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        if server:
+            server.stop()
+
+    print(f"\n{'backend':<12} {'spins/s':>10} {'p50':>9} {'p99':>9} {'max':>9}")
+    for name, result in (("logs", before), ("counters", after)):
+        print(f"{name:<12} {result['spins_per_second']:>10,.0f} {result['p50_ms']:>7.2f}ms "
+              f"{result['p99_ms']:>7.2f}ms {result['max_ms']:>7.2f}ms")
+    speedup = after["spins_per_second"] / before["spins_per_second"] if before["spins_per_second"] else 0
+    print(f"\n🚀 {speedup:.1f}x spins/s; rate_limit_counters is {counters_size} after the run")
+
+    if args.json:
+        args.json.write_text(json.dumps({
+            "log_rows": args.log_rows, "recent_rows": recent, "users": args.users,
+            "active_users": len(active), "spins_per_minute": args.spins_per_minute, "threads": args.threads,
+            "duration": args.duration, "logs": before, "counters": after,
+            "counters_size": counters_size,
+        }, indent=2) + "\n")
+        print(f"📝 Results written to {args.json}")
+    print("=" * 60)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
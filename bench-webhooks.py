@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Replay signed provider callbacks against game-webhook
+Delivers HMAC-signed bet/win/refund/session_end streams, with redeliveries
+and out-of-order arrivals, at increasing rates or as a flood, then checks
+every accepted transaction was applied to the ledger exactly once
+"""
+
+import os
+import sys
+import json
+import random
+import argparse
+from pathlib import Path
+
+from supabase_tools.db import database_url
+from supabase_tools.loadgen import DEFAULT_MAX_IN_FLIGHT, DEFAULT_TIMEOUT, saturation_point, synthetic_user_ids
+from supabase_tools.localdb import LocalPostgres, prepare_supabase_schema, scratch_database
+from supabase_tools.query_plans import build_schema, schema_sources
+from supabase_tools.rest_shim import DEFAULT_POOL_SIZE
+from supabase_tools.webhooks import (
+    DEFAULT_DUPLICATE_RATE, DEFAULT_REORDER_WINDOW, WebhookStandIn, balances, check_ledger,
+    deliver, generate_events, load_events, prepare_players, schedule
+)
+
+# Stands in for the deployed WEBHOOK_SECRET when running against the local stand-in
+LOCAL_SECRET = "local-webhook-secret"
+
+
+def parse_stages(text: str):
+    try:
+        return [float(part) for part in text.split(",")]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected RPS[,RPS...], got {text!r}") from None
+
+
+def print_stage(result, check) -> None:
+    stage = result.to_dict()
+    overall = stage["overall"]
+    latency = overall["latency"]
+    offered = f"{result.target_rps:g}" if result.target_rps else "flood"
+    print(f"{offered:>8} {stage['achieved_rps']:>8.1f} {stage['succeeded_rps']:>8.1f} "
+          f"{latency['p50_ms']:>6.0f}ms {latency['p95_ms']:>6.0f}ms {latency['p99_ms']:>6.0f}ms "
+          f"{100 * overall['error_rate']:>5.1f}% {result.dropped:>6}")
+    for label, stats in sorted(result.endpoints.items()):
+        codes = ", ".join(f"{code}: {count}" for code, count in sorted(stats.statuses.items()))
+        errors = ", ".join(f"{name}: {count}" for name, count in sorted(stats.errors.items()))
+        print(f"         {label:<14} {stats.requests:>6}  p99 {1000 * stats.latency.percentile(99):>6.0f}ms  "
+              f"{codes}{'  ' + errors if errors else ''}")
+    if check is None:
+        return
+    mark = "✅" if check.ok else "❌"
+    print(f"         {mark} ledger: {check.accepted}/{check.transactions} transactions accepted, "
+          f"{check.redeliveries} redeliveries, {check.early} early arrivals")
+    if check.recorded_twice:
+        print(f"            {len(check.recorded_twice)} recorded twice, e.g. {check.recorded_twice[0]}")
+    if check.not_recorded:
+        print(f"            {len(check.not_recorded)} accepted but not recorded, e.g. {check.not_recorded[0]}")
+    if check.balance_mismatches:
+        print(f"            {len(check.balance_mismatches)} balances off, {check.drift:+} AUD drift in total")
+
+
+def run(args, url: str, dsn, secret: str, api_key=None) -> int:
+    rng = random.Random(args.seed)
+    if args.replay:
+        captured = load_events(args.replay)
+        users = sorted({event["user_id"] for event in captured if event.get("user_id")})
+    else:
+        users = synthetic_user_ids(args.players)
+    if dsn:
+        prepare_players(dsn, users)
+
+    stages = [0.0] if args.flood else args.rps
+    print(f"🎯 {url}")
+    print(f"👥 {len(users)} players, {100 * args.duplicate_rate:g}% redelivered, "
+          f"reordered within {args.reorder_window} events")
+    print(f"\n{'offered':>8} {'sent/s':>8} {'ok/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'err':>6} {'drop':>6}")
+
+    results, checks = [], []
+    for rps in stages:
+        if args.replay:
+            events = captured
+        else:
+            count = args.flood or max(1, int(rps * args.duration))
+            events = generate_events(users, count, rng)
+        deliveries = schedule(events, secret, rng, args.duplicate_rate, args.reorder_window)
+        before = balances(dsn, users) if dsn else None
+        result, statuses = deliver(url, deliveries, rps, api_key, args.max_in_flight, args.timeout, args.seed)
+        check = check_ledger(dsn, deliveries, statuses, before) if dsn else None
+        print_stage(result, check)
+        results.append(result)
+        checks.append(check)
+
+    if args.flood:
+        result = results[0]
+        drain = result.overall.succeeded / result.wall_seconds if result.wall_seconds else 0.0
+        print(f"\n🌊 Drained {result.scheduled:,} deliveries in {result.wall_seconds:.1f}s: "
+              f"{drain:,.1f} events/s accepted")
+        saturated = None
+    else:
+        saturated = saturation_point(results, p99_budget=args.p99_budget / 1000)
+        if saturated:
+            print(f"\n⚠️  Saturated at {saturated.target_rps:g} events/s offered "
+                  f"({saturated.achieved_rps:.1f} events/s delivered)")
+        else:
+            print(f"\n✅ Kept up with every stage up to {max(stages):g} events/s")
+
+    ledger_ok = all(check.ok for check in checks if check is not None)
+    if dsn is None:
+        print("➖ Ledger not checked: pass --database-url for the function's database")
+    elif ledger_ok:
+        print("✅ Every accepted transaction applied exactly once")
+    else:
+        print("❌ Redelivered or reordered callbacks changed the ledger")
+
+    if args.json:
+        args.json.write_text(json.dumps({
+            "url": url,
+            "players": len(users),
+            "duplicate_rate": args.duplicate_rate,
+            "reorder_window": args.reorder_window,
+            "saturated_at_rps": saturated.target_rps if saturated else None,
+            "stages": [dict(result.to_dict(), ledger=check.to_dict() if check else None)
+                       for result, check in zip(results, checks)],
+        }, indent=2) + "\n")
+        print(f"📝 Results written to {args.json}")
+    return 0 if ledger_ok else 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Signed webhook replay and throughput harness")
+    parser.add_argument("--url", help="Deployed game-webhook URL (default: a local stand-in on a scratch database)")
+    parser.add_argument("--database-url", default=database_url(),
+                        help="With --url: the function's database, to check the ledger; "
+                             "otherwise the server for the scratch database (default: start a local one)")
+    parser.add_argument("--secret", default=os.getenv("WEBHOOK_SECRET"),
+                        help="Signing secret (default: $WEBHOOK_SECRET; a fixed one for the stand-in)")
+    parser.add_argument("--rps", type=parse_stages, default=[50.0],
+                        help="Offered events/second per stage: 50,100,200")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds per stage")
+    parser.add_argument("--flood", type=int, metavar="EVENTS",
+                        help="Instead of stages, deliver EVENTS as fast as they are answered, like a backlog")
+    parser.add_argument("--replay", type=Path, help="JSON lines of captured provider events to deliver")
+    parser.add_argument("--players", type=int, default=200, help="Synthetic players to generate rounds for")
+    parser.add_argument("--duplicate-rate", type=float, default=DEFAULT_DUPLICATE_RATE,
+                        help="Share of events the provider delivers twice")
+    parser.add_argument("--reorder-window", type=int, default=DEFAULT_REORDER_WINDOW,
+                        help="Places an event may arrive out of order (0 = in order)")
+    parser.add_argument("--max-in-flight", type=int, default=DEFAULT_MAX_IN_FLIGHT,
+                        help="Outstanding deliveries before new ones are dropped")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="Per-delivery timeout")
+    parser.add_argument("--pool-size", type=int, default=DEFAULT_POOL_SIZE,
+                        help="Stand-in database connections")
+    parser.add_argument("--dedupe", action="store_true",
+                        help="Stand-in ignores transaction ids it has already recorded")
+    parser.add_argument("--p99-budget", type=float, default=1000.0,
+                        help="p99 latency (ms) above which a stage counts as saturated")
+    parser.add_argument("--seed", type=int, default=0, help="Event stream seed")
+    parser.add_argument("--json", type=Path, help="Write every stage's results to this file")
+    args = parser.parse_args()
+
+    if args.replay and len(args.rps) > 1 and not args.flood:
+        # A second pass would be nothing but redeliveries of the first
+        print("❌ --replay delivers the capture once: pass a single --rps or --flood")
+        return 1
+
+    print("📨 WEBHOOK REPLAY")
+    print("=" * 60)
+
+    if args.url:
+        if not args.secret:
+            print("❌ Need the signing secret: pass --secret or set WEBHOOK_SECRET")
+            return 1
+        api_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY") or os.getenv("SUPABASE_ANON_KEY")
+        try:
+            return run(args, args.url, args.database_url, args.secret, api_key)
+        except (OSError, ValueError, RuntimeError) as e:
+            print(f"❌ {e}")
+            return 1
+
+    server = None
+    stand_in = None
+    secret = args.secret or LOCAL_SECRET
+    try:
+        if args.database_url:
+            dsn = args.database_url
+        else:
+            server = LocalPostgres().start()
+            dsn = server.dsn
+            print(f"✅ PostgreSQL started ({server.root})")
+
+        with scratch_database(dsn, "webhook_bench") as bench_dsn:
+            prepare_supabase_schema(bench_dsn)
+            sources = schema_sources()
+            print(f"📦 Building schema from {len(sources)} files")
+            failures = build_schema(bench_dsn, sources)
+            if failures:
+                print(f"   ⚠️  {len(failures)} statements did not apply")
+            stand_in = WebhookStandIn(bench_dsn, secret, args.pool_size, args.dedupe)
+            url = stand_in.serve()
+            print(f"🧪 Stand-in {'with' if args.dedupe else 'without'} deduplication, "
+                  f"{args.pool_size} connections")
+            try:
+                code = run(args, url, bench_dsn, secret)
+            finally:
+                stand_in.stop()
+            for error, count in sorted(stand_in.ignored_errors.items()):
+                print(f"   ➖ ignored as the function does, {count}x: {error}")
+    except (OSError, ValueError, RuntimeError) as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        if server:
+            server.stop()
+
+    print("=" * 60)
+    return code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Build responsive, content-hashed game thumbnails
+Encodes changed tiles in public/game-tiles to AVIF/WebP/JPEG at several widths
+and optionally points licensed_games.thumbnail_url at the hashed files
+"""
+
+import os
+import sys
+import argparse
+
+from supabase_tools.bulk import fetch_by_keys
+from supabase_tools.catalogue import LICENSED_GAMES_REQUIRED, print_bulk_result, update_thumbnails
+from supabase_tools.client import SupabaseClient
+from supabase_tools.concurrency import add_concurrency_argument
+from supabase_tools.thumbnails import (
+    FORMATS, OUTPUT_DIR, WIDTHS, build_thumbnails, built_urls, load_manifest, manifest_totals,
+    uncommitted_outputs
+)
+
+
+def parse_widths(text: str):
+    try:
+        return tuple(sorted({int(part) for part in text.split(",")}))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected comma-separated widths, got {text!r}") from None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build responsive game thumbnails")
+    parser.add_argument("games", nargs="*", help="Only these game codes (default: every tile)")
+    parser.add_argument("--widths", type=parse_widths, default=WIDTHS,
+                        help=f"Comma-separated widths (default: {','.join(map(str, WIDTHS))})")
+    parser.add_argument("--formats", default=",".join(name for name, _, _ in FORMATS),
+                        help="Comma-separated formats to encode, where Pillow supports them")
+    parser.add_argument("--workers", type=int, help="Encoder processes (default: all cores)")
+    parser.add_argument("--force", action="store_true", help="Re-encode every tile")
+    parser.add_argument("--publish", action="store_true",
+                        help="Write the hashed URLs to licensed_games.thumbnail_url")
+    add_concurrency_argument(parser)
+    args = parser.parse_args()
+
+    print("🖼️  THUMBNAIL BUILD")
+    print("=" * 60)
+
+    def progress(done: int, total: int) -> None:
+        print(f"\r   {done}/{total} tiles encoded", end="", flush=True)
+
+    try:
+        report = build_thumbnails(
+            widths=args.widths, formats=args.formats.split(","), workers=args.workers,
+            force=args.force, game_codes=args.games or None, progress=progress
+        )
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        return 1
+    if report.built or report.failed:
+        print()
+
+    skipped = sorted(set(args.formats.split(",")) - set(report.formats))
+    print(f"🎞️  Formats: {', '.join(report.formats)}"
+          + (f" (not supported here: {', '.join(skipped)})" if skipped else ""))
+    print(f"✅ {len(report.built)} built, {len(report.skipped)} unchanged, "
+          f"{report.removed} stale files removed")
+    for code, error in report.failed.items():
+        print(f"   ❌ {code}: {error}")
+
+    source_bytes, encoded = manifest_totals(load_manifest())
+    if source_bytes:
+        print(f"📦 Sources: {source_bytes / 1e6:.1f} MB")
+        for name, size in sorted(encoded.items(), key=lambda item: item[1]):
+            print(f"   {name:<5} {size / 1e6:>6.2f} MB at card size ({100 * size / source_bytes:.1f}%)")
+    print(f"📝 Manifest: {OUTPUT_DIR.relative_to(OUTPUT_DIR.parents[2])}/manifest.json")
+
+    if args.publish:
+        service_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+        if not service_key:
+            print("❌ SUPABASE_SERVICE_ROLE_KEY not set - cannot publish URLs")
+            return 1
+        try:
+            uncommitted = uncommitted_outputs()
+        except RuntimeError as e:
+            print(f"❌ {e}")
+            return 1
+        if uncommitted:
+            # The site deploys from git; URLs to files it doesn't have would 404
+            print(f"❌ {len(uncommitted)} built files are not committed (e.g. {uncommitted[0]}) - "
+                  f"commit {OUTPUT_DIR.relative_to(OUTPUT_DIR.parents[2])} and deploy the site before publishing")
+            return 1
+        built_urls.cache_clear()
+        urls = built_urls()
+        with SupabaseClient(service_key, pool_size=args.concurrency) as client:
+            try:
+                existing = fetch_by_keys(
+                    client, "licensed_games", "game_code", list(urls),
+                    ",".join(["game_code", "thumbnail_url", *LICENSED_GAMES_REQUIRED]),
+                    concurrency=args.concurrency
+                )
+            except RuntimeError as e:
+                print(f"❌ {e}")
+                return 1
+            codes = [code for code in urls if code in existing]
+            print(f"\n📡 Publishing {len(codes)} thumbnail URLs "
+                  f"({len(urls) - len(codes)} tiles have no licensed_games row)")
+            result = update_thumbnails(client, codes, concurrency=args.concurrency, existing=existing)
+        print_bulk_result(result, len(codes))
+        if not result.ok:
+            return 1
+
+    print("=" * 60)
+    return 0 if report.ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
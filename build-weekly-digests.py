@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Compute every active player's weekly digest in one grouped scan
+Streams the metrics in chunks to a JSONL file and/or weekly_digest_queue, in
+place of weekly-digest's two queries per player
+"""
+
+import sys
+import gzip
+import json
+import time
+import resource
+import argparse
+from datetime import datetime, timezone
+
+from supabase_tools.db import connect, database_url
+from supabase_tools.digest import (
+    DEFAULT_CHUNK_SIZE, DEFAULT_DAYS, DigestTotals, enqueue_digests, stream_digests, week_window
+)
+
+
+def parse_until(text: str) -> datetime:
+    try:
+        moment = datetime.fromisoformat(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected an ISO date or timestamp, got {text!r}") from None
+    return moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+
+
+def open_output(path: str):
+    if path == "-":
+        return sys.stdout
+    if path.endswith(".gz"):
+        return gzip.open(path, "wt")
+    return open(path, "w")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build weekly digests with one grouped scan")
+    parser.add_argument("--database-url", default=database_url(),
+                        help="Database to read (default: $DATABASE_URL or $SUPABASE_DB_URL)")
+    parser.add_argument("--until", type=parse_until,
+                        help="End of the digest window, ISO date or timestamp (default: now)")
+    parser.add_argument("--days", type=int, default=DEFAULT_DAYS, help="Window length")
+    parser.add_argument("--timezone", default="UTC", help="Time zone for weekday names")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="Players fetched and written per chunk")
+    parser.add_argument("--output", help="Write digests as JSONL here (.gz compresses, - for stdout)")
+    parser.add_argument("--enqueue", action="store_true", help="Upsert digests into weekly_digest_queue")
+    parser.add_argument("--with-context", action="store_true",
+                        help="Include the renderer's context text in the JSONL output")
+    args = parser.parse_args()
+
+    if not args.database_url:
+        print("❌ No database: pass --database-url or set DATABASE_URL")
+        return 1
+    if not args.output and not args.enqueue:
+        print("❌ Nothing to do: pass --output FILE and/or --enqueue")
+        return 1
+
+    since, until = week_window(args.until, args.days)
+    log = sys.stderr if args.output == "-" else sys.stdout
+    print("📰 WEEKLY DIGESTS", file=log)
+    print("=" * 60, file=log)
+    print(f"🗓️  {since:%Y-%m-%d %H:%M} to {until:%Y-%m-%d %H:%M} UTC", file=log)
+
+    totals = DigestTotals()
+    started = time.perf_counter()
+    output = open_output(args.output) if args.output else None
+    queue = None
+    try:
+        if args.enqueue:
+            queue = connect(args.database_url)
+        for digests in stream_digests(args.database_url, since, until, args.timezone, args.chunk_size):
+            if output:
+                for digest in digests:
+                    record = digest.to_dict()
+                    if args.with_context:
+                        record["context"] = digest.context()
+                    output.write(json.dumps(record) + "\n")
+            if queue:
+                enqueue_digests(queue, until.date(), digests)
+            totals.add(digests)
+            print(f"\r   {totals.players:,} players, {totals.sessions:,} sessions", end="",
+                  flush=True, file=log)
+    except RuntimeError as e:
+        print(f"\n❌ {e}", file=log)
+        return 1
+    finally:
+        if output and output is not sys.stdout:
+            output.close()
+        if queue:
+            queue.close()
+    print(file=log)
+
+    elapsed = time.perf_counter() - started
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"✅ {totals.players:,} digests in {elapsed:.1f}s over {totals.chunks} chunks "
+          f"(peak memory {peak_mb:.0f} MB)", file=log)
+    print(f"💰 Wagered ${totals.wagered:,.2f}, won ${totals.won:,.2f}", file=log)
+    if args.enqueue:
+        print(f"📬 Queued for week ending {until:%Y-%m-%d}", file=log)
+    print("=" * 60, file=log)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
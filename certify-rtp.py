@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Catalogue-wide RTP certification run
+Simulates every game_definitions.json title and GAME_CONFIGS key across all
+cores and writes a JSON report of measured vs advertised RTP
+"""
+
+import sys
+import json
+import argparse
+from pathlib import Path
+
+from supabase_tools.certification import (
+    DEFAULT_RUN_SEED, DEFAULT_SHARD_SIZE, build_report, catalogue_games, run_certification
+)
+from supabase_tools.simulation import check_vectors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Certify simulated RTP for the whole catalogue")
+    parser.add_argument("games", nargs="*", help="Limit the run to these slugs")
+    parser.add_argument("--spins", type=int, default=10_000_000, help="Spins per game")
+    parser.add_argument("--run-seed", default=DEFAULT_RUN_SEED,
+                        help="Seed stream name; the same seed and spin count reproduce a report")
+    parser.add_argument("--shard-size", type=int, default=DEFAULT_SHARD_SIZE,
+                        help="Spins per worker task")
+    parser.add_argument("--workers", type=int, help="Worker processes (default: all cores)")
+    parser.add_argument("--output", type=Path, default=Path("rtp-certification.json"),
+                        help="Report path")
+    args = parser.parse_args()
+
+    print("🎰 RTP CERTIFICATION RUN")
+    print("=" * 60)
+
+    try:
+        problems = check_vectors()
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        return 1
+    if problems:
+        print(f"❌ Port disagrees with {len(problems)} recorded TypeScript outcomes - not certifying")
+        return 1
+
+    games = catalogue_games()
+    if args.games:
+        wanted = set(args.games)
+        known = {slug for slug, _ in games}
+        games = [(slug, definition) for slug, definition in games if slug in wanted]
+        games.extend((slug, {}) for slug in args.games if slug not in known)
+    print(f"📦 {len(games)} games x {args.spins:,} spins, seed '{args.run_seed}'")
+
+    def progress(done: int, total: int) -> None:
+        print(f"\r   {done}/{total} shards", end="", flush=True)
+
+    merged, timing = run_certification(
+        [slug for slug, _ in games], args.spins, args.run_seed,
+        args.shard_size, args.workers, progress
+    )
+    print()
+
+    report = build_report(games, merged, timing, args.spins, args.run_seed, args.shard_size)
+    args.output.write_text(json.dumps(report, indent=2) + "\n")
+
+    print(f"\n{'game':<40} {'RTP':>8} {'99% CI':>17} {'adv.':>6}")
+    for game in report["games"]:
+        low, high = game["measured"]["rtp_ci"]
+        advertised = game["advertised_rtp"]
+        flag = "" if advertised is None else "  ✅" if game["advertised_within_ci"] else "  ⚠️"
+        interval = f"{low:.2f}-{high:.2f}%"
+        print(f"{game['slug']:<40} {game['measured']['rtp']:>7.2f}% "
+              f"{interval:>17} {advertised if advertised is not None else '-':>6}{flag}")
+
+    throughput = report["throughput"]
+    print(f"\n⏱️  {report['run']['total_spins']:,} spins in {throughput['wall_seconds']:.1f}s "
+          f"on {throughput['workers']} workers")
+    print(f"   {throughput['spins_per_second']:,.0f} spins/s overall, "
+          f"{throughput['spins_per_second_per_core']:,.0f} spins/s per core")
+    print(f"📝 Report written to {args.output}")
+    print("=" * 60)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Check the database hot paths for query-plan regressions
+Builds the full schema in a scratch database, seeds it to realistic volume and
+compares EXPLAIN (ANALYZE, BUFFERS) of each hot query with the stored baselines
+"""
+
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+
+from supabase_tools.db import database_url
+from supabase_tools.localdb import LocalPostgres, prepare_supabase_schema, scratch_database
+from supabase_tools.query_plans import (
+    BASELINES_PATH, DEFAULT_RUNS, DEFAULT_SCALE, HOT_QUERIES, TIME_TOLERANCE, baseline_for,
+    build_schema, check_query, explain, load_baselines, save_baselines, schema_sources,
+    seed, server_version
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check hot queries for plan regressions")
+    parser.add_argument("queries", nargs="*", help="Only these hot queries (default: all)")
+    parser.add_argument("--database-url", default=database_url(),
+                        help="Server to create the scratch database on (default: start a local one)")
+    parser.add_argument("--scale", type=float, default=DEFAULT_SCALE,
+                        help="Seed volume multiplier (1.0 = 1M spins, 20k players)")
+    parser.add_argument("--runs", type=int, default=DEFAULT_RUNS, help="EXPLAIN ANALYZE runs per query")
+    parser.add_argument("--time-tolerance", type=float, default=TIME_TOLERANCE,
+                        help="Fail when a query gets this many times slower than its baseline")
+    parser.add_argument("--baselines", type=Path, default=BASELINES_PATH, help="Baseline file")
+    parser.add_argument("--update-baselines", action="store_true",
+                        help="Record this run's plans as the new baselines")
+    parser.add_argument("--json", type=Path, help="Also write the results to this file")
+    args = parser.parse_args()
+
+    queries = [query for query in HOT_QUERIES if not args.queries or query.name in args.queries]
+    unknown = set(args.queries) - {query.name for query in HOT_QUERIES}
+    if unknown:
+        print(f"❌ Unknown queries: {', '.join(sorted(unknown))}")
+        print(f"   Available: {', '.join(query.name for query in HOT_QUERIES)}")
+        return 1
+
+    print("🔬 QUERY PLAN CHECK")
+    print("=" * 60)
+
+    server = None
+    try:
+        if args.database_url:
+            dsn = args.database_url
+        else:
+            server = LocalPostgres().start()
+            dsn = server.dsn
+            print(f"✅ PostgreSQL started ({server.root})")
+
+        with scratch_database(dsn, "query_plans") as plan_dsn:
+            prepare_supabase_schema(plan_dsn)
+            sources = schema_sources()
+            print(f"📦 Building schema from {len(sources)} files")
+            failures = build_schema(plan_dsn, sources)
+            index_failures = [failure for failure in failures if failure["index"]]
+            for failure in failures:
+                icon = "❌" if failure["index"] else "⚠️ "
+                statement = " ".join(failure["statement"].split())
+                print(f"   {icon} {failure['source']}: {statement[:70]}...")
+                print(f"      {failure['error']}")
+
+            print(f"🌱 Seeding at scale {args.scale:g}")
+            started = time.perf_counter()
+            counts = seed(plan_dsn, args.scale)
+            print(f"   {', '.join(f'{table} {rows:,}' for table, rows in counts.items())} "
+                  f"rows in {time.perf_counter() - started:.0f}s")
+
+            summaries = explain(plan_dsn, queries, runs=args.runs)
+            version = server_version(plan_dsn)
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        if server:
+            server.stop()
+
+    baselines = load_baselines(args.baselines)
+    compare_costs = baselines.get("scale") == args.scale
+    if baselines.get("queries") and not compare_costs:
+        print(f"⚠️  Baselines were recorded at scale {baselines.get('scale')}; "
+              f"comparing plan shapes only")
+    if baselines.get("server_version") and baselines["server_version"] != version:
+        print(f"⚠️  Baselines come from PostgreSQL {baselines['server_version']}, this is {version}")
+
+    checks = [
+        check_query(query, summaries[query.name],
+                    None if args.update_baselines else baseline_for(baselines, query.name),
+                    compare_costs, args.time_tolerance)
+        for query in queries
+    ]
+
+    print(f"\n{'query':<32} {'ms':>8} {'base':>8} {'buffers':>8} {'base':>8}")
+    for check in checks:
+        base = check.baseline
+        print(f"{'✅' if check.ok else '❌'} {check.query.name:<30} "
+              f"{check.summary.execution_ms:>8.2f} {(f'{base.execution_ms:.2f}' if base else '-'):>8} "
+              f"{check.summary.buffers:>8} {(base.buffers if base else '-'):>8}")
+        for problem in check.problems:
+            print(f"     {problem}")
+        if "plan changed" in check.problems:
+            print("     was:")
+            for line in check.baseline.shape:
+                print(f"       {line}")
+            print("     now:")
+            for line in check.summary.shape:
+                print(f"       {line}")
+        elif not check.baseline and not args.update_baselines:
+            print("     no baseline - record one with --update-baselines")
+
+    if args.update_baselines:
+        recorded = {name: summary.to_dict() for name, summary in summaries.items()}
+        # Recording a subset keeps the other queries' baselines
+        merged = {**baselines.get("queries", {}), **recorded} if args.queries else recorded
+        save_baselines(merged, args.scale, version, args.baselines)
+        print(f"\n📝 Baselines for {len(recorded)} queries written to {args.baselines}")
+
+    if args.json:
+        args.json.write_text(json.dumps({
+            "scale": args.scale,
+            "server_version": version,
+            "rows": counts,
+            "schema_failures": failures,
+            "queries": [check.to_dict() for check in checks],
+        }, indent=2) + "\n")
+        print(f"📝 Results written to {args.json}")
+
+    regressions = [check for check in checks if not check.ok]
+    print()
+    if index_failures:
+        print(f"❌ {len(index_failures)} index statements failed to apply")
+    if regressions:
+        print(f"❌ {len(regressions)} of {len(checks)} hot queries regressed")
+    else:
+        print(f"✅ {len(checks)} hot queries match their baselines")
+    print("=" * 60)
+    return 1 if regressions or index_failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Apply pending SQL migrations through the checksum ledger
+Only files not yet recorded in deploy_ledger.applied_migrations are run
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+from supabase_tools.db import database_url
+from supabase_tools.migrations import (
+    MIGRATIONS_DIR, Migration, discover_migrations, print_migration_report, run_migrations
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply pending SQL migrations")
+    parser.add_argument("files", nargs="*", type=Path,
+                        help=f"SQL files to apply (default: {MIGRATIONS_DIR.name}/*.sql)")
+    parser.add_argument("--database-url", help="PostgreSQL connection string")
+    parser.add_argument("--dry-run", action="store_true", help="List pending migrations only")
+    parser.add_argument("--baseline", action="store_true",
+                        help="Record pending migrations as applied without running them")
+    args = parser.parse_args()
+
+    db_url = args.database_url or database_url()
+    if not db_url:
+        print("❌ Error: DATABASE_URL environment variable not set")
+        print("   Set it via: export DATABASE_URL='postgresql://...'")
+        return 1
+
+    migrations = [Migration.from_path(f) for f in args.files] if args.files else discover_migrations()
+
+    print("🚀 Applying SQL Migrations")
+    print("=" * 60)
+    print(f"📦 {len(migrations)} migration files")
+
+    try:
+        report = run_migrations(db_url, migrations, baseline=args.baseline, dry_run=args.dry_run)
+    except Exception as e:
+        print(f"❌ Migration run failed: {e}")
+        return 1
+
+    print_migration_report(report)
+    print("=" * 60)
+    return 0 if report.ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
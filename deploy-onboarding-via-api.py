@@ -5,11 +5,12 @@ Deploy process-onboarding edge function via Supabase Management API
 
 import os
 import sys
-import requests
 import json
 from pathlib import Path
 
-PROJECT_REF = "yiorietrtfosjnpzznnr"
+from supabase_tools.client import SupabaseClient
+from supabase_tools.config import PROJECT_REF
+
 FUNCTION_NAME = "process-onboarding"
 FUNCTION_FILE = Path(__file__).parent / "supabase" / "functions" / FUNCTION_NAME / "index.ts"
 
@@ -42,28 +43,22 @@ def read_function_code():
 
 def deploy_function(token, code):
     """Deploy function via Supabase Management API"""
-    url = f"https://api.supabase.com/v1/projects/{PROJECT_REF}/functions/{FUNCTION_NAME}"
-    
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Content-Type": "application/json",
-    }
+    client = SupabaseClient(access_token=token)
+    path = f"/functions/{FUNCTION_NAME}"
     
     # First, try to get existing function to check if it exists
-    response = requests.get(url, headers=headers)
+    response = client.management("GET", path)
     
     if response.status_code == 404:
         # Function doesn't exist, create it
         print(f"📦 Creating new function: {FUNCTION_NAME}")
-        create_url = f"https://api.supabase.com/v1/projects/{PROJECT_REF}/functions"
-        
         payload = {
             "name": FUNCTION_NAME,
             "body": code,
             "verify_jwt": False,
         }
         
-        response = requests.post(create_url, headers=headers, json=payload)
+        response = client.management("POST", "/functions", json=payload)
         
     elif response.status_code == 200:
         # Function exists, update it
@@ -73,7 +68,7 @@ def deploy_function(token, code):
             "verify_jwt": False,
         }
         
-        response = requests.patch(url, headers=headers, json=payload)
+        response = client.management("PATCH", path, json=payload)
     
     else:
         print(f"❌ Error checking function: {response.status_code}")
@@ -5,12 +5,11 @@ Deploy SQL migrations to Supabase via Management API
 
 import os
 import sys
-import requests
 import json
 from pathlib import Path
 
-PROJECT_REF = "yiorietrtfosjnpzznnr"
-SUPABASE_URL = f"https://{PROJECT_REF}.supabase.co"
+from supabase_tools.client import SupabaseClient
+from supabase_tools.config import PROJECT_REF
 
 def get_service_role_key():
     """Get service role key"""
@@ -32,25 +31,19 @@ def get_service_role_key():
     print("Get it from: https://supabase.com/dashboard/project/{}/settings/api".format(PROJECT_REF))
     return None
 
-def execute_sql_via_rest_api(sql_content: str, service_key: str) -> bool:
+def execute_sql_via_rest_api(sql_content: str, client: SupabaseClient) -> bool:
     """Try to execute SQL via Supabase REST API"""
     # Supabase doesn't allow direct SQL execution via REST API
     # But we can try using the PostgREST RPC endpoint if a function exists
     # Or use the Management API
     
     # Try Management API
-    url = f"https://api.supabase.com/v1/projects/{PROJECT_REF}/database/query"
-    headers = {
-        "Authorization": f"Bearer {service_key}",
-        "Content-Type": "application/json"
-    }
-    
     payload = {
         "query": sql_content
     }
     
     try:
-        response = requests.post(url, json=payload, headers=headers, timeout=60)
+        response = client.management("POST", "/database/query", json=payload)
         if response.status_code in [200, 201]:
             print("✅ SQL executed via Management API")
             return True
@@ -62,22 +55,15 @@ def execute_sql_via_rest_api(sql_content: str, service_key: str) -> bool:
         print(f"⚠️  Management API error: {e}")
         return False
 
-def execute_sql_via_rpc(sql_content: str, service_key: str) -> bool:
+def execute_sql_via_rpc(sql_content: str, client: SupabaseClient) -> bool:
     """Try to execute SQL via RPC function"""
     # Some Supabase setups have an exec_sql RPC function
-    url = f"{SUPABASE_URL}/rest/v1/rpc/exec_sql"
-    headers = {
-        "apikey": service_key,
-        "Authorization": f"Bearer {service_key}",
-        "Content-Type": "application/json"
-    }
-    
     payload = {
         "sql": sql_content
     }
     
     try:
-        response = requests.post(url, json=payload, headers=headers, timeout=60)
+        response = client.rpc("exec_sql", payload, timeout=(5, 60))
         if response.status_code == 200:
             print("✅ SQL executed via RPC")
             return True
@@ -97,6 +83,7 @@ def main():
         print("   Go to: https://supabase.com/dashboard/project/{}/sql/new".format(PROJECT_REF))
         return
     
+    client = SupabaseClient(service_key)
     project_dir = Path(__file__).parent
     sql_files = [
         project_dir / "REAL_MONEY_COMPLETE_MIGRATION.sql",
@@ -113,11 +100,11 @@ def main():
             sql_content = f.read()
         
         # Try Management API first
-        if execute_sql_via_rest_api(sql_content, service_key):
+        if execute_sql_via_rest_api(sql_content, client):
             continue
         
         # Try RPC
-        if execute_sql_via_rpc(sql_content, service_key):
+        if execute_sql_via_rpc(sql_content, client):
             continue
         
         print(f"⚠️  Could not deploy {sql_file.name} automatically")
@@ -6,28 +6,13 @@ Uses Supabase REST API to execute migrations
 
 import os
 import sys
-import requests
 import json
 from pathlib import Path
 
-SUPABASE_URL = "https://yiorietrtfosjnpzznnr.supabase.co"
-SERVICE_ROLE_KEY = os.environ.get("SUPABASE_SERVICE_ROLE_KEY")
-
-if not SERVICE_ROLE_KEY:
-    print("❌ Error: SUPABASE_SERVICE_ROLE_KEY environment variable not set")
-    print("Get it from: https://supabase.com/dashboard/project/yiorietrtfosjnpzznnr/settings/api")
-    sys.exit(0)  # Exit gracefully
+from supabase_tools.client import TIMEOUTS, SupabaseClient
 
 def execute_sql(sql_content: str) -> bool:
     """Execute SQL via Supabase REST API"""
-    url = f"{SUPABASE_URL}/rest/v1/rpc/exec_sql"
-    headers = {
-        "apikey": SERVICE_ROLE_KEY,
-        "Authorization": f"Bearer {SERVICE_ROLE_KEY}",
-        "Content-Type": "application/json",
-        "Prefer": "return=minimal"
-    }
-    
     # Try using the REST API directly
     # Note: Supabase may not have exec_sql RPC, so we'll use a different approach
     try:
@@ -40,6 +25,13 @@ def execute_sql(sql_content: str) -> bool:
         return False
 
 def main():
+    service_key = os.environ.get("SUPABASE_SERVICE_ROLE_KEY")
+    if not service_key:
+        print("❌ Error: SUPABASE_SERVICE_ROLE_KEY environment variable not set")
+        print("Get it from: https://supabase.com/dashboard/project/yiorietrtfosjnpzznnr/settings/api")
+        return 1
+    client = SupabaseClient(service_key)
+    
     print("🚀 COLLECTIVE-WINS Deployment Script")
     print("=" * 50)
     
@@ -48,7 +40,7 @@ def main():
     
     if not migration_file.exists():
         print(f"❌ Migration file not found: {migration_file}")
-        sys.exit(0)  # Exit gracefully
+        return 1
     
     sql_content = migration_file.read_text()
     print(f"✅ Loaded migration file: {len(sql_content)} characters")
@@ -76,13 +68,10 @@ def main():
     
     # Check if games exist
     try:
-        response = requests.get(
-            f"{SUPABASE_URL}/rest/v1/licensed_games?select=id&limit=1",
-            headers={
-                "apikey": SERVICE_ROLE_KEY,
-                "Authorization": f"Bearer {SERVICE_ROLE_KEY}"
-            },
-            timeout=5
+        response = client.rest(
+            "GET", "licensed_games",
+            params={"select": "id", "limit": 1},
+            timeout=TIMEOUTS["probe"]
         )
         if response.status_code == 200:
             data = response.json()
@@ -94,7 +83,8 @@ def main():
     
     print("\n✅ Deployment script complete!")
     print("📝 Next: Deploy migrations manually via SQL Editor (see instructions above)")
+    return 0
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
 
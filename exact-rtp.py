@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Exact RTP, hit rate and variance of every game config
+Computed analytically from symbol weights, reel layout and the multiplier
+tables; use --set/--sweep to review weight changes before shipping them
+"""
+
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+
+from supabase_tools.certification import catalogue_games
+from supabase_tools.exact_rtp import game_exact_rtp
+from supabase_tools.slot_engine import get_game_config
+
+
+def parse_weight(text: str):
+    symbol, _, value = text.partition("=")
+    if not symbol or not value:
+        raise argparse.ArgumentTypeError(f"expected SYMBOL=WEIGHT, got {text!r}")
+    return symbol, float(value)
+
+
+def parse_sweep(text: str):
+    symbol, _, spec = text.partition("=")
+    try:
+        start, stop, step = (float(part) for part in spec.split(":"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected SYMBOL=START:STOP:STEP, got {text!r}") from None
+    values = []
+    while start <= stop + 1e-9:
+        values.append(round(start, 10))
+        start += step
+    return symbol, values
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compute exact RTP per game")
+    parser.add_argument("games", nargs="*", help="Game slugs (default: whole catalogue)")
+    parser.add_argument("--configured-weights", action="store_true",
+                        help="Price GAME_CONFIGS weights instead of the weights the spin function uses")
+    parser.add_argument("--set", type=parse_weight, action="append", default=[],
+                        metavar="SYMBOL=WEIGHT", help="Override one symbol weight")
+    parser.add_argument("--sweep", type=parse_sweep, metavar="SYMBOL=START:STOP:STEP",
+                        help="Re-price each game over a range of one symbol's weight")
+    parser.add_argument("--json", type=Path, help="Also write the results to this file")
+    args = parser.parse_args()
+
+    games = catalogue_games()
+    if args.games:
+        games = [(slug, {}) for slug in args.games]
+    advertised = dict(catalogue_games())
+    overrides = dict(args.set)
+
+    print("🧮 EXACT RTP")
+    print("=" * 60)
+    print(f"{'game':<40} {'layout':>6} {'RTP':>9} {'adv.':>6} {'hit %':>7} {'SD':>6} {'ms':>7}")
+
+    started = time.perf_counter()
+    results = {}
+    for slug, _ in games:
+        config = get_game_config(slug)
+        t0 = time.perf_counter()
+        result = game_exact_rtp(slug, args.configured_weights, overrides)
+        elapsed = 1000 * (time.perf_counter() - t0)
+        results[slug] = result.to_dict()
+        listed = advertised.get(slug, {}).get("rtp")
+        print(f"{slug:<40} {config.reels}x{config.rows:<4} {result.rtp_percent:>8.3f}% "
+              f"{listed if listed is not None else '-':>6} {100 * float(result.hit_rate):>7.3f} "
+              f"{result.std_dev:>6.2f} {elapsed:>7.2f}")
+
+        if args.sweep:
+            symbol, values = args.sweep
+            sweep = []
+            for value in values:
+                swept = game_exact_rtp(slug, args.configured_weights, {**overrides, symbol: value})
+                sweep.append({"weight": value, **swept.to_dict()})
+                print(f"   {symbol}={value:<8g} RTP {swept.rtp_percent:>8.3f}%  "
+                      f"hit {100 * float(swept.hit_rate):>6.3f}%  SD {swept.std_dev:.2f}")
+            results[slug]["sweep"] = sweep
+
+    print(f"\n⏱️  {len(games)} games priced in {1000 * (time.perf_counter() - started):.0f} ms")
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2) + "\n")
+        print(f"📝 Results written to {args.json}")
+    print("=" * 60)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
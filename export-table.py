@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Export a large table over PostgREST to gzip JSONL or CSV
+Keyset-pages (created_at, id) with parallel workers over slices of the
+created_at range, checkpointing so an interrupted export resumes
+"""
+
+import os
+import sys
+import time
+import argparse
+import threading
+from pathlib import Path
+
+from supabase_tools.client import SupabaseClient
+from supabase_tools.export import (
+    DEFAULT_WORKERS, SLICES_PER_WORKER, load_checkpoint, output_format, plan_export, run_export
+)
+from supabase_tools.paging import DEFAULT_PAGE_SIZE
+
+
+def parse_filter(text: str):
+    """COLUMN=OP.VALUE, as in a PostgREST query string"""
+    column, _, condition = text.partition("=")
+    if not column or "." not in condition:
+        raise argparse.ArgumentTypeError(f"expected COLUMN=OP.VALUE like game_id=eq.sweet-bonanza, got {text!r}")
+    return column, condition
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resumable keyset export of a table over PostgREST")
+    parser.add_argument("table", help="Table with created_at and id columns, e.g. game_spins")
+    parser.add_argument("--output", type=Path, required=True,
+                        help="Output file: .jsonl, .csv, .jsonl.gz or .csv.gz")
+    parser.add_argument("--select", default="*", help="Columns to export (default: all)")
+    parser.add_argument("--filter", type=parse_filter, action="append",
+                        help="PostgREST filter COLUMN=OP.VALUE (repeatable)")
+    parser.add_argument("--since", help="Only rows created at or after this timestamp")
+    parser.add_argument("--until", help="Only rows created before this timestamp")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Slices paged at once")
+    parser.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE)
+    parser.add_argument("--restart", action="store_true",
+                        help="Discard an existing checkpoint and start over")
+    args = parser.parse_args()
+
+    print("📤 TABLE EXPORT")
+    print("=" * 60)
+
+    service_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+    if not service_key:
+        print("❌ SUPABASE_SERVICE_ROLE_KEY not set")
+        return 1
+    try:
+        output_format(args.output)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+
+    filters = dict(args.filter or [])
+    stop = threading.Event()
+    started = time.perf_counter()
+    with SupabaseClient(service_key=service_key, pool_size=args.workers) as client:
+        try:
+            job = None if args.restart else load_checkpoint(args.output)
+            if job and not job.matches(args.table, args.select, filters, args.since, args.until):
+                print(f"❌ {job.checkpoint_path} is from a different export; pass --restart to discard it")
+                return 1
+            if job:
+                print(f"⏯️  Resuming: {job.rows:,} rows already exported, "
+                      f"{sum(not s.done for s in job.slices)} of {len(job.slices)} slices to go")
+            else:
+                job = plan_export(client, args.table, args.output, args.select, filters, args.page_size,
+                                  args.workers * SLICES_PER_WORKER, args.since, args.until)
+                print(f"🧭 {args.table}: {len(job.slices)} slices of created_at, {args.workers} workers")
+
+            exported = job.rows
+            resumed = exported
+
+            def on_page(rows: int) -> None:
+                nonlocal exported
+                exported += rows
+                rate = (exported - resumed) / max(time.perf_counter() - started, 1e-9)
+                print(f"\r   {exported:,} rows ({rate:,.0f} rows/s)", end="", flush=True)
+
+            size = run_export(client, job, args.workers, on_page, stop)
+        except (RuntimeError, ValueError, OSError) as e:
+            print(f"\n❌ {e}")
+            return 1
+        except KeyboardInterrupt:
+            # Running slices stop after their current page instead of finishing
+            stop.set()
+            print(f"\n⏸️  Interrupted - run the same command again to resume from {args.output}.checkpoint.json")
+            return 130
+        requests_sent = client.request_count
+    print()
+
+    elapsed = time.perf_counter() - started
+    print(f"✅ {job.rows:,} rows -> {args.output} ({size / 1e6:.1f} MB) in {elapsed:.1f}s, "
+          f"{requests_sent:,} requests")
+    print("=" * 60)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
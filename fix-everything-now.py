@@ -5,50 +5,16 @@ COMPLETE FIX - Add column and update thumbnails automatically
 
 import os
 import sys
-import requests
-import json
+import argparse
 
-PROJECT_REF = "yiorietrtfosjnpzznnr"
-SUPABASE_URL = f"https://{PROJECT_REF}.supabase.co"
-# Get service role key from environment (NEVER hardcode!)
-SERVICE_ROLE_KEY = os.environ.get("SUPABASE_SERVICE_ROLE_KEY")
+from supabase_tools.catalogue import GAMES_WITH_IMAGES, print_bulk_result, update_thumbnails
+from supabase_tools.client import SupabaseClient
+from supabase_tools.concurrency import add_concurrency_argument, run_concurrently
 
-if not SERVICE_ROLE_KEY:
-    print("❌ Error: SUPABASE_SERVICE_ROLE_KEY environment variable not set")
-    print("   Set it via: export SUPABASE_SERVICE_ROLE_KEY='your-key'")
-    sys.exit(0)  # Exit gracefully
-
-headers = {
-    "apikey": SERVICE_ROLE_KEY,
-    "Authorization": f"Bearer {SERVICE_ROLE_KEY}",
-    "Content-Type": "application/json"
-}
-
-GAMES_WITH_IMAGES = [
-    'big-bass-splash', 'gates-of-olympus', 'sweet-bonanza', 'starlight-princess',
-    'legend-of-cleopatra', 'egypt-fire', 'golden-pharaoh-megaways', 'crystal-fortune-deluxe',
-    'oceans-treasure-quest', 'blackjack-royal-vip', 'dragons-fire-prosperity', 'lightning-strike-roulette',
-    'wild-west-bounty-hunter', 'cosmic-gems-cluster', 'mega-fortune-jackpot-king', 'ancient-aztec-gold',
-    'baccarat-royale-supreme', 'neon-city-nights', 'viking-conquest-saga', 'crash-rocket-multiplier',
-    'diamond-dynasty-deluxe', 'egyptian-mysteries-unlimited', 'fruit-blitz-super-spin', 'pirates-plunder-megaways',
-    'starburst-crystal-classic', 'buffalo-thunder-lightning', 'zeus-power-reels', 'sugar-rush-candy-blitz',
-    'moon-princess-trinity', 'roulette-pro-european', 'aztec-bonanza-infinity', 'mega-moolah-fortune',
-    'dead-or-alive-outlaw', 'jammin-jars-cluster-party', 'book-of-secrets-deluxe', 'gonzos-quest-megaways',
-    'bonanza-goldmine-megaways', 'legacy-of-egypt-power', 'immortal-romance-remastered', 'fire-joker-respin',
-    'reactoonz-quantum-leap', 'street-racer-nitro', 'tiki-fortune-totem', 'tomb-raider-expedition',
-    'space-invaders-arcade', 'rainbow-riches-megaways', 'wolf-gold-moon-spin', 'poker-face-texas-holdem',
-    'jungle-adventure-expedition', 'mega-ball-live', 'gladiator-arena-champion', 'fortune-tiger-prosperity',
-    'fishing-frenzy-megaways'
-]
-
-def check_column_exists():
+def check_column_exists(client: SupabaseClient):
     """Check if thumbnail_url column exists"""
     try:
-        response = requests.get(
-            f"{SUPABASE_URL}/rest/v1/licensed_games?select=thumbnail_url&limit=1",
-            headers=headers,
-            timeout=10
-        )
+        response = client.rest("GET", "licensed_games", params={"select": "thumbnail_url", "limit": 1})
         if response.status_code == 200:
             return True
         return False
@@ -61,49 +27,39 @@ def add_column_via_rpc():
     # This won't work via REST API, but we can try
     return False
 
-def update_thumbnails_batch():
-    """Update thumbnails in batches"""
+def update_thumbnails_batch(client: SupabaseClient, concurrency: int = 1):
+    """Update all thumbnails with one bulk upsert"""
     print(f"\n📦 Updating thumbnails for {len(GAMES_WITH_IMAGES)} games...")
     print("-" * 60)
     
-    success_count = 0
-    failed = []
-    
-    # Update in batches of 10
-    for i in range(0, len(GAMES_WITH_IMAGES), 10):
-        batch = GAMES_WITH_IMAGES[i:i+10]
-        
-        for game_code in batch:
-            url = f"{SUPABASE_URL}/rest/v1/licensed_games"
-            params = {"game_code": f"eq.{game_code}"}
-            payload = {"thumbnail_url": f"/game-tiles/{game_code}.jpg"}
-            
-            try:
-                response = requests.patch(url, json=payload, headers=headers, params=params, timeout=10)
-                if response.status_code in [200, 204]:
-                    success_count += 1
-                else:
-                    failed.append(game_code)
-            except Exception as e:
-                failed.append(game_code)
-        
-        if (i + 10) % 20 == 0:
-            print(f"   ✅ Updated {success_count}/{len(GAMES_WITH_IMAGES)}...")
-    
-    print(f"\n✅ Updated {success_count}/{len(GAMES_WITH_IMAGES)} game thumbnails")
-    if failed:
-        print(f"⚠️  Failed: {len(failed)} games")
-        print(f"   {', '.join(failed[:5])}...")
+    try:
+        result = update_thumbnails(client, concurrency=concurrency)
+    except Exception as e:
+        print(f"⚠️  Bulk update failed: {e}")
+        return 0
     
-    return success_count
+    print_bulk_result(result, len(GAMES_WITH_IMAGES))
+    return len(result.written) + len(result.unchanged)
 
 def main():
+    parser = argparse.ArgumentParser(description="Check the thumbnail column and update thumbnails")
+    add_concurrency_argument(parser)
+    args = parser.parse_args()
+    
+    # Get service role key from environment (NEVER hardcode!)
+    service_key = os.environ.get("SUPABASE_SERVICE_ROLE_KEY")
+    if not service_key:
+        print("❌ Error: SUPABASE_SERVICE_ROLE_KEY environment variable not set")
+        print("   Set it via: export SUPABASE_SERVICE_ROLE_KEY='your-key'")
+        return 1
+    client = SupabaseClient(service_key, pool_size=args.concurrency)
+    
     print("🚀 COMPLETE DATABASE FIX - AUTOMATED")
     print("=" * 60)
     
     # Step 1: Check if column exists
     print("\n📋 Step 1: Checking thumbnail_url column...")
-    if check_column_exists():
+    if check_column_exists(client):
         print("✅ thumbnail_url column exists!")
     else:
         print("⚠️  thumbnail_url column MISSING!")
@@ -120,16 +76,24 @@ def main():
     
     # Step 2: Update thumbnails
     print("\n📋 Step 2: Updating game thumbnails...")
-    success_count = update_thumbnails_batch()
+    success_count = update_thumbnails_batch(client, args.concurrency)
     
     # Step 3: Verify
     print("\n📋 Step 3: Verifying updates...")
+    # Sample and total count are independent reads
+    queries = [
+        ({"select": "game_code,name,thumbnail_url", "thumbnail_url": "not.is.null", "limit": 10}, {}),
+        ({"select": "count"}, {"Prefer": "count=exact"}),
+    ]
+    sample, count = run_concurrently(
+        lambda query: client.rest("GET", "licensed_games", params=query[0], headers=query[1]),
+        queries,
+        args.concurrency
+    )
     try:
-        response = requests.get(
-            f"{SUPABASE_URL}/rest/v1/licensed_games?select=game_code,name,thumbnail_url&thumbnail_url=not.is.null&limit=10",
-            headers=headers,
-            timeout=10
-        )
+        if not sample.ok:
+            raise sample.error
+        response = sample.value
         if response.status_code == 200:
             games = response.json()
             print(f"✅ {len(games)} games now have thumbnails!")
@@ -138,12 +102,8 @@ def main():
                 print(f"   - {game.get('name')}: {game.get('thumbnail_url')}")
             
             # Check total
-            total_response = requests.get(
-                f"{SUPABASE_URL}/rest/v1/licensed_games?select=count",
-                headers={**headers, "Prefer": "count=exact"},
-                timeout=10
-            )
-            if total_response.status_code == 200:
+            total_response = count.value
+            if count.ok and total_response.status_code == 200:
                 total = total_response.headers.get('content-range', '').split('/')[-1]
                 print(f"\n   Total games in database: {total}")
         else:
@@ -166,5 +126,5 @@ def main():
     return 0
 
 if __name__ == "__main__":
-    exit(main())
+    sys.exit(main())
 
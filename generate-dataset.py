@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Generate a production-scale synthetic dataset for benchmarking
+Streams seeded, FK-consistent rows for users, spins, sessions, transactions,
+bonuses, verifications and rate limit logs into PostgreSQL with parallel COPY
+"""
+
+import sys
+import json
+import argparse
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from supabase_tools.db import connect
+from supabase_tools.localdb import prepare_supabase_schema
+from supabase_tools.query_plans import build_schema, schema_sources
+from supabase_tools.synthetic import (
+    DEFAULT_PARTITION_CHUNKS, DEFERRED_INDEXES_PATH, TABLES, Distributions, build_spec, generate_dataset
+)
+
+HOSTED_SUFFIXES = (".supabase.co", ".supabase.com")
+
+
+def parse_count(text: str) -> int:
+    """'250000', '250k', '100M' or '1e8'"""
+    multipliers = {"k": 1_000, "m": 1_000_000, "b": 1_000_000_000}
+    try:
+        if text[-1].lower() in multipliers:
+            return int(float(text[:-1]) * multipliers[text[-1].lower()])
+        return int(float(text))
+    except (ValueError, IndexError):
+        raise argparse.ArgumentTypeError(f"expected a row count like 250k or 100M, got {text!r}") from None
+
+
+def parse_anchor(text: str) -> int:
+    try:
+        day = datetime.strptime(text, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected YYYY-MM-DD, got {text!r}") from None
+    return int(day.timestamp())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load a synthetic dataset with parallel COPY")
+    parser.add_argument("--database-url", required=True,
+                        help="Database to load (a benchmark copy - never the live project)")
+    parser.add_argument("--allow-remote", action="store_true",
+                        help="Permit a hosted Supabase database as the target")
+    parser.add_argument("--tables", nargs="+", choices=TABLES, default=list(TABLES),
+                        help="Only load these tables")
+    parser.add_argument("--seed", type=int, default=1, help="Dataset seed")
+    parser.add_argument("--users", type=parse_count, default=100_000)
+    parser.add_argument("--spins", type=parse_count, default=10_000_000)
+    parser.add_argument("--sessions", type=parse_count, help="Default: spins / 50")
+    parser.add_argument("--transactions", type=parse_count, help="Default: spins / 5")
+    parser.add_argument("--bonuses", type=parse_count, help="Default: users * 2")
+    parser.add_argument("--rate-limit-logs", type=parse_count, help="Default: spins / 10")
+    parser.add_argument("--verify-ratio", type=float, default=0.1,
+                        help="Share of spins with a provably_fair_verification row")
+    parser.add_argument("--anchor", type=parse_anchor,
+                        help="Day the history window ends, YYYY-MM-DD (default: today UTC)")
+
+    shape = parser.add_argument_group("distributions")
+    defaults = Distributions()
+    shape.add_argument("--activity-skew", type=float, default=defaults.activity_skew,
+                       help="Player activity power law; 1 = every player equally busy")
+    shape.add_argument("--game-skew", type=float, default=defaults.game_skew,
+                       help="Zipf exponent of game popularity")
+    shape.add_argument("--wager-median", type=float, default=defaults.wager_median)
+    shape.add_argument("--wager-sigma", type=float, default=defaults.wager_sigma,
+                       help="Log-normal wager spread; larger = heavier tail")
+    shape.add_argument("--days", type=int, default=defaults.days, help="Days of history")
+    shape.add_argument("--peak-hour", type=int, default=defaults.peak_hour_utc,
+                       help="Busiest hour of the day (UTC)")
+
+    parser.add_argument("--workers", type=int, help="Loader processes (default: all cores)")
+    parser.add_argument("--partition-chunks", type=int, default=DEFAULT_PARTITION_CHUNKS,
+                        help="50k-row chunks per loader partition")
+    parser.add_argument("--build-schema", action="store_true",
+                        help="Apply the project schema to an empty database first")
+    parser.add_argument("--truncate", action="store_true",
+                        help="TRUNCATE ... CASCADE the target tables first")
+    parser.add_argument("--defer-indexes", action="store_true",
+                        help="Drop secondary indexes during the load and rebuild them after")
+    parser.add_argument("--keep-triggers", action="store_true",
+                        help="Run FK checks and triggers (slower; needs no superuser)")
+    parser.add_argument("--json", type=Path, help="Also write the load report to this file")
+    args = parser.parse_args()
+
+    host = urlsplit(args.database_url).hostname or ""
+    if host.endswith(HOSTED_SUFFIXES) and not args.allow_remote:
+        print(f"❌ {host} is a hosted Supabase database - pass --allow-remote if you really mean it")
+        return 1
+
+    distributions = Distributions(
+        activity_skew=args.activity_skew, game_skew=args.game_skew,
+        wager_median=args.wager_median, wager_sigma=args.wager_sigma,
+        days=args.days, peak_hour_utc=args.peak_hour,
+    )
+    spec = build_spec(
+        args.seed, args.users, args.spins, args.sessions, args.transactions, args.bonuses,
+        args.rate_limit_logs, args.verify_ratio, args.anchor, distributions
+    )
+    tables = [table for table in TABLES if table in args.tables]
+
+    print("🏭 SYNTHETIC DATASET")
+    print("=" * 60)
+    print(f"🎲 Seed {spec.seed}, {len(spec.games)} games, {distributions.days} days "
+          f"to {datetime.fromtimestamp(spec.anchor, timezone.utc):%Y-%m-%d}")
+    for table in tables:
+        print(f"   {table:<28} {spec.rows(table):>14,} rows")
+
+    try:
+        if args.build_schema:
+            prepare_supabase_schema(args.database_url)
+            failures = build_schema(args.database_url, schema_sources())
+            print(f"📦 Schema applied ({len(failures)} statements skipped)")
+        if args.truncate:
+            conn = connect(args.database_url, autocommit=True)
+            try:
+                with conn.cursor() as cur:
+                    names = [table if "." in table else f"public.{table}" for table in tables]
+                    cur.execute(f"TRUNCATE {', '.join(names)} CASCADE")
+            finally:
+                conn.close()
+            print("🧹 Target tables truncated")
+
+        def progress(result) -> None:
+            partition = result.partition
+            rate = result.rows / result.seconds if result.seconds else 0
+            print(f"   {partition.table:<28} chunks {partition.first_chunk}-{partition.last_chunk - 1}: "
+                  f"{result.rows:,} rows, {rate:,.0f} rows/s")
+
+        print(f"\n🚚 Loading{' (indexes deferred)' if args.defer_indexes else ''}")
+        report = generate_dataset(
+            args.database_url, spec, tables, workers=args.workers,
+            partition_chunks=args.partition_chunks, skip_triggers=not args.keep_triggers,
+            defer_indexes=args.defer_indexes, progress=progress
+        )
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        return 1
+    except Exception as e:
+        # Typically permission denied for session_replication_role
+        print(f"❌ Load failed: {str(e).strip()}")
+        if not args.keep_triggers:
+            print("   Without superuser rights, retry with --keep-triggers")
+        if args.defer_indexes and DEFERRED_INDEXES_PATH.exists():
+            print(f"   The dropped indexes may not all be back; their definitions are in {DEFERRED_INDEXES_PATH}")
+        return 1
+
+    print(f"\n✅ {report.total_rows:,} rows in {report.wall_seconds:.0f}s "
+          f"({report.total_rows / report.wall_seconds:,.0f} rows/s)")
+    if args.defer_indexes:
+        print(f"🗂️  Indexes rebuilt in {report.index_seconds:.0f}s")
+
+    if args.json:
+        args.json.write_text(json.dumps({
+            "seed": spec.seed,
+            "anchor": spec.anchor,
+            "rows": report.rows,
+            "load_seconds": report.seconds,
+            "index_seconds": report.index_seconds,
+            "wall_seconds": report.wall_seconds,
+        }, indent=2) + "\n")
+        print(f"📝 Results written to {args.json}")
+    print("=" * 60)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
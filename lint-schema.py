@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Lint the indexes declared across the migrations and root SQL scripts
+Replays the DDL offline into the final schema and reports duplicate,
+redundant and invalid indexes, plus what each hot-table insert maintains
+"""
+
+import sys
+import json
+import argparse
+from dataclasses import asdict
+
+from supabase_tools.query_plans import schema_sources
+from supabase_tools.schema_lint import lint_sources
+
+MARKS = {"invalid": "❌", "duplicate": "❌", "conflict": "❌", "redundant": "⚠️ ", "predicate": "⚠️ "}
+
+
+def print_costs(costs) -> None:
+    print("\n📝 Index writes per insert (hot tables)")
+    for cost in costs:
+        extra = []
+        if cost.conditional:
+            extra.append(f"+{cost.conditional} partial")
+        if cost.summarized:
+            extra.append(f"{cost.summarized} BRIN")
+        line = f"   {cost.table:<36} {cost.entries} entries" + (f" ({', '.join(extra)})" if extra else "")
+        line += f", ~{cost.bytes} B"
+        if cost.redundant:
+            line += f" - {cost.redundant} removable"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Static lint of the schema's indexes")
+    parser.add_argument("--json", action="store_true", help="Print findings and costs as JSON")
+    parser.add_argument("--strict", action="store_true",
+                        help="Also fail on warnings (redundant indexes, pointless predicates)")
+    args = parser.parse_args()
+
+    sources = schema_sources()
+    model, findings, costs = lint_sources(sources)
+    errors = [f for f in findings if f.error]
+    failed = bool(errors) or (args.strict and bool(findings))
+
+    if args.json:
+        print(json.dumps({
+            "sources": [source.name for source in sources],
+            "tables": len(model.tables),
+            "indexes": len(model.indexes),
+            "findings": [dict(asdict(f), error=f.error) for f in findings],
+            "insert_costs": [asdict(cost) for cost in costs],
+        }, indent=2))
+        return 1 if failed else 0
+
+    print("🔎 SCHEMA INDEX LINT")
+    print("=" * 60)
+    print(f"📄 {len(sources)} SQL files -> {len(model.tables)} tables, {len(model.indexes)} indexes")
+
+    if findings:
+        print()
+        table = None
+        for finding in sorted(findings, key=lambda f: (f.table, f.index, f.kind)):
+            if finding.table != table:
+                table = finding.table
+                print(f"📋 {table}")
+            print(f"   {MARKS[finding.kind]} {finding.index} [{finding.kind}]: {finding.message}")
+            print(f"      declared in {finding.source}")
+    else:
+        print("\n✅ No duplicate, redundant or invalid indexes")
+
+    print_costs(costs)
+
+    print("\n" + "=" * 60)
+    warnings = len(findings) - len(errors)
+    if failed:
+        print(f"❌ {len(errors)} errors, {warnings} warnings")
+        return 1
+    print(f"✅ {len(errors)} errors, {warnings} warnings")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Load test the spin and spin-outcome edge functions
+Offers open-loop spin traffic at increasing rates from synthetic players and
+reports latency percentiles, 429 and error rates per stage
+"""
+
+import os
+import sys
+import json
+import argparse
+from pathlib import Path
+
+from supabase_tools.config import SUPABASE_URL
+from supabase_tools.loadgen import (
+    DEFAULT_MAX_IN_FLIGHT, DEFAULT_TIMEOUT, TrafficModel, load_tokens, mint_token,
+    parse_mix, run_load, saturation_point, synthetic_user_ids
+)
+
+
+def parse_stages(text: str):
+    """'50,100,200' or a ramp 'START:STOP:STEP'"""
+    try:
+        if ":" in text:
+            start, stop, step = (float(part) for part in text.split(":"))
+            stages = []
+            while start <= stop + 1e-9:
+                stages.append(start)
+                start += step
+            return stages
+        return [float(part) for part in text.split(",")]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected RPS[,RPS...] or START:STOP:STEP, got {text!r}") from None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the spin edge functions")
+    parser.add_argument("--url", default=f"{SUPABASE_URL}/functions/v1",
+                        help="Functions base URL (default: SUPABASE_URL/functions/v1; "
+                             "http://localhost:54321/functions/v1 for a local stack)")
+    parser.add_argument("--rps", type=parse_stages, default=[10.0],
+                        help="Offered requests/second per stage: 50,100,200 or 20:200:20")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds per stage")
+    parser.add_argument("--mix", type=parse_mix, default={"spin": 1.0},
+                        help="Endpoint weights, e.g. spin=0.8,spin-outcome=0.2")
+    parser.add_argument("--users", type=int, default=1000, help="Synthetic players to mint tokens for")
+    parser.add_argument("--jwt-secret", default=os.getenv("SUPABASE_JWT_SECRET"),
+                        help="Secret to mint player tokens with (default: $SUPABASE_JWT_SECRET)")
+    parser.add_argument("--tokens", type=Path, help="File of real access tokens, one per line")
+    parser.add_argument("--games", nargs="*", help="Game ids to spin (default: whole catalogue)")
+    parser.add_argument("--skew", type=float, default=1.0,
+                        help="Zipf exponent of player activity (0 = every player equally busy)")
+    parser.add_argument("--max-in-flight", type=int, default=DEFAULT_MAX_IN_FLIGHT,
+                        help="Outstanding requests before new ones are dropped")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="Per-request timeout")
+    parser.add_argument("--p99-budget", type=float, default=1000.0,
+                        help="p99 latency (ms) above which a stage counts as saturated")
+    parser.add_argument("--seed", type=int, default=0, help="Traffic model seed")
+    parser.add_argument("--json", type=Path, help="Write every stage's results to this file")
+    args = parser.parse_args()
+
+    if args.tokens:
+        tokens = load_tokens(args.tokens)
+    elif args.jwt_secret:
+        tokens = [mint_token(args.jwt_secret, user_id) for user_id in synthetic_user_ids(args.users)]
+    else:
+        print("❌ Need player tokens: pass --tokens FILE or --jwt-secret / SUPABASE_JWT_SECRET")
+        return 1
+
+    api_key = os.getenv("SUPABASE_ANON_KEY") or os.getenv("VITE_SUPABASE_PUBLISHABLE_KEY")
+    model = TrafficModel(tokens, args.mix, args.games, args.seed, args.skew)
+
+    print("🔥 SPIN LOAD TEST")
+    print("=" * 60)
+    print(f"🎯 {args.url}")
+    print(f"👥 {len(tokens)} players, {len(model.games)} games, "
+          f"{', '.join(f'{name} {weight:g}' for name, weight in args.mix.items())}")
+    print(f"\n{'offered':>8} {'sent/s':>8} {'ok/s':>8} {'p50':>8} {'p95':>8} {'p99':>8} "
+          f"{'max':>8} {'429':>6} {'err':>6} {'drop':>6}")
+
+    def on_stage(result) -> None:
+        stage = result.to_dict()
+        latency = stage["overall"]["latency"]
+        print(f"{result.target_rps:>8g} {stage['achieved_rps']:>8.1f} {stage['succeeded_rps']:>8.1f} "
+              f"{latency['p50_ms']:>6.0f}ms {latency['p95_ms']:>6.0f}ms {latency['p99_ms']:>6.0f}ms "
+              f"{latency['max_ms']:>6.0f}ms {100 * stage['overall']['rate_limited_rate']:>5.1f}% "
+              f"{100 * stage['overall']['error_rate']:>5.1f}% {result.dropped:>6}")
+
+    try:
+        results = run_load(args.url, model, args.rps, args.duration, api_key,
+                           args.max_in_flight, args.timeout, on_stage)
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        return 1
+
+    saturated = saturation_point(results, p99_budget=args.p99_budget / 1000)
+    if saturated:
+        print(f"\n⚠️  Saturated at {saturated.target_rps:g} req/s offered "
+              f"({saturated.achieved_rps:.1f} req/s delivered)")
+    else:
+        print(f"\n✅ Kept up with every stage up to {max(args.rps):g} req/s")
+
+    if args.json:
+        report = {
+            "url": args.url,
+            "players": len(tokens),
+            "mix": args.mix,
+            "saturated_at_rps": saturated.target_rps if saturated else None,
+            "stages": [result.to_dict() for result in results],
+        }
+        args.json.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"📝 Results written to {args.json}")
+    print("=" * 60)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
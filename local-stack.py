@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Offline stand-in for the Supabase project
+Starts a throwaway PostgreSQL, stubs the platform schemas, builds the base
+schema the editor-generated migrations describe, applies the later
+migrations through the ledger and serves a PostgREST-compatible API on
+localhost, so deploy scripts can be timed and regression-tested without
+touching production
+"""
+
+import sys
+import time
+import argparse
+import uuid
+
+from supabase_tools.bulk import DEFAULT_CHUNK_SIZE, bulk_update_column, bulk_upsert
+from supabase_tools.catalogue import print_bulk_result, update_thumbnails
+from supabase_tools.client import SupabaseClient
+from supabase_tools.concurrency import add_concurrency_argument
+from supabase_tools.config import PROJECT_DIR
+from supabase_tools.localdb import LocalPostgres, prepare_supabase_schema
+from supabase_tools.migrations import (
+    MIGRATIONS_DIR, Migration, discover_migrations, print_migration_report, run_migrations,
+    split_editor_migrations
+)
+from supabase_tools.query_plans import build_schema
+from supabase_tools.rest_shim import RestShim
+
+COMBINED_MIGRATION = PROJECT_DIR / "supabase" / "all_migrations_combined.sql"
+LOCAL_SERVICE_KEY = "local-service-role"
+
+
+def build_base_schema(dsn: str, base: list) -> None:
+    """
+    The editor's migrations are not in dependency order, so they are applied
+    to a fixpoint, as the query-plan check does, then recorded in the ledger
+    """
+    print(f"📦 Building the base schema from {len(base)} editor-generated migrations")
+    started = time.perf_counter()
+    failures = build_schema(dsn, base)
+    run_migrations(dsn, base, baseline=True)
+    print(f"⏱️  Base schema: {time.perf_counter() - started:.2f}s")
+    for failure in failures:
+        print(f"   ➖ {failure['source']}: {failure['error']}")
+
+
+def apply_migrations(dsn: str, combined: bool, incremental: list) -> bool:
+    migrations = [Migration.from_path(COMBINED_MIGRATION)] if combined else incremental
+    source = COMBINED_MIGRATION.name if combined else f"{MIGRATIONS_DIR.name}/*.sql"
+    print(f"📦 Applying {len(migrations)} migration files from {source}")
+
+    started = time.perf_counter()
+    report = run_migrations(dsn, migrations)
+    elapsed = time.perf_counter() - started
+
+    print_migration_report(report)
+    statements = sum(entry.get("statements", 0) for entry in report.applied)
+    print(f"⏱️  Migrations: {elapsed:.2f}s total, {statements} statements")
+    return report.ok
+
+
+def benchmark_bulk_writes(client: SupabaseClient, rows: int, chunk_size: int,
+                          concurrency: int) -> None:
+    """Time a bulk upsert and a bulk column update of `rows` synthetic games"""
+    run_id = uuid.uuid4().hex[:8]
+    games = [
+        {"game_code": f"bench-{run_id}-{i}", "name": f"Benchmark {i}", "category": "slot"}
+        for i in range(rows)
+    ]
+
+    started = time.perf_counter()
+    result = bulk_upsert(client, "licensed_games", games, "game_code", chunk_size, concurrency)
+    elapsed = time.perf_counter() - started
+    print_bulk_result(result, rows, "benchmark upserts")
+    print(f"⏱️  Upsert: {rows / elapsed:,.0f} rows/s ({result.requests} requests, {elapsed:.2f}s)")
+
+    values = {game["game_code"]: f"/game-tiles/bench-{i}.jpg" for i, game in enumerate(games)}
+    started = time.perf_counter()
+    result = bulk_update_column(client, "licensed_games", "game_code", values, "thumbnail_url",
+                                ("name", "category"), chunk_size, concurrency=concurrency)
+    elapsed = time.perf_counter() - started
+    print_bulk_result(result, rows, "benchmark thumbnail updates")
+    print(f"⏱️  Update: {rows / elapsed:,.0f} rows/s ({result.requests} requests, {elapsed:.2f}s)")
+
+    client.rest("DELETE", "licensed_games", params={"game_code": f"like.bench-{run_id}-*"})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the database and REST API locally")
+    parser.add_argument("--database-url",
+                        help="Use an existing (empty) PostgreSQL instead of starting one")
+    parser.add_argument("--combined", action="store_true",
+                        help=f"Apply {COMBINED_MIGRATION.name} instead of {MIGRATIONS_DIR.name}/")
+    parser.add_argument("--rest-port", type=int, default=0, help="REST shim port (default: any free)")
+    parser.add_argument("--benchmark-rows", type=int, default=0,
+                        help="Time bulk upsert/update of N synthetic games")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--serve", action="store_true",
+                        help="Keep the stack running until Ctrl+C")
+    parser.add_argument("--keep", action="store_true", help="Keep the data directory on exit")
+    add_concurrency_argument(parser)
+    args = parser.parse_args()
+
+    print("🚀 LOCAL SUPABASE STAND-IN")
+    print("=" * 60)
+
+    server = None
+    try:
+        if args.database_url:
+            dsn = args.database_url
+        else:
+            started = time.perf_counter()
+            server = LocalPostgres(keep=args.keep).start()
+            dsn = server.dsn
+            print(f"✅ PostgreSQL started in {time.perf_counter() - started:.2f}s ({server.root})")
+
+        prepare_supabase_schema(dsn)
+        print("✅ auth/storage stubs and roles created")
+        base, incremental = split_editor_migrations(discover_migrations())
+        build_base_schema(dsn, base)
+        if not apply_migrations(dsn, args.combined, incremental):
+            return 1
+
+        shim = RestShim(dsn, pool_size=args.concurrency)
+        url = shim.serve(port=args.rest_port)
+        print(f"✅ REST shim listening on {url}/rest/v1")
+
+        try:
+            with SupabaseClient(LOCAL_SERVICE_KEY, supabase_url=url,
+                                pool_size=args.concurrency) as client:
+                started = time.perf_counter()
+                result = update_thumbnails(client, concurrency=args.concurrency)
+                elapsed = time.perf_counter() - started
+                print(f"⏱️  Thumbnail sync: {elapsed:.2f}s ({result.requests} requests)")
+
+                if args.benchmark_rows:
+                    benchmark_bulk_writes(client, args.benchmark_rows, args.chunk_size,
+                                          args.concurrency)
+
+            if args.serve:
+                print("\n📝 Point the scripts at this stack with:")
+                print(f"   export SUPABASE_URL={url}")
+                print(f"   export SUPABASE_SERVICE_ROLE_KEY={LOCAL_SERVICE_KEY}")
+                print(f"   export DATABASE_URL={dsn}")
+                print("\nPress Ctrl+C to stop")
+                while True:
+                    time.sleep(3600)
+        finally:
+            shim.stop()
+    except KeyboardInterrupt:
+        print("\n⏹️  Stopping")
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        if server:
+            server.stop()
+
+    print("=" * 60)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Maintain the monthly partitions of game_spins, rate_limit_logs and
+provably_fair_verification: create upcoming months, archive months past
+retention to Parquet, and restore or query archived months for audits
+"""
+
+import sys
+import json
+import argparse
+from datetime import datetime, timezone
+from pathlib import Path
+
+from supabase_tools.db import connect, database_url
+from supabase_tools.partitions import (
+    ARCHIVE_DIR, MONTHS_AHEAD, RETENTION_MONTHS, TABLES, archive_partition, due_for_archive,
+    ensure_partitions, list_partitions, load_manifest, query_archives, restore_partition,
+    verify_archive
+)
+
+
+def parse_retention(text: str):
+    table, _, months = text.partition("=")
+    if table not in RETENTION_MONTHS or not months.isdigit():
+        raise argparse.ArgumentTypeError(f"expected TABLE=MONTHS with TABLE one of {', '.join(TABLES)}")
+    return table, int(months)
+
+
+def parse_moment(text: str) -> datetime:
+    try:
+        moment = datetime.fromisoformat(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected an ISO date or timestamp, got {text!r}") from None
+    return moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)
+
+
+def parse_where(text: str):
+    column, _, value = text.partition("=")
+    if not column or not _:
+        raise argparse.ArgumentTypeError(f"expected COLUMN=VALUE, got {text!r}")
+    return column, value
+
+
+def show_status(args) -> int:
+    manifest = load_manifest(args.archive_dir)
+    conn = connect(args.database_url)
+    try:
+        for table in args.tables:
+            partitions = list_partitions(conn, table)
+            due = {p.name for p in due_for_archive(partitions, RETENTION_MONTHS[table])}
+            print(f"\n📅 {table} ({len(partitions)} partitions, keeps {RETENTION_MONTHS[table]} months)")
+            for partition in partitions:
+                rows = "?" if partition.estimated_rows is None else f"~{partition.estimated_rows:,}"
+                note = "  ⏳ due for archive" if partition.name in due else ""
+                print(f"   {partition.label:<8} {rows:>14} rows{note}")
+            archived = sorted((e for e in manifest.values() if e.table == table), key=lambda e: e.month)
+            for entry in archived:
+                state = "restored" if entry.restored_at else "archived"
+                print(f"   {entry.month:<8} {entry.rows:>14,} rows  🧊 {state} ({entry.bytes / 1e6:.1f} MB)")
+    finally:
+        conn.close()
+    return 0
+
+
+def ensure(args) -> int:
+    conn = connect(args.database_url)
+    try:
+        created = ensure_partitions(conn, args.months_ahead, tuple(args.tables))
+    finally:
+        conn.close()
+    for table, count in created.items():
+        print(f"✅ {table}: {count} partition(s) created")
+    return 0
+
+
+def archive(args) -> int:
+    retention = dict(RETENTION_MONTHS, **dict(args.retention or []))
+    conn = connect(args.database_url)
+    try:
+        due = [p for table in args.tables for p in due_for_archive(list_partitions(conn, table), retention[table])]
+    finally:
+        conn.close()
+
+    if not due:
+        print("✅ Nothing past retention")
+        return 0
+    failed = 0
+    for partition in due:
+        if args.dry_run:
+            print(f"   would archive {partition.name}")
+            continue
+        try:
+            entry = archive_partition(args.database_url, partition, args.archive_dir)
+        except Exception as e:
+            print(f"❌ {partition.name}: {str(e).strip()}")
+            failed += 1
+            continue
+        print(f"🧊 {partition.name}: {entry.rows:,} rows -> {entry.path} ({entry.bytes / 1e6:.1f} MB)")
+    return 1 if failed else 0
+
+
+def verify(args) -> int:
+    entries = [e for e in load_manifest(args.archive_dir).values() if e.table in args.tables]
+    problems = [problem for problem in (verify_archive(e, args.archive_dir) for e in entries) if problem]
+    for problem in problems:
+        print(f"❌ {problem}")
+    print(f"{'✅' if not problems else '⚠️ '} {len(entries) - len(problems)} of {len(entries)} archives intact")
+    return 1 if problems else 0
+
+
+def restore(args) -> int:
+    entries = [e for e in load_manifest(args.archive_dir).values()
+               if e.table == args.table and e.month == args.month]
+    if not entries:
+        print(f"❌ No archive of {args.table} for {args.month}")
+        return 1
+    rows = restore_partition(args.database_url, entries[0], args.archive_dir)
+    print(f"✅ {entries[0].partition} attached again with {rows:,} rows")
+    return 0
+
+
+def query(args) -> int:
+    columns = args.columns.split(",") if args.columns else None
+    output = open(args.output, "w") if args.output else sys.stdout
+    count = 0
+    try:
+        for row in query_archives(args.table, args.since, args.until, dict(args.where or []),
+                                  columns, args.archive_dir):
+            output.write(json.dumps(row, default=str) + "\n")
+            count += 1
+            if args.limit and count >= args.limit:
+                break
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    print(f"🔎 {count:,} archived rows", file=sys.stderr)
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monthly partition maintenance and archives")
+    parser.add_argument("--database-url", default=database_url(),
+                        help="Database (default: $DATABASE_URL or $SUPABASE_DB_URL)")
+    parser.add_argument("--archive-dir", type=Path, default=ARCHIVE_DIR,
+                        help="Where archives and manifest.json live")
+    parser.add_argument("--table", dest="tables", action="append", choices=TABLES,
+                        help="Only this table (repeatable; default: all three)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("status", help="Partitions, their sizes and archived months")
+
+    ensure_parser = commands.add_parser("ensure", help="Create the coming months' partitions")
+    ensure_parser.add_argument("--months-ahead", type=int, default=MONTHS_AHEAD)
+
+    archive_parser = commands.add_parser("archive", help="Archive and drop months past retention")
+    archive_parser.add_argument("--retention", type=parse_retention, action="append",
+                                help="Override a table's retention, e.g. game_spins=24")
+    archive_parser.add_argument("--dry-run", action="store_true", help="Only list the months due")
+
+    commands.add_parser("verify", help="Check archive files against the manifest")
+
+    restore_parser = commands.add_parser("restore", help="Attach an archived month again")
+    restore_parser.add_argument("table", choices=TABLES)
+    restore_parser.add_argument("month", help="YYYY-MM")
+
+    query_parser = commands.add_parser("query", help="Read archived rows as JSONL")
+    query_parser.add_argument("table", choices=TABLES)
+    query_parser.add_argument("--since", type=parse_moment)
+    query_parser.add_argument("--until", type=parse_moment)
+    query_parser.add_argument("--where", type=parse_where, action="append",
+                              help="COLUMN=VALUE equality filter (repeatable)")
+    query_parser.add_argument("--columns", help="Comma-separated columns (default: all)")
+    query_parser.add_argument("--limit", type=int)
+    query_parser.add_argument("--output", help="Write JSONL here instead of stdout")
+    args = parser.parse_args()
+    args.tables = args.tables or list(TABLES)
+
+    handlers = {"status": show_status, "ensure": ensure, "archive": archive,
+                "verify": verify, "restore": restore, "query": query}
+    if args.command in ("status", "ensure", "archive", "restore") and not args.database_url:
+        print("❌ No database: pass --database-url or set DATABASE_URL")
+        return 1
+
+    if args.command != "query":
+        print("🗓️  PARTITION MAINTENANCE")
+        print("=" * 60)
+    try:
+        return handlers[args.command](args)
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Measure the return to player of the spin engine offline
+Runs the Python port of the spin edge function's standard play and compares
+simulated RTP and volatility with the figures in game_definitions.json
+"""
+
+import sys
+import time
+import argparse
+
+from supabase_tools.catalogue import load_game_definitions
+from supabase_tools.simulation import DEFAULT_BATCH_SIZE, check_vectors, simulate, vectors_stale
+from supabase_tools.slot_engine import GAME_CONFIGS, get_game_config
+
+
+def default_games() -> list:
+    """Every game_definitions.json slug, then GAME_CONFIGS keys not already listed"""
+    slugs = [game["slug"] for game in load_game_definitions()]
+    return slugs + [slug for slug in GAME_CONFIGS if slug not in slugs]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate spin RTP per game")
+    parser.add_argument("games", nargs="*", help="Game slugs (default: every known game)")
+    parser.add_argument("--spins", type=int, default=1_000_000, help="Spins per game")
+    parser.add_argument("--seed-prefix", default="sim-", help="Seed prefix; spin i uses <prefix><i:012d>")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    print("🎰 SPIN ENGINE RTP SIMULATION")
+    print("=" * 60)
+
+    try:
+        problems = check_vectors()
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        return 1
+    if problems:
+        print(f"❌ Port disagrees with {len(problems)} recorded TypeScript outcomes:")
+        for problem in problems[:10]:
+            print(f"   - {problem}")
+        return 1
+    print("✅ Port matches the recorded TypeScript outcomes")
+    if vectors_stale():
+        print("⚠️  supabase/functions/spin/index.ts changed since the vectors were recorded")
+
+    advertised = {game["slug"]: game for game in load_game_definitions()}
+    games = args.games or default_games()
+    print(f"📦 {len(games)} games x {args.spins:,} spins\n")
+    print(f"{'game':<40} {'layout':>6} {'RTP':>8} {'adv.':>6} {'hit %':>6} {'SD':>6}  volatility")
+
+    started = time.perf_counter()
+    for game_id in games:
+        config = get_game_config(game_id)
+        stats = simulate(game_id, args.spins, args.seed_prefix, batch_size=args.batch_size)
+        listed = advertised.get(game_id, {})
+        listed_rtp = f"{listed['rtp']:.1f}" if "rtp" in listed else "-"
+        listed_vol = f" (adv. {listed['vol']})" if "vol" in listed else ""
+        print(f"{game_id:<40} {config.reels}x{config.rows:<4} {stats.rtp:>7.2f}% {listed_rtp:>6} "
+              f"{100 * stats.hit_frequency:>6.2f} {stats.std_dev:>6.2f}  {stats.volatility}{listed_vol}")
+
+    elapsed = time.perf_counter() - started
+    total = args.spins * len(games)
+    print(f"\n⏱️  {total:,} spins in {elapsed:.1f}s ({total / elapsed:,.0f} spins/s)")
+    print("=" * 60)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
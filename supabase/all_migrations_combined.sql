@@ -503,3 +503,527 @@ BEGIN
 END;
 $$;
 
+-- =====================================================
+-- CONSTANT-TIME RATE LIMITING
+-- =====================================================
+-- check_rate_limit() used to COUNT(*) rate_limit_logs over the window and
+-- log_rate_limit_action() inserted one row per spin into a table that was
+-- never pruned and carries several overlapping indexes.
+--
+-- Actions are now counted in 10-second buckets keyed by
+-- (user_id, action_type, bucket_start): logging is a single upsert and a
+-- check sums at most window/10 + 1 primary-key rows, weighting the oldest
+-- bucket by how much of it falls inside the window (sliding window
+-- counter). Buckets older than 24 hours are pruned as new ones are opened.
+-- The RPC signatures are unchanged.
+
+CREATE TABLE IF NOT EXISTS public.rate_limit_counters (
+  user_id UUID NOT NULL,
+  action_type TEXT NOT NULL,
+  bucket_start TIMESTAMP WITH TIME ZONE NOT NULL,
+  hits INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (user_id, action_type, bucket_start)
+);
+
+ALTER TABLE public.rate_limit_counters ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Admins can view rate limit counters" ON public.rate_limit_counters;
+CREATE POLICY "Admins can view rate limit counters"
+  ON public.rate_limit_counters FOR SELECT
+  USING (public.has_role(auth.uid(), 'admin'));
+
+-- Global pruning walks buckets by age
+CREATE INDEX IF NOT EXISTS idx_rate_limit_counters_bucket ON public.rate_limit_counters(bucket_start);
+
+-- Drop every expired bucket; also called now and then by log_rate_limit_action
+CREATE OR REPLACE FUNCTION public.prune_rate_limit_counters()
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  v_deleted INTEGER;
+BEGIN
+  DELETE FROM public.rate_limit_counters
+  WHERE bucket_start < now() - INTERVAL '24 hours';
+  GET DIAGNOSTICS v_deleted = ROW_COUNT;
+  RETURN v_deleted;
+END;
+$$;
+
+-- Dropped first: an older copy may name the limit p_max_requests, and
+-- CREATE OR REPLACE cannot rename parameters
+DROP FUNCTION IF EXISTS public.check_rate_limit(UUID, TEXT, INTEGER, INTEGER);
+CREATE FUNCTION public.check_rate_limit(
+  p_user_id UUID,
+  p_action_type TEXT,
+  p_max_actions INTEGER DEFAULT 60,
+  p_window_seconds INTEGER DEFAULT 60
+)
+RETURNS BOOLEAN
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+  SELECT COALESCE(SUM(
+           hits * LEAST(1.0, EXTRACT(EPOCH FROM
+             bucket_start + INTERVAL '10 seconds' - (now() - make_interval(secs => p_window_seconds))
+           ) / 10.0)
+         ), 0) < p_max_actions
+  FROM public.rate_limit_counters
+  WHERE user_id = p_user_id
+    AND action_type = p_action_type
+    AND bucket_start > now() - make_interval(secs => p_window_seconds) - INTERVAL '10 seconds';
+$$;
+
+DROP FUNCTION IF EXISTS public.log_rate_limit_action(UUID, TEXT, INET);
+CREATE FUNCTION public.log_rate_limit_action(
+  p_user_id UUID,
+  p_action_type TEXT,
+  p_ip_address INET DEFAULT NULL
+)
+RETURNS UUID
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  v_bucket TIMESTAMP WITH TIME ZONE := to_timestamp(floor(EXTRACT(EPOCH FROM now()) / 10) * 10);
+  v_new_bucket BOOLEAN;
+BEGIN
+  INSERT INTO public.rate_limit_counters AS c (user_id, action_type, bucket_start, hits)
+  VALUES (p_user_id, p_action_type, v_bucket, 1)
+  ON CONFLICT (user_id, action_type, bucket_start)
+  DO UPDATE SET hits = c.hits + 1
+  RETURNING (xmax = 0) INTO v_new_bucket;
+
+  -- Opening a bucket prunes this key's expired ones (a short primary-key
+  -- range) and, about once per thousand buckets, everyone else's
+  IF v_new_bucket THEN
+    DELETE FROM public.rate_limit_counters
+    WHERE user_id = p_user_id
+      AND action_type = p_action_type
+      AND bucket_start < now() - INTERVAL '24 hours';
+    IF random() < 0.001 THEN
+      PERFORM public.prune_rate_limit_counters();
+    END IF;
+  END IF;
+
+  -- Kept for callers of the old signature; no log row is written any more
+  RETURN gen_random_uuid();
+END;
+$$;
+
+GRANT EXECUTE ON FUNCTION public.check_rate_limit(UUID, TEXT, INTEGER, INTEGER) TO authenticated, service_role;
+GRANT EXECUTE ON FUNCTION public.log_rate_limit_action(UUID, TEXT, INET) TO authenticated, service_role;
+GRANT EXECUTE ON FUNCTION public.prune_rate_limit_counters() TO service_role;
+
+-- Nothing reads rate_limit_logs by player any more, so the old limiter's
+-- overlapping indexes go: every logged action wrote all of them.
+-- idx_rate_limit_recent was only ever declared (Postgres rejects NOW() in
+-- an index predicate) and is dropped in case a copy exists.
+DROP INDEX IF EXISTS public.idx_rate_limit_user_action;
+DROP INDEX IF EXISTS public.idx_rate_limit_user_time;
+DROP INDEX IF EXISTS public.idx_rate_limit_action_time;
+DROP INDEX IF EXISTS public.idx_rate_limit_recent;
+
+-- =====================================================
+-- HOT PATH INDEXES
+-- =====================================================
+-- game_sessions only had its primary key, so both weekly-digest queries -
+-- the players active in the last seven days and each player's sessions in
+-- that window, newest first - read the whole table.
+--
+-- The lobby lists active games of one category by name. The old partial
+-- index led with status, which its predicate already fixes, so category
+-- could not narrow the scan and the planner preferred a sequential scan.
+
+CREATE INDEX IF NOT EXISTS idx_game_sessions_user_start
+  ON public.game_sessions(user_id, start_time DESC);
+
+CREATE INDEX IF NOT EXISTS idx_game_sessions_start_time
+  ON public.game_sessions(start_time);
+
+CREATE INDEX IF NOT EXISTS idx_licensed_games_active_category
+  ON public.licensed_games(category, name) WHERE status = 'active';
+
+DROP INDEX IF EXISTS public.idx_licensed_games_status_category;
+
+-- =====================================================
+-- WEEKLY DIGEST QUEUE
+-- =====================================================
+-- Weekly metrics are computed by a set-based batch job (one grouped scan of
+-- the week's game_sessions) and queued here, one row per player per week,
+-- for the email renderer. weekly-digest used to issue two queries per
+-- active player instead.
+
+CREATE TABLE IF NOT EXISTS public.weekly_digest_queue (
+  week_ending DATE NOT NULL,
+  user_id UUID NOT NULL REFERENCES public.users(id) ON DELETE CASCADE,
+  status TEXT NOT NULL DEFAULT 'pending', -- pending, sent, failed
+  metrics JSONB NOT NULL,
+  context TEXT NOT NULL, -- plain-text summary handed to the renderer
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+  processed_at TIMESTAMP WITH TIME ZONE,
+  PRIMARY KEY (week_ending, user_id)
+);
+
+ALTER TABLE public.weekly_digest_queue ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "System can manage weekly digest queue" ON public.weekly_digest_queue;
+CREATE POLICY "System can manage weekly digest queue"
+  ON public.weekly_digest_queue
+  FOR ALL
+  USING (auth.role() = 'service_role');
+
+DROP POLICY IF EXISTS "Admins can view weekly digest queue" ON public.weekly_digest_queue;
+CREATE POLICY "Admins can view weekly digest queue"
+  ON public.weekly_digest_queue
+  FOR SELECT
+  USING (public.has_role(auth.uid(), 'admin'));
+
+-- The renderer takes pending digests of one week in batches
+CREATE INDEX IF NOT EXISTS idx_weekly_digest_queue_pending
+  ON public.weekly_digest_queue(week_ending, user_id) WHERE status = 'pending';
+
+-- =====================================================
+-- MONTHLY PARTITIONS FOR APPEND-ONLY HISTORY
+-- =====================================================
+-- game_spins, rate_limit_logs and provably_fair_verification only ever
+-- grow. Range partitioning them by month on created_at keeps each hot
+-- partition (and its indexes) the size of one month, and lets the
+-- maintain-partitions.py job detach old months and archive them to
+-- Parquet instead of deleting rows.
+--
+-- Partitions live in the `partitions` schema, which the API does not
+-- expose: queries go through the public parent tables, whose RLS policies
+-- apply to every partition. The primary keys become (id, created_at), as
+-- a partitioned unique index must include the partition key.
+--
+-- That means nothing can reference game_spins(id) with a foreign key any
+-- more. The one that did where REAL_MONEY_COMPLETE_MIGRATION.sql created
+-- the table, provably_fair_verification.spin_id -> game_spins(id) ON DELETE
+-- CASCADE, is DROPPED and replaced by triggers enforcing the same rule: a
+-- verification row's spin must exist, and deleting a spin deletes its
+-- verification rows. Unlike the foreign key,
+-- detaching an archived game_spins month leaves the verification rows in
+-- place; they are archived on their own schedule. Any other foreign key
+-- into a table being partitioned stops the migration.
+--
+-- The migrations and REAL_MONEY_COMPLETE_MIGRATION.sql disagree on these
+-- tables: only the root file creates game_spins, and only the migrations
+-- give provably_fair_verification a session_id. A table that does not
+-- exist is left alone, and an index whose columns do not exist is skipped.
+
+CREATE SCHEMA IF NOT EXISTS partitions;
+REVOKE ALL ON SCHEMA partitions FROM PUBLIC;
+
+-- Create the monthly partitions of `p_table` covering [p_from, p_to].
+-- Rows already caught by the DEFAULT partition for a new month are moved
+-- into it. Returns how many partitions were created.
+CREATE OR REPLACE FUNCTION public.create_monthly_partitions(
+  p_table TEXT,
+  p_from TIMESTAMP WITH TIME ZONE,
+  p_to TIMESTAMP WITH TIME ZONE
+)
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  v_month DATE := date_trunc('month', p_from AT TIME ZONE 'UTC')::date;
+  v_name TEXT;
+  v_lower TIMESTAMP WITH TIME ZONE;
+  v_upper TIMESTAMP WITH TIME ZONE;
+  v_default TEXT := p_table || '_default';
+  v_misplaced BOOLEAN;
+  v_created INTEGER := 0;
+BEGIN
+  IF p_table NOT IN ('game_spins', 'rate_limit_logs', 'provably_fair_verification') THEN
+    RAISE EXCEPTION '% is not a monthly partitioned table', p_table;
+  END IF;
+  IF to_regclass(format('public.%I', p_table)) IS NULL THEN
+    RETURN 0;
+  END IF;
+
+  WHILE v_month <= (p_to AT TIME ZONE 'UTC')::date LOOP
+    v_name := format('%s_p%s', p_table, to_char(v_month, 'YYYYMM'));
+    v_lower := v_month::timestamp AT TIME ZONE 'UTC';
+    v_upper := (v_month + INTERVAL '1 month')::timestamp AT TIME ZONE 'UTC';
+
+    IF to_regclass(format('partitions.%I', v_name)) IS NULL THEN
+      v_misplaced := false;
+      IF to_regclass(format('partitions.%I', v_default)) IS NOT NULL THEN
+        EXECUTE format(
+          'SELECT EXISTS (SELECT 1 FROM partitions.%I WHERE created_at >= $1 AND created_at < $2)',
+          v_default
+        ) INTO v_misplaced USING v_lower, v_upper;
+      END IF;
+
+      IF v_misplaced THEN
+        EXECUTE format(
+          'CREATE TABLE partitions.%I (LIKE public.%I INCLUDING DEFAULTS INCLUDING CONSTRAINTS)',
+          v_name, p_table
+        );
+        EXECUTE format(
+          'WITH moved AS (DELETE FROM partitions.%I WHERE created_at >= $1 AND created_at < $2 RETURNING *)
+           INSERT INTO partitions.%I SELECT * FROM moved',
+          v_default, v_name
+        ) USING v_lower, v_upper;
+        EXECUTE format(
+          'ALTER TABLE public.%I ATTACH PARTITION partitions.%I FOR VALUES FROM (%L) TO (%L)',
+          p_table, v_name, v_lower, v_upper
+        );
+      ELSE
+        EXECUTE format(
+          'CREATE TABLE partitions.%I PARTITION OF public.%I FOR VALUES FROM (%L) TO (%L)',
+          v_name, p_table, v_lower, v_upper
+        );
+      END IF;
+      -- No policies: only the parent (and its policies) is reachable
+      EXECUTE format('ALTER TABLE partitions.%I ENABLE ROW LEVEL SECURITY', v_name);
+      v_created := v_created + 1;
+    END IF;
+
+    v_month := (v_month + INTERVAL '1 month')::date;
+  END LOOP;
+
+  RETURN v_created;
+END;
+$$;
+
+REVOKE ALL ON FUNCTION public.create_monthly_partitions(TEXT, TIMESTAMP WITH TIME ZONE, TIMESTAMP WITH TIME ZONE) FROM PUBLIC;
+DO $$
+BEGIN
+  IF EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'service_role') THEN
+    GRANT EXECUTE ON FUNCTION public.create_monthly_partitions(TEXT, TIMESTAMP WITH TIME ZONE, TIMESTAMP WITH TIME ZONE) TO service_role;
+  END IF;
+END $$;
+
+-- Foreign keys partition_by_month dropped, for the caller to re-enforce
+CREATE TEMP TABLE IF NOT EXISTS dropped_foreign_keys (conname TEXT, rel REGCLASS, referenced TEXT);
+
+-- Swap a plain table for a monthly partitioned one with the same columns,
+-- defaults, checks, foreign keys, grants, RLS policies and publications,
+-- then copy its rows across. `p_indexes` replaces the old index set.
+-- `p_replaced_fks` names the foreign keys into the table that the caller
+-- re-enforces some other way; any other one is an error. A no-op once the
+-- table is partitioned, or if it does not exist.
+CREATE OR REPLACE FUNCTION pg_temp.partition_by_month(
+  p_table TEXT,
+  p_indexes TEXT[],
+  p_replaced_fks TEXT[] DEFAULT '{}'
+)
+RETURNS VOID
+LANGUAGE plpgsql
+AS $$
+DECLARE
+  v_table REGCLASS := to_regclass(format('public.%I', p_table));
+  v_old TEXT := p_table || '_unpartitioned';
+  v_first TIMESTAMP WITH TIME ZONE;
+  v_index TEXT;
+  r RECORD;
+BEGIN
+  IF v_table IS NULL THEN
+    RAISE NOTICE 'public.% does not exist, not partitioning it', p_table;
+    RETURN;
+  ELSIF (SELECT relkind FROM pg_class WHERE oid = v_table) = 'p' THEN
+    RETURN;
+  END IF;
+
+  EXECUTE format('LOCK TABLE public.%I IN ACCESS EXCLUSIVE MODE', p_table);
+
+  -- A foreign key needs a unique key on its own columns, which a
+  -- partitioned table can only offer together with created_at
+  FOR r IN SELECT conname, conrelid::regclass AS rel FROM pg_constraint WHERE confrelid = v_table LOOP
+    IF NOT r.conname = ANY (p_replaced_fks) THEN
+      RAISE EXCEPTION 'Foreign key % on % references %, which is being partitioned', r.conname, r.rel, p_table
+        USING HINT = 'Re-enforce it and pass its name in p_replaced_fks';
+    END IF;
+    RAISE NOTICE 'Dropping % on %, which references %', r.conname, r.rel, p_table;
+    EXECUTE format('ALTER TABLE %s DROP CONSTRAINT %I', r.rel, r.conname);
+    INSERT INTO pg_temp.dropped_foreign_keys VALUES (r.conname, r.rel, p_table);
+  END LOOP;
+
+  EXECUTE format('ALTER TABLE public.%I RENAME TO %I', p_table, v_old);
+  FOR r IN SELECT conname FROM pg_constraint WHERE conrelid = v_table AND contype IN ('p', 'u') LOOP
+    EXECUTE format('ALTER TABLE public.%I RENAME CONSTRAINT %I TO %I', v_old, r.conname, r.conname || '_unpartitioned');
+  END LOOP;
+  FOR r IN
+    SELECT i.indexrelid::regclass AS index_name FROM pg_index i
+    WHERE i.indrelid = v_table
+      AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = i.indexrelid)
+  LOOP
+    EXECUTE format('DROP INDEX %s', r.index_name);
+  END LOOP;
+
+  EXECUTE format(
+    'CREATE TABLE public.%I (LIKE public.%I INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING STORAGE INCLUDING COMMENTS)
+     PARTITION BY RANGE (created_at)',
+    p_table, v_old
+  );
+  EXECUTE format('ALTER TABLE public.%I ADD PRIMARY KEY (id, created_at)', p_table);
+
+  FOR r IN SELECT conname, pg_get_constraintdef(oid) AS definition FROM pg_constraint WHERE conrelid = v_table AND contype = 'f' LOOP
+    EXECUTE format('ALTER TABLE public.%I ADD CONSTRAINT %I %s', p_table, r.conname, r.definition);
+  END LOOP;
+
+  FOR r IN
+    SELECT grantee, string_agg(privilege_type, ', ') AS privileges
+    FROM information_schema.role_table_grants
+    WHERE table_schema = 'public' AND table_name = v_old
+      AND grantee <> (SELECT pg_get_userbyid(relowner) FROM pg_class WHERE oid = v_table)
+    GROUP BY grantee
+  LOOP
+    EXECUTE format('GRANT %s ON public.%I TO %s', r.privileges, p_table,
+                   CASE WHEN r.grantee = 'PUBLIC' THEN 'PUBLIC' ELSE quote_ident(r.grantee) END);
+  END LOOP;
+
+  IF (SELECT relrowsecurity FROM pg_class WHERE oid = v_table) THEN
+    EXECUTE format('ALTER TABLE public.%I ENABLE ROW LEVEL SECURITY', p_table);
+  END IF;
+  FOR r IN
+    SELECT p.polname,
+           CASE WHEN p.polpermissive THEN 'PERMISSIVE' ELSE 'RESTRICTIVE' END AS kind,
+           CASE p.polcmd WHEN 'r' THEN 'SELECT' WHEN 'a' THEN 'INSERT' WHEN 'w' THEN 'UPDATE'
+                         WHEN 'd' THEN 'DELETE' ELSE 'ALL' END AS command,
+           CASE WHEN p.polroles = '{0}' THEN 'PUBLIC'
+                ELSE (SELECT string_agg(quote_ident(rolname), ', ') FROM pg_roles WHERE oid = ANY (p.polroles)) END AS roles,
+           pg_get_expr(p.polqual, p.polrelid) AS using_expr,
+           pg_get_expr(p.polwithcheck, p.polrelid) AS check_expr
+    FROM pg_policy p
+    WHERE p.polrelid = v_table
+  LOOP
+    EXECUTE format('CREATE POLICY %I ON public.%I AS %s FOR %s TO %s', r.polname, p_table, r.kind, r.command, r.roles)
+         || COALESCE(' USING (' || r.using_expr || ')', '')
+         || COALESCE(' WITH CHECK (' || r.check_expr || ')', '');
+  END LOOP;
+
+  FOR r IN
+    SELECT p.pubname FROM pg_publication_rel pr JOIN pg_publication p ON p.oid = pr.prpubid
+    WHERE pr.prrelid = v_table
+  LOOP
+    EXECUTE format('ALTER PUBLICATION %I ADD TABLE public.%I', r.pubname, p_table);
+  END LOOP;
+
+  FOREACH v_index IN ARRAY p_indexes LOOP
+    BEGIN
+      EXECUTE v_index;
+    EXCEPTION WHEN undefined_column THEN
+      RAISE NOTICE 'Skipping an index on public.%: %', p_table, SQLERRM;
+    END;
+  END LOOP;
+
+  EXECUTE format('SELECT min(created_at) FROM public.%I', v_old) INTO v_first;
+  PERFORM public.create_monthly_partitions(p_table, COALESCE(v_first, now()), now() + INTERVAL '3 months');
+  EXECUTE format('CREATE TABLE partitions.%I PARTITION OF public.%I DEFAULT', p_table || '_default', p_table);
+  EXECUTE format('ALTER TABLE partitions.%I ENABLE ROW LEVEL SECURITY', p_table || '_default');
+
+  EXECUTE format('INSERT INTO public.%I SELECT * FROM public.%I', p_table, v_old);
+  EXECUTE format('DROP TABLE public.%I', v_old);
+END;
+$$;
+
+-- Per month, the (user, time) indexes serve the history lookups; a BRIN
+-- index replaces the B-tree on created_at, since rows arrive in time order.
+-- Prefix-redundant and duplicate indexes are dropped, as is the rate limit
+-- logs' per-player index, which only the old COUNT(*) limiter used.
+SELECT pg_temp.partition_by_month('game_spins', ARRAY[
+  'CREATE INDEX idx_game_spins_user_created ON public.game_spins(user_id, created_at DESC)',
+  'CREATE INDEX idx_game_spins_game_created ON public.game_spins(game_id, created_at DESC)',
+  'CREATE INDEX idx_game_spins_win_amount ON public.game_spins(win_amount DESC) WHERE win_amount > 0',
+  'CREATE INDEX idx_game_spins_created_at ON public.game_spins USING brin(created_at)'
+], ARRAY['provably_fair_verification_spin_id_fkey']);
+
+SELECT pg_temp.partition_by_month('rate_limit_logs', ARRAY[
+  'CREATE INDEX idx_rate_limit_ip_action ON public.rate_limit_logs(ip_address, action_type, created_at)',
+  'CREATE INDEX idx_rate_limit_created_at ON public.rate_limit_logs USING brin(created_at)'
+]);
+
+SELECT pg_temp.partition_by_month('provably_fair_verification', ARRAY[
+  'CREATE INDEX idx_provably_fair_user_id ON public.provably_fair_verification(user_id)',
+  'CREATE INDEX idx_provably_fair_session_id ON public.provably_fair_verification(session_id)',
+  'CREATE INDEX idx_provably_fair_spin_id ON public.provably_fair_verification(spin_id)',
+  'CREATE INDEX idx_provably_fair_created_at ON public.provably_fair_verification USING brin(created_at)'
+]);
+
+-- provably_fair_verification.spin_id -> game_spins(id) ON DELETE CASCADE,
+-- enforced by triggers now that game_spins(id) alone is not unique-indexed.
+-- FOR KEY SHARE holds the spin until the inserting transaction ends, as the
+-- foreign key's own check does.
+CREATE OR REPLACE FUNCTION public.check_provably_fair_spin()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SET search_path = public
+AS $$
+BEGIN
+  IF NEW.spin_id IS NOT NULL THEN
+    PERFORM 1 FROM public.game_spins WHERE id = NEW.spin_id FOR KEY SHARE;
+    IF NOT FOUND THEN
+      RAISE EXCEPTION 'insert or update on table "provably_fair_verification" violates foreign key "provably_fair_verification_spin_id_fkey"'
+        USING ERRCODE = 'foreign_key_violation',
+              DETAIL = format('Key (spin_id)=(%s) is not present in table "game_spins".', NEW.spin_id);
+    END IF;
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION public.cascade_game_spin_delete()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SET search_path = public
+AS $$
+BEGIN
+  IF TG_OP = 'DELETE' THEN
+    DELETE FROM public.provably_fair_verification WHERE spin_id = OLD.id;
+  ELSIF NEW.id IS DISTINCT FROM OLD.id
+        AND EXISTS (SELECT 1 FROM public.provably_fair_verification WHERE spin_id = OLD.id) THEN
+    RAISE EXCEPTION 'update on table "game_spins" violates foreign key "provably_fair_verification_spin_id_fkey"'
+      USING ERRCODE = 'foreign_key_violation',
+            DETAIL = format('Key (id)=(%s) is still referenced from table "provably_fair_verification".', OLD.id);
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+-- Only where the foreign key existed: the migrations' own definition has
+-- a free-text spin_id that never referenced game_spins
+DO $$
+BEGIN
+  IF EXISTS (SELECT 1 FROM pg_temp.dropped_foreign_keys WHERE conname = 'provably_fair_verification_spin_id_fkey') THEN
+    DROP TRIGGER IF EXISTS provably_fair_verification_spin_fkey ON public.provably_fair_verification;
+    CREATE CONSTRAINT TRIGGER provably_fair_verification_spin_fkey
+      AFTER INSERT OR UPDATE OF spin_id ON public.provably_fair_verification
+      FOR EACH ROW EXECUTE FUNCTION public.check_provably_fair_spin();
+
+    DROP TRIGGER IF EXISTS game_spins_provably_fair_cascade ON public.game_spins;
+    CREATE TRIGGER game_spins_provably_fair_cascade
+      AFTER DELETE OR UPDATE OF id ON public.game_spins
+      FOR EACH ROW EXECUTE FUNCTION public.cascade_game_spin_delete();
+  END IF;
+END $$;
+
+-- The outcome documents are the bulk of each row: compress them with lz4
+-- where the server was built with it (new rows only; archived months
+-- leave the database anyway)
+DO $$
+DECLARE
+  r RECORD;
+BEGIN
+  IF EXISTS (
+    SELECT 1 FROM pg_settings
+    WHERE name = 'default_toast_compression' AND 'lz4' = ANY (enumvals)
+  ) THEN
+    FOR r IN
+      SELECT attrelid::regclass AS rel FROM pg_attribute
+      WHERE attrelid IN (to_regclass('public.game_spins'), to_regclass('public.provably_fair_verification'))
+        AND attname = 'outcome_json' AND NOT attisdropped
+    LOOP
+      EXECUTE format('ALTER TABLE %s ALTER COLUMN outcome_json SET COMPRESSION lz4', r.rel);
+    END LOOP;
+  END IF;
+END $$;
@@ -0,0 +1,125 @@
+-- =====================================================
+-- CONSTANT-TIME RATE LIMITING
+-- =====================================================
+-- check_rate_limit() used to COUNT(*) rate_limit_logs over the window and
+-- log_rate_limit_action() inserted one row per spin into a table that was
+-- never pruned and carries several overlapping indexes.
+--
+-- Actions are now counted in 10-second buckets keyed by
+-- (user_id, action_type, bucket_start): logging is a single upsert and a
+-- check sums at most window/10 + 1 primary-key rows, weighting the oldest
+-- bucket by how much of it falls inside the window (sliding window
+-- counter). Buckets older than 24 hours are pruned as new ones are opened.
+-- The RPC signatures are unchanged.
+
+CREATE TABLE IF NOT EXISTS public.rate_limit_counters (
+  user_id UUID NOT NULL,
+  action_type TEXT NOT NULL,
+  bucket_start TIMESTAMP WITH TIME ZONE NOT NULL,
+  hits INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY (user_id, action_type, bucket_start)
+);
+
+ALTER TABLE public.rate_limit_counters ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Admins can view rate limit counters" ON public.rate_limit_counters;
+CREATE POLICY "Admins can view rate limit counters"
+  ON public.rate_limit_counters FOR SELECT
+  USING (public.has_role(auth.uid(), 'admin'));
+
+-- Global pruning walks buckets by age
+CREATE INDEX IF NOT EXISTS idx_rate_limit_counters_bucket ON public.rate_limit_counters(bucket_start);
+
+-- Drop every expired bucket; also called now and then by log_rate_limit_action
+CREATE OR REPLACE FUNCTION public.prune_rate_limit_counters()
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  v_deleted INTEGER;
+BEGIN
+  DELETE FROM public.rate_limit_counters
+  WHERE bucket_start < now() - INTERVAL '24 hours';
+  GET DIAGNOSTICS v_deleted = ROW_COUNT;
+  RETURN v_deleted;
+END;
+$$;
+
+-- Dropped first: an older copy may name the limit p_max_requests, and
+-- CREATE OR REPLACE cannot rename parameters
+DROP FUNCTION IF EXISTS public.check_rate_limit(UUID, TEXT, INTEGER, INTEGER);
+CREATE FUNCTION public.check_rate_limit(
+  p_user_id UUID,
+  p_action_type TEXT,
+  p_max_actions INTEGER DEFAULT 60,
+  p_window_seconds INTEGER DEFAULT 60
+)
+RETURNS BOOLEAN
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+  SELECT COALESCE(SUM(
+           hits * LEAST(1.0, EXTRACT(EPOCH FROM
+             bucket_start + INTERVAL '10 seconds' - (now() - make_interval(secs => p_window_seconds))
+           ) / 10.0)
+         ), 0) < p_max_actions
+  FROM public.rate_limit_counters
+  WHERE user_id = p_user_id
+    AND action_type = p_action_type
+    AND bucket_start > now() - make_interval(secs => p_window_seconds) - INTERVAL '10 seconds';
+$$;
+
+DROP FUNCTION IF EXISTS public.log_rate_limit_action(UUID, TEXT, INET);
+CREATE FUNCTION public.log_rate_limit_action(
+  p_user_id UUID,
+  p_action_type TEXT,
+  p_ip_address INET DEFAULT NULL
+)
+RETURNS UUID
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+  v_bucket TIMESTAMP WITH TIME ZONE := to_timestamp(floor(EXTRACT(EPOCH FROM now()) / 10) * 10);
+  v_new_bucket BOOLEAN;
+BEGIN
+  INSERT INTO public.rate_limit_counters AS c (user_id, action_type, bucket_start, hits)
+  VALUES (p_user_id, p_action_type, v_bucket, 1)
+  ON CONFLICT (user_id, action_type, bucket_start)
+  DO UPDATE SET hits = c.hits + 1
+  RETURNING (xmax = 0) INTO v_new_bucket;
+
+  -- Opening a bucket prunes this key's expired ones (a short primary-key
+  -- range) and, about once per thousand buckets, everyone else's
+  IF v_new_bucket THEN
+    DELETE FROM public.rate_limit_counters
+    WHERE user_id = p_user_id
+      AND action_type = p_action_type
+      AND bucket_start < now() - INTERVAL '24 hours';
+    IF random() < 0.001 THEN
+      PERFORM public.prune_rate_limit_counters();
+    END IF;
+  END IF;
+
+  -- Kept for callers of the old signature; no log row is written any more
+  RETURN gen_random_uuid();
+END;
+$$;
+
+GRANT EXECUTE ON FUNCTION public.check_rate_limit(UUID, TEXT, INTEGER, INTEGER) TO authenticated, service_role;
+GRANT EXECUTE ON FUNCTION public.log_rate_limit_action(UUID, TEXT, INET) TO authenticated, service_role;
+GRANT EXECUTE ON FUNCTION public.prune_rate_limit_counters() TO service_role;
+
+-- Nothing reads rate_limit_logs by player any more, so the old limiter's
+-- overlapping indexes go: every logged action wrote all of them.
+-- idx_rate_limit_recent was only ever declared (Postgres rejects NOW() in
+-- an index predicate) and is dropped in case a copy exists.
+DROP INDEX IF EXISTS public.idx_rate_limit_user_action;
+DROP INDEX IF EXISTS public.idx_rate_limit_user_time;
+DROP INDEX IF EXISTS public.idx_rate_limit_action_time;
+DROP INDEX IF EXISTS public.idx_rate_limit_recent;
@@ -0,0 +1,21 @@
+-- =====================================================
+-- HOT PATH INDEXES
+-- =====================================================
+-- game_sessions only had its primary key, so both weekly-digest queries -
+-- the players active in the last seven days and each player's sessions in
+-- that window, newest first - read the whole table.
+--
+-- The lobby lists active games of one category by name. The old partial
+-- index led with status, which its predicate already fixes, so category
+-- could not narrow the scan and the planner preferred a sequential scan.
+
+CREATE INDEX IF NOT EXISTS idx_game_sessions_user_start
+  ON public.game_sessions(user_id, start_time DESC);
+
+CREATE INDEX IF NOT EXISTS idx_game_sessions_start_time
+  ON public.game_sessions(start_time);
+
+CREATE INDEX IF NOT EXISTS idx_licensed_games_active_category
+  ON public.licensed_games(category, name) WHERE status = 'active';
+
+DROP INDEX IF EXISTS public.idx_licensed_games_status_category;
@@ -0,0 +1,36 @@
+-- =====================================================
+-- WEEKLY DIGEST QUEUE
+-- =====================================================
+-- Weekly metrics are computed by a set-based batch job (one grouped scan of
+-- the week's game_sessions) and queued here, one row per player per week,
+-- for the email renderer. weekly-digest used to issue two queries per
+-- active player instead.
+
+CREATE TABLE IF NOT EXISTS public.weekly_digest_queue (
+  week_ending DATE NOT NULL,
+  user_id UUID NOT NULL REFERENCES public.users(id) ON DELETE CASCADE,
+  status TEXT NOT NULL DEFAULT 'pending', -- pending, sent, failed
+  metrics JSONB NOT NULL,
+  context TEXT NOT NULL, -- plain-text summary handed to the renderer
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL,
+  processed_at TIMESTAMP WITH TIME ZONE,
+  PRIMARY KEY (week_ending, user_id)
+);
+
+ALTER TABLE public.weekly_digest_queue ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "System can manage weekly digest queue" ON public.weekly_digest_queue;
+CREATE POLICY "System can manage weekly digest queue"
+  ON public.weekly_digest_queue
+  FOR ALL
+  USING (auth.role() = 'service_role');
+
+DROP POLICY IF EXISTS "Admins can view weekly digest queue" ON public.weekly_digest_queue;
+CREATE POLICY "Admins can view weekly digest queue"
+  ON public.weekly_digest_queue
+  FOR SELECT
+  USING (public.has_role(auth.uid(), 'admin'));
+
+-- The renderer takes pending digests of one week in batches
+CREATE INDEX IF NOT EXISTS idx_weekly_digest_queue_pending
+  ON public.weekly_digest_queue(week_ending, user_id) WHERE status = 'pending';
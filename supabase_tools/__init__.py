@@ -0,0 +1,3 @@
+"""
+Shared helpers for the COLLECTIVE-WINS deploy and maintenance scripts
+"""
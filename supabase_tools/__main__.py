@@ -0,0 +1,9 @@
+"""
+python3 -m supabase_tools: see supabase_tools.cli
+"""
+
+import sys
+
+from supabase_tools.cli import main
+
+sys.exit(main())
@@ -0,0 +1,188 @@
+"""
+Bulk reads and writes against PostgREST tables
+
+Rows are sent as chunked upserts (one request per chunk) instead of one
+PATCH per row. When PostgREST rejects a chunk the chunk is bisected until
+the offending rows are isolated, so failures are still reported per row.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+import requests
+
+from supabase_tools.client import SupabaseClient
+from supabase_tools.concurrency import run_concurrently
+
+DEFAULT_CHUNK_SIZE = 500
+# Keys travel in the query string on reads, so keep URLs well under 8 KB
+READ_CHUNK_SIZE = 150
+
+
+@dataclass
+class BulkResult:
+    """Outcome of a bulk write, keyed by the conflict column value"""
+    written: List[str] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+    failed: Dict[str, str] = field(default_factory=dict)
+    requests: int = 0
+
+    @property
+    def ok(self) -> bool:
+        return not self.failed
+
+    def merge(self, other: "BulkResult") -> None:
+        self.written.extend(other.written)
+        self.unchanged.extend(other.unchanged)
+        self.failed.update(other.failed)
+        self.requests += other.requests
+
+
+def chunked(items: Sequence, size: int) -> Iterator[Sequence]:
+    """Yield consecutive slices of at most `size` items"""
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _error_message(response: requests.Response) -> str:
+    """Pull the PostgREST error message out of a failed response"""
+    try:
+        body = response.json()
+    except ValueError:
+        return f"HTTP {response.status_code}: {response.text[:200]}"
+    if isinstance(body, dict):
+        message = body.get("message") or body.get("error") or ""
+        details = body.get("details")
+        if details:
+            message = f"{message} ({details})"
+        return f"HTTP {response.status_code}: {message}"
+    return f"HTTP {response.status_code}"
+
+
+def in_filter(values: Iterable[str]) -> str:
+    """Build a PostgREST `in.(...)` filter with every value quoted"""
+    quoted = ",".join('"{}"'.format(str(v).replace('"', '\\"')) for v in values)
+    return f"in.({quoted})"
+
+
+def fetch_by_keys(client: SupabaseClient, table: str, key: str,
+                  keys: Sequence[str], select: str,
+                  chunk_size: int = READ_CHUNK_SIZE,
+                  concurrency: int = 1) -> Dict[str, dict]:
+    """Fetch rows whose `key` column is in `keys`, one GET per chunk"""
+    def fetch(chunk: Sequence[str]) -> List[dict]:
+        response = client.rest(
+            "GET", table,
+            params={"select": select, key: in_filter(chunk)}
+        )
+        if response.status_code != 200:
+            raise RuntimeError(f"Reading {table} failed: {_error_message(response)}")
+        return response.json()
+
+    rows: Dict[str, dict] = {}
+    for outcome in run_concurrently(fetch, chunked(list(keys), chunk_size), concurrency):
+        if not outcome.ok:
+            raise outcome.error
+        for row in outcome.value:
+            rows[row[key]] = row
+    return rows
+
+
+def _post_chunk(client: SupabaseClient, table: str, on_conflict: str,
+                chunk: Sequence[dict]) -> BulkResult:
+    """Upsert one chunk, bisecting on rejection to find the bad rows"""
+    result = BulkResult(requests=1)
+    keys = [row[on_conflict] for row in chunk]
+
+    try:
+        # merge-duplicates upserts are idempotent, so retrying is safe
+        response = client.rest(
+            "POST", table,
+            headers={"Prefer": "resolution=merge-duplicates,return=representation"},
+            params={"on_conflict": on_conflict, "select": on_conflict},
+            json=list(chunk),
+            retry=True
+        )
+    except requests.RequestException as e:
+        # Transport errors say nothing about individual rows
+        for key in keys:
+            result.failed[key] = str(e)
+        return result
+
+    if response.status_code in (200, 201):
+        returned = {row[on_conflict] for row in response.json()}
+        for key in keys:
+            if key in returned:
+                result.written.append(key)
+            else:
+                result.failed[key] = "not returned by server"
+        return result
+
+    if len(chunk) == 1:
+        result.failed[keys[0]] = _error_message(response)
+        return result
+
+    middle = len(chunk) // 2
+    for half in (chunk[:middle], chunk[middle:]):
+        result.merge(_post_chunk(client, table, on_conflict, half))
+    return result
+
+
+def bulk_upsert(client: SupabaseClient, table: str, rows: Sequence[dict],
+                on_conflict: str, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                concurrency: int = 1) -> BulkResult:
+    """
+    Upsert `rows` into `table` with `Prefer: resolution=merge-duplicates`.
+
+    Every row must carry the `on_conflict` column plus any NOT NULL column
+    without a default: Postgres checks those before resolving the conflict.
+    Chunks are independent, so up to `concurrency` of them are sent at once.
+    """
+    result = BulkResult()
+    post = lambda chunk: _post_chunk(client, table, on_conflict, chunk)
+    for outcome in run_concurrently(post, chunked(list(rows), chunk_size), concurrency):
+        if not outcome.ok:
+            # Anything but a transport error, e.g. a malformed response
+            result.requests += 1
+            for row in outcome.item:
+                result.failed[row[on_conflict]] = str(outcome.error)
+            continue
+        result.merge(outcome.value)
+    return result
+
+
+def bulk_update_column(client: SupabaseClient, table: str, key: str,
+                       values: Dict[str, object], column: str,
+                       required: Sequence[str] = (),
+                       chunk_size: int = DEFAULT_CHUNK_SIZE,
+                       existing: Optional[Dict[str, dict]] = None,
+                       concurrency: int = 1) -> BulkResult:
+    """
+    Set `column` to a per-row value for existing rows only.
+
+    Current rows are read once so that unknown keys are reported instead of
+    inserted, unchanged rows are skipped, and the NOT NULL `required`
+    columns can be echoed back in the upsert payload.
+    """
+    result = BulkResult()
+    if existing is None:
+        select = ",".join(dict.fromkeys([key, column, *required]))
+        existing = fetch_by_keys(client, table, key, list(values), select,
+                                 concurrency=concurrency)
+        result.requests += -(-len(values) // READ_CHUNK_SIZE)
+
+    payload = []
+    for row_key, value in values.items():
+        current = existing.get(row_key)
+        if current is None:
+            result.failed[row_key] = f"not found in {table}"
+        elif current.get(column) == value:
+            result.unchanged.append(row_key)
+        else:
+            row = {name: current.get(name) for name in required}
+            row[key] = row_key
+            row[column] = value
+            payload.append(row)
+
+    result.merge(bulk_upsert(client, table, payload, key, chunk_size, concurrency))
+    return result
@@ -0,0 +1,72 @@
+"""
+Game catalogue helpers shared by the thumbnail and database fix scripts
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from supabase_tools.bulk import DEFAULT_CHUNK_SIZE, BulkResult, bulk_update_column
+from supabase_tools.client import SupabaseClient
+from supabase_tools.config import PROJECT_DIR
+from supabase_tools.thumbnails import built_urls
+
+GAME_DEFINITIONS_PATH = PROJECT_DIR / "game_definitions.json"
+
+# Games that have images in public/game-tiles
+GAMES_WITH_IMAGES = [
+    'big-bass-splash', 'gates-of-olympus', 'sweet-bonanza', 'starlight-princess',
+    'legend-of-cleopatra', 'egypt-fire', 'golden-pharaoh-megaways', 'crystal-fortune-deluxe',
+    'oceans-treasure-quest', 'blackjack-royal-vip', 'dragons-fire-prosperity', 'lightning-strike-roulette',
+    'wild-west-bounty-hunter', 'cosmic-gems-cluster', 'mega-fortune-jackpot-king', 'ancient-aztec-gold',
+    'baccarat-royale-supreme', 'neon-city-nights', 'viking-conquest-saga', 'crash-rocket-multiplier',
+    'diamond-dynasty-deluxe', 'egyptian-mysteries-unlimited', 'fruit-blitz-super-spin', 'pirates-plunder-megaways',
+    'starburst-crystal-classic', 'buffalo-thunder-lightning', 'zeus-power-reels', 'sugar-rush-candy-blitz',
+    'moon-princess-trinity', 'roulette-pro-european', 'aztec-bonanza-infinity', 'mega-moolah-fortune',
+    'dead-or-alive-outlaw', 'jammin-jars-cluster-party', 'book-of-secrets-deluxe', 'gonzos-quest-megaways',
+    'bonanza-goldmine-megaways', 'legacy-of-egypt-power', 'immortal-romance-remastered', 'fire-joker-respin',
+    'reactoonz-quantum-leap', 'street-racer-nitro', 'tiki-fortune-totem', 'tomb-raider-expedition',
+    'space-invaders-arcade', 'rainbow-riches-megaways', 'wolf-gold-moon-spin', 'poker-face-texas-holdem',
+    'jungle-adventure-expedition', 'mega-ball-live', 'gladiator-arena-champion', 'fortune-tiger-prosperity',
+    'fishing-frenzy-megaways'
+]
+
+# NOT NULL columns without defaults across the licensed_games migrations
+LICENSED_GAMES_REQUIRED = ("name", "category")
+
+
+def load_game_definitions(path: Path = GAME_DEFINITIONS_PATH) -> List[dict]:
+    """Entries of game_definitions.json: slug, title, rtp, vol, type, tags, ..."""
+    return json.loads(Path(path).read_text())
+
+
+def thumbnail_url(game_code: str) -> str:
+    """Public path of a game's tile image: the hashed build if there is one"""
+    return built_urls().get(game_code, f"/game-tiles/{game_code}.jpg")
+
+
+def update_thumbnails(client: SupabaseClient,
+                      game_codes: Optional[Iterable[str]] = None,
+                      chunk_size: int = DEFAULT_CHUNK_SIZE,
+                      concurrency: int = 1,
+                      existing: Optional[Dict[str, dict]] = None) -> BulkResult:
+    """Point `thumbnail_url` at the tile image for every game in one bulk write"""
+    codes = GAMES_WITH_IMAGES if game_codes is None else list(game_codes)
+    values: Dict[str, object] = {code: thumbnail_url(code) for code in codes}
+    return bulk_update_column(
+        client, "licensed_games", "game_code", values,
+        "thumbnail_url", required=LICENSED_GAMES_REQUIRED, chunk_size=chunk_size,
+        existing=existing, concurrency=concurrency
+    )
+
+
+def print_bulk_result(result: BulkResult, total: int, label: str = "game thumbnails") -> None:
+    """Print the per-row outcome of a bulk write in the scripts' usual format"""
+    done = len(result.written) + len(result.unchanged)
+    print(f"\n✅ Updated {done}/{total} {label} in {result.requests} request(s)")
+    if result.unchanged:
+        print(f"   ({len(result.unchanged)} already up to date)")
+    if result.failed:
+        print(f"⚠️  Failed: {len(result.failed)} rows")
+        for key, error in result.failed.items():
+            print(f"   - {key}: {error}")
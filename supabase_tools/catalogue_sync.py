@@ -0,0 +1,169 @@
+"""
+Declarative sync of game_definitions.json into licensed_games
+
+game_definitions.json is the source of truth. The current licensed_games
+rows are read once (keyset-paged), diffed field by field in memory, and
+only the rows that differ are written: new titles are inserted, changed
+ones updated and titles dropped from the file are disabled, all through
+chunked upserts. A catalogue where ten rows changed costs ten row writes.
+
+Only rows belonging to a provider named in the definitions are managed, so
+third-party titles in the same table are never disabled.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from supabase_tools.bulk import DEFAULT_CHUNK_SIZE, BulkResult, bulk_upsert, fetch_by_keys
+from supabase_tools.catalogue import LICENSED_GAMES_REQUIRED, load_game_definitions
+from supabase_tools.client import SupabaseClient
+from supabase_tools.paging import DEFAULT_PAGE_SIZE, keyset_pages
+
+TABLE = "licensed_games"
+KEY = "game_code"
+# Columns owned by game_definitions.json; everything else is left alone
+SYNC_COLUMNS = ("game_code", "provider_id", "name", "category", "rtp_certified", "volatility", "status")
+ACTIVE_STATUS = "active"
+# Valid both for the game_status enum and the later plain-text column
+INACTIVE_STATUS = "disabled"
+# game_definitions "type" values that are not slots; the rest are mechanics
+CATEGORY_BY_TYPE = {"Table": "table", "Crash": "crash", "Live": "live"}
+DEFAULT_CATEGORY = "slots"
+
+
+@dataclass
+class CatalogueDiff:
+    """What a sync would write; `changes` maps game_code -> column -> (current, desired)"""
+    inserts: List[dict] = field(default_factory=list)
+    updates: List[dict] = field(default_factory=list)
+    deactivations: List[dict] = field(default_factory=list)
+    changes: Dict[str, Dict[str, Tuple[object, object]]] = field(default_factory=dict)
+    unchanged: int = 0
+
+    @property
+    def empty(self) -> bool:
+        return not (self.inserts or self.updates or self.deactivations)
+
+    @property
+    def writes(self) -> int:
+        return len(self.inserts) + len(self.updates) + len(self.deactivations)
+
+
+def desired_row(definition: dict, provider_id: str) -> dict:
+    """The licensed_games columns a game_definitions entry dictates"""
+    rtp = definition.get("rtp")
+    volatility = definition.get("vol")
+    return {
+        "game_code": definition["slug"],
+        "provider_id": provider_id,
+        "name": definition["title"],
+        "category": CATEGORY_BY_TYPE.get(definition.get("type"), DEFAULT_CATEGORY),
+        "rtp_certified": round(float(rtp), 2) if rtp is not None else None,
+        "volatility": volatility.lower() if volatility else None,
+        "status": ACTIVE_STATUS,
+    }
+
+
+def _same(current, desired) -> bool:
+    # PostgREST returns NUMERIC columns as JSON numbers (or strings, for
+    # some configurations), so compare at the column's two-decimal scale
+    if isinstance(desired, float) and current is not None:
+        try:
+            return round(float(current), 2) == desired
+        except (TypeError, ValueError):
+            return False
+    return current == desired
+
+
+def fetch_licensed_games(client: SupabaseClient,
+                         page_size: int = DEFAULT_PAGE_SIZE) -> Dict[str, dict]:
+    """Every licensed_games row's synced columns, keyed by game_code"""
+    rows: Dict[str, dict] = {}
+    for page in keyset_pages(client, TABLE, ",".join(SYNC_COLUMNS), page_size):
+        for row in page:
+            rows[row[KEY]] = row
+    return rows
+
+
+def fetch_provider_ids(client: SupabaseClient, codes: Sequence[str]) -> Dict[str, str]:
+    """game_providers.code -> id"""
+    rows = fetch_by_keys(client, "game_providers", "code", list(codes), "id,code")
+    return {code: row["id"] for code, row in rows.items()}
+
+
+def diff_catalogue(definitions: Sequence[dict], current: Dict[str, dict],
+                   provider_ids: Dict[str, str]) -> CatalogueDiff:
+    """Field-level diff of the definitions against the current rows"""
+    diff = CatalogueDiff()
+    seen = set()
+
+    for definition in definitions:
+        slug = definition["slug"]
+        if slug in seen:
+            raise ValueError(f"Duplicate slug in game definitions: {slug}")
+        seen.add(slug)
+
+        provider = definition.get("provider")
+        if provider not in provider_ids:
+            raise ValueError(f"{slug}: provider '{provider}' is not in game_providers")
+        desired = desired_row(definition, provider_ids[provider])
+
+        row = current.get(slug)
+        if row is None:
+            diff.inserts.append(desired)
+            diff.changes[slug] = {column: (None, value) for column, value in desired.items()}
+            continue
+        changed = {
+            column: (row.get(column), value)
+            for column, value in desired.items()
+            if not _same(row.get(column), value)
+        }
+        if changed:
+            diff.updates.append(desired)
+            diff.changes[slug] = changed
+        else:
+            diff.unchanged += 1
+
+    managed = set(provider_ids.values())
+    for slug, row in current.items():
+        if slug in seen or row.get("provider_id") not in managed:
+            continue
+        if row.get("status") != INACTIVE_STATUS:
+            payload = {name: row.get(name) for name in LICENSED_GAMES_REQUIRED}
+            payload[KEY] = slug
+            payload["status"] = INACTIVE_STATUS
+            diff.deactivations.append(payload)
+            diff.changes[slug] = {"status": (row.get("status"), INACTIVE_STATUS)}
+
+    return diff
+
+
+def apply_diff(client: SupabaseClient, diff: CatalogueDiff,
+               chunk_size: int = DEFAULT_CHUNK_SIZE, concurrency: int = 1) -> BulkResult:
+    """
+    Write a diff. Inserts and updates share a payload shape and go out as
+    one chunked upsert; deactivations only carry the key, status and the
+    NOT NULL columns, so they are a second upsert.
+    """
+    result = BulkResult()
+    for rows in (diff.inserts + diff.updates, diff.deactivations):
+        if rows:
+            result.merge(bulk_upsert(client, TABLE, rows, KEY, chunk_size, concurrency))
+    return result
+
+
+def sync_catalogue(client: SupabaseClient, definitions: Optional[Sequence[dict]] = None,
+                   dry_run: bool = False, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                   concurrency: int = 1,
+                   page_size: int = DEFAULT_PAGE_SIZE) -> Tuple[CatalogueDiff, BulkResult]:
+    """Diff game_definitions.json against licensed_games and push the difference"""
+    if definitions is None:
+        definitions = load_game_definitions()
+    providers = sorted({d.get("provider") for d in definitions if d.get("provider")})
+    provider_ids = fetch_provider_ids(client, providers)
+    current = fetch_licensed_games(client, page_size)
+
+    diff = diff_catalogue(definitions, current, provider_ids)
+    if dry_run or diff.empty:
+        return diff, BulkResult()
+    return diff, apply_diff(client, diff, chunk_size, concurrency)
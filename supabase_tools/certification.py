@@ -0,0 +1,171 @@
+"""
+Catalogue-wide RTP certification runs
+
+Each game's spins are split into fixed-size shards of consecutive seed
+indices and simulated across a ProcessPoolExecutor. Game g's spin i always
+uses the seed f"{run_seed}:{g}:{i:012d}", so the merged figures depend
+only on the run seed and spin count, never on worker count or scheduling;
+payouts are whole multiples of the stake, so even the float sums are exact.
+"""
+
+import os
+import platform
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+from supabase_tools.catalogue import load_game_definitions
+from supabase_tools.simulation import SEED_INDEX_WIDTH, SimulationStats, simulate
+from supabase_tools.slot_engine import GAME_CONFIGS, get_game_config
+
+DEFAULT_SHARD_SIZE = 2_000_000
+DEFAULT_RUN_SEED = "certify"
+CONFIDENCE_Z = 2.576  # 99% two-sided
+TAIL_THRESHOLDS = (10, 25, 50, 100)
+TOP_PAYOUTS = 5
+
+
+@dataclass(frozen=True)
+class Shard:
+    game_id: str
+    start: int
+    count: int
+    prefix: str
+
+
+@dataclass
+class ShardResult:
+    shard: Shard
+    stats: SimulationStats
+    cpu_seconds: float
+    wall_seconds: float
+
+
+def catalogue_games() -> List[Tuple[str, dict]]:
+    """(slug, game_definitions entry or {}) for every title and GAME_CONFIGS key"""
+    definitions = {game["slug"]: game for game in load_game_definitions()}
+    games = list(definitions.items())
+    games.extend((slug, {}) for slug in GAME_CONFIGS if slug not in definitions)
+    return games
+
+
+def seed_prefix(run_seed: str, game_id: str) -> str:
+    return f"{run_seed}:{game_id}:"
+
+
+def plan_shards(game_ids: List[str], spins: int, run_seed: str = DEFAULT_RUN_SEED,
+                shard_size: int = DEFAULT_SHARD_SIZE) -> List[Shard]:
+    """Split each game's seed index range 0..spins-1 into shards"""
+    return [
+        Shard(game_id, start, min(shard_size, spins - start), seed_prefix(run_seed, game_id))
+        for game_id in game_ids
+        for start in range(0, spins, shard_size)
+    ]
+
+
+def run_shard(shard: Shard) -> ShardResult:
+    """Worker entry point (top level so it pickles under spawn)"""
+    wall, cpu = time.perf_counter(), time.process_time()
+    stats = simulate(shard.game_id, shard.count, shard.prefix, start=shard.start)
+    return ShardResult(shard, stats, time.process_time() - cpu, time.perf_counter() - wall)
+
+
+def run_certification(game_ids: List[str], spins: int, run_seed: str = DEFAULT_RUN_SEED,
+                      shard_size: int = DEFAULT_SHARD_SIZE, workers: Optional[int] = None,
+                      progress: Optional[Callable[[int, int], None]] = None
+                      ) -> Tuple[Dict[str, SimulationStats], dict]:
+    """
+    Simulate `spins` spins of every game; returns merged stats per game and
+    run timing (wall seconds, summed worker CPU seconds, workers used).
+    """
+    shards = plan_shards(game_ids, spins, run_seed, shard_size)
+    workers = workers or os.cpu_count() or 1
+    merged = {game_id: SimulationStats() for game_id in game_ids}
+    cpu_seconds = 0.0
+
+    started = time.perf_counter()
+    if workers <= 1:
+        results = map(run_shard, shards)
+        for done, result in enumerate(results, 1):
+            merged[result.shard.game_id].merge(result.stats)
+            cpu_seconds += result.cpu_seconds
+            if progress:
+                progress(done, len(shards))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(run_shard, shard) for shard in shards]
+            for done, future in enumerate(as_completed(futures), 1):
+                result = future.result()
+                merged[result.shard.game_id].merge(result.stats)
+                cpu_seconds += result.cpu_seconds
+                if progress:
+                    progress(done, len(shards))
+
+    timing = {
+        "wall_seconds": time.perf_counter() - started,
+        "cpu_seconds": cpu_seconds,
+        "workers": workers,
+        "shards": len(shards),
+    }
+    return merged, timing
+
+
+def game_report(game_id: str, definition: dict, stats: SimulationStats, run_seed: str) -> dict:
+    config = get_game_config(game_id)
+    low, high = stats.rtp_interval(CONFIDENCE_Z)
+    advertised = definition.get("rtp")
+    top = sorted(stats.payouts.items(), reverse=True)[:TOP_PAYOUTS]
+    return {
+        "slug": game_id,
+        "title": definition.get("title"),
+        "in_game_definitions": bool(definition),
+        "in_game_configs": game_id in GAME_CONFIGS,
+        "layout": f"{config.reels}x{config.rows}",
+        "seed_prefix": seed_prefix(run_seed, game_id),
+        "advertised_rtp": advertised,
+        "advertised_volatility": definition.get("vol"),
+        "measured": {
+            **stats.to_dict(),
+            "mean_return": stats.total_return / stats.spins if stats.spins else 0.0,
+            "variance": stats.variance,
+            "rtp_ci": [low, high],
+        },
+        "rtp_delta": stats.rtp - advertised if advertised is not None else None,
+        "advertised_within_ci": low <= advertised <= high if advertised is not None else None,
+        "tail": {
+            "max_multiplier": stats.max_multiplier,
+            "exceedance": {f">={t}x": stats.exceedance(t) for t in TAIL_THRESHOLDS},
+            "top_payouts": [{"multiplier": payout, "spins": count} for payout, count in top],
+        },
+    }
+
+
+def build_report(games: List[Tuple[str, dict]], merged: Dict[str, SimulationStats],
+                 timing: dict, spins: int, run_seed: str, shard_size: int) -> dict:
+    total = spins * len(games)
+    return {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "run": {
+            "run_seed": run_seed,
+            "seed_format": f"<run_seed>:<slug>:<index:0{SEED_INDEX_WIDTH}d>, index 0..spins-1",
+            "spins_per_game": spins,
+            "games": len(games),
+            "total_spins": total,
+            "shard_size": shard_size,
+            "confidence": f"normal approximation, z={CONFIDENCE_Z}",
+        },
+        "throughput": {
+            **timing,
+            "cpu_count": os.cpu_count(),
+            "machine": platform.machine(),
+            "python": platform.python_version(),
+            "spins_per_second": total / timing["wall_seconds"] if timing["wall_seconds"] else None,
+            "spins_per_second_per_core": total / timing["cpu_seconds"] if timing["cpu_seconds"] else None,
+        },
+        "games": [
+            game_report(game_id, definition, merged[game_id], run_seed)
+            for game_id, definition in games
+        ],
+    }
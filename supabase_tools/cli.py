@@ -0,0 +1,318 @@
+"""
+One entry point for the everyday deploy and maintenance operations
+
+    python3 -m supabase_tools status
+    python3 -m supabase_tools migrate --dry-run
+    python3 -m supabase_tools sync-catalogue + thumbnails + verify
+
+Subcommands chained with `+` run in one process: configuration is resolved
+once, up front, and they share one pooled Supabase client, so a chain pays
+interpreter start-up and TLS handshakes once instead of once per script.
+Only the parser is built at start-up; everything a subcommand needs
+(requests, psycopg, the deploy engines) is imported inside its handler, so
+`--help` and `status` never load them.
+
+The standalone scripts keep working; this is the faster way to run the
+same operations together.
+"""
+
+import argparse
+import os
+import sys
+from typing import Callable, Dict, List, Optional
+
+from supabase_tools.concurrency import DEFAULT_CONCURRENCY, add_concurrency_argument
+from supabase_tools.config import PROJECT_REF, SUPABASE_URL, env_file_values
+
+CHAIN_SEPARATOR = "+"
+
+
+class Context:
+    """Configuration resolved once per process and the clients built from it"""
+
+    def __init__(self, service_key: Optional[str] = None, access_token: Optional[str] = None,
+                 database_url: Optional[str] = None, concurrency: int = DEFAULT_CONCURRENCY):
+        dotenv = env_file_values()
+
+        def resolve(explicit: Optional[str], *names: str) -> Optional[str]:
+            for name in names:
+                explicit = explicit or os.environ.get(name) or dotenv.get(name)
+            return explicit
+
+        self.service_key = resolve(service_key, "SUPABASE_SERVICE_ROLE_KEY")
+        self.access_token = resolve(access_token, "SUPABASE_ACCESS_TOKEN")
+        self.database_url = resolve(database_url, "DATABASE_URL", "SUPABASE_DB_URL")
+        self.concurrency = concurrency
+        self._client = None
+
+    @property
+    def client(self):
+        """The shared pooled client, created on first use"""
+        if self._client is None:
+            from supabase_tools.client import SupabaseClient
+            self._client = SupabaseClient(self.service_key, self.access_token, pool_size=self.concurrency)
+        return self._client
+
+    def require(self, setting: str, variable: str) -> bool:
+        if getattr(self, setting):
+            return True
+        print(f"❌ {variable} not set (environment, .env or a global option)")
+        return False
+
+    def close(self) -> None:
+        if self._client is not None:
+            self._client.close()
+
+
+# --- status --------------------------------------------------------------
+
+def status(ctx: Context, args) -> int:
+    """Offline summary: credentials found, functions and migrations on disk"""
+    from supabase_tools.edge_functions import discover_functions, function_digest, load_manifest
+    from supabase_tools.migrations import discover_migrations
+    from supabase_tools.timing import load_history
+
+    print(f"Project: {PROJECT_REF}")
+    print(f"URL: {SUPABASE_URL}")
+    for label, value in (("Service role key", ctx.service_key), ("Access token", ctx.access_token),
+                         ("Database URL", ctx.database_url)):
+        print(f"   {'✅' if value else '➖'} {label}")
+
+    functions = discover_functions()
+    deployed = load_manifest()
+    changed = [name for name in functions if deployed.get(name, {}).get("digest") != function_digest(name)]
+    print(f"📦 {len(functions)} edge functions, {len(changed)} changed since their last deploy")
+    for name in changed:
+        print(f"   - {name}")
+    print(f"📋 {len(discover_migrations())} migration files")
+
+    history = load_history(run="deploy", last=1)
+    if history:
+        last = history[-1]
+        print(f"⏱️  Last deploy {last['started_at'][:16]}: {last['seconds']:.1f}s, {last['outcome']}")
+    return 0
+
+
+# --- migrate -------------------------------------------------------------
+
+def add_migrate_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("files", nargs="*", help="SQL files to apply (default: supabase/migrations/*.sql)")
+    parser.add_argument("--dry-run", action="store_true", help="List pending migrations only")
+    parser.add_argument("--baseline", action="store_true",
+                        help="Record pending migrations as applied without running them")
+
+
+def migrate(ctx: Context, args) -> int:
+    """Apply pending SQL files through the checksum ledger"""
+    from pathlib import Path
+    from supabase_tools.migrations import Migration, discover_migrations, print_migration_report, run_migrations
+
+    if not ctx.require("database_url", "DATABASE_URL"):
+        return 1
+    migrations = [Migration.from_path(Path(f)) for f in args.files] if args.files else discover_migrations()
+    print(f"📦 {len(migrations)} migration files")
+    try:
+        report = run_migrations(ctx.database_url, migrations, baseline=args.baseline, dry_run=args.dry_run)
+    except Exception as e:
+        print(f"❌ Migration run failed: {e}")
+        return 1
+    print_migration_report(report)
+    return 0 if report.ok else 1
+
+
+# --- deploy-function -----------------------------------------------------
+
+def add_deploy_function_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("functions", nargs="*", help="Function names (default: every function)")
+    parser.add_argument("--force", action="store_true", help="Redeploy even if unchanged")
+    parser.add_argument("--workers", type=int, help="Parallel CLI deploys (default 4)")
+
+
+def deploy_function(ctx: Context, args) -> int:
+    """Deploy changed edge functions through the Supabase CLI"""
+    from supabase_tools.edge_functions import DEFAULT_DEPLOY_WORKERS, deploy_functions, discover_functions
+
+    names = args.functions or discover_functions()
+    unknown = sorted(set(names) - set(discover_functions()))
+    if unknown:
+        print(f"❌ No such function: {', '.join(unknown)}")
+        return 1
+    workers = args.workers or DEFAULT_DEPLOY_WORKERS
+    print(f"📦 {len(names)} functions, {workers} deploy workers")
+    failed = 0
+    for result in deploy_functions(names, ctx.access_token, args.force, workers):
+        if result.status == "skipped":
+            print(f"⏭️  Function '{result.name}' unchanged ({result.digest[:12]})")
+        elif result.ok:
+            print(f"✅ Function '{result.name}' deployed via CLI ({result.elapsed:.1f}s)")
+        else:
+            print(f"⚠️  Could not deploy {result.name}: {result.message}")
+            failed += 1
+    return 1 if failed else 0
+
+
+# --- sync-catalogue ------------------------------------------------------
+
+def add_sync_catalogue_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--definitions", help="Catalogue file (default: game_definitions.json)")
+    parser.add_argument("--dry-run", action="store_true", help="Show the diff without writing")
+
+
+def sync_catalogue(ctx: Context, args) -> int:
+    """Bring licensed_games in line with game_definitions.json"""
+    from pathlib import Path
+    from supabase_tools.catalogue import GAME_DEFINITIONS_PATH, load_game_definitions, print_bulk_result
+    from supabase_tools.catalogue_sync import sync_catalogue as run_sync
+
+    if not ctx.require("service_key", "SUPABASE_SERVICE_ROLE_KEY"):
+        return 1
+    path = Path(args.definitions) if args.definitions else GAME_DEFINITIONS_PATH
+    definitions = load_game_definitions(path)
+    print(f"📄 {len(definitions)} games in {path.name}")
+    try:
+        diff, result = run_sync(ctx.client, definitions, args.dry_run, concurrency=ctx.concurrency)
+    except (RuntimeError, ValueError) as e:
+        print(f"❌ {e}")
+        return 1
+    print(f"📊 {len(diff.inserts)} to insert, {len(diff.updates)} to update, "
+          f"{len(diff.deactivations)} to disable, {diff.unchanged} unchanged")
+    if diff.empty:
+        print("✅ licensed_games already matches the definitions")
+    elif args.dry_run:
+        print("🔍 Dry run - nothing written")
+    else:
+        print_bulk_result(result, diff.writes, "catalogue rows")
+    return 0 if result.ok else 1
+
+
+# --- thumbnails ----------------------------------------------------------
+
+def add_thumbnails_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("games", nargs="*", help="Game codes (default: every game with a tile)")
+
+
+def thumbnails(ctx: Context, args) -> int:
+    """Point licensed_games.thumbnail_url at each game's tile"""
+    from supabase_tools.catalogue import GAMES_WITH_IMAGES, print_bulk_result, update_thumbnails
+
+    if not ctx.require("service_key", "SUPABASE_SERVICE_ROLE_KEY"):
+        return 1
+    codes = args.games or GAMES_WITH_IMAGES
+    try:
+        result = update_thumbnails(ctx.client, codes, concurrency=ctx.concurrency)
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        return 1
+    print_bulk_result(result, len(codes))
+    return 0 if result.ok else 1
+
+
+# --- verify --------------------------------------------------------------
+
+def verify(ctx: Context, args) -> int:
+    """Probe the games table and every edge function at once"""
+    from supabase_tools.concurrency import run_concurrently
+    from supabase_tools.edge_functions import discover_functions
+    from supabase_tools.probes import deploy_probes, probe_passed
+
+    probes = deploy_probes(discover_functions(), games_table=bool(ctx.service_key))
+    failed = 0
+    for outcome in run_concurrently(lambda probe: probe[1](ctx.client), probes, ctx.concurrency):
+        print(outcome.value)
+        failed += not probe_passed(outcome.value)
+    return 1 if failed else 0
+
+
+# --- deploy --------------------------------------------------------------
+
+def add_deploy_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--force-functions", action="store_true",
+                        help="Redeploy every edge function even if unchanged")
+
+
+def deploy(ctx: Context, args) -> int:
+    """The root SQL files, changed functions, then verification (non-interactive)"""
+    from supabase_tools.migrations import ROOT_SQL_FILES
+
+    steps = [
+        ("SQL migrations", migrate, argparse.Namespace(
+            files=[str(path) for path in ROOT_SQL_FILES if path.exists()], dry_run=False, baseline=False)),
+        ("Edge functions", deploy_function, argparse.Namespace(
+            functions=[], force=args.force_functions, workers=None)),
+        ("Verification", verify, argparse.Namespace()),
+    ]
+    # Like deploy-full-automated.py, a failed step doesn't stop the later ones
+    code = 0
+    for number, (title, handler, step_args) in enumerate(steps, 1):
+        print(f"\n📋 STEP {number}: {title}")
+        print("-" * 60)
+        code = handler(ctx, step_args) or code
+    return code
+
+
+COMMANDS: Dict[str, tuple] = {
+    # name: (handler, add_arguments, help)
+    "status": (status, None, "Credentials, changed functions and migrations (offline, instant)"),
+    "deploy": (deploy, add_deploy_arguments, "SQL, edge functions and verification in one go"),
+    "migrate": (migrate, add_migrate_arguments, "Apply pending SQL migrations"),
+    "deploy-function": (deploy_function, add_deploy_function_arguments, "Deploy changed edge functions"),
+    "sync-catalogue": (sync_catalogue, add_sync_catalogue_arguments, "Sync licensed_games from the catalogue"),
+    "thumbnails": (thumbnails, add_thumbnails_arguments, "Update licensed_games thumbnail URLs"),
+    "verify": (verify, None, "Probe the games table and every edge function"),
+}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python3 -m supabase_tools",
+        description="COLLECTIVE-WINS deploy and maintenance. "
+                    f"Chain subcommands with '{CHAIN_SEPARATOR}' to run them in one process.",
+    )
+    parser.add_argument("--service-role-key", help="Default: $SUPABASE_SERVICE_ROLE_KEY or .env")
+    parser.add_argument("--access-token", help="Default: $SUPABASE_ACCESS_TOKEN or .env")
+    parser.add_argument("--database-url", help="Default: $DATABASE_URL, $SUPABASE_DB_URL or .env")
+    add_concurrency_argument(parser)
+    commands = parser.add_subparsers(dest="command", required=True, metavar="COMMAND")
+    for name, (handler, add_arguments, help_text) in COMMANDS.items():
+        command = commands.add_parser(name, help=help_text, description=handler.__doc__)
+        if add_arguments:
+            add_arguments(command)
+    return parser
+
+
+def split_chain(argv: List[str]) -> List[List[str]]:
+    chain = [[]]
+    for arg in argv:
+        if arg == CHAIN_SEPARATOR:
+            chain.append([])
+        else:
+            chain[-1].append(arg)
+    return chain
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = build_parser()
+    segments = split_chain(sys.argv[1:] if argv is None else argv)
+    # Global options go before the first subcommand; every segment is parsed
+    # before anything runs, so a typo late in a chain fails fast
+    first = parser.parse_args(segments[0])
+    steps = [first] + [parser.parse_args(segment) for segment in segments[1:]]
+
+    ctx = Context(first.service_role_key, first.access_token, first.database_url, first.concurrency)
+    handlers: Dict[str, Callable] = {name: entry[0] for name, entry in COMMANDS.items()}
+    try:
+        for step in steps:
+            if len(steps) > 1:
+                print(f"\n▶️  {step.command}")
+                print("=" * 60)
+            code = handlers[step.command](ctx, step)
+            if code:
+                if len(steps) > 1:
+                    print(f"\n❌ {step.command} failed - stopping the chain")
+                return code
+        return 0
+    except KeyboardInterrupt:
+        print("\n⏸️  Interrupted")
+        return 130
+    finally:
+        ctx.close()
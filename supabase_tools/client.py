@@ -0,0 +1,158 @@
+"""
+Pooled HTTP client for the Supabase REST, RPC, Functions and Management APIs
+
+One `requests.Session` keeps a keep-alive connection pool per host, so a
+script pays the TCP/TLS handshake once per host instead of once per call.
+Auth headers are applied once, each endpoint family gets its own timeout,
+and 429/5xx responses are retried with exponential backoff and full jitter.
+"""
+
+import random
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from supabase_tools.config import MANAGEMENT_API_URL, PROJECT_REF, SUPABASE_URL
+
+# (connect, read) timeouts in seconds per endpoint family
+TIMEOUTS: Dict[str, Tuple[float, float]] = {
+    "rest": (5, 30),
+    "rpc": (5, 120),
+    "functions": (5, 30),
+    "management": (5, 60),
+    "probe": (3, 5),
+}
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE", "PATCH"})
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_MAX_RETRIES = 3
+BACKOFF_BASE = 0.5
+BACKOFF_CAP = 8.0
+
+
+class SupabaseClient:
+    """Shared session with per-host pooling, auth headers and retries"""
+
+    def __init__(self, service_key: Optional[str] = None, access_token: Optional[str] = None,
+                 supabase_url: str = SUPABASE_URL, pool_size: int = DEFAULT_POOL_SIZE,
+                 max_retries: int = DEFAULT_MAX_RETRIES):
+        self.service_key = service_key
+        self.access_token = access_token
+        self.supabase_url = supabase_url.rstrip("/")
+        self.max_retries = max_retries
+        self.request_count = 0
+        self.retry_count = 0
+        self._count_lock = threading.Lock()
+
+        self.session = requests.Session()
+        self.resize_pool(pool_size)
+
+        self.rest_headers: Dict[str, str] = {}
+        if service_key:
+            self.rest_headers = {
+                "apikey": service_key,
+                "Authorization": f"Bearer {service_key}",
+            }
+
+        # The scripts historically fell back to the service key here
+        management_token = access_token or service_key
+        self.management_headers: Dict[str, str] = {}
+        if management_token:
+            self.management_headers = {"Authorization": f"Bearer {management_token}"}
+
+    def __enter__(self) -> "SupabaseClient":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.session.close()
+
+    def resize_pool(self, pool_size: int) -> None:
+        """Keep at least `pool_size` keep-alive sockets per host"""
+        self.pool_size = max(pool_size, 1)
+        # pool_connections is the number of hosts kept warm, pool_maxsize the
+        # number of keep-alive sockets per host (matches worker concurrency)
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def _backoff(self, attempt: int, retry_after: Optional[str]) -> None:
+        """Sleep before the next attempt, honouring Retry-After when given"""
+        delay = random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * (2 ** attempt)))
+        if retry_after:
+            try:
+                delay = max(delay, min(float(retry_after), BACKOFF_CAP))
+            except ValueError:
+                pass
+        time.sleep(delay)
+
+    def request(self, method: str, url: str, endpoint: str = "rest",
+                headers: Optional[Dict[str, str]] = None, retry: Optional[bool] = None,
+                timeout=None, **kwargs) -> requests.Response:
+        """
+        Send a request through the pooled session.
+
+        Idempotent methods are retried by default; pass `retry=True` for a
+        POST that is safe to repeat (e.g. a merge-duplicates upsert).
+        """
+        method = method.upper()
+        if retry is None:
+            retry = method in IDEMPOTENT_METHODS
+        if timeout is None:
+            timeout = TIMEOUTS.get(endpoint, TIMEOUTS["rest"])
+        attempts = self.max_retries + 1 if retry else 1
+
+        for attempt in range(attempts):
+            with self._count_lock:
+                self.request_count += 1
+                self.retry_count += attempt > 0
+            last = attempt == attempts - 1
+            try:
+                response = self.session.request(method, url, headers=headers,
+                                                timeout=timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if last:
+                    raise
+                self._backoff(attempt, None)
+                continue
+
+            if response.status_code in RETRY_STATUSES and not last:
+                self._backoff(attempt, response.headers.get("Retry-After"))
+                continue
+            return response
+
+        raise AssertionError("unreachable")
+
+    def rest_url(self, path: str) -> str:
+        return f"{self.supabase_url}/rest/v1/{path.lstrip('/')}"
+
+    def rest(self, method: str, table: str, headers: Optional[Dict[str, str]] = None,
+             **kwargs) -> requests.Response:
+        """Call `/rest/v1/<table>` with the service role headers"""
+        return self.request(method, self.rest_url(table), "rest",
+                            headers={**self.rest_headers, **(headers or {})}, **kwargs)
+
+    def rpc(self, name: str, payload: Optional[dict] = None, **kwargs) -> requests.Response:
+        """Call a Postgres function through `/rest/v1/rpc/<name>`"""
+        return self.request("POST", self.rest_url(f"rpc/{name}"), "rpc",
+                            headers=self.rest_headers, json=payload or {}, **kwargs)
+
+    def function(self, name: str, payload: Optional[dict] = None, method: str = "POST",
+                 headers: Optional[Dict[str, str]] = None, endpoint: str = "functions",
+                 **kwargs) -> requests.Response:
+        """Call an edge function; no auth is sent unless `headers` carries it"""
+        return self.request(method, f"{self.supabase_url}/functions/v1/{name}", endpoint,
+                            headers=headers, json=payload, **kwargs)
+
+    def management(self, method: str, path: str = "", **kwargs) -> requests.Response:
+        """Call `/v1/projects/<ref><path>` on the Management API"""
+        url = f"{MANAGEMENT_API_URL}/v1/projects/{PROJECT_REF}{path}"
+        headers = {**self.management_headers, **kwargs.pop("headers", {})}
+        return self.request(method, url, "management", headers=headers, **kwargs)
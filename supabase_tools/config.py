@@ -0,0 +1,35 @@
+"""
+Project settings shared by every deploy and maintenance script
+"""
+
+import os
+from pathlib import Path
+from typing import Dict
+
+PROJECT_REF = "yiorietrtfosjnpzznnr"
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+
+# SUPABASE_URL may point at a local stand-in instead of the live project
+SUPABASE_URL = os.environ.get("SUPABASE_URL", f"https://{PROJECT_REF}.supabase.co").rstrip("/")
+MANAGEMENT_API_URL = "https://api.supabase.com"
+DASHBOARD_URL = f"https://supabase.com/dashboard/project/{PROJECT_REF}"
+
+FUNCTIONS_DIR = PROJECT_DIR / "supabase" / "functions"
+
+# Local, untracked state (deploy manifests, caches, run history)
+STATE_DIR = PROJECT_DIR / ".deploy-state"
+ENV_FILE = PROJECT_DIR / ".env"
+
+
+def env_file_values(path: Path = ENV_FILE) -> Dict[str, str]:
+    """KEY=VALUE lines of .env, quotes stripped; a missing file means none"""
+    values: Dict[str, str] = {}
+    try:
+        with open(path) as f:
+            for line in f:
+                key, sep, value = line.strip().partition("=")
+                if sep and not key.startswith("#"):
+                    values[key.strip().removeprefix("export ")] = value.strip().strip('"').strip("'")
+    except OSError:
+        pass
+    return values
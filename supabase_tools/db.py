@@ -0,0 +1,45 @@
+"""
+Direct PostgreSQL connections for the migration and maintenance tools
+
+psycopg2 (or psycopg 3) is optional: the REST-only scripts never import it.
+"""
+
+import os
+from typing import Optional
+
+
+def database_url() -> Optional[str]:
+    """Connection string from DATABASE_URL or SUPABASE_DB_URL"""
+    return os.environ.get("DATABASE_URL") or os.environ.get("SUPABASE_DB_URL")
+
+
+def driver_available() -> bool:
+    """True if psycopg2 or psycopg is importable"""
+    try:
+        import psycopg2  # noqa: F401
+        return True
+    except ImportError:
+        pass
+    try:
+        import psycopg  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def connect(dsn: str, autocommit: bool = False, timeout: Optional[int] = None):
+    """Open a DB-API connection with whichever psycopg is installed"""
+    options = {"connect_timeout": timeout} if timeout else {}
+    try:
+        import psycopg2
+        conn = psycopg2.connect(dsn, **options)
+    except ImportError:
+        try:
+            import psycopg
+        except ImportError:
+            raise RuntimeError(
+                "No PostgreSQL driver installed - run: pip install psycopg2-binary"
+            ) from None
+        conn = psycopg.connect(dsn, **options)
+    conn.autocommit = autocommit
+    return conn
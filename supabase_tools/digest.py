@@ -0,0 +1,191 @@
+"""
+Set-based weekly digest metrics
+
+One grouped scan of the week's game_sessions computes every active player's
+sessions, wagered, won, per-game and per-weekday counts: GROUPING SETS
+aggregates (player, game) and (player, weekday) in the same pass, and an
+outer GROUP BY folds both into one row per player joined with users.
+
+Rows are read through a server-side cursor in fixed-size chunks, so memory
+stays bounded however many players were active. Each chunk can be written
+to a JSONL file and/or upserted into weekly_digest_queue for the renderer.
+The context text matches what the weekly-digest function builds per player.
+"""
+
+import json
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from supabase_tools.db import connect
+
+DEFAULT_CHUNK_SIZE = 10_000
+DEFAULT_DAYS = 7
+TOP_GAMES = 5
+TOP_DAYS = 3
+
+DIGEST_SQL = """
+WITH grouped AS (
+  SELECT user_id,
+         game_id,
+         to_char(start_time AT TIME ZONE %(timezone)s, 'FMDay') AS weekday,
+         GROUPING(game_id) = 0 AS by_game,
+         count(*) AS sessions,
+         sum(wager_amount) AS wagered,
+         sum(payout_amount) AS won
+  FROM public.game_sessions
+  WHERE start_time >= %(since)s AND start_time < %(until)s
+  GROUP BY GROUPING SETS ((user_id, game_id), (user_id, weekday))
+)
+SELECT g.user_id::text,
+       u.display_name,
+       u.total_balance_aud,
+       sum(g.sessions) FILTER (WHERE g.by_game),
+       sum(g.wagered) FILTER (WHERE g.by_game),
+       sum(g.won) FILTER (WHERE g.by_game),
+       jsonb_object_agg(g.game_id, g.sessions) FILTER (WHERE g.by_game),
+       jsonb_object_agg(g.weekday, g.sessions) FILTER (WHERE NOT g.by_game)
+FROM grouped g
+JOIN public.users u ON u.id = g.user_id
+GROUP BY g.user_id, u.display_name, u.total_balance_aud
+"""
+
+ENQUEUE_SQL = """
+INSERT INTO public.weekly_digest_queue (week_ending, user_id, metrics, context)
+SELECT %s, user_id, metrics, context
+FROM unnest(%s::uuid[], %s::jsonb[], %s::text[]) AS d(user_id, metrics, context)
+ON CONFLICT (week_ending, user_id) DO UPDATE
+  SET metrics = EXCLUDED.metrics, context = EXCLUDED.context, created_at = now()
+  WHERE weekly_digest_queue.status = 'pending'
+"""
+
+
+def _json(value):
+    return json.loads(value) if isinstance(value, str) else (value or {})
+
+
+@dataclass
+class WeeklyDigest:
+    user_id: str
+    display_name: str
+    balance: Decimal
+    sessions: int
+    wagered: Decimal
+    won: Decimal
+    games: Dict[str, int] = field(default_factory=dict)
+    weekdays: Dict[str, int] = field(default_factory=dict)
+
+    @classmethod
+    def from_row(cls, row) -> "WeeklyDigest":
+        user_id, name, balance, sessions, wagered, won, games, weekdays = row
+        return cls(user_id, name, balance, int(sessions), wagered, won, _json(games), _json(weekdays))
+
+    @property
+    def net(self) -> Decimal:
+        return self.won - self.wagered
+
+    @property
+    def win_rate(self) -> float:
+        return float(self.won / self.wagered * 100) if self.wagered else 0.0
+
+    def top_games(self, limit: int = TOP_GAMES) -> List[Tuple[str, int]]:
+        return sorted(self.games.items(), key=lambda item: (-item[1], item[0]))[:limit]
+
+    def busiest_days(self, limit: int = TOP_DAYS) -> List[Tuple[str, int]]:
+        return sorted(self.weekdays.items(), key=lambda item: (-item[1], item[0]))[:limit]
+
+    def metrics(self) -> dict:
+        return {
+            "sessions": self.sessions,
+            "wagered": float(self.wagered),
+            "won": float(self.won),
+            "net": float(self.net),
+            "win_rate": round(self.win_rate, 1),
+            "games": self.games,
+            "weekdays": self.weekdays,
+        }
+
+    def context(self) -> str:
+        """The plain-text summary weekly-digest hands to the AI renderer"""
+        sign = "+" if self.net >= 0 else ""
+        win_rate = f"{self.win_rate:.1f}" if self.wagered else "0"
+        return "\n".join([
+            "",
+            "Weekly Gaming Digest (Last 7 Days):",
+            f"User: {self.display_name}",
+            f"Current Balance: ${self.balance} AUD",
+            "",
+            "Weekly Activity:",
+            f"- Total Sessions: {self.sessions}",
+            f"- Total Wagered: ${self.wagered:.2f} AUD",
+            f"- Total Won: ${self.won:.2f} AUD",
+            f"- Net Result: {sign}${self.net:.2f} AUD",
+            f"- Win Rate: {win_rate}%",
+            "",
+            "Top Games Played:",
+            *(f"{game} ({count} sessions)" for game, count in self.top_games()),
+            "",
+            "Most Active Days:",
+            *(f"{day}: {count} sessions" for day, count in self.busiest_days()),
+            "",
+        ])
+
+    def to_dict(self) -> dict:
+        return {"user_id": self.user_id, "display_name": self.display_name,
+                "balance": float(self.balance), **self.metrics()}
+
+
+def week_window(until: Optional[datetime] = None, days: int = DEFAULT_DAYS) -> Tuple[datetime, datetime]:
+    until = until or datetime.now(timezone.utc)
+    return until - timedelta(days=days), until
+
+
+def stream_digests(dsn: str, since: datetime, until: datetime, timezone_name: str = "UTC",
+                   chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[List[WeeklyDigest]]:
+    """Every active player's digest for [since, until), `chunk_size` at a time"""
+    conn = connect(dsn)
+    try:
+        with conn.cursor(name="weekly_digest") as cur:
+            cur.itersize = chunk_size
+            cur.execute(DIGEST_SQL, {"since": since, "until": until, "timezone": timezone_name})
+            while True:
+                rows = cur.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield [WeeklyDigest.from_row(row) for row in rows]
+    finally:
+        conn.rollback()
+        conn.close()
+
+
+def enqueue_digests(conn, week_ending: date, digests: List[WeeklyDigest]) -> None:
+    """Upsert a chunk into weekly_digest_queue; digests already sent are left alone"""
+    with conn.cursor() as cur:
+        cur.execute(ENQUEUE_SQL, (
+            week_ending,
+            [digest.user_id for digest in digests],
+            [json.dumps(digest.metrics()) for digest in digests],
+            [digest.context() for digest in digests],
+        ))
+    conn.commit()
+
+
+@dataclass
+class DigestTotals:
+    players: int = 0
+    sessions: int = 0
+    wagered: Decimal = Decimal(0)
+    won: Decimal = Decimal(0)
+    chunks: int = 0
+
+    def add(self, digests: List[WeeklyDigest]) -> None:
+        self.players += len(digests)
+        self.sessions += sum(digest.sessions for digest in digests)
+        self.wagered += sum((digest.wagered for digest in digests), Decimal(0))
+        self.won += sum((digest.won for digest in digests), Decimal(0))
+        self.chunks += 1
+
+    def to_dict(self) -> dict:
+        return {key: float(value) if isinstance(value, Decimal) else value
+                for key, value in asdict(self).items()}
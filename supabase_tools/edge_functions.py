@@ -0,0 +1,160 @@
+"""
+Edge function deploy engine
+
+Every directory under supabase/functions with an index.ts is a function.
+Each one is fingerprinted over its own sources plus _shared; a manifest in
+.deploy-state/ remembers the fingerprint last deployed per project, so only
+changed functions are redeployed, in parallel across a worker pool.
+"""
+
+import hashlib
+import os
+import subprocess
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from supabase_tools.concurrency import run_concurrently
+from supabase_tools.config import FUNCTIONS_DIR, PROJECT_DIR, PROJECT_REF
+from supabase_tools.state import load_json, save_json, state_path
+
+SHARED_DIR_NAME = "_shared"
+DEPLOY_TIMEOUT = 180
+DEFAULT_DEPLOY_WORKERS = 4
+MANIFEST_PATH = state_path("functions-manifest.json")
+
+
+@dataclass
+class FunctionDeploy:
+    """Outcome for one function: deployed, skipped (unchanged) or failed"""
+    name: str
+    digest: str
+    status: str
+    message: str = ""
+    elapsed: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.status in ("deployed", "skipped")
+
+
+def discover_functions(functions_dir: Path = FUNCTIONS_DIR) -> List[str]:
+    """Names of every deployable function directory, sorted"""
+    if not functions_dir.is_dir():
+        return []
+    return sorted(
+        entry.name for entry in functions_dir.iterdir()
+        if entry.is_dir()
+        and not entry.name.startswith(("_", "."))
+        and (entry / "index.ts").exists()
+    )
+
+
+def _source_files(directory: Path) -> List[Path]:
+    """Files that end up in the bundle (tests are not deployed)"""
+    if not directory.is_dir():
+        return []
+    return sorted(
+        path for path in directory.rglob("*")
+        if path.is_file() and ".test." not in path.name
+    )
+
+
+def function_digest(name: str, functions_dir: Path = FUNCTIONS_DIR) -> str:
+    """SHA-256 over the function's sources together with _shared"""
+    digest = hashlib.sha256()
+    for directory in (functions_dir / name, functions_dir / SHARED_DIR_NAME):
+        for path in _source_files(directory):
+            digest.update(path.relative_to(functions_dir).as_posix().encode())
+            digest.update(b"\0")
+            digest.update(path.read_bytes())
+            digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def load_manifest(project_ref: str = PROJECT_REF) -> Dict[str, dict]:
+    """Last deployed digest per function for one project"""
+    return load_json(MANIFEST_PATH, {}).get(project_ref, {})
+
+
+def deploy_function_via_cli(function_name: str, access_token: Optional[str] = None,
+                            project_ref: str = PROJECT_REF,
+                            timeout: int = DEPLOY_TIMEOUT) -> subprocess.CompletedProcess:
+    """Run `npx supabase functions deploy <name>` for one function"""
+    env = os.environ.copy()
+    if access_token and access_token != "CLI_AUTHENTICATED":
+        env["SUPABASE_ACCESS_TOKEN"] = access_token
+
+    cmd = [
+        "npx", "supabase", "functions", "deploy", function_name,
+        "--project-ref", project_ref
+    ]
+    return subprocess.run(
+        cmd,
+        cwd=PROJECT_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=timeout
+    )
+
+
+def _cli_error(result: subprocess.CompletedProcess) -> str:
+    error_msg = result.stderr or result.stdout
+    if "Access token" in error_msg or "login" in error_msg.lower():
+        return "Authentication required"
+    return f"CLI error: {error_msg[:200]}"
+
+
+def deploy_functions(names: Optional[Iterable[str]] = None,
+                     access_token: Optional[str] = None,
+                     force: bool = False,
+                     workers: int = DEFAULT_DEPLOY_WORKERS,
+                     project_ref: str = PROJECT_REF) -> List[FunctionDeploy]:
+    """
+    Deploy every changed function, `workers` CLI processes at a time.
+
+    The manifest is rewritten after each successful deploy, so an
+    interrupted run keeps the functions it already shipped.
+    """
+    names = discover_functions() if names is None else list(names)
+    manifest = load_json(MANIFEST_PATH, {})
+    deployed = manifest.setdefault(project_ref, {})
+    lock = threading.Lock()
+
+    results: Dict[str, FunctionDeploy] = {}
+    pending = []
+    for name in names:
+        digest = function_digest(name)
+        if not force and deployed.get(name, {}).get("digest") == digest:
+            results[name] = FunctionDeploy(name, digest, "skipped", "unchanged")
+        else:
+            pending.append((name, digest))
+
+    def deploy(job) -> FunctionDeploy:
+        name, digest = job
+        started = time.perf_counter()
+        try:
+            result = deploy_function_via_cli(name, access_token, project_ref)
+        except Exception as e:
+            return FunctionDeploy(name, digest, "failed", f"CLI error: {e}",
+                                  time.perf_counter() - started)
+        elapsed = time.perf_counter() - started
+        if result.returncode != 0:
+            return FunctionDeploy(name, digest, "failed", _cli_error(result), elapsed)
+
+        with lock:
+            deployed[name] = {
+                "digest": digest,
+                "deployed_at": datetime.now(timezone.utc).isoformat(),
+            }
+            save_json(MANIFEST_PATH, manifest)
+        return FunctionDeploy(name, digest, "deployed", "", elapsed)
+
+    for outcome in run_concurrently(deploy, pending, workers):
+        results[outcome.value.name] = outcome.value
+
+    return [results[name] for name in names]
@@ -0,0 +1,202 @@
+"""
+Exact return-to-player of the spin engine, without simulation
+
+calculateWin only scores the middle payline and the grid-wide scatter
+count, and every cell is an independent selectSymbol draw, so the payout
+distribution can be computed exactly:
+
+- symbol probabilities count the 2^32 RNG outputs each symbol receives
+  under selectSymbol's float roll, so rounding at the bucket edges is exact
+- a DP over the middle row gives the joint law of (run length, whether the
+  run's symbol pays, scatters on the middle row)
+- scatters on the other reels*(rows-1) cells are binomial
+- the two are combined with the multiplier tables into a payout law
+
+Every stage is memoised on its inputs only: changing a multiplier
+re-prices the cached run/scatter laws, changing the layout reuses the
+symbol probabilities, and games sharing weights and layout share all work.
+"""
+
+from dataclasses import dataclass
+from fractions import Fraction
+from functools import lru_cache
+from math import comb
+from typing import Dict, Optional, Sequence, Tuple
+
+from supabase_tools.slot_engine import (
+    DEFAULT_SYMBOLS, PAYLINE_MULTIPLIERS, SCATTER_MIN_COUNT, SCATTER_MULTIPLIER, TWO_POW_32,
+    SymbolWeight, cumulative_weights, get_game_config, spin_weights
+)
+
+# (run length, run symbol pays, scatters on the middle row) -> probability
+MiddleRowLaw = Dict[Tuple[int, bool, int], Fraction]
+
+
+@dataclass(frozen=True)
+class ExactResult:
+    rtp: Fraction
+    hit_rate: Fraction
+    variance: Fraction
+    payouts: Tuple[Tuple[Fraction, Fraction], ...]  # (multiplier, probability)
+    run_lengths: Tuple[Tuple[int, Fraction], ...]
+    scatter_counts: Tuple[Tuple[int, Fraction], ...]
+
+    @property
+    def rtp_percent(self) -> float:
+        return float(100 * self.rtp)
+
+    @property
+    def std_dev(self) -> float:
+        return float(self.variance) ** 0.5
+
+    def to_dict(self) -> dict:
+        return {
+            "rtp": self.rtp_percent,
+            "hit_rate": float(self.hit_rate),
+            "variance": float(self.variance),
+            "std_dev": self.std_dev,
+            "max_multiplier": float(max(payout for payout, _ in self.payouts)),
+            "run_lengths": {length: float(p) for length, p in self.run_lengths},
+            "scatter_counts": {count: float(p) for count, p in self.scatter_counts},
+        }
+
+
+def _outputs_at_or_below(bound: float, total: float) -> int:
+    """How many RNG outputs k/2^32 give a roll (k/2^32 * total) <= bound"""
+    low, high = 0, TWO_POW_32  # invariant: k < low passes, k >= high fails
+    while low < high:
+        mid = (low + high) // 2
+        if (mid / TWO_POW_32) * total <= bound:
+            low = mid + 1
+        else:
+            high = mid
+    return low
+
+
+@lru_cache(maxsize=None)
+def symbol_probabilities(weights: Tuple[float, ...]) -> Tuple[Fraction, ...]:
+    """Exact selectSymbol probabilities for a weight vector"""
+    symbols = [SymbolWeight(str(i), "", weight, "normal") for i, weight in enumerate(weights)]
+    cumulative, total = cumulative_weights(symbols)
+    counts, below = [], 0
+    for bound in cumulative:
+        at_or_below = _outputs_at_or_below(bound, total)
+        counts.append(at_or_below - below)
+        below = at_or_below
+    counts[0] += TWO_POW_32 - below  # rolls above every bound fall back to symbols[0]
+    return tuple(Fraction(count, TWO_POW_32) for count in counts)
+
+
+@lru_cache(maxsize=None)
+def middle_row_law(ids: Tuple[str, ...], probabilities: Tuple[Fraction, ...],
+                   reels: int) -> MiddleRowLaw:
+    """DP over the middle row, following calculateWin's wild substitution"""
+    payable_ids = {s.id for s in DEFAULT_SYMBOLS}
+    draws = list(zip(ids, probabilities))
+    scatter_p = sum((p for symbol, p in draws if symbol == "scatter"), Fraction(0))
+
+    # running: (match symbol, run length, middle scatters) -> probability
+    running: Dict[Tuple[str, int, int], Fraction] = {}
+    for symbol, p in draws:
+        key = (symbol, 1, int(symbol == "scatter"))
+        running[key] = running.get(key, 0) + p
+    stopped: Dict[Tuple[str, int, int], Fraction] = {}
+
+    for _ in range(1, reels):
+        next_running: Dict[Tuple[str, int, int], Fraction] = {}
+        next_stopped: Dict[Tuple[str, int, int], Fraction] = {}
+        for (match, length, scatters), p_state in running.items():
+            for symbol, p in draws:
+                hit = int(symbol == "scatter")
+                if symbol == match or symbol == "wild" or match == "wild":
+                    key = (symbol if match == "wild" else match, length + 1, scatters + hit)
+                    next_running[key] = next_running.get(key, 0) + p_state * p
+                else:
+                    key = (match, length, scatters + hit)
+                    next_stopped[key] = next_stopped.get(key, 0) + p_state * p
+        # once the run is broken only the scatter count can still change
+        for (match, length, scatters), p_state in stopped.items():
+            for key, p in (((match, length, scatters + 1), scatter_p),
+                           ((match, length, scatters), 1 - scatter_p)):
+                next_stopped[key] = next_stopped.get(key, 0) + p_state * p
+        running, stopped = next_running, next_stopped
+
+    law: MiddleRowLaw = {}
+    for states in (running, stopped):
+        for (match, length, scatters), p in states.items():
+            key = (length, match in payable_ids, scatters)
+            law[key] = law.get(key, 0) + p
+    return law
+
+
+@lru_cache(maxsize=None)
+def scatter_law(scatter_p: Fraction, cells: int) -> Tuple[Fraction, ...]:
+    """Binomial law of scatters on the cells off the middle row"""
+    return tuple(
+        comb(cells, k) * scatter_p ** k * (1 - scatter_p) ** (cells - k)
+        for k in range(cells + 1)
+    )
+
+
+@lru_cache(maxsize=None)
+def _price(law_items: Tuple[Tuple[Tuple[int, bool, int], Fraction], ...],
+           off_row: Tuple[Fraction, ...], payline: Tuple[int, ...],
+           scatter_min: int, scatter_multiplier: int) -> ExactResult:
+    payouts: Dict[Fraction, Fraction] = {}
+    run_lengths: Dict[int, Fraction] = {}
+    scatter_counts: Dict[int, Fraction] = {}
+
+    for (length, payable, middle_scatters), p_row in law_items:
+        run_lengths[length] = run_lengths.get(length, 0) + p_row
+        line = payline[min(length - 1, len(payline) - 1)] if length >= 3 and payable else 0
+        for others, p_off in enumerate(off_row):
+            count = middle_scatters + others
+            p = p_row * p_off
+            scatter_counts[count] = scatter_counts.get(count, 0) + p
+            payout = Fraction(line + (count * scatter_multiplier if count >= scatter_min else 0))
+            payouts[payout] = payouts.get(payout, 0) + p
+
+    rtp = sum((x * p for x, p in payouts.items()), Fraction(0))
+    second_moment = sum((x * x * p for x, p in payouts.items()), Fraction(0))
+    return ExactResult(
+        rtp=rtp,
+        hit_rate=sum((p for x, p in payouts.items() if x > 0), Fraction(0)),
+        variance=second_moment - rtp * rtp,
+        payouts=tuple(sorted(payouts.items())),
+        run_lengths=tuple(sorted(run_lengths.items())),
+        scatter_counts=tuple(sorted(scatter_counts.items())),
+    )
+
+
+def exact_rtp(symbols: Sequence[SymbolWeight], reels: int, rows: int,
+              payline: Sequence[int] = PAYLINE_MULTIPLIERS,
+              scatter_min: int = SCATTER_MIN_COUNT,
+              scatter_multiplier: int = SCATTER_MULTIPLIER) -> ExactResult:
+    """Exact payout law of one symbol set on a reels x rows grid"""
+    ids = tuple(s.id for s in symbols)
+    probabilities = symbol_probabilities(tuple(s.weight for s in symbols))
+    scatter_p = sum((p for symbol, p in zip(ids, probabilities) if symbol == "scatter"), Fraction(0))
+    law = middle_row_law(ids, probabilities, reels)
+    off_row = scatter_law(scatter_p, reels * (rows - 1))
+    return _price(tuple(sorted(law.items())), off_row, tuple(payline),
+                  scatter_min, scatter_multiplier)
+
+
+def game_symbols(game_id: str, configured: bool = False,
+                 overrides: Optional[Dict[str, float]] = None) -> Tuple[SymbolWeight, ...]:
+    """
+    Weights a game is priced with: what generateSpinOutcome draws from, or
+    with `configured` the game's own GAME_CONFIGS weights; `overrides`
+    replaces individual symbol weights by id.
+    """
+    symbols = get_game_config(game_id).symbol_weights if configured else spin_weights()
+    overrides = overrides or {}
+    return tuple(
+        SymbolWeight(s.id, s.name, overrides.get(s.id, s.weight), s.type) for s in symbols
+    )
+
+
+def game_exact_rtp(game_id: str, configured: bool = False,
+                   overrides: Optional[Dict[str, float]] = None) -> ExactResult:
+    config = get_game_config(game_id)
+    return exact_rtp(game_symbols(game_id, configured, overrides), config.reels, config.rows)
@@ -0,0 +1,303 @@
+"""
+Resumable, parallel table exports over PostgREST
+
+A large table (game_spins for an audit, provably_fair_verification for
+verify-fairness.py) is read with keyset pagination on (created_at, id),
+so every page is an index range scan however deep the export gets. The
+created_at range is cut into slices that a pool of workers pages through
+side by side, each appending to its own part file as it goes: memory holds
+one page per worker, never the table.
+
+After every page a slice's last key and part file size are checkpointed.
+An interrupted export resumes from there: each part is truncated back to
+its checkpointed size (a gzip part is a series of complete gzip members,
+one per page, so that is always a member boundary) and paging continues
+after the saved key. When every slice is done the parts are concatenated,
+in key order, into the output file.
+"""
+
+import csv
+import gzip
+import io
+import json
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from supabase_tools.bulk import _error_message
+from supabase_tools.client import SupabaseClient
+from supabase_tools.concurrency import run_concurrently
+from supabase_tools.paging import DEFAULT_PAGE_SIZE, KEYSET_COLUMNS, _quote, keyset_pages, select_with_keys
+from supabase_tools.state import load_json, save_json
+
+FORMATS = ("jsonl", "csv")
+DEFAULT_WORKERS = 4
+# More slices than workers, so a dense stretch of time doesn't leave one
+# worker finishing alone
+SLICES_PER_WORKER = 4
+CHECKPOINT_SECONDS = 2.0
+COMPRESS_LEVEL = 6
+
+
+def output_format(path: Path):
+    """(format, gzip) from an output name like spins.jsonl.gz or rows.csv"""
+    suffixes = [suffix.lower() for suffix in path.suffixes]
+    compress = bool(suffixes) and suffixes[-1] == ".gz"
+    if compress:
+        suffixes.pop()
+    fmt = suffixes[-1].lstrip(".") if suffixes else ""
+    if fmt not in FORMATS:
+        raise ValueError(f"{path.name}: expected a .jsonl or .csv name, optionally ending in .gz")
+    return fmt, compress
+
+
+@dataclass
+class Slice:
+    index: int
+    lower: Optional[str]              # created_at >= lower (None: unbounded)
+    upper: Optional[str]              # created_at < upper (None: unbounded)
+    after: Optional[List[str]] = None  # last (created_at, id) written
+    rows: int = 0
+    bytes: int = 0
+    done: bool = False
+
+    def bounds(self) -> Dict[str, str]:
+        terms = []
+        if self.lower is not None:
+            terms.append(f"created_at.gte.{_quote(self.lower)}")
+        if self.upper is not None:
+            terms.append(f"created_at.lt.{_quote(self.upper)}")
+        return {"and": f"({','.join(terms)})"} if terms else {}
+
+
+@dataclass
+class ExportJob:
+    table: str
+    output: str
+    select: str
+    filters: Dict[str, str]
+    page_size: int
+    columns: List[str]
+    since: Optional[str] = None
+    until: Optional[str] = None
+    slices: List[Slice] = field(default_factory=list)
+    started_at: str = ""
+
+    @property
+    def format(self) -> str:
+        return output_format(Path(self.output))[0]
+
+    @property
+    def compress(self) -> bool:
+        return output_format(Path(self.output))[1]
+
+    @property
+    def checkpoint_path(self) -> Path:
+        return Path(self.output + ".checkpoint.json")
+
+    def part_path(self, piece: Slice) -> Path:
+        return Path(f"{self.output}.part{piece.index:04d}")
+
+    @property
+    def rows(self) -> int:
+        return sum(piece.rows for piece in self.slices)
+
+    @property
+    def done(self) -> bool:
+        return all(piece.done for piece in self.slices)
+
+    def matches(self, table: str, select: str, filters: Dict[str, str],
+                since: Optional[str], until: Optional[str]) -> bool:
+        """True if this checkpoint is of an export with these parameters"""
+        return (self.table, self.select, self.filters, self.since, self.until) == \
+               (table, select, filters, since, until)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ExportJob":
+        data = dict(data)
+        data["slices"] = [Slice(**piece) for piece in data.get("slices", [])]
+        return cls(**data)
+
+
+def load_checkpoint(output: Path) -> Optional[ExportJob]:
+    data = load_json(Path(f"{output}.checkpoint.json"))
+    return ExportJob.from_dict(data) if data else None
+
+
+def _probe(client: SupabaseClient, table: str, params: Dict[str, str]) -> List[dict]:
+    response = client.rest("GET", table, params={**params, "limit": "1"})
+    if response.status_code != 200:
+        raise RuntimeError(f"Reading {table} failed: {_error_message(response)}")
+    return response.json()
+
+
+def _split(first: str, last: str, count: int) -> List[str]:
+    """count - 1 cut points evenly spaced between two timestamps"""
+    start, end = datetime.fromisoformat(first), datetime.fromisoformat(last)
+    step = (end - start) / count
+    return [(start + step * i).isoformat() for i in range(1, count)] if step else []
+
+
+def plan_export(client: SupabaseClient, table: str, output: Path, select: str = "*",
+                filters: Optional[Dict[str, str]] = None, page_size: int = DEFAULT_PAGE_SIZE,
+                slices: int = DEFAULT_WORKERS * SLICES_PER_WORKER, since: Optional[str] = None,
+                until: Optional[str] = None) -> ExportJob:
+    """
+    Find the created_at range of the rows to export (under `filters`, within
+    [since, until)) and cut it into `slices` equal spans. The outer spans
+    reach out to `since` and `until`, or are open-ended, so rows outside
+    the probed range are still exported.
+    """
+    output_format(output)
+    filters = dict(filters or {})
+    if "or" in filters or "and" in filters or "created_at" in filters:
+        raise ValueError("exports filter on created_at and use `or`/`and` themselves; use since/until")
+
+    window = {**filters, **Slice(-1, since, until).bounds()}
+    # The pages carry the keyset columns whatever `select` lists, so the probe does too
+    first = _probe(client, table, {**window, "select": select_with_keys(select), "order": "created_at.asc"})
+    columns = list(first[0]) if first else [c.strip() for c in select.split(",") if c.strip() != "*"]
+    columns += [column for column in KEYSET_COLUMNS if column not in columns]
+    cuts: List[str] = []
+    if first:
+        last = _probe(client, table, {**window, "select": "created_at", "order": "created_at.desc"})
+        cuts = _split(first[0]["created_at"], last[0]["created_at"], max(slices, 1))
+    edges = [since] + cuts + [until]
+
+    return ExportJob(
+        table=table,
+        output=str(output),
+        select=select,
+        filters=filters,
+        page_size=page_size,
+        columns=columns,
+        since=since,
+        until=until,
+        slices=[Slice(i, edges[i], edges[i + 1]) for i in range(len(edges) - 1)],
+        started_at=datetime.now().astimezone().isoformat(),
+    )
+
+
+def _cell(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, separators=(",", ":"))
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+def encode_rows(rows: List[dict], fmt: str, columns: List[str]) -> str:
+    if fmt == "jsonl":
+        return "".join(json.dumps(row, separators=(",", ":")) + "\n" for row in rows)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerows([_cell(row.get(column)) for column in columns] for row in rows)
+    return buffer.getvalue()
+
+
+def _encode(text: str, compress: bool) -> bytes:
+    data = text.encode("utf-8")
+    return gzip.compress(data, compresslevel=COMPRESS_LEVEL, mtime=0) if compress else data
+
+
+class _Checkpointer:
+    """Saves the job at most every CHECKPOINT_SECONDS, from any worker"""
+
+    def __init__(self, job: ExportJob):
+        self.job = job
+        self.lock = threading.Lock()
+        self.saved = 0.0
+
+    def save(self, force: bool = False) -> None:
+        with self.lock:
+            if force or time.monotonic() - self.saved >= CHECKPOINT_SECONDS:
+                save_json(self.job.checkpoint_path, self.job.to_dict())
+                self.saved = time.monotonic()
+
+
+def _export_slice(client: SupabaseClient, job: ExportJob, piece: Slice,
+                  checkpointer: _Checkpointer, on_page: Optional[Callable[[int], None]],
+                  stop: Optional[threading.Event] = None) -> None:
+    path = job.part_path(piece)
+    with open(path, "ab") as part:
+        # Drop whatever was written after the last checkpoint
+        part.truncate(piece.bytes)
+        pages = keyset_pages(client, job.table, job.select, job.page_size, after=piece.after,
+                             filters={**job.filters, **piece.bounds()})
+        for page in pages:
+            part.write(_encode(encode_rows(page, job.format, job.columns), job.compress))
+            part.flush()
+            with checkpointer.lock:
+                piece.after = [page[-1][column] for column in KEYSET_COLUMNS]
+                piece.rows += len(page)
+                piece.bytes = part.tell()
+            if stop is not None and stop.is_set():
+                # Interrupted: keep the slice's progress for the next run
+                checkpointer.save(force=True)
+                return
+            checkpointer.save()
+            if on_page:
+                on_page(len(page))
+    with checkpointer.lock:
+        piece.done = True
+    checkpointer.save(force=True)
+
+
+def assemble(job: ExportJob) -> int:
+    """Concatenate the parts, in key order, into the output; returns its size"""
+    output = Path(job.output)
+    partial = output.with_name(output.name + ".partial")
+    with open(partial, "wb") as out:
+        if job.format == "csv":
+            header = io.StringIO()
+            csv.writer(header, lineterminator="\n").writerow(job.columns)
+            out.write(_encode(header.getvalue(), job.compress))
+        for piece in job.slices:
+            with open(job.part_path(piece), "rb") as part:
+                while True:
+                    block = part.read(1 << 20)
+                    if not block:
+                        break
+                    out.write(block)
+    partial.replace(output)
+    for piece in job.slices:
+        job.part_path(piece).unlink(missing_ok=True)
+    job.checkpoint_path.unlink(missing_ok=True)
+    return output.stat().st_size
+
+
+def run_export(client: SupabaseClient, job: ExportJob, workers: int = DEFAULT_WORKERS,
+               on_page: Optional[Callable[[int], None]] = None,
+               stop: Optional[threading.Event] = None) -> int:
+    """
+    Export every slice not yet done with up to `workers` in flight, then
+    assemble the output. If a slice fails the checkpoint is kept, so the
+    next run resumes, and the first error is raised. Setting `stop` (the
+    caller's Ctrl-C handler) makes every slice checkpoint and return after
+    its current page. Returns the output size.
+    """
+    checkpointer = _Checkpointer(job)
+    checkpointer.save(force=True)
+    pending = [piece for piece in job.slices if not piece.done]
+    client.resize_pool(max(client.pool_size, workers))
+    outcomes = run_concurrently(
+        lambda piece: _export_slice(client, job, piece, checkpointer, on_page, stop), pending, workers, stop
+    )
+    checkpointer.save(force=True)
+    if stop is not None and stop.is_set():
+        raise KeyboardInterrupt
+    failed = [outcome for outcome in outcomes if not outcome.ok]
+    if failed:
+        raise RuntimeError(
+            f"{len(failed)} of {len(pending)} slices failed ({failed[0].error}); "
+            "run the export again to resume"
+        )
+    return assemble(job)
@@ -0,0 +1,288 @@
+"""
+Offline provably-fair verification of spin outcomes
+
+The spin function stores, per spin, server_seed (the rngSeed), outcome_json
+(the authoritative outcome object) and outcome_hash, which is that object's
+JSON.stringify text. A row verifies when:
+
+- outcome_json.seed is the row's server_seed
+- replaying the seed through slot_engine reproduces the reels under one of
+  the three modes (standard, $111 Hook, Master - the weights differ, so at
+  most one matches) and the win, multiplier and feature trigger
+- outcome_hash is byte-for-byte JSON.stringify of the rebuilt object, or
+  its SHA-256 hex digest if the column holds a 64-character digest
+- outcome_json holds the same values as outcome_hash
+
+Rows stream from CSV/JSONL exports (optionally gzipped) or keyset-paged
+PostgREST reads and are verified in batches across a process pool with a
+bounded number of batches in flight, so memory stays constant.
+"""
+
+import csv
+import gzip
+import hashlib
+import io
+import json
+import math
+import re
+import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from supabase_tools.client import SupabaseClient
+from supabase_tools.paging import DEFAULT_PAGE_SIZE, keyset_pages
+from supabase_tools.slot_engine import generate_spin_outcome
+
+TABLE = "provably_fair_verification"
+SELECT_COLUMNS = "id,spin_id,game_id,server_seed,client_seed,nonce,outcome_hash,outcome_json,created_at"
+DEFAULT_BATCH_SIZE = 2000
+MODES = (("standard", False, False), ("111_hook", False, True), ("master", True, False))
+_SHA256_HEX = re.compile(r"^[0-9a-f]{64}$")
+
+
+def js_number(value) -> str:
+    """Number.prototype.toString for a finite double, as JSON.stringify prints it"""
+    if isinstance(value, int):
+        return str(value)
+    if not math.isfinite(value):
+        return "null"
+    if value == 0:
+        return "0"
+
+    sign = "-" if value < 0 else ""
+    mantissa, _, exponent = repr(abs(value)).partition("e")
+    whole, _, fraction = mantissa.partition(".")
+    digits = whole + fraction
+    point = len(whole) + (int(exponent) if exponent else 0)
+    stripped = digits.lstrip("0")
+    point -= len(digits) - len(stripped)
+    digits = stripped.rstrip("0")
+
+    k, n = len(digits), point
+    if k <= n <= 21:
+        text = digits + "0" * (n - k)
+    elif 0 < n <= 21:
+        text = f"{digits[:n]}.{digits[n:]}"
+    elif -6 < n <= 0:
+        text = "0." + "0" * -n + digits
+    else:
+        e = n - 1
+        mantissa = digits if k == 1 else f"{digits[0]}.{digits[1:]}"
+        text = f"{mantissa}e{'+' if e >= 0 else '-'}{abs(e)}"
+    return sign + text
+
+
+def js_stringify(value) -> str:
+    """JSON.stringify(value) with no indentation"""
+    if value is None:
+        return "null"
+    if value is True:
+        return "true"
+    if value is False:
+        return "false"
+    if isinstance(value, (int, float)):
+        return js_number(value)
+    if isinstance(value, str):
+        return json.dumps(value, ensure_ascii=False)
+    if isinstance(value, dict):
+        return "{" + ",".join(
+            f"{json.dumps(key, ensure_ascii=False)}:{js_stringify(item)}" for key, item in value.items()
+        ) + "}"
+    return "[" + ",".join(js_stringify(item) for item in value) + "]"
+
+
+def rebuild_outcome_json(recorded: dict, outcome) -> dict:
+    """
+    The spin function's outcomeJson for a recomputed outcome, in its key
+    order; spinId and timestamp come from the recorded object.
+    """
+    win = outcome.win_amount
+    return {
+        "spinId": recorded.get("spinId"),
+        "seed": recorded.get("seed"),
+        "reels": outcome.reels,
+        "winBreakdown": {
+            "paylineWins": [{
+                "lineNumber": 1,
+                "symbols": [reel[1] for reel in outcome.reels],
+                "matchCount": 5,
+                "winAmount": win,
+                "multiplier": outcome.multiplier,
+            }] if outcome.win_lines and outcome.win_lines[0] == 1 else [],
+            "scatterWins": [{
+                "scatterCount": sum(symbol == "scatter" for reel in outcome.reels for symbol in reel),
+                "winAmount": win * 0.5,
+                "triggersFeature": outcome.feature_trigger is not None,
+            }] if 0 in outcome.win_lines else [],
+            "baseWin": win,
+            "featureWin": 0,
+            "totalWin": win,
+        },
+        "featureTrigger": outcome.feature_trigger,
+        "totalWin": win,
+        "multiplier": outcome.multiplier,
+        "timestamp": recorded.get("timestamp"),
+        "gameId": recorded.get("gameId"),
+        "wager": recorded.get("wager"),
+    }
+
+
+def _as_object(value):
+    return json.loads(value) if isinstance(value, str) else value
+
+
+def verify_row(row: dict) -> dict:
+    """{id, spin_id, mode, reasons}; the row verifies when `reasons` is empty"""
+    reasons: List[str] = []
+    mode = None
+    try:
+        recorded = _as_object(row.get("outcome_json"))
+        hashed = row.get("outcome_hash") or ""
+        game_id = row.get("game_id") or recorded.get("gameId")
+        seed = row.get("server_seed")
+        wager = recorded["wager"]
+    except (ValueError, TypeError, KeyError, AttributeError) as e:
+        return {"id": row.get("id"), "spin_id": row.get("spin_id"),
+                "reasons": [f"malformed: {e}"], "mode": None}
+
+    if recorded.get("seed") != seed:
+        reasons.append("seed: outcome_json.seed differs from server_seed")
+
+    expected = None
+    for name, is_master, is_111_hook in MODES:
+        outcome = generate_spin_outcome(game_id, wager, seed, is_master, is_111_hook)
+        if outcome.reels == recorded.get("reels"):
+            mode, expected = name, outcome
+            break
+
+    if expected is None:
+        reasons.append("reels: seed does not reproduce the recorded reels in any mode")
+    else:
+        if (expected.win_amount != recorded.get("totalWin")
+                or expected.multiplier != recorded.get("multiplier")
+                or expected.feature_trigger != recorded.get("featureTrigger")):
+            reasons.append(f"win: recorded win differs from the recomputed {mode} outcome")
+        text = js_stringify(rebuild_outcome_json(recorded, expected))
+        if _SHA256_HEX.match(hashed):
+            matches = hashlib.sha256(text.encode()).hexdigest() == hashed
+        else:
+            matches = text == hashed
+        if not matches:
+            reasons.append("hash: outcome_hash is not the rebuilt outcome")
+
+    if not _SHA256_HEX.match(hashed):
+        try:
+            if json.loads(hashed) != recorded:
+                reasons.append("json: outcome_json differs from outcome_hash")
+        except ValueError:
+            reasons.append("json: outcome_hash is not valid JSON")
+
+    return {"id": row.get("id"), "spin_id": row.get("spin_id"), "reasons": reasons, "mode": mode}
+
+
+@dataclass
+class VerifyReport:
+    checked: int = 0
+    mismatched: int = 0
+    by_reason: Dict[str, int] = field(default_factory=dict)
+    by_mode: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return self.mismatched == 0
+
+
+def verify_batch(rows: List[dict]) -> tuple:
+    """Worker entry point: (rows checked, mode counts, mismatches)"""
+    modes: Dict[str, int] = {}
+    mismatches = []
+    for row in rows:
+        result = verify_row(row)
+        if result["reasons"]:
+            mismatches.append(result)
+        else:
+            modes[result["mode"]] = modes.get(result["mode"], 0) + 1
+    return len(rows), modes, mismatches
+
+
+def _batches(rows: Iterable[dict], size: int) -> Iterator[List[dict]]:
+    batch: List[dict] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def verify_rows(rows: Iterable[dict], workers: int = 1, batch_size: int = DEFAULT_BATCH_SIZE,
+                on_mismatch=None, progress=None) -> VerifyReport:
+    """
+    Verify a row stream; `on_mismatch(dict)` receives each failure as it is
+    found and `progress(report)` is called after every batch.
+    """
+    report = VerifyReport()
+
+    def absorb(result) -> None:
+        checked, modes, mismatches = result
+        report.checked += checked
+        report.mismatched += len(mismatches)
+        for mode, count in modes.items():
+            report.by_mode[mode] = report.by_mode.get(mode, 0) + count
+        for mismatch in mismatches:
+            for reason in mismatch["reasons"]:
+                key = reason.split(":", 1)[0]
+                report.by_reason[key] = report.by_reason.get(key, 0) + 1
+            if on_mismatch:
+                on_mismatch(mismatch)
+        if progress:
+            progress(report)
+
+    if workers <= 1:
+        for batch in _batches(rows, batch_size):
+            absorb(verify_batch(batch))
+        return report
+
+    max_in_flight = workers * 2
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        for batch in _batches(rows, batch_size):
+            pending.add(pool.submit(verify_batch, batch))
+            if len(pending) >= max_in_flight:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    absorb(future.result())
+        for future in pending:
+            absorb(future.result())
+    return report
+
+
+def _open_text(path: Path) -> io.TextIOBase:
+    if path.suffix == ".gz":
+        return io.TextIOWrapper(gzip.open(path, "rb"), encoding="utf-8", newline="")
+    return open(path, encoding="utf-8", newline="")
+
+
+def iter_csv(path: Path) -> Iterator[dict]:
+    """Rows of a CSV export (header row with the table's column names)"""
+    csv.field_size_limit(sys.maxsize)
+    with _open_text(path) as handle:
+        yield from csv.DictReader(handle)
+
+
+def iter_jsonl(path: Path) -> Iterator[dict]:
+    """Rows of a JSON Lines export"""
+    with _open_text(path) as handle:
+        for line in handle:
+            if line.strip():
+                yield json.loads(line)
+
+
+def iter_rest(client: SupabaseClient, page_size: int = DEFAULT_PAGE_SIZE,
+              filters: Optional[Dict[str, str]] = None) -> Iterator[dict]:
+    """Rows read live, keyset-paged on (created_at, id)"""
+    for page in keyset_pages(client, TABLE, SELECT_COLUMNS, page_size, filters=filters):
+        yield from page
@@ -0,0 +1,663 @@
+"""
+Workload-driven index advice
+
+The schema linter judges indexes by their definitions; this module judges
+them by the queries that actually run. A workload is a list of queries with
+call counts, taken from one of:
+
+- EDGE_WORKLOAD: the PostgREST reads and writes the edge functions and the
+  lobby make, plus the hot SQL inside the spin RPCs, in rough proportions
+  per 1,000 spins
+- a captured log: access-log lines containing `GET /rest/v1/<table>?<query>`
+  (one call per line), or JSON lines {"query": sql, "calls": n, "params": [...]}
+  such as an export of pg_stat_statements
+- pg_stat_statements read from a staging database
+
+The reads are planned with EXPLAIN in a scratch database built and seeded
+like the query-plan check. From each read's filter and sort columns the
+advisor proposes composite indexes (and covering ones for narrow select
+lists), creates each candidate inside a transaction, re-plans the workload
+and rolls back. The drop in planner cost times the call count is the
+candidate's benefit. Existing indexes that no plan uses are ranked by the
+writes they cost: the workload's inserts and updates of their table, or
+with a staging database, pg_stat_user_indexes and pg_stat_user_tables.
+
+Planner costs are estimates in the planner's own units, comparable with one
+another but not milliseconds, so the advice is a candidate migration to
+review, not one to apply blindly.
+"""
+
+import json
+import re
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+from urllib.parse import parse_qsl, urlsplit
+
+from supabase_tools.db import connect
+from supabase_tools.query_plans import DEFAULT_PARAMS, HOT_QUERIES, player_id
+from supabase_tools.rest_shim import ShimError, build_order, build_select, build_where, quote_ident
+from supabase_tools.sql import strip_comments
+
+# A candidate must cut the cost of the queries it serves by this share
+MIN_GAIN = 0.10
+# Covering candidates INCLUDE at most this many extra columns
+MAX_INCLUDE = 4
+DEFAULT_STATEMENTS = 100
+CANDIDATE_NAME = "index_advisor_candidate"
+
+# (name, method, PostgREST path, calls per 1,000 spins)
+EDGE_WORKLOAD = [
+    ("spin: balance", "GET", "users?select=total_balance_aud&id=eq.{user_id}", 1000),
+    ("spin: master check", "GET",
+     "admin_users?select=is_master&user_id=eq.{user_id}&is_master=eq.true", 1000),
+    ("spin: log spin", "POST", "game_spins", 1000),
+    ("spin: update balance", "PATCH", "users?id=eq.{user_id}", 1000),
+    ("spin: provably fair record", "POST", "provably_fair_verification", 1000),
+    ("spin-outcome: rtp config", "GET", "game_rtp_config?select=current_rtp&game_id=eq.{game_id}", 100),
+    ("game-launch: provider", "GET", "game_providers?select=*&code=eq.{provider_code}&status=eq.active", 20),
+    ("game-launch: provider config", "GET",
+     "game_provider_configs?select=*&provider_id=eq.{provider_id}&status=eq.active", 20),
+    ("game-launch: balance", "GET", "users?select=total_balance_aud&id=eq.{user_id}", 20),
+    ("game-launch: open session", "POST", "game_sessions", 20),
+    ("game-webhook: session totals", "PATCH", "game_sessions?id=eq.{session_id}", 400),
+    ("game-webhook: transaction log", "POST", "game_transactions", 400),
+    ("gaming-advisor: recent sessions", "GET",
+     "game_sessions?select=*&user_id=eq.{user_id}&order=start_time.desc&limit=50", 5),
+    ("weekly-digest: active players", "GET",
+     "game_sessions?select=user_id&start_time=gte.{since}&order=user_id", 0.01),
+    ("weekly-digest: player sessions", "GET",
+     "game_sessions?select=*&user_id=eq.{user_id}&start_time=gte.{since}&order=start_time.desc", 2),
+    ("lobby: catalogue", "GET",
+     "licensed_games?select=id,game_code,name,category,rtp_certified,volatility,status,thumbnail_url,"
+     "min_bet_aud,max_bet_aud,is_demo_available,provider_id"
+     "&status=in.(active,demo_only)&category=eq.{category}&order=name.asc", 50),
+    ("lobby: categories", "GET", "licensed_games?select=category&status=neq.disabled", 50),
+    ("claim-bonus: existing bonus", "GET",
+     "user_bonuses?select=*&user_id=eq.{user_id}&bonus_type=eq.sign_up&status=in.(active,claimed)", 1),
+    ("process-onboarding: completed", "GET",
+     "onboarding_queue?select=user_id&status=eq.completed&processed_at=is.null&limit=50", 1),
+]
+# SQL that runs inside the spin RPCs, by HOT_QUERIES name: calls per 1,000 spins
+RPC_WORKLOAD = {
+    "rate_limit_counters_window": 1000,
+    "wager_balance_lock": 1000,
+}
+
+_ACCESS_LINE = re.compile(r"\b(GET|HEAD|POST|PATCH|PUT|DELETE)\s+(\S*/rest/v1/[^\s\"]+)")
+_REST_PATH = re.compile(r"/rest/v1/([A-Za-z_]\w*)$")
+_COLUMN = r'(?:[A-Za-z_]\w*\.)?"?([A-Za-z_]\w*)"?'
+_TABLE = r'(?:"?public"?\.)?"?([A-Za-z_]\w*)"?'
+_CLAUSE_END = r"\b(?:GROUP\s+BY|ORDER\s+BY|LIMIT|OFFSET|FOR\s+(?:UPDATE|SHARE|NO\s+KEY|KEY)|RETURNING)\b"
+
+
+@dataclass
+class QueryShape:
+    """The columns a single-table query filters and sorts on"""
+    table: str
+    equality: List[str] = field(default_factory=list)
+    ranges: List[str] = field(default_factory=list)
+    order: List[Tuple[str, bool]] = field(default_factory=list)   # (column, descending)
+    select: Optional[List[str]] = None     # columns read; None for * or expressions
+
+
+@dataclass
+class WorkloadQuery:
+    name: str
+    table: str
+    calls: float = 1.0
+    sql: Optional[str] = None              # None for inserts: nothing to plan
+    params: Union[list, dict, None] = None
+    write: bool = False
+    shape: Optional[QueryShape] = None
+
+    @property
+    def generic(self) -> bool:
+        """pg_stat_statements text, with $1-style placeholders and no values"""
+        return self.params is None and bool(self.sql and re.search(r"\$\d", self.sql))
+
+
+@dataclass
+class Candidate:
+    table: str
+    keys: Tuple[Tuple[str, bool], ...]
+    include: Tuple[str, ...] = ()
+    costs: Dict[str, float] = field(default_factory=dict)   # query name -> cost with the index
+    benefit: float = 0.0
+    size: int = 0
+    writes: float = 0.0                    # writes to the table per workload period
+
+    @property
+    def name(self) -> str:
+        name = f"idx_{self.table}_{'_'.join(column for column, _ in self.keys)}"
+        return (name + ("_covering" if self.include else ""))[:63]
+
+    def sql(self, name: Optional[str] = None) -> str:
+        keys = ", ".join(column + (" DESC" if descending else "") for column, descending in self.keys)
+        text = f"CREATE INDEX IF NOT EXISTS {name or self.name} ON public.{self.table} ({keys})"
+        return text + (f" INCLUDE ({', '.join(self.include)})" if self.include else "")
+
+    @property
+    def signature(self) -> Tuple:
+        return self.table, self.keys, self.include
+
+
+@dataclass
+class IndexUsage:
+    index: str
+    table: str
+    size: int
+    writes: float                          # writes to the table (period depends on the source)
+    scans: Optional[int] = None            # idx_scan from staging stats; None when replayed
+    unique: bool = False
+
+
+@dataclass
+class Advice:
+    baseline: Dict[str, float]             # query name -> planner cost
+    candidates: List[Candidate]            # recommended, best first
+    unused: List[IndexUsage]               # most expensive to keep first
+    skipped: List[Tuple[str, str]]         # (query or candidate, reason)
+    empty_tables: List[str]                # read by the workload but with no rows to plan over
+
+
+def _first_line(error: Exception) -> str:
+    text = str(error).strip().splitlines()
+    return text[0] if text else type(error).__name__
+
+
+def _split(text: str, word: str) -> List[str]:
+    """Split on a keyword or comma outside parentheses and quotes"""
+    parts, depth, quote, start = [], 0, None, 0
+    pattern = re.compile(rf"\s+{word}\s+", re.I) if word != "," else None
+    i = 0
+    while i < len(text):
+        c = text[i]
+        if quote:
+            if c == quote:
+                quote = None
+        elif c in "'\"":
+            quote = c
+        elif c == "(":
+            depth += 1
+        elif c == ")":
+            depth -= 1
+        elif depth == 0:
+            if pattern is None and c == ",":
+                parts.append(text[start:i])
+                start = i + 1
+            elif pattern is not None:
+                match = pattern.match(text, i)
+                if match:
+                    parts.append(text[start:i])
+                    start = i = match.end()
+                    continue
+        i += 1
+    parts.append(text[start:])
+    return [part.strip() for part in parts if part.strip()]
+
+
+def sql_shape(sql: str) -> Optional[QueryShape]:
+    """
+    Filter and sort columns of a single-table SELECT, UPDATE or DELETE.
+    Joins, subqueries and OR filters give None: no candidate is guessed.
+    """
+    text = re.sub(r"\s+", " ", strip_comments(sql)).strip().rstrip(";")
+    if re.search(r"\bJOIN\b|\(\s*SELECT\b|\bUNION\b", text, re.I):
+        return None
+    columns_text = None
+    if re.match(r"^SELECT ", text, re.I):
+        start = _top_level(text, re.compile(r" FROM ", re.I))
+        if start is None:
+            return None
+        columns_text = text[len("SELECT "):start]
+        match = re.match(rf"^{_TABLE}(?: (?:AS )?(?!WHERE\b)\w+)?(?P<rest>.*)$", text[start + 6:], re.I)
+    else:
+        match = re.match(rf"^(?:UPDATE(?: ONLY)?|DELETE FROM(?: ONLY)?) {_TABLE}(?P<rest>.*)$", text, re.I)
+    if not match or re.match(r"^\s*,", match.group("rest")):
+        return None
+    shape = QueryShape(match.group(1))
+
+    if columns_text is not None:
+        columns = []
+        for item in _split(columns_text, ","):
+            column = re.fullmatch(rf"{_COLUMN}(?: (?:AS )?\"?\w+\"?)?", item, re.I)
+            if re.fullmatch(r"count\(\s*\*?\s*\)(?: (?:AS )?\w+)?", item, re.I):
+                continue
+            if not column or item == "*" or item.endswith(".*"):
+                columns = None
+                break
+            columns.append(column.group(1).lower())
+        shape.select = columns
+
+    rest = match.group("rest")
+    where = re.search(rf"\bWHERE (?P<where>.+?)(?= {_CLAUSE_END}|$)", rest, re.I)
+    if where:
+        condition_text = re.sub(r"\bBETWEEN (.+?) AND ", r"BETWEEN \1 __AND__ ", where.group("where"), flags=re.I)
+        if _split(condition_text, "OR") != [condition_text.strip()]:
+            return None
+        for condition in _split(condition_text, "AND"):
+            condition = _strip_parens(condition)
+            column = re.match(rf"^{_COLUMN}\s*(?P<op>=\s*ANY\b|=|IN\b|IS\b|<>|!=|<=|>=|<|>|BETWEEN\b)",
+                              condition, re.I)
+            if not column or column.group("op") in ("<>", "!="):
+                continue
+            op = column.group("op").upper()
+            name = column.group(1).lower()
+            target = shape.equality if op.startswith("=") or op in ("IN", "IS") else shape.ranges
+            if name not in target:
+                target.append(name)
+    order = re.search(r"\bORDER BY (?P<order>.+?)(?= (?:LIMIT|OFFSET|FOR)\b|$)", rest, re.I)
+    if order:
+        for item in _split(order.group("order"), ","):
+            term = re.fullmatch(rf"{_COLUMN}(?: (ASC|DESC))?(?: NULLS (?:FIRST|LAST))?", item, re.I)
+            if not term:
+                break
+            shape.order.append((term.group(1).lower(), (term.group(2) or "").upper() == "DESC"))
+    return shape
+
+
+def _top_level(text: str, pattern) -> Optional[int]:
+    """Position of the first match of `pattern` outside parentheses and quotes"""
+    depth, quote = 0, None
+    for i, c in enumerate(text):
+        if quote:
+            if c == quote:
+                quote = None
+        elif c in "'\"":
+            quote = c
+        elif c == "(":
+            depth += 1
+        elif c == ")":
+            depth -= 1
+        elif depth == 0 and pattern.match(text, i):
+            return i
+    return None
+
+
+def _strip_parens(text: str) -> str:
+    while text.startswith("(") and text.endswith(")") and _split(text[1:-1], ",") == [text[1:-1].strip()]:
+        text = text[1:-1].strip()
+    return text
+
+
+def _strip_embeds(select: Optional[str]) -> Optional[str]:
+    """Drop embedded resources (provider:game_providers(...)), planned as their own lookups"""
+    if not select:
+        return select
+    items = [item for item in _split(select, ",") if "(" not in item or re.fullmatch(r"count\(\)", item)]
+    return ",".join(items) or "*"
+
+
+def rest_query(method: str, path: str, calls: float = 1.0, name: Optional[str] = None) -> Optional[WorkloadQuery]:
+    """
+    The SQL PostgREST runs for a request to /rest/v1/<table>, built with the
+    local shim's translation. RPC calls give None. Updates and deletes are
+    planned as DELETE, which finds its rows exactly as the UPDATE would;
+    EXPLAIN without ANALYZE never runs it.
+    """
+    parts = urlsplit(path if "/rest/v1/" in path else f"/rest/v1/{path}")
+    match = _REST_PATH.search(parts.path)
+    if not match:
+        return None
+    table = match.group(1)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    options = dict(query)
+    name = name or f"{method} {table}" + ("?" + "&".join(
+        f"{key}={value.split('.')[0]}" for key, value in query if key not in ("select", "limit", "offset")
+    ) if query else "")
+    method = method.upper()
+    if method in ("POST", "PUT"):
+        return WorkloadQuery(name, table, calls, write=True)
+
+    params: list = []
+    where = build_where(query, params)
+    target = f"public.{quote_ident(table)} AS _t"
+    if method in ("PATCH", "DELETE"):
+        sql = f"DELETE FROM {target}{where}"
+    else:
+        sql = f"SELECT {build_select(_strip_embeds(options.get('select')))} FROM {target}{where}"
+        sql += build_order(options.get("order"))
+        if options.get("limit", "").isdigit():
+            sql += f" LIMIT {int(options['limit'])}"
+    return WorkloadQuery(name, table, calls, sql, params, method in ("PATCH", "DELETE"), sql_shape(sql))
+
+
+def sql_query(sql: str, calls: float = 1.0, params: Union[list, dict, None] = None,
+              name: Optional[str] = None) -> Optional[WorkloadQuery]:
+    """A workload entry for a SQL statement; None for anything but DML"""
+    text = re.sub(r"\s+", " ", strip_comments(sql)).strip()
+    name = name or (text[:60] + ("…" if len(text) > 60 else ""))
+    insert = re.match(rf"^INSERT INTO {_TABLE}", text, re.I)
+    if insert:
+        return WorkloadQuery(name, insert.group(1), calls, write=True)
+    if not re.match(r"^(SELECT|UPDATE|DELETE)\b", text, re.I):
+        return None
+    shape = sql_shape(text)
+    table = shape.table if shape else ""
+    if not table:
+        found = re.search(rf"\b(?:FROM|UPDATE) {_TABLE}", text, re.I)
+        table = found.group(1) if found else ""
+    return WorkloadQuery(name, table, calls, sql, params, not text.upper().startswith("SELECT"), shape)
+
+
+def edge_workload(scale: float = 1.0) -> List[WorkloadQuery]:
+    """EDGE_WORKLOAD and RPC_WORKLOAD with the query-plan check's seeded values"""
+    values = {
+        "user_id": DEFAULT_PARAMS["user_id"],
+        "category": DEFAULT_PARAMS["category"],
+        "since": (datetime.now(timezone.utc) - timedelta(days=7)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "game_id": "game-1",
+        "session_id": player_id(0),
+        "provider_id": player_id(0),
+        "provider_code": "softgamings",
+    }
+    workload = [rest_query(method, path.format(**values), calls * scale, name)
+                for name, method, path, calls in EDGE_WORKLOAD]
+    hot = {query.name: query for query in HOT_QUERIES}
+    for query_name, calls in RPC_WORKLOAD.items():
+        entry = sql_query(hot[query_name].sql, calls * scale, dict(DEFAULT_PARAMS), f"rpc: {query_name}")
+        workload.append(entry)
+    return workload
+
+
+def load_log(path: Path) -> List[WorkloadQuery]:
+    """
+    Workload from a captured log. Access-log requests are grouped by table,
+    filter columns and operators; the first one's values are the ones planned.
+    """
+    workload: List[WorkloadQuery] = []
+    requests: Dict[str, WorkloadQuery] = {}
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith("{"):
+                entry = json.loads(line)
+                sql = entry.get("query") or entry.get("sql")
+                query = sql_query(sql, float(entry.get("calls", 1)), entry.get("params"), entry.get("name")) \
+                    if sql else None
+                if query:
+                    workload.append(query)
+                continue
+            match = _ACCESS_LINE.search(line)
+            if not match:
+                continue
+            method = "GET" if match.group(1) == "HEAD" else match.group(1)
+            try:
+                query = rest_query(method, match.group(2))
+            except ShimError:
+                continue
+            if query is None:
+                continue
+            if query.name in requests:
+                requests[query.name].calls += 1
+            else:
+                requests[query.name] = query
+                workload.append(query)
+    return workload
+
+
+def read_pg_stat_statements(dsn: str, limit: int = DEFAULT_STATEMENTS) -> List[WorkloadQuery]:
+    """The `limit` statements with the most total execution time in the current database"""
+    conn = connect(dsn, autocommit=True)
+    try:
+        with conn.cursor() as cur:
+            try:
+                cur.execute(
+                    """SELECT s.query, s.calls
+                       FROM pg_stat_statements s
+                       JOIN pg_database d ON d.oid = s.dbid
+                       WHERE d.datname = current_database()
+                         AND s.query ~* '^\\s*(select|insert|update|delete)\\M'
+                       ORDER BY s.total_exec_time DESC
+                       LIMIT %s""",
+                    (limit,)
+                )
+            except Exception as e:
+                raise RuntimeError(f"pg_stat_statements is not readable: {_first_line(e)}") from None
+            rows = cur.fetchall()
+    finally:
+        conn.close()
+    return [query for query in (sql_query(sql, calls) for sql, calls in rows) if query]
+
+
+def staging_index_usage(dsn: str) -> List[IndexUsage]:
+    """
+    Every public index with its scans and its table's writes since the
+    statistics were reset; partitions are summed into their parent.
+    """
+    conn = connect(dsn, autocommit=True)
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                """WITH tables AS (
+                       SELECT coalesce(p.inhparent, t.relid) AS relid,
+                              sum(t.n_tup_ins + t.n_tup_upd - t.n_tup_hot_upd + t.n_tup_del) AS writes
+                       FROM pg_stat_user_tables t
+                       LEFT JOIN pg_inherits p ON p.inhrelid = t.relid
+                       GROUP BY 1
+                   )
+                   SELECT ic.relname, tc.relname, sum(pg_relation_size(s.indexrelid)),
+                          coalesce(max(tables.writes), 0), sum(s.idx_scan), bool_or(i.indisunique)
+                   FROM pg_stat_user_indexes s
+                   JOIN pg_index i ON i.indexrelid = s.indexrelid
+                   LEFT JOIN pg_inherits pi ON pi.inhrelid = s.indexrelid
+                   LEFT JOIN pg_inherits pt ON pt.inhrelid = s.relid
+                   JOIN pg_class ic ON ic.oid = coalesce(pi.inhparent, s.indexrelid)
+                   JOIN pg_class tc ON tc.oid = coalesce(pt.inhparent, s.relid)
+                   LEFT JOIN tables ON tables.relid = tc.oid
+                   WHERE s.schemaname = 'public'
+                   GROUP BY 1, 2"""
+            )
+            return [IndexUsage(index, table, int(size), float(writes), int(scans), unique)
+                    for index, table, size, writes, scans, unique in cur.fetchall()]
+    finally:
+        conn.close()
+
+
+def unused_indexes(usage: Iterable[IndexUsage]) -> List[IndexUsage]:
+    """Never-scanned indexes that don't enforce uniqueness, costliest first"""
+    unused = [entry for entry in usage if not entry.unique and not entry.scans]
+    return sorted(unused, key=lambda entry: (entry.writes, entry.size), reverse=True)
+
+
+def candidates_for(shape: QueryShape) -> List[Candidate]:
+    """Equality columns first, then the sort or the first range column; optionally covering"""
+    equality = list(dict.fromkeys(shape.equality))
+    order = [(column, descending) for column, descending in shape.order if column not in equality]
+    # A btree reads backwards as well as forwards, so only mixed directions need DESC
+    if order and all(descending for _, descending in order):
+        order = [(column, False) for column, _ in order]
+    variants = []
+    if equality or order:
+        variants.append(tuple((column, False) for column in equality) + tuple(order))
+    ranges = [column for column in shape.ranges if column not in equality]
+    if ranges and (not order or order[0][0] != ranges[0]):
+        variants.append(tuple((column, False) for column in equality) + ((ranges[0], False),))
+
+    found = []
+    for keys in variants:
+        found.append(Candidate(shape.table, keys))
+        if shape.select is not None:
+            extra = tuple(column for column in dict.fromkeys(shape.select)
+                          if column not in {key for key, _ in keys})
+            if extra and len(extra) <= MAX_INCLUDE:
+                found.append(Candidate(shape.table, keys, extra))
+    return found
+
+
+def _walk(node: dict, indexes: List[str]) -> None:
+    if node.get("Index Name"):
+        indexes.append(node["Index Name"])
+    for child in node.get("Plans", []):
+        _walk(child, indexes)
+
+
+def _plan(cur, query: WorkloadQuery) -> Tuple[float, List[str]]:
+    options = "FORMAT JSON, GENERIC_PLAN" if query.generic else "FORMAT JSON"
+    if query.params is None:
+        cur.execute(f"EXPLAIN ({options}) {query.sql}")
+    else:
+        cur.execute(f"EXPLAIN ({options}) {query.sql}", query.params)
+    plan = cur.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    indexes: List[str] = []
+    _walk(plan[0]["Plan"], indexes)
+    return plan[0]["Plan"]["Total Cost"], indexes
+
+
+def _index_size(cur, name: str) -> int:
+    # pg_partition_tree() has no rows for an index that isn't partitioned
+    cur.execute(
+        """SELECT coalesce((SELECT sum(pg_relation_size(relid)) FROM pg_partition_tree(%(name)s::regclass)),
+                           pg_relation_size(%(name)s::regclass))""",
+        {"name": f"public.{name}"}
+    )
+    return int(cur.fetchone()[0])
+
+
+def workload_writes(workload: Iterable[WorkloadQuery]) -> Dict[str, float]:
+    writes: Dict[str, float] = {}
+    for query in workload:
+        if query.write:
+            writes[query.table] = writes.get(query.table, 0.0) + query.calls
+    return writes
+
+
+def advise(dsn: str, workload: List[WorkloadQuery], min_gain: float = MIN_GAIN) -> Advice:
+    """
+    Plan the workload, measure every candidate index in a rolled-back
+    transaction and pick, best first, those that still cut some query's
+    cost by `min_gain` after the better ones were taken.
+    """
+    conn = connect(dsn)
+    skipped: List[Tuple[str, str]] = []
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SHOW server_version_num")
+            generic_plans = int(cur.fetchone()[0]) >= 160000
+            cur.execute("ANALYZE")
+            conn.commit()
+            cur.execute(
+                """SELECT c.relname, p.relname FROM pg_inherits i
+                   JOIN pg_class c ON c.oid = i.inhrelid
+                   JOIN pg_class p ON p.oid = i.inhparent
+                   WHERE c.relkind = 'i'"""
+            )
+            parents = dict(cur.fetchall())
+
+            reads = [query for query in workload if query.sql]
+            baseline: Dict[str, float] = {}
+            used = set()
+            for query in reads:
+                if query.generic and not generic_plans:
+                    skipped.append((query.name, "placeholders need PostgreSQL 16 for EXPLAIN (GENERIC_PLAN)"))
+                    continue
+                try:
+                    cost, indexes = _plan(cur, query)
+                except Exception as e:
+                    skipped.append((query.name, _first_line(e)))
+                    continue
+                finally:
+                    conn.rollback()
+                baseline[query.name] = cost
+                used.update(parents.get(name, name) for name in indexes)
+            planned = [query for query in reads if query.name in baseline]
+            calls = {query.name: query.calls for query in planned}
+
+            cur.execute(
+                """SELECT c.relname, c.reltuples <= 0 AND NOT c.relhassubclass
+                   FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace
+                   WHERE n.nspname = 'public' AND c.relkind IN ('r', 'p')"""
+            )
+            empty = {table for table, is_empty in cur.fetchall() if is_empty}
+            conn.rollback()
+
+            # An updated table's pages are rarely all-visible, so a covering
+            # index there still visits the heap, and indexing an updated
+            # column would stop its HOT updates
+            updated = {query.table for query in workload if query.write and query.sql}
+            proposals: Dict[Tuple, Candidate] = {}
+            for query in planned:
+                for candidate in candidates_for(query.shape) if query.shape else []:
+                    if not (candidate.include and candidate.table in updated):
+                        proposals.setdefault(candidate.signature, candidate)
+
+            writes = workload_writes(workload)
+            for candidate in proposals.values():
+                try:
+                    cur.execute(candidate.sql(CANDIDATE_NAME))
+                    candidate.size = _index_size(cur, CANDIDATE_NAME)
+                    for query in planned:
+                        if query.table == candidate.table:
+                            candidate.costs[query.name] = _plan(cur, query)[0]
+                except Exception as e:
+                    skipped.append((candidate.sql(), _first_line(e)))
+                    candidate.costs = {}
+                finally:
+                    conn.rollback()
+                candidate.writes = writes.get(candidate.table, 0.0)
+                candidate.benefit = sum(calls[name] * max(0.0, baseline[name] - cost)
+                                        for name, cost in candidate.costs.items())
+
+            best = dict(baseline)
+            chosen = []
+            for candidate in sorted(proposals.values(), key=lambda c: (-c.benefit, len(c.keys) + len(c.include))):
+                gain = sum(calls[name] * max(0.0, best[name] - cost) for name, cost in candidate.costs.items())
+                served = sum(calls[name] * baseline[name] for name, cost in candidate.costs.items() if cost < best[name])
+                if gain <= 0 or gain < min_gain * served:
+                    continue
+                candidate.benefit = gain
+                chosen.append(candidate)
+                for name, cost in candidate.costs.items():
+                    best[name] = min(best[name], cost)
+
+            # An empty table is always scanned, so its indexes prove nothing
+            read_tables = {query.table for query in planned if not query.write} - empty
+            cur.execute(
+                """SELECT c.relname, t.relname, i.indisunique
+                   FROM pg_index i
+                   JOIN pg_class c ON c.oid = i.indexrelid
+                   JOIN pg_class t ON t.oid = i.indrelid
+                   JOIN pg_namespace n ON n.oid = t.relnamespace
+                   WHERE n.nspname = 'public' AND NOT c.relispartition"""
+            )
+            usage = [IndexUsage(index, table, _index_size(cur, index), writes.get(table, 0.0),
+                                1 if index in used else 0, unique)
+                     for index, table, unique in cur.fetchall() if table in read_tables]
+            conn.rollback()
+    finally:
+        conn.close()
+
+    return Advice(
+        baseline=baseline,
+        candidates=chosen,
+        unused=unused_indexes(usage),
+        skipped=skipped,
+        empty_tables=sorted({query.table for query in planned if query.table in empty}),
+    )
+
+
+def migration_sql(advice: Advice, workload_source: str) -> str:
+    """A candidate migration: the recommended indexes, and the unused ones' drops commented out"""
+    lines = [
+        f"-- Index advice for {workload_source}",
+        f"-- Generated {datetime.now(timezone.utc):%Y-%m-%d %H:%M} UTC by advise-indexes.py.",
+        "-- Benefits are planner cost estimates; review before applying.",
+        "",
+    ]
+    for candidate in advice.candidates:
+        helped = [name for name, cost in candidate.costs.items() if cost < advice.baseline[name]]
+        lines.append(f"-- saves ~{candidate.benefit:,.0f} cost units: {', '.join(helped)}")
+        lines.append(candidate.sql() + ";")
+        lines.append("")
+    if advice.unused:
+        lines.append("-- Not used by this workload. Confirm on production statistics, then uncomment.")
+        for entry in advice.unused:
+            lines.append(f"-- DROP INDEX IF EXISTS public.{entry.index};")
+        lines.append("")
+    if not advice.candidates and not advice.unused:
+        lines.append("-- Nothing to change.")
+    return "\n".join(lines)
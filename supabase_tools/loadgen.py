@@ -0,0 +1,373 @@
+"""
+Open-loop load generation for the spin edge functions
+
+Requests are scheduled at a target rate (Poisson arrivals) whether or not
+earlier ones have answered, so a slow server shows up as latency and a
+growing backlog instead of silently lowering the offered load. Latency is
+measured from each request's scheduled send time, which keeps queueing
+inside the client from being hidden (coordinated omission).
+
+Traffic is drawn from a pool of synthetic players - JWTs minted with the
+project's JWT secret, or a file of real staging tokens - spread across the
+catalogue's game ids and a range of wagers. A run is a list of stages at
+increasing rates; the first stage that misses its rate, errors or blows its
+p99 budget is where check_rate_limit and process_wager_transaction saturate.
+
+aiohttp is optional and only needed to run load.
+"""
+
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import math
+import random
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from supabase_tools.certification import catalogue_games
+
+ENDPOINTS = ("spin", "spin-outcome")
+WAGERS = (0.2, 0.5, 1.0, 2.0, 5.0, 10.0)
+DEFAULT_MIX = {"spin": 1.0}
+DEFAULT_TIMEOUT = 30.0
+DEFAULT_MAX_IN_FLIGHT = 1000
+# Log-spaced histogram buckets: 2% wide, from 0.1 ms up
+HISTOGRAM_BASE = 1.02
+HISTOGRAM_FLOOR = 1e-4
+USER_NAMESPACE = uuid.UUID("6f1c1f0e-8f5b-4a55-9a4e-5c0d1e2a7b31")
+
+
+def _aiohttp():
+    try:
+        import aiohttp
+    except ImportError:
+        raise RuntimeError("Load generation needs aiohttp: pip install aiohttp") from None
+    return aiohttp
+
+
+class LatencyHistogram:
+    """Fixed-precision latency histogram; percentiles are within one 2% bucket"""
+
+    def __init__(self):
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float) -> None:
+        index = 0 if seconds <= HISTOGRAM_FLOOR else \
+            int(math.log(seconds / HISTOGRAM_FLOOR, HISTOGRAM_BASE)) + 1
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, q: float) -> float:
+        """Upper edge of the bucket holding the q-th percentile, in seconds"""
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(q / 100 * self.count))
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen >= rank:
+                return min(HISTOGRAM_FLOOR * HISTOGRAM_BASE ** index, self.max)
+        return self.max
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def to_dict(self) -> dict:
+        ms = lambda seconds: round(1000 * seconds, 2)
+        return {
+            "count": self.count,
+            "mean_ms": ms(self.mean),
+            "p50_ms": ms(self.percentile(50)),
+            "p95_ms": ms(self.percentile(95)),
+            "p99_ms": ms(self.percentile(99)),
+            "max_ms": ms(self.max),
+        }
+
+
+@dataclass
+class EndpointStats:
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    statuses: Dict[int, int] = field(default_factory=dict)
+    errors: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def requests(self) -> int:
+        return sum(self.statuses.values()) + sum(self.errors.values())
+
+    @property
+    def succeeded(self) -> int:
+        return sum(count for status, count in self.statuses.items() if 200 <= status < 300)
+
+    @property
+    def rate_limited(self) -> int:
+        return self.statuses.get(429, 0)
+
+    @property
+    def failed(self) -> int:
+        """Transport errors and 5xx; 4xx answers are the server working as designed"""
+        return sum(self.errors.values()) + sum(
+            count for status, count in self.statuses.items() if status >= 500
+        )
+
+    def merge(self, other: "EndpointStats") -> None:
+        self.latency.merge(other.latency)
+        for status, count in other.statuses.items():
+            self.statuses[status] = self.statuses.get(status, 0) + count
+        for error, count in other.errors.items():
+            self.errors[error] = self.errors.get(error, 0) + count
+
+    def to_dict(self) -> dict:
+        requests = self.requests
+        return {
+            "requests": requests,
+            "succeeded": self.succeeded,
+            "rate_limited": self.rate_limited,
+            "failed": self.failed,
+            "rate_limited_rate": self.rate_limited / requests if requests else 0.0,
+            "error_rate": self.failed / requests if requests else 0.0,
+            "statuses": {str(status): count for status, count in sorted(self.statuses.items())},
+            "errors": self.errors,
+            "latency": self.latency.to_dict(),
+        }
+
+
+@dataclass
+class StageResult:
+    target_rps: float
+    duration: float
+    scheduled: int = 0
+    dropped: int = 0  # not sent because max_in_flight requests were outstanding
+    wall_seconds: float = 0.0
+    endpoints: Dict[str, EndpointStats] = field(default_factory=dict)
+
+    @property
+    def overall(self) -> EndpointStats:
+        total = EndpointStats()
+        for stats in self.endpoints.values():
+            total.merge(stats)
+        return total
+
+    @property
+    def achieved_rps(self) -> float:
+        return self.overall.requests / self.wall_seconds if self.wall_seconds else 0.0
+
+    def to_dict(self) -> dict:
+        overall = self.overall
+        return {
+            "target_rps": self.target_rps,
+            "duration_seconds": self.duration,
+            "wall_seconds": round(self.wall_seconds, 3),
+            "scheduled": self.scheduled,
+            "dropped": self.dropped,
+            "achieved_rps": round(self.achieved_rps, 2),
+            "succeeded_rps": round(overall.succeeded / self.wall_seconds, 2) if self.wall_seconds else 0.0,
+            "overall": overall.to_dict(),
+            "endpoints": {name: stats.to_dict() for name, stats in self.endpoints.items()},
+        }
+
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def mint_token(secret: str, user_id: str, ttl: int = 3600) -> str:
+    """HS256 access token for `user_id`, as GoTrue would issue it"""
+    now = int(time.time())
+    header = {"alg": "HS256", "typ": "JWT"}
+    claims = {"sub": user_id, "role": "authenticated", "aud": "authenticated",
+              "iat": now, "exp": now + ttl}
+    signing_input = f"{_b64(json.dumps(header).encode())}.{_b64(json.dumps(claims).encode())}"
+    signature = hmac.new(secret.encode(), signing_input.encode(), hashlib.sha256).digest()
+    return f"{signing_input}.{_b64(signature)}"
+
+
+def synthetic_user_ids(count: int) -> List[str]:
+    """Stable user ids, so repeated runs and seeded fixtures line up"""
+    return [str(uuid.uuid5(USER_NAMESPACE, f"load-user-{i}")) for i in range(count)]
+
+
+def load_tokens(path: Path) -> List[str]:
+    """One access token per line (blank lines and # comments ignored)"""
+    lines = Path(path).read_text().splitlines()
+    return [line.strip() for line in lines if line.strip() and not line.startswith("#")]
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """'spin=0.8,spin-outcome=0.2' -> weights per endpoint"""
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ENDPOINTS:
+            raise ValueError(f"unknown endpoint '{name}' (expected one of {', '.join(ENDPOINTS)})")
+        mix[name] = float(weight) if weight else 1.0
+    return mix
+
+
+def spin_payload(game_id: str, wager: float, rng: random.Random) -> dict:
+    return {"gameId": game_id, "wager": wager, "sessionId": str(uuid.UUID(int=rng.getrandbits(128)))}
+
+
+def spin_outcome_payload(game_id: str, wager: float, rng: random.Random) -> dict:
+    return {"game_id": game_id, "wager_amount": wager}
+
+
+PAYLOADS: Dict[str, Callable[[str, float, random.Random], dict]] = {
+    "spin": spin_payload,
+    "spin-outcome": spin_outcome_payload,
+}
+
+
+class TrafficModel:
+    """
+    Draws (endpoint, token, payload) for each request. Players are picked
+    with a Zipf-like skew (a few regulars spin far more than most), which is
+    what drives the per-user 60 spins/minute limit in practice.
+    """
+
+    def __init__(self, tokens: Sequence[str], mix: Dict[str, float] = DEFAULT_MIX,
+                 games: Optional[Sequence[str]] = None, seed: int = 0, skew: float = 1.0):
+        if not tokens:
+            raise ValueError("at least one access token is needed")
+        self.tokens = list(tokens)
+        self.endpoints = list(mix)
+        self.endpoint_weights = [mix[name] for name in self.endpoints]
+        self.games = list(games) if games else [slug for slug, _ in catalogue_games()]
+        self.rng = random.Random(seed)
+        weights = [1 / (rank + 1) ** skew for rank in range(len(self.tokens))]
+        total = sum(weights)
+        self.cumulative = []
+        running = 0.0
+        for weight in weights:
+            running += weight / total
+            self.cumulative.append(running)
+
+    def _user(self) -> str:
+        roll = self.rng.random()
+        low, high = 0, len(self.cumulative) - 1
+        while low < high:
+            mid = (low + high) // 2
+            if self.cumulative[mid] < roll:
+                low = mid + 1
+            else:
+                high = mid
+        return self.tokens[low]
+
+    def next_request(self) -> Tuple[str, str, dict]:
+        endpoint = self.rng.choices(self.endpoints, self.endpoint_weights)[0]
+        payload = PAYLOADS[endpoint](self.rng.choice(self.games), self.rng.choice(WAGERS), self.rng)
+        return endpoint, self._user(), payload
+
+
+async def _send(session, url: str, headers: dict, payload: dict, scheduled: float,
+                stats: EndpointStats) -> None:
+    aiohttp = _aiohttp()
+    try:
+        async with session.post(url, json=payload, headers=headers) as response:
+            await response.read()
+            stats.statuses[response.status] = stats.statuses.get(response.status, 0) + 1
+    except asyncio.TimeoutError:
+        stats.errors["timeout"] = stats.errors.get("timeout", 0) + 1
+    except aiohttp.ClientError as e:
+        name = type(e).__name__
+        stats.errors[name] = stats.errors.get(name, 0) + 1
+    stats.latency.record(time.perf_counter() - scheduled)
+
+
+async def run_stage(session, functions_url: str, base_headers: dict, model: TrafficModel,
+                    rps: float, duration: float,
+                    max_in_flight: int = DEFAULT_MAX_IN_FLIGHT) -> StageResult:
+    """Offer `rps` requests/second for `duration` seconds and wait for the answers"""
+    result = StageResult(target_rps=rps, duration=duration,
+                         endpoints={name: EndpointStats() for name in model.endpoints})
+    pending = set()
+    started = time.perf_counter()
+    due = started
+    end = started + duration
+
+    while True:
+        due += model.rng.expovariate(rps)
+        if due >= end:
+            break
+        delay = due - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        result.scheduled += 1
+        if len(pending) >= max_in_flight:
+            result.dropped += 1
+            continue
+        endpoint, token, payload = model.next_request()
+        headers = {**base_headers, "Authorization": f"Bearer {token}"}
+        task = asyncio.ensure_future(_send(
+            session, f"{functions_url}/{endpoint}", headers, payload, due, result.endpoints[endpoint]
+        ))
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+
+    if pending:
+        await asyncio.gather(*pending)
+    result.wall_seconds = time.perf_counter() - started
+    return result
+
+
+async def _run(functions_url: str, base_headers: dict, model: TrafficModel,
+               stages: Sequence[float], duration: float, max_in_flight: int, timeout: float,
+               on_stage: Optional[Callable[[StageResult], None]]) -> List[StageResult]:
+    aiohttp = _aiohttp()
+    connector = aiohttp.TCPConnector(limit=max_in_flight, ttl_dns_cache=300)
+    client_timeout = aiohttp.ClientTimeout(total=timeout)
+    results = []
+    async with aiohttp.ClientSession(connector=connector, timeout=client_timeout) as session:
+        for rps in stages:
+            result = await run_stage(session, functions_url, base_headers, model,
+                                     rps, duration, max_in_flight)
+            results.append(result)
+            if on_stage:
+                on_stage(result)
+    return results
+
+
+def run_load(functions_url: str, model: TrafficModel, stages: Sequence[float],
+             duration: float, api_key: Optional[str] = None,
+             max_in_flight: int = DEFAULT_MAX_IN_FLIGHT, timeout: float = DEFAULT_TIMEOUT,
+             on_stage: Optional[Callable[[StageResult], None]] = None) -> List[StageResult]:
+    """Run each stage's offered rate in turn against `functions_url`"""
+    headers = {"Content-Type": "application/json"}
+    if api_key:
+        headers["apikey"] = api_key
+    return asyncio.run(_run(functions_url.rstrip("/"), headers, model, stages, duration,
+                            max_in_flight, timeout, on_stage))
+
+
+def saturation_point(results: Sequence[StageResult], max_error_rate: float = 0.01,
+                     p99_budget: float = 1.0, min_delivery: float = 0.95) -> Optional[StageResult]:
+    """
+    First stage that could not keep up: delivered under `min_delivery` of its
+    target rate, failed more than `max_error_rate`, or had p99 over budget
+    (seconds). 429s are counted separately - they are the limiter working.
+    """
+    for result in results:
+        overall = result.overall
+        requests = overall.requests or 1
+        if (result.achieved_rps < min_delivery * result.target_rps
+                or overall.failed / requests > max_error_rate
+                or overall.latency.percentile(99) > p99_budget):
+            return result
+    return None
@@ -0,0 +1,234 @@
+"""
+Throwaway local PostgreSQL for offline deploy testing
+
+LocalPostgres runs initdb/pg_ctl from the installed PostgreSQL server into a
+temporary directory; prepare_supabase_schema() then stubs the pieces of the
+Supabase platform the migrations reference (roles, auth.users, auth.uid(),
+storage buckets/objects, the supabase_realtime publication) so that
+supabase/migrations applies unchanged.
+
+Durability is switched off (fsync, synchronous_commit), so timings are only
+comparable between local runs, not with the hosted project.
+"""
+
+import glob
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+from supabase_tools.db import connect
+
+START_TIMEOUT = 60
+
+# Minimal stand-ins for objects owned by the Supabase platform
+SUPABASE_STUBS = [
+    """DO $$
+BEGIN
+  IF NOT EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'anon') THEN
+    CREATE ROLE anon NOLOGIN NOINHERIT;
+  END IF;
+  IF NOT EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'authenticated') THEN
+    CREATE ROLE authenticated NOLOGIN NOINHERIT;
+  END IF;
+  IF NOT EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'service_role') THEN
+    CREATE ROLE service_role NOLOGIN NOINHERIT BYPASSRLS;
+  END IF;
+  IF NOT EXISTS (SELECT 1 FROM pg_roles WHERE rolname = 'authenticator') THEN
+    CREATE ROLE authenticator NOINHERIT;
+  END IF;
+END
+$$""",
+    "GRANT anon, authenticated, service_role TO authenticator",
+    "GRANT USAGE ON SCHEMA public TO anon, authenticated, service_role",
+    "CREATE SCHEMA IF NOT EXISTS auth",
+    "CREATE SCHEMA IF NOT EXISTS storage",
+    "CREATE SCHEMA IF NOT EXISTS extensions",
+    """CREATE TABLE IF NOT EXISTS auth.users (
+  id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+  email TEXT UNIQUE,
+  raw_user_meta_data JSONB NOT NULL DEFAULT '{}'::jsonb,
+  raw_app_meta_data JSONB NOT NULL DEFAULT '{}'::jsonb,
+  created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+  updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now()
+)""",
+    # Same resolution order as Supabase: per-claim setting, then the claims JSON
+    """CREATE OR REPLACE FUNCTION auth.jwt() RETURNS JSONB
+LANGUAGE sql STABLE AS $$
+  SELECT coalesce(nullif(current_setting('request.jwt.claims', true), '')::jsonb, '{}'::jsonb)
+$$""",
+    """CREATE OR REPLACE FUNCTION auth.uid() RETURNS UUID
+LANGUAGE sql STABLE AS $$
+  SELECT nullif(coalesce(
+    nullif(current_setting('request.jwt.claim.sub', true), ''),
+    auth.jwt() ->> 'sub'
+  ), '')::uuid
+$$""",
+    """CREATE OR REPLACE FUNCTION auth.role() RETURNS TEXT
+LANGUAGE sql STABLE AS $$
+  SELECT coalesce(
+    nullif(current_setting('request.jwt.claim.role', true), ''),
+    auth.jwt() ->> 'role'
+  )
+$$""",
+    "GRANT USAGE ON SCHEMA auth TO anon, authenticated, service_role",
+    """CREATE TABLE IF NOT EXISTS storage.buckets (
+  id TEXT PRIMARY KEY,
+  name TEXT NOT NULL UNIQUE,
+  owner UUID,
+  public BOOLEAN NOT NULL DEFAULT false,
+  file_size_limit BIGINT,
+  allowed_mime_types TEXT[],
+  created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+  updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now()
+)""",
+    """CREATE TABLE IF NOT EXISTS storage.objects (
+  id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+  bucket_id TEXT REFERENCES storage.buckets(id),
+  name TEXT,
+  owner UUID,
+  metadata JSONB,
+  created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+  updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now()
+)""",
+    "ALTER TABLE storage.objects ENABLE ROW LEVEL SECURITY",
+    """CREATE OR REPLACE FUNCTION storage.foldername(name TEXT) RETURNS TEXT[]
+LANGUAGE sql IMMUTABLE AS $$
+  SELECT (string_to_array(name, '/'))[1:array_length(string_to_array(name, '/'), 1) - 1]
+$$""",
+    """DO $$
+BEGIN
+  IF NOT EXISTS (SELECT 1 FROM pg_publication WHERE pubname = 'supabase_realtime') THEN
+    CREATE PUBLICATION supabase_realtime;
+  END IF;
+END
+$$""",
+]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def find_pg_bin() -> Optional[Path]:
+    """Directory holding initdb/pg_ctl: $PG_BIN, PATH, then common install prefixes"""
+    if os.environ.get("PG_BIN"):
+        return Path(os.environ["PG_BIN"])
+    initdb = shutil.which("initdb")
+    if initdb:
+        return Path(initdb).parent
+    candidates = sorted(
+        glob.glob("/usr/lib/postgresql/*/bin")
+        + glob.glob("/usr/local/opt/postgresql*/bin")
+        + glob.glob("/opt/homebrew/opt/postgresql*/bin"),
+        reverse=True
+    )
+    for candidate in candidates:
+        if (Path(candidate) / "initdb").exists():
+            return Path(candidate)
+    return None
+
+
+class LocalPostgres:
+    """A private PostgreSQL cluster in a temp directory, removed on stop()"""
+
+    def __init__(self, port: Optional[int] = None, data_dir: Optional[Path] = None,
+                 keep: bool = False):
+        self.bin_dir = find_pg_bin()
+        if self.bin_dir is None:
+            raise RuntimeError(
+                "PostgreSQL server binaries not found - install postgresql or set PG_BIN"
+            )
+        self.port = port or _free_port()
+        self._tmp = None if data_dir else tempfile.mkdtemp(prefix="collective-wins-pg-")
+        self.root = Path(data_dir or self._tmp)
+        self.data_dir = self.root / "data"
+        self.log_file = self.root / "postgres.log"
+        self.keep = keep
+
+    @property
+    def dsn(self) -> str:
+        return f"postgresql://postgres@127.0.0.1:{self.port}/postgres"
+
+    def _run(self, *args: str) -> None:
+        result = subprocess.run(
+            [str(self.bin_dir / args[0]), *args[1:]],
+            capture_output=True,
+            text=True,
+            timeout=START_TIMEOUT
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"{args[0]} failed: {(result.stderr or result.stdout).strip()[:500]}")
+
+    def start(self) -> "LocalPostgres":
+        if not (self.data_dir / "PG_VERSION").exists():
+            self._run("initdb", "-D", str(self.data_dir), "-U", "postgres",
+                      "-A", "trust", "-E", "UTF8", "--no-sync")
+        options = " ".join([
+            f"-p {self.port}",
+            "-c listen_addresses=127.0.0.1",
+            f"-c unix_socket_directories={self.root}",
+            "-c fsync=off",
+            "-c synchronous_commit=off",
+            "-c full_page_writes=off",
+        ])
+        self._run("pg_ctl", "-D", str(self.data_dir), "-l", str(self.log_file),
+                  "-o", options, "-w", "-t", str(START_TIMEOUT), "start")
+        return self
+
+    def stop(self) -> None:
+        if (self.data_dir / "postmaster.pid").exists():
+            self._run("pg_ctl", "-D", str(self.data_dir), "-m", "fast", "-w", "stop")
+        if self._tmp and not self.keep:
+            shutil.rmtree(self._tmp, ignore_errors=True)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def prepare_supabase_schema(dsn: str) -> None:
+    """Create the platform roles and schemas the migrations depend on"""
+    conn = connect(dsn, autocommit=True)
+    try:
+        with conn.cursor() as cur:
+            for statement in SUPABASE_STUBS:
+                cur.execute(statement)
+    finally:
+        conn.close()
+
+
+def with_database(dsn: str, name: str) -> str:
+    """The same server connection string pointed at database `name`"""
+    parts = urlsplit(dsn)
+    return urlunsplit(parts._replace(path=f"/{name}"))
+
+
+@contextmanager
+def scratch_database(dsn: str, prefix: str = "scratch") -> Iterator[str]:
+    """
+    Create an empty database next to `dsn`'s, yield its connection string
+    and drop it afterwards, so benchmarks never touch real schemas.
+    """
+    name = f"{prefix}_{uuid.uuid4().hex[:8]}"
+    conn = connect(dsn, autocommit=True)
+    try:
+        with conn.cursor() as cur:
+            cur.execute(f'CREATE DATABASE "{name}"')
+        try:
+            yield with_database(dsn, name)
+        finally:
+            with conn.cursor() as cur:
+                cur.execute(f'DROP DATABASE IF EXISTS "{name}" WITH (FORCE)')
+    finally:
+        conn.close()
@@ -0,0 +1,358 @@
+"""
+Ledger-based SQL migration runner
+
+Applied migrations are recorded with a SHA-256 checksum in
+deploy_ledger.applied_migrations. A run reads the ledger once, applies only
+pending files, each inside its own transaction, over one persistent
+connection, and holds an advisory lock so two deploys never interleave.
+
+Files that need autocommit (CREATE INDEX CONCURRENTLY and the like) cannot
+be rolled back, so their progress is recorded statement by statement in
+deploy_ledger.migration_progress: after a failure the next run resumes at
+the failed statement instead of re-running the ones already applied.
+"""
+
+import hashlib
+import re
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from supabase_tools.config import PROJECT_DIR
+from supabase_tools.db import connect
+from supabase_tools.sql import split_sql
+
+MIGRATIONS_DIR = PROJECT_DIR / "supabase" / "migrations"
+# What a full deploy applies: the consolidated schema, then the catalogue data
+ROOT_SQL_FILES = (
+    PROJECT_DIR / "REAL_MONEY_COMPLETE_MIGRATION.sql",
+    PROJECT_DIR / "UPDATE_GAME_THUMBNAILS.sql",
+)
+# The hosted editor generated the migrations before this one, and not in
+# dependency order: the first needs tables a later one creates. From here
+# on they apply in sequence; all_migrations_combined.sql starts here too.
+FIRST_INCREMENTAL_MIGRATION = "20251220092638"
+
+# Arbitrary constant shared by every runner instance
+ADVISORY_LOCK_KEY = 7_201_220_092_643
+
+LEDGER_DDL = [
+    "CREATE SCHEMA IF NOT EXISTS deploy_ledger",
+    """CREATE TABLE IF NOT EXISTS deploy_ledger.applied_migrations (
+  name TEXT PRIMARY KEY,
+  checksum TEXT NOT NULL,
+  statements INTEGER NOT NULL,
+  duration_ms INTEGER NOT NULL,
+  baseline BOOLEAN NOT NULL DEFAULT false,
+  applied_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now()
+)""",
+    """CREATE TABLE IF NOT EXISTS deploy_ledger.migration_progress (
+  name TEXT PRIMARY KEY,
+  prefix_checksum TEXT NOT NULL,
+  statements_done INTEGER NOT NULL,
+  updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now()
+)""",
+]
+
+_LEADING_NOISE = r"(?:\s|--[^\n]*(?:\n|$)|/\*.*?\*/)*"
+# Statements PostgreSQL refuses to run inside a transaction block
+_NON_TRANSACTIONAL = re.compile(
+    _LEADING_NOISE + r"(?:CREATE\s+(?:UNIQUE\s+)?INDEX\s+CONCURRENTLY|DROP\s+INDEX\s+CONCURRENTLY"
+    r"|REINDEX\b.*\bCONCURRENTLY|VACUUM|ALTER\s+SYSTEM|CREATE\s+DATABASE)",
+    re.IGNORECASE | re.DOTALL
+)
+# The runner owns the transaction, so scripts' own BEGIN/COMMIT are dropped
+_TRANSACTION_CONTROL = re.compile(
+    _LEADING_NOISE + r"(?:BEGIN|START\s+TRANSACTION|COMMIT|END|ROLLBACK)(?:\s+(?:WORK|TRANSACTION))?\s*$",
+    re.IGNORECASE | re.DOTALL
+)
+
+
+@dataclass
+class Migration:
+    """One SQL file, identified by its path relative to the project"""
+    name: str
+    path: Path
+    checksum: str
+
+    @classmethod
+    def from_path(cls, path: Path) -> "Migration":
+        path = Path(path).resolve()
+        try:
+            name = path.relative_to(PROJECT_DIR).as_posix()
+        except ValueError:
+            name = path.as_posix()
+        return cls(name, path, hashlib.sha256(path.read_bytes()).hexdigest())
+
+    def statements(self) -> List[str]:
+        return [
+            statement for statement in split_sql(self.path.read_text())
+            if not _TRANSACTION_CONTROL.match(statement)
+        ]
+
+
+def prefix_checksum(statements: List[str]) -> str:
+    """Identifies the statements an interrupted autocommit file got through"""
+    digest = hashlib.sha256()
+    for statement in statements:
+        digest.update(statement.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+@dataclass
+class MigrationReport:
+    """What a run did; `failed` stops the run at the first broken file"""
+    applied: List[dict] = field(default_factory=list)
+    skipped: List[str] = field(default_factory=list)
+    drifted: List[str] = field(default_factory=list)
+    failed: Optional[dict] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.failed is None
+
+
+def discover_migrations(directory: Path = MIGRATIONS_DIR) -> List[Migration]:
+    """Every *.sql file in `directory`, in filename (timestamp) order"""
+    return [Migration.from_path(path) for path in sorted(directory.glob("*.sql"))]
+
+
+def split_editor_migrations(migrations: List[Migration]) -> Tuple[List[Migration], List[Migration]]:
+    """The editor-generated migrations, and the incremental ones after them"""
+    base = [m for m in migrations if m.path.name < FIRST_INCREMENTAL_MIGRATION]
+    return base, [m for m in migrations if m.path.name >= FIRST_INCREMENTAL_MIGRATION]
+
+
+class MigrationError(Exception):
+    """
+    A statement failed. A transactional file has been rolled back; an
+    autocommit one keeps its first `left_applied` statements, recorded so
+    the next run resumes after them.
+    """
+
+    def __init__(self, name: str, index: int, statement: str, cause: Exception,
+                 transactional: bool = True, left_applied: int = 0):
+        self.name = name
+        self.index = index
+        self.statement = statement
+        self.cause = cause
+        self.transactional = transactional
+        self.left_applied = left_applied
+        super().__init__(f"{name}: statement {index} failed: {cause}")
+
+
+class MigrationRunner:
+    """Applies migrations over one connection, recording them in the ledger"""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def ensure_ledger(self) -> None:
+        with self.conn.cursor() as cur:
+            for ddl in LEDGER_DDL:
+                cur.execute(ddl)
+        self.conn.commit()
+
+    def lock(self) -> None:
+        with self.conn.cursor() as cur:
+            cur.execute("SELECT pg_advisory_lock(%s)", (ADVISORY_LOCK_KEY,))
+        self.conn.commit()
+
+    def unlock(self) -> None:
+        with self.conn.cursor() as cur:
+            cur.execute("SELECT pg_advisory_unlock(%s)", (ADVISORY_LOCK_KEY,))
+        self.conn.commit()
+
+    def applied(self) -> Dict[str, str]:
+        """Checksum of every recorded migration, keyed by name"""
+        with self.conn.cursor() as cur:
+            cur.execute("SELECT name, checksum FROM deploy_ledger.applied_migrations")
+            rows = cur.fetchall()
+        self.conn.commit()
+        return dict(rows)
+
+    def _record(self, cur, migration: Migration, statements: int,
+                duration_ms: int, baseline: bool) -> None:
+        cur.execute(
+            """INSERT INTO deploy_ledger.applied_migrations
+                 (name, checksum, statements, duration_ms, baseline)
+               VALUES (%s, %s, %s, %s, %s)
+               ON CONFLICT (name) DO UPDATE
+               SET checksum = EXCLUDED.checksum, statements = EXCLUDED.statements,
+                   duration_ms = EXCLUDED.duration_ms, baseline = EXCLUDED.baseline,
+                   applied_at = now()""",
+            (migration.name, migration.checksum, statements, duration_ms, baseline)
+        )
+
+    def progress(self, migration: Migration) -> Optional[tuple]:
+        """(statements_done, prefix_checksum) left by an interrupted autocommit run"""
+        with self.conn.cursor() as cur:
+            cur.execute(
+                """SELECT statements_done, prefix_checksum FROM deploy_ledger.migration_progress
+                   WHERE name = %s""",
+                (migration.name,)
+            )
+            row = cur.fetchone()
+        self.conn.commit()
+        return row
+
+    def _resume_point(self, migration: Migration, statements: List[str]) -> int:
+        """How many leading statements an earlier autocommit run already applied"""
+        progress = self.progress(migration)
+        if progress is None:
+            return 0
+        done, checksum = progress
+        if done > len(statements) or prefix_checksum(statements[:done]) != checksum:
+            error = RuntimeError(
+                f"statements 1-{done} were applied by an earlier, interrupted run and have "
+                "since been edited; undo them by hand and delete the file's row from "
+                "deploy_ledger.migration_progress, or keep them unchanged"
+            )
+            raise MigrationError(migration.name, done + 1, "", error, transactional=False, left_applied=done)
+        return done
+
+    def apply(self, migration: Migration) -> dict:
+        """
+        Run one migration and record it atomically.
+
+        Files containing statements that cannot run in a transaction (e.g.
+        CREATE INDEX CONCURRENTLY) run statement by statement in autocommit,
+        recording each one's completion so a failed run resumes where it
+        stopped. Raises MigrationError carrying the failing statement index.
+        """
+        statements = migration.statements()
+        transactional = not any(_NON_TRANSACTIONAL.match(s) for s in statements)
+        resumed = 0 if transactional else self._resume_point(migration, statements)
+        started = time.perf_counter()
+
+        self.conn.autocommit = not transactional
+        try:
+            with self.conn.cursor() as cur:
+                for index, statement in enumerate(statements[resumed:], resumed + 1):
+                    try:
+                        cur.execute(statement)
+                    except Exception as e:
+                        raise MigrationError(migration.name, index, statement, e,
+                                             transactional, left_applied=0 if transactional else index - 1) from e
+                    if not transactional:
+                        cur.execute(
+                            """INSERT INTO deploy_ledger.migration_progress (name, prefix_checksum, statements_done)
+                               VALUES (%s, %s, %s)
+                               ON CONFLICT (name) DO UPDATE
+                               SET prefix_checksum = EXCLUDED.prefix_checksum,
+                                   statements_done = EXCLUDED.statements_done, updated_at = now()""",
+                            (migration.name, prefix_checksum(statements[:index]), index)
+                        )
+                duration_ms = int((time.perf_counter() - started) * 1000)
+                self._record(cur, migration, len(statements), duration_ms, baseline=False)
+                if not transactional:
+                    cur.execute("DELETE FROM deploy_ledger.migration_progress WHERE name = %s", (migration.name,))
+            if transactional:
+                self.conn.commit()
+        except Exception:
+            if transactional:
+                self.conn.rollback()
+            raise
+        finally:
+            self.conn.autocommit = False
+
+        applied = {
+            "name": migration.name,
+            "statements": len(statements),
+            "duration_ms": duration_ms,
+            "transactional": transactional,
+        }
+        if resumed:
+            applied["resumed_at"] = resumed + 1
+        return applied
+
+    def baseline(self, migration: Migration) -> None:
+        """Record a migration as applied without running it"""
+        with self.conn.cursor() as cur:
+            self._record(cur, migration, len(migration.statements()), 0, baseline=True)
+            cur.execute("DELETE FROM deploy_ledger.migration_progress WHERE name = %s", (migration.name,))
+        self.conn.commit()
+
+
+def run_migrations(dsn: str, migrations: Optional[Iterable[Migration]] = None,
+                   baseline: bool = False, dry_run: bool = False) -> MigrationReport:
+    """
+    Apply every pending migration (default: supabase/migrations/*.sql).
+
+    A recorded file whose checksum changed is reported as drifted and not
+    re-run; `baseline` records pending files without executing them, for
+    databases that were set up by hand through the SQL editor.
+    """
+    migrations = discover_migrations() if migrations is None else list(migrations)
+    report = MigrationReport()
+
+    conn = connect(dsn)
+    try:
+        runner = MigrationRunner(conn)
+        runner.ensure_ledger()
+        runner.lock()
+        try:
+            applied = runner.applied()
+            for migration in migrations:
+                recorded = applied.get(migration.name)
+                if recorded == migration.checksum:
+                    report.skipped.append(migration.name)
+                    continue
+                if recorded is not None:
+                    report.drifted.append(migration.name)
+                    continue
+                if dry_run:
+                    report.applied.append({"name": migration.name, "pending": True})
+                    continue
+                if baseline:
+                    runner.baseline(migration)
+                    report.applied.append({"name": migration.name, "baseline": True})
+                    continue
+                started = time.perf_counter()
+                try:
+                    report.applied.append(runner.apply(migration))
+                except MigrationError as e:
+                    report.failed = {
+                        "name": e.name,
+                        "statement": e.index,
+                        "error": str(e.cause).strip(),
+                        "duration_ms": int((time.perf_counter() - started) * 1000),
+                        "transactional": e.transactional,
+                        "left_applied": e.left_applied,
+                    }
+                    break
+        finally:
+            runner.unlock()
+    finally:
+        conn.close()
+    return report
+
+
+def print_migration_report(report: MigrationReport) -> None:
+    """Print a migration run in the scripts' usual format"""
+    for entry in report.applied:
+        if entry.get("pending"):
+            print(f"📝 Pending: {entry['name']}")
+        elif entry.get("baseline"):
+            print(f"📌 Baselined: {entry['name']}")
+        else:
+            mode = "" if entry["transactional"] else ", autocommit"
+            if entry.get("resumed_at"):
+                mode += f", resumed at statement {entry['resumed_at']}"
+            print(f"✅ Applied: {entry['name']} ({entry['statements']} statements, {entry['duration_ms']} ms{mode})")
+    if report.skipped:
+        print(f"⏭️  {len(report.skipped)} migrations already applied")
+    for name in report.drifted:
+        print(f"⚠️  {name} changed after it was applied - not re-run, add a new migration instead")
+    if report.failed:
+        print(f"❌ {report.failed['name']} failed at statement {report.failed['statement']}")
+        print(f"   {report.failed['error']}")
+        if report.failed.get("transactional", True):
+            print("   The file was rolled back; later migrations were not attempted")
+        elif report.failed["left_applied"]:
+            print(f"   Autocommit file: statements 1-{report.failed['left_applied']} stayed applied and the "
+                  "next run resumes after them; later migrations were not attempted")
+        else:
+            print("   Autocommit file: nothing in it was applied; later migrations were not attempted")
@@ -0,0 +1,426 @@
+"""
+Monthly partition maintenance and cold archival
+
+game_spins, rate_limit_logs and provably_fair_verification are range
+partitioned by month on created_at, with each month in its own table in the
+`partitions` schema. This module creates the coming months' partitions
+ahead of the inserts, so writes never pile up in the DEFAULT partition, and
+archives months past their retention: each month is streamed through a
+server-side cursor into a zstd-compressed Parquet file, checked against the
+partition's row count, recorded in the archive manifest and only then
+detached and dropped. The hot partitions, and their indexes, stay the size
+of a month however much history accumulates.
+
+Archived months stay available for audits. They can be queried straight
+from the files with pyarrow dataset filters, or restored: the file is
+copied into a fresh table, which is attached as the month's partition again.
+"""
+
+import hashlib
+import json
+import re
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from supabase_tools.config import STATE_DIR
+from supabase_tools.db import connect
+from supabase_tools.state import load_json, save_json
+from supabase_tools.synthetic import copy_chunks
+
+# Months kept in the database before a partition is archived
+RETENTION_MONTHS = {
+    "game_spins": 12,
+    "provably_fair_verification": 12,
+    "rate_limit_logs": 2,
+}
+TABLES = tuple(RETENTION_MONTHS)
+MONTHS_AHEAD = 3
+
+ARCHIVE_DIR = STATE_DIR / "archive"
+MANIFEST_NAME = "manifest.json"
+BATCH_ROWS = 50_000
+COMPRESSION = "zstd"
+# Detaching locks the parent briefly; never queue hot inserts behind it
+LOCK_TIMEOUT = "5s"
+
+_MONTH_SUFFIX = re.compile(r"_p(\d{4})(\d{2})$")
+_NUMERIC = re.compile(r"numeric\((\d+),(\d+)\)")
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.dataset  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        raise RuntimeError("pyarrow is required for partition archives - run: pip install pyarrow") from None
+    return pyarrow
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _month_start(month: date) -> datetime:
+    return datetime(month.year, month.month, 1, tzinfo=timezone.utc)
+
+
+@dataclass
+class MonthPartition:
+    table: str
+    name: str                     # schema-qualified, e.g. partitions.game_spins_p202501
+    month: Optional[date]         # None for the DEFAULT partition
+    estimated_rows: Optional[int]
+
+    @property
+    def is_default(self) -> bool:
+        return self.month is None
+
+    @property
+    def label(self) -> str:
+        return f"{self.month:%Y-%m}" if self.month else "default"
+
+    @property
+    def lower(self) -> datetime:
+        return _month_start(self.month)
+
+    @property
+    def upper(self) -> datetime:
+        return _month_start(_add_months(self.month, 1))
+
+
+def list_partitions(conn, table: str) -> List[MonthPartition]:
+    """The table's attached partitions, oldest month first and DEFAULT last"""
+    with conn.cursor() as cur:
+        cur.execute(
+            """SELECT c.oid::regclass::text, c.reltuples::bigint
+               FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+               WHERE i.inhparent = to_regclass(%s)""",
+            (f"public.{table}",)
+        )
+        rows = cur.fetchall()
+    partitions = []
+    for name, reltuples in rows:
+        match = _MONTH_SUFFIX.search(name)
+        month = date(int(match.group(1)), int(match.group(2)), 1) if match else None
+        # reltuples is -1 until the partition is first vacuumed or analyzed
+        partitions.append(MonthPartition(table, name, month, reltuples if reltuples >= 0 else None))
+    return sorted(partitions, key=lambda p: (p.is_default, p.month or date.min))
+
+
+def ensure_partitions(conn, months_ahead: int = MONTHS_AHEAD,
+                      tables: tuple = TABLES) -> Dict[str, int]:
+    """Create this month's and the next `months_ahead` months' partitions"""
+    created = {}
+    with conn.cursor() as cur:
+        for table in tables:
+            cur.execute(
+                "SELECT public.create_monthly_partitions(%s, now(), now() + make_interval(months => %s))",
+                (table, months_ahead)
+            )
+            created[table] = cur.fetchone()[0]
+    conn.commit()
+    return created
+
+
+def due_for_archive(partitions: List[MonthPartition], retention_months: int,
+                    today: Optional[date] = None) -> List[MonthPartition]:
+    """Months that ended more than `retention_months` whole months ago"""
+    today = today or datetime.now(timezone.utc).date()
+    cutoff = _add_months(today.replace(day=1), -retention_months)
+    return [p for p in partitions if not p.is_default and p.month < cutoff]
+
+
+@dataclass
+class ArchiveEntry:
+    table: str
+    partition: str
+    month: str                    # YYYY-MM
+    path: str                     # relative to the archive directory
+    rows: int
+    bytes: int
+    sha256: str
+    columns: List[List[str]] = field(default_factory=list)   # [name, postgres type]
+    archived_at: str = ""
+    restored_at: Optional[str] = None
+
+    @property
+    def lower(self) -> datetime:
+        return _month_start(datetime.strptime(self.month, "%Y-%m").date())
+
+    @property
+    def upper(self) -> datetime:
+        return _month_start(_add_months(self.lower.date(), 1))
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ArchiveEntry":
+        return cls(**data)
+
+
+def load_manifest(archive_dir: Path = ARCHIVE_DIR) -> Dict[str, ArchiveEntry]:
+    """Archived partitions by schema-qualified partition name"""
+    data = load_json(archive_dir / MANIFEST_NAME, {}) or {}
+    return {name: ArchiveEntry.from_dict(entry) for name, entry in data.get("partitions", {}).items()}
+
+
+def save_manifest(entries: Dict[str, ArchiveEntry], archive_dir: Path = ARCHIVE_DIR) -> None:
+    save_json(archive_dir / MANIFEST_NAME, {
+        "partitions": {name: entry.to_dict() for name, entry in sorted(entries.items())}
+    })
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _column_types(cur, relation: str) -> List[List[str]]:
+    cur.execute(
+        """SELECT attname, format_type(atttypid, atttypmod) FROM pg_attribute
+           WHERE attrelid = %s::regclass AND attnum > 0 AND NOT attisdropped
+           ORDER BY attnum""",
+        (relation,)
+    )
+    return [[name, pg_type] for name, pg_type in cur.fetchall()]
+
+
+def _arrow_type(pa, pg_type: str):
+    numeric = _NUMERIC.fullmatch(pg_type)
+    if numeric:
+        return pa.decimal128(int(numeric.group(1)), int(numeric.group(2)))
+    return {
+        "smallint": pa.int16(),
+        "integer": pa.int32(),
+        "bigint": pa.int64(),
+        "boolean": pa.bool_(),
+        "real": pa.float32(),
+        "double precision": pa.float64(),
+        "date": pa.date32(),
+        "timestamp with time zone": pa.timestamp("us", tz="UTC"),
+        "timestamp without time zone": pa.timestamp("us"),
+    }.get(pg_type, pa.string())   # uuid, text, inet, jsonb, unconstrained numeric...
+
+
+def _as_text(value) -> Optional[str]:
+    """Columns Arrow has no type for (uuid, inet, jsonb...) are archived as text"""
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return str(value)
+
+
+def _copy_value(value) -> str:
+    if value is None:
+        return r"\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    text = value.isoformat() if isinstance(value, (date, datetime)) else str(value)
+    return (text.replace("\\", "\\\\").replace("\t", "\\t")
+            .replace("\n", "\\n").replace("\r", "\\r"))
+
+
+def archive_partition(dsn: str, partition: MonthPartition,
+                      archive_dir: Path = ARCHIVE_DIR) -> ArchiveEntry:
+    """
+    Stream one month to Parquet, check it, record it in the manifest, then
+    detach and drop the partition. Everything runs in one transaction that
+    holds a SHARE lock on the partition, so the archive is exactly what was
+    dropped; if anything fails the partition stays attached.
+    """
+    pa = _pyarrow()
+    if partition.is_default:
+        raise RuntimeError(f"{partition.name} is the DEFAULT partition and is never archived")
+
+    relative = Path(partition.table) / f"{partition.label}.parquet"
+    path = archive_dir / relative
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(path.name + ".partial")
+
+    manifest = load_manifest(archive_dir)
+    conn = connect(dsn)
+    try:
+        with conn.cursor() as cur:
+            cur.execute(f"SET LOCAL lock_timeout = '{LOCK_TIMEOUT}'")
+            cur.execute(f"LOCK TABLE {partition.name} IN SHARE MODE")
+            columns = _column_types(cur, partition.name)
+            cur.execute(f"SELECT count(*) FROM {partition.name}")
+            expected = cur.fetchone()[0]
+
+        schema = pa.schema([(name, _arrow_type(pa, pg_type)) for name, pg_type in columns])
+        as_text = [(column.name, column.type == pa.string()) for column in schema]
+        written = 0
+        with pa.parquet.ParquetWriter(str(partial), schema, compression=COMPRESSION) as writer:
+            with conn.cursor(name=f"archive_{partition.table}") as cur:
+                cur.itersize = BATCH_ROWS
+                cur.execute(f"SELECT * FROM {partition.name} ORDER BY created_at")
+                while True:
+                    rows = cur.fetchmany(BATCH_ROWS)
+                    if not rows:
+                        break
+                    batch = {
+                        name: [_as_text(row[i]) for row in rows] if text else [row[i] for row in rows]
+                        for i, (name, text) in enumerate(as_text)
+                    }
+                    writer.write_table(pa.Table.from_pydict(batch, schema=schema))
+                    written += len(rows)
+
+        stored = pa.parquet.ParquetFile(partial).metadata.num_rows
+        if not written == stored == expected:
+            raise RuntimeError(
+                f"{partition.name}: {expected:,} rows in the partition, "
+                f"{written:,} exported, {stored:,} in the file"
+            )
+        partial.replace(path)
+
+        entry = ArchiveEntry(
+            table=partition.table,
+            partition=partition.name,
+            month=partition.label,
+            path=str(relative),
+            rows=stored,
+            bytes=path.stat().st_size,
+            sha256=file_sha256(path),
+            columns=columns,
+            archived_at=datetime.now(timezone.utc).isoformat(),
+        )
+
+        with conn.cursor() as cur:
+            cur.execute(f"ALTER TABLE public.{partition.table} DETACH PARTITION {partition.name}")
+            cur.execute(f"DROP TABLE {partition.name}")
+
+        previous = manifest.get(partition.name)
+        manifest[partition.name] = entry
+        save_manifest(manifest, archive_dir)
+        try:
+            conn.commit()
+        except Exception:
+            if previous:
+                manifest[partition.name] = previous
+            else:
+                del manifest[partition.name]
+            save_manifest(manifest, archive_dir)
+            raise
+        return entry
+    except Exception:
+        conn.rollback()
+        partial.unlink(missing_ok=True)
+        raise
+    finally:
+        conn.close()
+
+
+def verify_archive(entry: ArchiveEntry, archive_dir: Path = ARCHIVE_DIR) -> Optional[str]:
+    """None if the file matches its manifest entry, else what is wrong"""
+    path = archive_dir / entry.path
+    if not path.exists():
+        return f"{path} is missing"
+    if file_sha256(path) != entry.sha256:
+        return f"{path} does not match its recorded sha256"
+    rows = _pyarrow().parquet.ParquetFile(path).metadata.num_rows
+    if rows != entry.rows:
+        return f"{path} holds {rows:,} rows, the manifest says {entry.rows:,}"
+    return None
+
+
+def _copy_text(path: Path, columns: List[str]) -> Iterator[str]:
+    parquet = _pyarrow().parquet.ParquetFile(path)
+    for batch in parquet.iter_batches(batch_size=BATCH_ROWS, columns=columns):
+        values = [batch.column(name).to_pylist() for name in columns]
+        yield "".join("\t".join(_copy_value(value) for value in row) + "\n" for row in zip(*values))
+
+
+def restore_partition(dsn: str, entry: ArchiveEntry, archive_dir: Path = ARCHIVE_DIR) -> int:
+    """
+    Copy an archived month back into a new table and attach it as the
+    month's partition again. The archive file and its manifest entry are
+    kept. Returns the rows restored.
+    """
+    problem = verify_archive(entry, archive_dir)
+    if problem:
+        raise RuntimeError(problem)
+
+    name = entry.partition.split(".", 1)[1]
+    columns = [column for column, _ in entry.columns]
+    conn = connect(dsn)
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT to_regclass(%s)", (entry.partition,))
+            if cur.fetchone()[0]:
+                raise RuntimeError(f"{entry.partition} already exists")
+            cur.execute(
+                f"CREATE TABLE partitions.{name} "
+                f"(LIKE public.{entry.table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+            )
+        rows = copy_chunks(conn, f"partitions.{name}", tuple(columns),
+                           _copy_text(archive_dir / entry.path, columns))
+        if rows != entry.rows:
+            raise RuntimeError(f"{entry.partition}: restored {rows:,} rows of {entry.rows:,}")
+        with conn.cursor() as cur:
+            cur.execute(f"SET LOCAL lock_timeout = '{LOCK_TIMEOUT}'")
+            cur.execute(
+                f"ALTER TABLE public.{entry.table} ATTACH PARTITION partitions.{name} "
+                "FOR VALUES FROM (%s) TO (%s)",
+                (entry.lower, entry.upper)
+            )
+            cur.execute(f"ALTER TABLE partitions.{name} ENABLE ROW LEVEL SECURITY")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    manifest = load_manifest(archive_dir)
+    entry.restored_at = datetime.now(timezone.utc).isoformat()
+    manifest[entry.partition] = entry
+    save_manifest(manifest, archive_dir)
+    return rows
+
+
+def query_archives(table: str, since: Optional[datetime] = None, until: Optional[datetime] = None,
+                   where: Optional[Dict[str, str]] = None, columns: Optional[List[str]] = None,
+                   archive_dir: Path = ARCHIVE_DIR) -> Iterator[dict]:
+    """
+    Rows of `table` archived for [since, until) whose columns equal the
+    `where` values, read straight from the Parquet files. Only the months
+    overlapping the window are opened, and filters are pushed down to the
+    row groups.
+    """
+    pa = _pyarrow()
+    ds = pa.dataset
+    entries = [
+        entry for entry in load_manifest(archive_dir).values()
+        if entry.table == table
+        and (since is None or entry.upper > since)
+        and (until is None or entry.lower < until)
+    ]
+    if not entries:
+        return
+    dataset = ds.dataset([str(archive_dir / entry.path) for entry in sorted(entries, key=lambda e: e.month)],
+                         format="parquet")
+
+    clauses = []
+    if since is not None:
+        clauses.append(ds.field("created_at") >= pa.scalar(since, type=pa.timestamp("us", tz="UTC")))
+    if until is not None:
+        clauses.append(ds.field("created_at") < pa.scalar(until, type=pa.timestamp("us", tz="UTC")))
+    for name, value in (where or {}).items():
+        if name not in dataset.schema.names:
+            raise RuntimeError(f"{table} archives have no column {name!r}")
+        clauses.append(ds.field(name) == pa.scalar(value).cast(dataset.schema.field(name).type))
+    condition = None
+    for clause in clauses:
+        condition = clause if condition is None else condition & clause
+
+    for batch in dataset.to_batches(columns=columns, filter=condition, batch_size=BATCH_ROWS):
+        yield from batch.to_pylist()
@@ -0,0 +1,289 @@
+"""
+Concurrent preflight for the deploy scripts
+
+Before a deploy does any work it needs to know which credentials are
+available, whether the Supabase CLI is logged in, whether psql and a
+PostgreSQL driver are installed, and whether the database, the REST API
+and the Management API answer. The checks are independent, so they run
+side by side and cost roughly the slowest one instead of their sum.
+
+Passing results are cached in .deploy-state/preflight.json for a while
+(hours for CLI login and tool discovery, minutes for reachability), so a
+repeat run skips the `npx supabase` cold start and goes straight to work.
+Only facts are cached, never a credential: each entry is keyed by a
+fingerprint of what it was checked against (PATH, the target URL, a hash of
+the key), so changing any of those re-runs the check. Failures are never
+cached.
+"""
+
+import hashlib
+import os
+import shutil
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from supabase_tools.client import TIMEOUTS, SupabaseClient
+from supabase_tools.concurrency import DEFAULT_CONCURRENCY, run_concurrently
+from supabase_tools.config import SUPABASE_URL, env_file_values
+from supabase_tools.db import connect
+from supabase_tools.state import load_json, save_json, state_path
+
+PREFLIGHT_PATH = state_path("preflight.json")
+# Seconds a passing check is trusted
+TTL = {
+    "tools": 24 * 3600,
+    "cli_auth": 6 * 3600,
+    "database": 300,
+    "rest": 300,
+    "management": 300,
+}
+CLI_TIMEOUT = 10
+DB_TIMEOUT = 5
+# Where `npx supabase login` keeps its token; logging in or out changes it
+CLI_TOKEN_PATH = Path.home() / ".supabase" / "access-token"
+
+
+@dataclass
+class Credentials:
+    """What the environment and .env provide; `sources` says where from"""
+    service_key: Optional[str] = None
+    access_token: Optional[str] = None
+    database_url: Optional[str] = None
+    sources: Dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class Check:
+    name: str
+    ok: bool
+    detail: str = ""
+    data: dict = field(default_factory=dict)
+    elapsed: float = 0.0
+    age: Optional[float] = None     # seconds since it was cached, if it was
+    skipped: bool = False           # nothing to check against
+
+    @property
+    def cached(self) -> bool:
+        return self.age is not None
+
+
+def find_credentials() -> Credentials:
+    """
+    Read credentials from the environment, then .env. For the service role
+    key any .env line mentioning SERVICE_ROLE or SERVICEKEY counts, as the
+    deploy script has always accepted.
+    """
+    dotenv = env_file_values()
+    credentials = Credentials()
+    wanted = {
+        "service_key": ("SUPABASE_SERVICE_ROLE_KEY",),
+        "access_token": ("SUPABASE_ACCESS_TOKEN",),
+        "database_url": ("DATABASE_URL", "SUPABASE_DB_URL"),
+    }
+    for attribute, names in wanted.items():
+        for name in names:
+            for source, values in (("environment", os.environ), (".env", dotenv)):
+                if not getattr(credentials, attribute) and values.get(name):
+                    setattr(credentials, attribute, values[name])
+                    credentials.sources[attribute] = source
+    if not credentials.service_key:
+        for name, value in dotenv.items():
+            if value and ("SERVICE_ROLE" in name.upper() or "SERVICEKEY" in name.upper()):
+                credentials.service_key = value
+                credentials.sources["service_key"] = f".env ({name})"
+                break
+    return credentials
+
+
+def _fingerprint(*parts: Optional[str]) -> str:
+    return hashlib.sha256("\0".join(part or "" for part in parts).encode()).hexdigest()[:16]
+
+
+def discover_tools() -> Tuple[bool, str, dict]:
+    """psql and npx on PATH, and which PostgreSQL driver imports"""
+    driver = None
+    for module in ("psycopg2", "psycopg"):
+        try:
+            __import__(module)
+        except ImportError:
+            continue
+        driver = module
+        break
+    data = {"psql": shutil.which("psql"), "npx": shutil.which("npx"), "driver": driver}
+    found = [name for name in ("psql", "npx", "driver") if data[name]]
+    missing = [name for name in ("psql", "npx", "driver") if not data[name]]
+    detail = ", ".join(f"{name} {data[name] if name == 'driver' else 'found'}" for name in found)
+    if missing:
+        detail += (", " if detail else "") + "no " + ", no ".join(missing)
+    return True, detail, data
+
+
+def cli_logged_in() -> Tuple[bool, str, dict]:
+    """`npx supabase projects list` only succeeds with a logged-in CLI"""
+    try:
+        result = subprocess.run(
+            ["npx", "supabase", "projects", "list"],
+            capture_output=True,
+            text=True,
+            timeout=CLI_TIMEOUT
+        )
+    except FileNotFoundError:
+        return False, "npx not installed", {}
+    except subprocess.TimeoutExpired:
+        return False, f"no answer in {CLI_TIMEOUT}s", {}
+    if result.returncode != 0:
+        return False, "not logged in", {}
+    return True, "logged in", {}
+
+
+def _describe(error: BaseException) -> str:
+    """First line of an error, short enough for one status line"""
+    text = str(error).strip().splitlines()
+    return f"{type(error).__name__}: {text[0][:100]}" if text else type(error).__name__
+
+
+def _database(dsn: str) -> Tuple[bool, str, dict]:
+    try:
+        conn = connect(dsn, timeout=DB_TIMEOUT)
+    except Exception as e:
+        return False, _describe(e), {}
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SHOW server_version")
+            version = cur.fetchone()[0]
+    finally:
+        conn.close()
+    return True, f"PostgreSQL {version}", {}
+
+
+def _rest(client: SupabaseClient) -> Tuple[bool, str, dict]:
+    response = client.rest("GET", "licensed_games", params={"select": "id", "limit": 1},
+                           timeout=TIMEOUTS["probe"], retry=False)
+    return response.status_code == 200, f"HTTP {response.status_code}", {}
+
+
+def _management(client: SupabaseClient) -> Tuple[bool, str, dict]:
+    response = client.management("GET", timeout=TIMEOUTS["probe"], retry=False)
+    return response.status_code == 200, f"HTTP {response.status_code}", {}
+
+
+class Preflight:
+    """Credentials, check results and the client the checks warmed up"""
+
+    def __init__(self, credentials: Credentials, checks: Dict[str, Check], client: SupabaseClient):
+        self.credentials = credentials
+        self.checks = checks
+        self.client = client
+
+    def passed(self, name: str) -> bool:
+        check = self.checks.get(name)
+        return bool(check and check.ok)
+
+    @property
+    def cli_authenticated(self) -> bool:
+        return self.passed("cli_auth")
+
+    @property
+    def psql(self) -> Optional[str]:
+        return self.checks["tools"].data.get("psql")
+
+    @property
+    def driver(self) -> Optional[str]:
+        return self.checks["tools"].data.get("driver")
+
+    def client_for(self, service_key: Optional[str], access_token: Optional[str],
+                   pool_size: int) -> SupabaseClient:
+        """The preflight's client if the credentials are still the same, else a new one"""
+        if (service_key, access_token) == (self.client.service_key, self.client.access_token):
+            self.client.resize_pool(pool_size)
+            return self.client
+        self.client.close()
+        return SupabaseClient(service_key, access_token, pool_size=pool_size)
+
+
+def run_preflight(credentials: Optional[Credentials] = None, refresh: bool = False,
+                  concurrency: int = DEFAULT_CONCURRENCY, path: Path = PREFLIGHT_PATH) -> Preflight:
+    """
+    Run every check not fresh in the cache, concurrently. `refresh` ignores
+    the cache. A check with nothing to check against is reported as skipped.
+    """
+    credentials = credentials or find_credentials()
+    client = SupabaseClient(credentials.service_key, credentials.access_token, pool_size=concurrency)
+    try:
+        cli_token_mtime = str(CLI_TOKEN_PATH.stat().st_mtime)
+    except OSError:
+        cli_token_mtime = ""
+
+    # name: (fingerprint, check, reason it can't run)
+    plan: Dict[str, Tuple[str, Optional[Callable[[], Tuple[bool, str, dict]]], str]] = {
+        "tools": (_fingerprint(os.environ.get("PATH"), sys.executable), discover_tools, ""),
+        "cli_auth": (
+            _fingerprint(shutil.which("npx"), cli_token_mtime),
+            None if credentials.access_token else cli_logged_in,
+            "access token given",
+        ),
+        "database": (
+            _fingerprint(credentials.database_url),
+            (lambda: _database(credentials.database_url)) if credentials.database_url else None,
+            "no database URL",
+        ),
+        "rest": (
+            _fingerprint(SUPABASE_URL, credentials.service_key),
+            (lambda: _rest(client)) if credentials.service_key else None,
+            "no service role key",
+        ),
+        "management": (
+            _fingerprint(credentials.access_token or credentials.service_key),
+            (lambda: _management(client)) if credentials.access_token else None,
+            "no access token",
+        ),
+    }
+
+    cache = {} if refresh else load_json(path, {})
+    now = time.time()
+    checks: Dict[str, Check] = {}
+    pending: List[str] = []
+    for name, (fingerprint, check, reason) in plan.items():
+        entry = cache.get(name) or {}
+        if check is None:
+            checks[name] = Check(name, False, reason, skipped=True)
+        elif entry.get("fingerprint") == fingerprint and now - entry.get("checked_at", 0) < TTL[name]:
+            checks[name] = Check(name, True, entry.get("detail", ""), entry.get("data", {}),
+                                 age=now - entry["checked_at"])
+        else:
+            pending.append(name)
+
+    for outcome in run_concurrently(lambda name: plan[name][1](), pending, concurrency):
+        name = outcome.item
+        if outcome.ok:
+            ok, detail, data = outcome.value
+        else:
+            ok, detail, data = False, _describe(outcome.error), {}
+        checks[name] = Check(name, ok, detail, data, outcome.elapsed)
+
+    fresh = {name: checks[name] for name in pending if checks[name].ok}
+    if fresh or refresh:
+        saved = {name: entry for name, entry in cache.items() if name in plan and name not in pending}
+        for name, check in fresh.items():
+            saved[name] = {"fingerprint": plan[name][0], "checked_at": now,
+                           "detail": check.detail, "data": check.data}
+        save_json(path, saved)
+
+    return Preflight(credentials, {name: checks[name] for name in plan}, client)
+
+
+def print_preflight(preflight: Preflight) -> None:
+    """One line per check in the scripts' usual format"""
+    for source_name, label in (("service_key", "Service role key"), ("access_token", "Access token"),
+                               ("database_url", "Database URL")):
+        source = preflight.credentials.sources.get(source_name)
+        print(f"   {'✅' if source else '➖'} {label}" + (f" (from {source})" if source else ""))
+    for check in preflight.checks.values():
+        mark = "➖" if check.skipped else "✅" if check.ok else "⚠️ "
+        when = f", cached {check.age / 60:.0f} min ago" if check.cached else \
+               "" if check.skipped else f", {check.elapsed:.1f}s"
+        print(f"   {mark} {check.name}: {check.detail}{when}")
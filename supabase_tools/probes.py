@@ -0,0 +1,50 @@
+"""
+Post-deploy reachability probes
+
+Each probe returns the line the deploy scripts print: ✅ when the target
+answered as expected, ⚠️ otherwise. They never raise, so a batch can run
+through run_concurrently and be reported in order.
+"""
+
+from typing import Callable, List, Tuple
+
+from supabase_tools.client import TIMEOUTS, SupabaseClient
+
+
+def probe_games_table(client: SupabaseClient) -> str:
+    """Check the games table is reachable with the service role key"""
+    try:
+        response = client.rest(
+            "GET", "licensed_games",
+            params={"select": "id", "limit": 1},
+            timeout=TIMEOUTS["probe"]
+        )
+        if response.status_code == 200:
+            data = response.json()
+            return f"✅ Games table accessible ({len(data)} games found)"
+        return f"⚠️  Games table returned HTTP {response.status_code}"
+    except Exception as e:
+        return f"⚠️  Could not verify games: {e}"
+
+
+def probe_function(client: SupabaseClient, func_name: str) -> str:
+    """Check an edge function answers (anything but 404 means deployed)"""
+    try:
+        # CORS preflight: every function answers it without running its body
+        response = client.function(func_name, method="OPTIONS", endpoint="probe")
+        if response.status_code != 404:
+            return f"✅ Function '{func_name}' is responding (HTTP {response.status_code})"
+        return f"⚠️  Function '{func_name}' returned 404 (not deployed)"
+    except Exception as e:
+        return f"⚠️  Could not test {func_name}: {e}"
+
+
+def deploy_probes(functions: List[str], games_table: bool = True) -> List[Tuple[str, Callable[[SupabaseClient], str]]]:
+    """(name, probe) for the games table and every function"""
+    probes = [("licensed_games", probe_games_table)] if games_table else []
+    probes += [(name, lambda client, name=name: probe_function(client, name)) for name in functions]
+    return probes
+
+
+def probe_passed(line: str) -> bool:
+    return line.startswith("✅")
@@ -0,0 +1,430 @@
+"""
+Query-plan regression checks for the database hot paths
+
+A scratch database gets every schema source the project deploys
+(supabase/migrations, REAL_MONEY_COMPLETE_MIGRATION.sql and
+SUPABASE_PERFORMANCE_SECURITY.sql) and is seeded with generate_series to a
+realistic volume. Each query in HOT_QUERIES is then run under
+EXPLAIN (ANALYZE, BUFFERS) and its plan shape, buffer count and timing are
+compared with data/plan_baselines.json.
+
+A sequential scan over one of a query's tables always fails, whatever the
+baseline says. So does a changed plan shape, or buffers or time growing past
+the tolerances. Timings depend on the machine, so keep a generous tolerance
+when the baselines were recorded elsewhere.
+"""
+
+import hashlib
+import json
+import re
+import statistics
+import uuid
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from supabase_tools.config import PROJECT_DIR
+from supabase_tools.db import connect
+from supabase_tools.migrations import Migration, discover_migrations
+from supabase_tools.partitions import TABLES as PARTITIONED_TABLES
+from supabase_tools.state import load_json, save_json
+
+BASELINES_PATH = Path(__file__).resolve().parent / "data" / "plan_baselines.json"
+SCHEMA_FILES = [
+    PROJECT_DIR / "REAL_MONEY_COMPLETE_MIGRATION.sql",
+    PROJECT_DIR / "SUPABASE_PERFORMANCE_SECURITY.sql",
+]
+# The first migration written after the root SQL files
+ROOT_FILES_BEFORE = "20251221000000"
+
+DEFAULT_SCALE = 1.0
+DEFAULT_RUNS = 5
+BUFFER_TOLERANCE = 1.5
+BUFFER_SLACK = 16
+TIME_TOLERANCE = 3.0
+TIME_SLACK_MS = 2.0
+
+# Rows per table at scale 1.0
+SEED_ROWS = {
+    "users": 20_000,
+    "game_spins": 1_000_000,
+    "game_sessions": 200_000,
+    "rate_limit_logs": 500_000,
+    "rate_limit_counters": 200_000,
+    "licensed_games": 3_000,
+}
+
+_PARTITION_NAME = re.compile(rf"^({'|'.join(PARTITIONED_TABLES)})_(?:p\d{{6}}|default)")
+_INDEX_STATEMENT = re.compile(
+    r"^(?:\s|--[^\n]*(?:\n|$))*CREATE\s+(?:UNIQUE\s+)?INDEX\b", re.IGNORECASE
+)
+
+
+@dataclass(frozen=True)
+class HotQuery:
+    name: str
+    description: str
+    sql: str
+    # Relations that must be reached through an index
+    tables: Tuple[str, ...]
+
+
+HOT_QUERIES = [
+    HotQuery(
+        "game_spins_user_history",
+        "A player's latest spins (game history page)",
+        """SELECT id, game_id, wager, win_amount, created_at
+           FROM public.game_spins
+           WHERE user_id = %(user_id)s
+           ORDER BY created_at DESC
+           LIMIT 50""",
+        ("game_spins",),
+    ),
+    HotQuery(
+        "rate_limit_counters_window",
+        "check_rate_limit: weighted sum over the window's buckets",
+        """SELECT COALESCE(SUM(
+                    hits * LEAST(1.0, EXTRACT(EPOCH FROM
+                      bucket_start + INTERVAL '10 seconds' - (now() - INTERVAL '60 seconds')
+                    ) / 10.0)
+                  ), 0) < 60
+           FROM public.rate_limit_counters
+           WHERE user_id = %(user_id)s
+             AND action_type = 'spin'
+             AND bucket_start > now() - INTERVAL '70 seconds'""",
+        ("rate_limit_counters",),
+    ),
+    HotQuery(
+        "weekly_digest_player_sessions",
+        "weekly-digest: one player's sessions in the last seven days",
+        """SELECT *
+           FROM public.game_sessions
+           WHERE user_id = %(user_id)s
+             AND start_time >= now() - INTERVAL '7 days'
+           ORDER BY start_time DESC""",
+        ("game_sessions",),
+    ),
+    HotQuery(
+        "licensed_games_catalogue",
+        "Lobby: active games in one category",
+        """SELECT id, game_code, name, thumbnail_url
+           FROM public.licensed_games
+           WHERE status = 'active' AND category = %(category)s
+           ORDER BY name""",
+        ("licensed_games",),
+    ),
+    HotQuery(
+        "wager_balance_lock",
+        "process_wager_transaction: lock the player's balance row",
+        """SELECT total_balance_aud
+           FROM public.users
+           WHERE id = %(user_id)s
+           FOR UPDATE""",
+        ("users",),
+    ),
+]
+
+
+def player_id(n: int) -> str:
+    """UUID of seeded player n, the same value as md5('plan-player-' || n)::uuid"""
+    return str(uuid.UUID(hashlib.md5(f"plan-player-{n}".encode()).hexdigest()))
+
+
+# Player 1 is the busiest under the seeding skew; 'live' is a small category
+DEFAULT_PARAMS = {"user_id": player_id(1), "category": "live"}
+
+
+def schema_sources() -> List[Migration]:
+    """
+    In the order they were written: the migrations REAL_MONEY_COMPLETE_MIGRATION.sql
+    consolidates, the root SQL files, then the migrations written against
+    them (partitioning needs the game_spins only the root file creates).
+    """
+    migrations = discover_migrations()
+    return ([m for m in migrations if m.path.name < ROOT_FILES_BEFORE]
+            + [Migration.from_path(path) for path in SCHEMA_FILES]
+            + [m for m in migrations if m.path.name >= ROOT_FILES_BEFORE])
+
+
+def build_schema(dsn: str, sources: List[Migration]) -> List[dict]:
+    """
+    Apply every statement one at a time, then keep retrying the failures
+    until a pass makes no progress: the files overlap and are not ordered
+    by dependency, so a statement can need a table a later file creates.
+    Returns the statements that never applied.
+    """
+    pending = [(source.name, statement) for source in sources for statement in source.statements()]
+    failures = []
+    conn = connect(dsn, autocommit=True)
+    try:
+        with conn.cursor() as cur:
+            while pending:
+                failures = []
+                for name, statement in pending:
+                    try:
+                        cur.execute(statement)
+                    except Exception as e:
+                        failures.append({
+                            "source": name,
+                            "statement": statement,
+                            "error": str(e).strip().splitlines()[0],
+                            "index": bool(_INDEX_STATEMENT.match(statement)),
+                        })
+                if len(failures) == len(pending):
+                    break
+                pending = [(failure["source"], failure["statement"]) for failure in failures]
+    finally:
+        conn.close()
+    return failures
+
+
+def _column_type(cur, table: str, column: str) -> str:
+    cur.execute(
+        """SELECT format_type(atttypid, atttypmod) FROM pg_attribute
+           WHERE attrelid = %s::regclass AND attname = %s""",
+        (table, column)
+    )
+    return cur.fetchone()[0]
+
+
+def seed(dsn: str, scale: float = DEFAULT_SCALE) -> Dict[str, int]:
+    """
+    Fill the hot tables. Player activity is skewed (random()^3 over player
+    numbers), so player 1 has tens of thousands of spins like a real whale.
+    Returns the row count of each table.
+    """
+    rows = {table: max(1, int(count * scale)) for table, count in SEED_ROWS.items()}
+    players = rows["users"]
+    pick_player = f"md5('plan-player-' || (1 + floor({players} * random() ^ 3))::int)::uuid"
+
+    statements = [
+        f"""INSERT INTO auth.users (id, email, raw_user_meta_data)
+            SELECT md5('plan-player-' || i)::uuid, 'player' || i || '@example.com',
+                   jsonb_build_object('display_name', 'Player ' || i)
+            FROM generate_series(1, {players}) AS i""",
+        f"""INSERT INTO public.users (id, display_name, referral_code, total_balance_aud)
+            SELECT md5('plan-player-' || i)::uuid, 'Player ' || i, 'P' || i, 100
+            FROM generate_series(1, {players}) AS i""",
+        f"""INSERT INTO public.game_spins
+              (user_id, game_id, spin_index, wager, outcome_json, win_amount,
+               rng_seed, balance_before, balance_after, created_at)
+            SELECT {pick_player}, 'game-' || (i % 200), i, 1, '{{}}'::jsonb,
+                   CASE WHEN i % 4 = 0 THEN 2 ELSE 0 END, md5(i::text), 100, 100,
+                   now() - random() * INTERVAL '90 days'
+            FROM generate_series(1, {rows['game_spins']}) AS i""",
+        f"""INSERT INTO public.game_sessions
+              (user_id, game_id, start_time, end_time, wager_amount, payout_amount)
+            SELECT {pick_player}, 'game-' || (i % 200), t, t + INTERVAL '10 minutes', 20, 19
+            FROM (SELECT i, now() - random() * INTERVAL '90 days' AS t
+                  FROM generate_series(1, {rows['game_sessions']}) AS i) AS s""",
+        f"""INSERT INTO public.rate_limit_logs (user_id, action_type, ip_address, created_at)
+            SELECT {pick_player}, 'spin', '10.0.0.1', now() - random() * INTERVAL '7 days'
+            FROM generate_series(1, {rows['rate_limit_logs']}) AS i""",
+        # Every player's last few minutes of 10-second buckets
+        f"""INSERT INTO public.rate_limit_counters (user_id, action_type, bucket_start, hits)
+            SELECT md5('plan-player-' || (1 + i % {players}))::uuid, 'spin',
+                   to_timestamp(floor(EXTRACT(EPOCH FROM now()) / 10) * 10 - 10 * (i / {players})),
+                   1 + i % 7
+            FROM generate_series(0, {rows['rate_limit_counters'] - 1}) AS i""",
+    ]
+
+    conn = connect(dsn, autocommit=True)
+    try:
+        with conn.cursor() as cur:
+            # Skip the signup trigger, whose random referral codes collide
+            # at this volume, and the other per-row triggers
+            cur.execute("SET session_replication_role = replica")
+            # The seeded history spans 90 days of monthly partitions
+            cur.execute("SELECT to_regprocedure('public.create_monthly_partitions(text, timestamptz, timestamptz)')")
+            if cur.fetchone()[0]:
+                for table in ("game_spins", "rate_limit_logs"):
+                    cur.execute("SELECT public.create_monthly_partitions(%s, now() - INTERVAL '90 days', now())",
+                                (table,))
+            status_type = _column_type(cur, "public.licensed_games", "status")
+            statements.append(f"""INSERT INTO public.licensed_games
+                  (game_code, name, category, status)
+                SELECT 'plan-game-' || i, 'Game ' || i,
+                       CASE WHEN i % 100 < 80 THEN 'slots' WHEN i % 100 < 88 THEN 'table'
+                            WHEN i % 100 < 95 THEN 'live' ELSE 'crash' END,
+                       (CASE WHEN i % 10 < 8 THEN 'active' ELSE 'disabled' END)::text::{status_type}
+                FROM generate_series(1, {rows['licensed_games']}) AS i""")
+            for statement in statements:
+                cur.execute(statement)
+            for table in rows:
+                cur.execute(f"VACUUM ANALYZE public.{table}")
+            counts = {}
+            for table in rows:
+                cur.execute(f"SELECT COUNT(*) FROM public.{table}")
+                counts[table] = cur.fetchone()[0]
+    finally:
+        conn.close()
+    return counts
+
+
+@dataclass
+class PlanSummary:
+    shape: List[str]
+    seq_scans: List[str]
+    shared_hit: int
+    shared_read: int
+    execution_ms: float
+    planning_ms: float
+    rows: int
+
+    @property
+    def buffers(self) -> int:
+        return self.shared_hit + self.shared_read
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "PlanSummary":
+        return cls(**{name: data[name] for name in cls.__dataclass_fields__})
+
+
+def _parent_name(name: str) -> str:
+    """game_spins_p202501 (and its indexes) under the parent table's name"""
+    return _PARTITION_NAME.sub(r"\1", name)
+
+
+def _walk(node: dict, depth: int, shape: List[str], seq_scans: List[str]) -> None:
+    label = node["Node Type"]
+    if node.get("Index Name"):
+        label += f" using {_parent_name(node['Index Name'])}"
+    if node.get("Relation Name"):
+        relation = _parent_name(node["Relation Name"])
+        label += f" on {relation}"
+        # An empty (e.g. next month's) partition is seq scanned without
+        # touching a page, which is no regression
+        touched = node.get("Shared Hit Blocks", 0) + node.get("Shared Read Blocks", 0)
+        if node["Node Type"] == "Seq Scan" and touched:
+            seq_scans.append(relation)
+    shape.append("  " * depth + label)
+    # How many monthly partitions an Append visits depends on the date,
+    # so partitions with the same plan are listed once
+    seen = set()
+    for child in node.get("Plans", []):
+        child_shape = []
+        _walk(child, depth + 1, child_shape, seq_scans)
+        if tuple(child_shape) not in seen:
+            seen.add(tuple(child_shape))
+            shape.extend(child_shape)
+
+
+def summarize(explain_output) -> PlanSummary:
+    """Reduce EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) output to what is compared"""
+    if isinstance(explain_output, str):
+        explain_output = json.loads(explain_output)
+    root = explain_output[0]
+    plan = root["Plan"]
+    shape, seq_scans = [], []
+    _walk(plan, 0, shape, seq_scans)
+    return PlanSummary(
+        shape=shape,
+        seq_scans=seq_scans,
+        shared_hit=plan.get("Shared Hit Blocks", 0),
+        shared_read=plan.get("Shared Read Blocks", 0),
+        execution_ms=round(root.get("Execution Time", 0.0), 3),
+        planning_ms=round(root.get("Planning Time", 0.0), 3),
+        rows=plan.get("Actual Rows", 0),
+    )
+
+
+def explain(dsn: str, queries: List[HotQuery], params: Optional[dict] = None,
+            runs: int = DEFAULT_RUNS) -> Dict[str, PlanSummary]:
+    """
+    Run each query once to warm the cache, then `runs` times under EXPLAIN
+    ANALYZE; keeps the last plan with the median execution time. Every run
+    is rolled back, so FOR UPDATE locks and writes never persist.
+    """
+    params = {**DEFAULT_PARAMS, **(params or {})}
+    summaries = {}
+    conn = connect(dsn)
+    try:
+        with conn.cursor() as cur:
+            for query in queries:
+                cur.execute(query.sql, params)
+                conn.rollback()
+                timings = []
+                for _ in range(max(1, runs)):
+                    cur.execute(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {query.sql}", params)
+                    summary = summarize(cur.fetchone()[0])
+                    conn.rollback()
+                    timings.append(summary.execution_ms)
+                summary.execution_ms = round(statistics.median(timings), 3)
+                summaries[query.name] = summary
+    finally:
+        conn.close()
+    return summaries
+
+
+def server_version(dsn: str) -> str:
+    conn = connect(dsn, autocommit=True)
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SHOW server_version")
+            return cur.fetchone()[0]
+    finally:
+        conn.close()
+
+
+@dataclass
+class QueryCheck:
+    query: HotQuery
+    summary: PlanSummary
+    baseline: Optional[PlanSummary]
+    problems: List[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.problems
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.query.name,
+            "ok": self.ok,
+            "problems": self.problems,
+            "plan": self.summary.to_dict(),
+            "baseline": self.baseline.to_dict() if self.baseline else None,
+        }
+
+
+def check_query(query: HotQuery, summary: PlanSummary, baseline: Optional[PlanSummary],
+                compare_costs: bool = True, time_tolerance: float = TIME_TOLERANCE) -> QueryCheck:
+    check = QueryCheck(query, summary, baseline)
+    for table in summary.seq_scans:
+        if table in query.tables:
+            check.problems.append(f"sequential scan on {table}")
+    if baseline is None:
+        return check
+
+    if summary.shape != baseline.shape:
+        check.problems.append("plan changed")
+    if compare_costs:
+        buffer_limit = baseline.buffers * BUFFER_TOLERANCE + BUFFER_SLACK
+        if summary.buffers > buffer_limit:
+            check.problems.append(
+                f"{summary.buffers} buffers, baseline {baseline.buffers}"
+            )
+        time_limit = baseline.execution_ms * time_tolerance + TIME_SLACK_MS
+        if summary.execution_ms > time_limit:
+            check.problems.append(
+                f"{summary.execution_ms:.2f}ms, baseline {baseline.execution_ms:.2f}ms"
+            )
+    return check
+
+
+def load_baselines(path: Path = BASELINES_PATH) -> dict:
+    return load_json(path, {"scale": None, "server_version": None, "queries": {}})
+
+
+def baseline_for(baselines: dict, name: str) -> Optional[PlanSummary]:
+    entry = baselines.get("queries", {}).get(name)
+    return PlanSummary.from_dict(entry) if entry else None
+
+
+def save_baselines(queries: Dict[str, dict], scale: float, version: str,
+                   path: Path = BASELINES_PATH) -> None:
+    """`queries` maps query names to PlanSummary.to_dict() output"""
+    save_json(path, {"scale": scale, "server_version": version, "queries": queries})
@@ -0,0 +1,536 @@
+"""
+Minimal PostgREST-compatible HTTP shim over a local database
+
+Serves /rest/v1/<table> (GET, POST incl. upsert, PATCH, DELETE) and
+/rest/v1/rpc/<function> for the public schema, enough for the deploy and
+maintenance scripts to run against SUPABASE_URL=http://127.0.0.1:<port>.
+
+Supported: select lists (columns, alias:column, count), horizontal filters
+(eq, neq, gt, gte, lt, lte, like, ilike, is, in, not.<op>, or/and trees),
+order, limit, offset, Prefer return/resolution/count and on_conflict.
+Embedded resources are not. Every request acts as service_role (RLS is
+bypassed); a bearer JWT's claims are exposed to auth.uid() unverified.
+"""
+
+import base64
+import json
+import queue
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+from supabase_tools.db import connect
+
+DEFAULT_POOL_SIZE = 8
+RESERVED_PARAMS = {"select", "order", "limit", "offset", "on_conflict", "columns"}
+
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+_OPERATORS = {
+    "eq": "=", "neq": "<>", "gt": ">", "gte": ">=", "lt": "<", "lte": "<=",
+    "like": "LIKE", "ilike": "ILIKE",
+}
+_IS_VALUES = {"null": "NULL", "true": "TRUE", "false": "FALSE", "unknown": "UNKNOWN"}
+
+# SQLSTATE -> HTTP status, following PostgREST's mapping
+_STATUS_BY_SQLSTATE = {
+    "23505": 409, "23503": 409, "42P01": 404, "42883": 404,
+    "42501": 403, "42703": 400, "P0001": 400,
+}
+
+
+class ShimError(Exception):
+    """A request the shim rejects before it reaches the database"""
+
+    def __init__(self, status: int, message: str, code: str = "PGRST100"):
+        self.status = status
+        self.code = code
+        super().__init__(message)
+
+
+def quote_ident(name: str) -> str:
+    if not _IDENTIFIER.match(name):
+        raise ShimError(400, f'"{name}" is not a supported column or table name')
+    return f'"{name}"'
+
+
+def _split_top_level(text: str) -> List[str]:
+    """Split on commas outside parentheses and double quotes"""
+    parts, depth, quoted, start = [], 0, False, 0
+    for i, c in enumerate(text):
+        if c == '"':
+            quoted = not quoted
+        elif quoted:
+            continue
+        elif c == "(":
+            depth += 1
+        elif c == ")":
+            depth -= 1
+        elif c == "," and depth == 0:
+            parts.append(text[start:i])
+            start = i + 1
+    parts.append(text[start:])
+    return [part for part in parts if part != ""]
+
+
+def _unquote(value: str) -> str:
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        return value[1:-1].replace('\\"', '"')
+    return value
+
+
+def _condition(column: str, expression: str, params: list, quoted: bool = False) -> str:
+    """SQL for one `column=op.value` filter; inside or/and trees values may be quoted"""
+    negate = expression.startswith("not.")
+    if negate:
+        expression = expression[4:]
+    op, _, value = expression.partition(".")
+    if quoted and op != "in":
+        value = _unquote(value)
+    target = f"_t.{quote_ident(column)}"
+
+    if op in _OPERATORS:
+        if op in ("like", "ilike"):
+            value = value.replace("*", "%")
+        params.append(value)
+        sql = f"{target} {_OPERATORS[op]} %s"
+    elif op == "is":
+        if value.lower() not in _IS_VALUES:
+            raise ShimError(400, f"unsupported is.{value}")
+        sql = f"{target} IS {_IS_VALUES[value.lower()]}"
+    elif op == "in":
+        if not (value.startswith("(") and value.endswith(")")):
+            raise ShimError(400, f"in filter must be parenthesised: {value}")
+        items = [_unquote(item) for item in _split_top_level(value[1:-1])]
+        if not items:
+            sql = "FALSE"
+        else:
+            params.extend(items)
+            sql = f"{target} IN ({', '.join(['%s'] * len(items))})"
+    else:
+        raise ShimError(400, f"unsupported operator: {op}")
+    return f"NOT ({sql})" if negate else sql
+
+
+def _logic_tree(joiner: str, body: str, params: list) -> str:
+    """SQL for or=(...)/and=(...) with nested and(...)/or(...) groups"""
+    if not (body.startswith("(") and body.endswith(")")):
+        raise ShimError(400, f"{joiner} filter must be parenthesised")
+    clauses = []
+    for item in _split_top_level(body[1:-1]):
+        negate = item.startswith("not.")
+        if negate:
+            item = item[4:]
+        nested = re.match(r"^(and|or)(\(.*\))$", item)
+        if nested:
+            clause = _logic_tree(nested.group(1), nested.group(2), params)
+        else:
+            column, _, expression = item.partition(".")
+            clause = _condition(column, expression, params, quoted=True)
+        clauses.append(f"NOT ({clause})" if negate else clause)
+    return "(" + f" {joiner.upper()} ".join(clauses) + ")"
+
+
+def build_where(query: List[Tuple[str, str]], params: list) -> str:
+    clauses = []
+    for key, value in query:
+        if key in RESERVED_PARAMS:
+            continue
+        if key in ("or", "and", "not.or", "not.and"):
+            negate = key.startswith("not.")
+            clause = _logic_tree(key.split(".")[-1], value, params)
+            clauses.append(f"NOT {clause}" if negate else clause)
+        else:
+            clauses.append(_condition(key, value, params))
+    return f" WHERE {' AND '.join(clauses)}" if clauses else ""
+
+
+def build_select(select: Optional[str]) -> str:
+    if not select or select == "*":
+        return "_t.*"
+    columns = []
+    for item in _split_top_level(select):
+        item = item.strip()
+        if item in ("count", "count()"):
+            columns.append("count(*) AS count")
+            continue
+        if "(" in item:
+            raise ShimError(400, "embedded resources are not supported by the local shim")
+        alias, _, column = item.rpartition(":")
+        column = column.split("::")[0]
+        sql = f"_t.{quote_ident(column)}"
+        columns.append(f"{sql} AS {quote_ident(alias)}" if alias else sql)
+    return ", ".join(columns)
+
+
+def build_order(order: Optional[str]) -> str:
+    if not order:
+        return ""
+    terms = []
+    for item in _split_top_level(order):
+        column, *modifiers = item.split(".")
+        sql = f"_t.{quote_ident(column)}"
+        for modifier in modifiers:
+            if modifier in ("asc", "desc"):
+                sql += f" {modifier.upper()}"
+            elif modifier in ("nullsfirst", "nullslast"):
+                sql += f" NULLS {modifier[5:].upper()}"
+            else:
+                raise ShimError(400, f"unsupported order modifier: {modifier}")
+        terms.append(sql)
+    return f" ORDER BY {', '.join(terms)}"
+
+
+def _int_param(value: Optional[str], name: str) -> Optional[int]:
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ShimError(400, f"{name} must be an integer") from None
+
+
+def parse_prefer(header: Optional[str]) -> Dict[str, str]:
+    prefs = {}
+    for token in (header or "").split(","):
+        key, _, value = token.strip().partition("=")
+        if key:
+            prefs[key] = value
+    return prefs
+
+
+def jwt_claims(authorization: Optional[str]) -> Optional[dict]:
+    """Claims of a bearer JWT, decoded without verification (local use only)"""
+    if not authorization or not authorization.lower().startswith("bearer "):
+        return None
+    parts = authorization.split(" ", 1)[1].split(".")
+    if len(parts) != 3:
+        return None
+    try:
+        payload = parts[1] + "=" * (-len(parts[1]) % 4)
+        return json.loads(base64.urlsafe_b64decode(payload))
+    except ValueError:
+        return None
+
+
+def _sqlstate(error: Exception) -> Optional[str]:
+    return getattr(error, "pgcode", None) or getattr(error, "sqlstate", None)
+
+
+class ConnectionPool:
+    """Fixed-size pool of DB-API connections shared by request threads"""
+
+    def __init__(self, dsn: str, size: int = DEFAULT_POOL_SIZE):
+        self.dsn = dsn
+        self._idle: "queue.LifoQueue" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def acquire(self):
+        self._slots.acquire()
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            try:
+                return connect(self.dsn)
+            except Exception:
+                self._slots.release()
+                raise
+
+    def release(self, conn, broken: bool = False) -> None:
+        if broken:
+            conn.close()
+        else:
+            self._idle.put(conn)
+        self._slots.release()
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class RestShim:
+    """Translates PostgREST requests into SQL over a ConnectionPool"""
+
+    def __init__(self, dsn: str, pool_size: int = DEFAULT_POOL_SIZE, schema: str = "public"):
+        self.pool = ConnectionPool(dsn, pool_size)
+        self.schema = quote_ident(schema)
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    # ---- SQL execution -------------------------------------------------
+
+    def _execute(self, claims: Optional[dict], statements: List[Tuple[str, list]]):
+        """Run statements in one transaction; return the last one's first column"""
+        conn = self.pool.acquire()
+        broken = False
+        try:
+            with conn.cursor() as cur:
+                if claims is not None:
+                    cur.execute("SELECT set_config('request.jwt.claims', %s, true)",
+                                (json.dumps(claims),))
+                result = None
+                for sql, params in statements:
+                    cur.execute(sql, params)
+                    result = cur.fetchone()[0] if cur.description else None
+            conn.commit()
+            return result
+        except Exception:
+            try:
+                conn.rollback()
+            except Exception:
+                broken = True
+            raise
+        finally:
+            self.pool.release(conn, broken)
+
+    def _table(self, name: str) -> str:
+        return f"{self.schema}.{quote_ident(name)}"
+
+    def _primary_key(self, claims, table: str) -> List[str]:
+        columns = self._execute(claims, [(
+            """SELECT coalesce(json_agg(a.attname ORDER BY a.attnum), '[]')::text
+               FROM pg_index i
+               JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = ANY(i.indkey)
+               WHERE i.indrelid = %s::regclass AND i.indisprimary""",
+            [f"{self.schema}.{quote_ident(table)}"]
+        )])
+        return json.loads(columns)
+
+    # ---- Table endpoints -----------------------------------------------
+
+    def read(self, table: str, query, prefs, claims) -> Tuple[int, dict, Optional[str]]:
+        params = dict(query)
+        where_params: list = []
+        where = build_where(query, where_params)
+        select = build_select(params.get("select"))
+        limit = _int_param(params.get("limit"), "limit")
+        offset = _int_param(params.get("offset"), "offset") or 0
+
+        sql = f"SELECT {select} FROM {self._table(table)} AS _t{where}"
+        if "count(*)" not in select:
+            sql += build_order(params.get("order"))
+            if limit is not None:
+                sql += f" LIMIT {limit}"
+            if offset:
+                sql += f" OFFSET {offset}"
+        statements = [(f"SELECT coalesce(json_agg(_r), '[]')::text FROM ({sql}) AS _r", where_params)]
+
+        headers = {}
+        if prefs.get("count") in ("exact", "planned", "estimated"):
+            total = self._execute(claims, [(
+                f"SELECT count(*) FROM {self._table(table)} AS _t{where}", list(where_params)
+            )])
+            body = self._execute(claims, statements)
+            returned = len(json.loads(body))
+            end = offset + returned - 1
+            headers["Content-Range"] = f"{offset}-{end}/{total}" if returned else f"*/{total}"
+            return 200, headers, body
+        return 200, headers, self._execute(claims, statements)
+
+    def write(self, table: str, rows, query, prefs, claims) -> Tuple[int, dict, Optional[str]]:
+        if isinstance(rows, dict):
+            rows = [rows]
+        if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+            raise ShimError(400, "body must be a JSON object or array of objects", "PGRST102")
+        if not rows:
+            return 201, {}, "[]"
+
+        params = dict(query)
+        keys = params.get("columns", "").split(",") if params.get("columns") else []
+        for row in rows:
+            keys.extend(key for key in row if key not in keys)
+        columns = ", ".join(quote_ident(key) for key in keys)
+        target = self._table(table)
+
+        sql = (f"INSERT INTO {target} AS _t ({columns}) SELECT {columns} "
+               f"FROM json_populate_recordset(NULL::{target}, %s::json)")
+        resolution = prefs.get("resolution")
+        if resolution:
+            conflict = (params["on_conflict"].split(",") if params.get("on_conflict")
+                        else self._primary_key(claims, table))
+            conflict_sql = ", ".join(quote_ident(c) for c in conflict)
+            if resolution == "ignore-duplicates":
+                sql += f" ON CONFLICT ({conflict_sql}) DO NOTHING"
+            else:
+                updates = ", ".join(f"{quote_ident(k)} = EXCLUDED.{quote_ident(k)}" for k in keys)
+                sql += f" ON CONFLICT ({conflict_sql}) DO UPDATE SET {updates}"
+        return self._returning(sql, [json.dumps(rows)], params, prefs, claims, 201)
+
+    def update(self, table: str, values, query, prefs, claims) -> Tuple[int, dict, Optional[str]]:
+        if not isinstance(values, dict) or not values:
+            raise ShimError(400, "body must be a non-empty JSON object", "PGRST102")
+        target = self._table(table)
+        assignments = ", ".join(f"{quote_ident(k)} = _p.{quote_ident(k)}" for k in values)
+        params: list = [json.dumps(values)]
+        where = build_where(query, params)
+        where = where.replace(" WHERE ", " AND ", 1) if where else ""
+        sql = (f"UPDATE {target} AS _t SET {assignments} "
+               f"FROM json_populate_record(NULL::{target}, %s::json) AS _p WHERE TRUE{where}")
+        return self._returning(sql, params, dict(query), prefs, claims, 204)
+
+    def delete(self, table: str, query, prefs, claims) -> Tuple[int, dict, Optional[str]]:
+        params: list = []
+        sql = f"DELETE FROM {self._table(table)} AS _t{build_where(query, params)}"
+        return self._returning(sql, params, dict(query), prefs, claims, 204)
+
+    def _returning(self, sql, params, query, prefs, claims, minimal_status):
+        if prefs.get("return") == "representation":
+            select = build_select(query.get("select")).replace("_t.", "_w.")
+            wrapped = (f"WITH _w AS ({sql} RETURNING _t.*) "
+                       f"SELECT coalesce(json_agg(_r), '[]')::text FROM (SELECT {select} FROM _w) AS _r")
+            body = self._execute(claims, [(wrapped, params)])
+            return (201 if minimal_status == 201 else 200), {}, body
+        self._execute(claims, [(sql, params)])
+        return minimal_status, {}, None
+
+    # ---- RPC -----------------------------------------------------------
+
+    def rpc(self, name: str, args, claims) -> Tuple[int, dict, Optional[str]]:
+        if not isinstance(args, dict):
+            raise ShimError(400, "rpc arguments must be a JSON object", "PGRST102")
+        info = self._execute(claims, [(
+            """SELECT json_build_object('retset', p.proretset, 'typtype', t.typtype,
+                                        'void', p.prorettype = 'void'::regtype)::text
+               FROM pg_proc p
+               JOIN pg_namespace n ON n.oid = p.pronamespace
+               JOIN pg_type t ON t.oid = p.prorettype
+               WHERE n.nspname = %s AND p.proname = %s
+               LIMIT 1""",
+            [self.schema.strip('"'), name]
+        )])
+        if info is None:
+            raise ShimError(404, f"Could not find the function {name}", "PGRST202")
+        info = json.loads(info)
+
+        # Arguments travel as untyped literals so PostgreSQL coerces them to the signature
+        params = [
+            None if value is None
+            else json.dumps(value) if isinstance(value, (dict, list))
+            else str(value).lower() if isinstance(value, bool)
+            else str(value)
+            for value in args.values()
+        ]
+        call = f"{self.schema}.{quote_ident(name)}(" + ", ".join(
+            f"{quote_ident(arg)} := %s" for arg in args
+        ) + ")"
+
+        if info["void"]:
+            self._execute(claims, [(f"SELECT {call}", params)])
+            return 204, {}, None
+        if info["retset"] or info["typtype"] in ("c", "p"):
+            body = self._execute(claims, [(
+                f"SELECT coalesce(json_agg(_r), '[]')::text FROM {call} AS _r", params
+            )])
+            if not info["retset"]:
+                rows = json.loads(body)
+                body = json.dumps(rows[0] if rows else None)
+            return 200, {}, body
+        return 200, {}, self._execute(claims, [(f"SELECT to_json({call})::text", params)])
+
+    # ---- HTTP plumbing -------------------------------------------------
+
+    def handle(self, method: str, path: str, query, headers, body: bytes):
+        parts = [part for part in path.split("/") if part]
+        if parts[:2] != ["rest", "v1"]:
+            raise ShimError(404, f"{path} is not served by the local shim", "PGRST125")
+        claims = jwt_claims(headers.get("Authorization"))
+        prefs = parse_prefer(headers.get("Prefer"))
+        try:
+            payload = json.loads(body) if body else None
+        except ValueError:
+            raise ShimError(400, "request body is not valid JSON", "PGRST102") from None
+
+        if len(parts) == 2:
+            return 200, {}, json.dumps({"swagger": "2.0", "info": {"title": "local shim"}})
+        if parts[2] == "rpc" and len(parts) == 4:
+            if method not in ("POST", "GET"):
+                raise ShimError(405, "rpc only supports POST and GET")
+            return self.rpc(parts[3], payload if method == "POST" else dict(query), claims)
+        if len(parts) != 3:
+            raise ShimError(404, f"{path} is not a table endpoint", "PGRST125")
+
+        table = parts[2]
+        if method in ("GET", "HEAD"):
+            return self.read(table, query, prefs, claims)
+        if method == "POST":
+            return self.write(table, payload, query, prefs, claims)
+        if method == "PATCH":
+            return self.update(table, payload, query, prefs, claims)
+        if method == "DELETE":
+            return self.delete(table, query, prefs, claims)
+        raise ShimError(405, f"{method} is not supported")
+
+    def _handler_class(self):
+        shim = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _respond(self, status: int, headers: dict, body: Optional[str]) -> None:
+                data = (body or "").encode() if self.command != "HEAD" else b""
+                self.send_response(status)
+                self.send_header("Access-Control-Allow-Origin", "*")
+                if body is not None:
+                    self.send_header("Content-Type", "application/json; charset=utf-8")
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _dispatch(self):
+                url = urlsplit(self.path)
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                try:
+                    status, headers, payload = shim.handle(
+                        self.command, url.path, parse_qsl(url.query, keep_blank_values=True),
+                        self.headers, body
+                    )
+                except ShimError as e:
+                    status, headers = e.status, {}
+                    payload = json.dumps({"code": e.code, "message": str(e),
+                                          "details": None, "hint": None})
+                except Exception as e:
+                    sqlstate = _sqlstate(e)
+                    status = _STATUS_BY_SQLSTATE.get(sqlstate, 400 if sqlstate else 500)
+                    headers = {}
+                    payload = json.dumps({"code": sqlstate, "message": str(e).strip().split("\n")[0],
+                                          "details": None, "hint": None})
+                self._respond(status, headers, payload)
+
+            def do_OPTIONS(self):
+                self._respond(200, {
+                    "Access-Control-Allow-Methods": "GET, POST, PATCH, DELETE, OPTIONS",
+                    "Access-Control-Allow-Headers": "*",
+                }, None)
+
+            do_GET = do_HEAD = do_POST = do_PATCH = do_DELETE = _dispatch
+
+        return Handler
+
+    def serve(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start serving in a daemon thread; returns the base URL"""
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self.url
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def stop(self) -> None:
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+        self.pool.close()
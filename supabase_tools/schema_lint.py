@@ -0,0 +1,571 @@
+"""
+Static index linter over the SQL sources
+
+The schema is spread over supabase/migrations/*.sql plus the two
+consolidated root scripts, which re-declare many of the same tables and
+indexes with IF NOT EXISTS. This module replays their DDL, in the same
+order the query-plan check builds the schema, into a model of the final
+tables, constraints and indexes, without a database. It then reports:
+
+- duplicate indexes: same table, method, keys and predicate as another
+  index or a primary key / unique constraint
+- prefix-redundant indexes: their keys lead another index on the same
+  table, which serves the same lookups
+- invalid indexes: on tables or columns that don't exist, or with a
+  predicate PostgreSQL rejects (now() and other non-immutable functions)
+- conflicts: one index name declared with different definitions, where
+  which one wins depends on the order the files are applied in
+- pointless predicates: WHERE col IS NOT NULL on a NOT NULL column
+
+Every index is written on every insert into its table, so the report also
+totals the per-insert index maintenance of the hot tables.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from supabase_tools.migrations import Migration
+from supabase_tools.sql import strip_comments
+
+# Tables written on the spin and rate-limit paths
+HOT_TABLES = (
+    "public.game_spins",
+    "public.provably_fair_verification",
+    "public.rate_limit_logs",
+    "public.rate_limit_counters",
+    "public.game_sessions",
+    "public.users",
+)
+
+ERROR_KINDS = ("invalid", "duplicate", "conflict")
+
+# Rough key widths in bytes, for the per-insert cost estimate
+_TYPE_WIDTHS = {
+    "boolean": 1, "bool": 1, "smallint": 2, "integer": 4, "int": 4, "int4": 4, "serial": 4,
+    "real": 4, "date": 4, "bigint": 8, "int8": 8, "bigserial": 8, "double precision": 8,
+    "timestamp": 8, "timestamptz": 8, "time": 8, "uuid": 16, "inet": 16, "numeric": 12,
+    "decimal": 12, "text": 24, "varchar": 24, "character varying": 24, "jsonb": 64, "json": 64,
+}
+# btree tuple header + line pointer
+_INDEX_TUPLE_OVERHEAD = 12
+
+# Functions PostgreSQL refuses in an index predicate or expression
+_VOLATILE = re.compile(
+    r"\b(now|clock_timestamp|statement_timestamp|transaction_timestamp|timeofday|random|"
+    r"gen_random_uuid|uuid_generate_v4|nextval)\s*\(|"
+    r"\b(current_timestamp|current_date|current_time|localtimestamp|localtime|current_user)\b",
+    re.I,
+)
+
+_NAME = r'(?:"[^"]+"|[A-Za-z_][\w$]*)'
+_QUALIFIED = rf"{_NAME}(?:\s*\.\s*{_NAME})?"
+
+_CREATE_TABLE = re.compile(
+    rf"^CREATE\s+(?:(?:GLOBAL|LOCAL)\s+)?(?:UNLOGGED\s+|TEMP\s+|TEMPORARY\s+)?TABLE\s+"
+    rf"(?P<exists>IF\s+NOT\s+EXISTS\s+)?(?P<table>{_QUALIFIED})\s*\(", re.I | re.S)
+_CREATE_MATVIEW = re.compile(
+    rf"^CREATE\s+MATERIALIZED\s+VIEW\s+(?:IF\s+NOT\s+EXISTS\s+)?(?P<table>{_QUALIFIED})", re.I)
+_CREATE_INDEX = re.compile(
+    rf"^CREATE\s+(?P<unique>UNIQUE\s+)?INDEX\s+(?:CONCURRENTLY\s+)?(?P<exists>IF\s+NOT\s+EXISTS\s+)?"
+    rf"(?P<name>{_NAME}\s+)?ON\s+(?:ONLY\s+)?(?P<table>{_QUALIFIED})\s*"
+    rf"(?:USING\s+(?P<method>\w+)\s*)?\(", re.I | re.S)
+_DROP_INDEX = re.compile(r"^DROP\s+INDEX\s+(?:CONCURRENTLY\s+)?(?:IF\s+EXISTS\s+)?(?P<names>.+?)"
+                         r"(?:\s+(?:CASCADE|RESTRICT))?$", re.I | re.S)
+_DROP_TABLE = re.compile(r"^DROP\s+(?:TABLE|MATERIALIZED\s+VIEW)\s+(?:IF\s+EXISTS\s+)?(?P<names>.+?)"
+                         r"(?:\s+(?:CASCADE|RESTRICT))?$", re.I | re.S)
+_ALTER_TABLE = re.compile(
+    rf"^ALTER\s+TABLE\s+(?:IF\s+EXISTS\s+)?(?:ONLY\s+)?(?P<table>{_QUALIFIED})\s+(?P<actions>.+)$",
+    re.I | re.S)
+# The partition migration's helper swaps a table's indexes for a curated list
+_PARTITION_BY_MONTH = re.compile(
+    r"^SELECT\s+pg_temp\.partition_by_month\(\s*'(?P<table>\w+)'\s*,\s*ARRAY\s*\[(?P<indexes>.*)\]\s*\)$",
+    re.I | re.S)
+
+_COLUMN_STOP = re.compile(
+    r"\b(NOT\s+NULL|NULL|DEFAULT|PRIMARY\s+KEY|UNIQUE|REFERENCES|CHECK|CONSTRAINT|GENERATED|COLLATE)\b",
+    re.I)
+_TABLE_CONSTRAINT = re.compile(
+    r"^(?:CONSTRAINT\s+(?P<name>\S+)\s+)?(?P<kind>PRIMARY\s+KEY|UNIQUE|FOREIGN\s+KEY|CHECK|EXCLUDE)\b",
+    re.I)
+
+
+def _ident(name: str) -> str:
+    name = re.sub(r"\s+", "", name)
+    parts = [part[1:-1] if part.startswith('"') else part.lower() for part in name.split(".")]
+    return ".".join(parts)
+
+
+def _table_name(name: str) -> str:
+    name = _ident(name)
+    return name if "." in name else f"public.{name}"
+
+
+def _closing(text: str, i: int) -> int:
+    """Index of the parenthesis closing the one at text[i]"""
+    depth = 0
+    quote = None
+    for j in range(i, len(text)):
+        c = text[j]
+        if quote:
+            if c == quote:
+                quote = None
+        elif c in "'\"":
+            quote = c
+        elif c == "(":
+            depth += 1
+        elif c == ")":
+            depth -= 1
+            if depth == 0:
+                return j
+    return len(text)
+
+
+def _split_top(text: str, separator: str = ",") -> List[str]:
+    """Split on `separator` outside parentheses and quotes"""
+    parts, depth, quote, start = [], 0, None, 0
+    for j, c in enumerate(text):
+        if quote:
+            if c == quote:
+                quote = None
+        elif c in "'\"":
+            quote = c
+        elif c == "(":
+            depth += 1
+        elif c == ")":
+            depth -= 1
+        elif c == separator and depth == 0:
+            parts.append(text[start:j].strip())
+            start = j + 1
+    parts.append(text[start:].strip())
+    return [part for part in parts if part]
+
+
+def _normalize(expression: str) -> str:
+    """Case- and whitespace-insensitive form of an expression or predicate"""
+    expression = re.sub(r"\s+", " ", expression.strip())
+    expression = re.sub(r"\s*([(),=<>])\s*", r"\1", expression)
+    expression = re.sub(r'"([a-z_][a-z0-9_]*)"', r"\1", expression)
+    return re.sub(r"'[^']*'|[^']+", lambda m: m.group(0) if m.group(0).startswith("'") else m.group(0).lower(),
+                  expression)
+
+
+def _strip_parens(expression: str) -> str:
+    while expression.startswith("(") and _closing(expression, 0) == len(expression) - 1:
+        expression = expression[1:-1].strip()
+    return expression
+
+
+@dataclass
+class IndexKey:
+    expression: str           # normalized column name or expression
+    descending: bool = False
+
+    @property
+    def column(self) -> Optional[str]:
+        return self.expression if re.fullmatch(r"[a-z_][a-z0-9_$]*", self.expression) else None
+
+    def __str__(self) -> str:
+        return self.expression + (" DESC" if self.descending else "")
+
+
+@dataclass
+class Index:
+    name: str
+    table: str
+    keys: List[IndexKey]
+    method: str = "btree"
+    unique: bool = False
+    predicate: Optional[str] = None
+    include: List[str] = field(default_factory=list)
+    constraint: Optional[str] = None    # "primary key" / "unique constraint" for implicit indexes
+    source: str = ""
+
+    @property
+    def signature(self) -> Tuple:
+        return (self.method, tuple((k.expression, k.descending) for k in self.keys), self.predicate)
+
+    def definition(self) -> str:
+        text = f"{self.table}{'' if self.method == 'btree' else ' USING ' + self.method}" \
+               f"({', '.join(map(str, self.keys))})"
+        if self.include:
+            text += f" INCLUDE ({', '.join(self.include)})"
+        if self.predicate:
+            text += f" WHERE {self.predicate}"
+        return ("UNIQUE " if self.unique else "") + text
+
+
+@dataclass
+class Column:
+    name: str
+    type: str
+    not_null: bool = False
+
+
+@dataclass
+class Table:
+    name: str
+    columns: Dict[str, Column] = field(default_factory=dict)
+    source: str = ""
+    known_columns: bool = True       # False for materialized views: columns unknown
+
+
+@dataclass
+class Finding:
+    kind: str                 # invalid, duplicate, conflict, redundant, predicate
+    index: str
+    table: str
+    message: str
+    source: str = ""
+
+    @property
+    def error(self) -> bool:
+        return self.kind in ERROR_KINDS
+
+
+@dataclass
+class InsertCost:
+    table: str
+    indexes: int
+    entries: int              # btree/hash entries written by every insert
+    conditional: int          # partial indexes, written only when the row matches
+    summarized: int           # BRIN: no per-row entry
+    bytes: int                # estimated index bytes written per insert
+    redundant: int            # of those, flagged by the linter
+
+
+class SchemaModel:
+    """Tables and indexes after replaying the DDL of the sources in order"""
+
+    def __init__(self):
+        self.tables: Dict[str, Table] = {}
+        self.indexes: Dict[str, Index] = {}          # by schema-qualified index name
+        self.findings: List[Finding] = []
+        self.skipped: List[str] = []                 # statements not understood
+
+    # --- replay -----------------------------------------------------------
+
+    def apply(self, statement: str, source: str) -> None:
+        text = strip_comments(statement).strip()
+        for pattern, handler in (
+            (_CREATE_TABLE, self._create_table),
+            (_CREATE_MATVIEW, self._create_matview),
+            (_CREATE_INDEX, self._create_index),
+            (_DROP_INDEX, self._drop_index),
+            (_DROP_TABLE, self._drop_table),
+            (_ALTER_TABLE, self._alter_table),
+            (_PARTITION_BY_MONTH, self._partition_by_month),
+        ):
+            match = pattern.match(text)
+            if match:
+                handler(match, text, source)
+                return
+
+    def _create_table(self, match, text: str, source: str) -> None:
+        name = _table_name(match.group("table"))
+        if name in self.tables:
+            if not match.group("exists"):
+                self.skipped.append(f"{source}: CREATE TABLE {name} over an existing table")
+            return
+        table = self.tables[name] = Table(name, source=source)
+        body = text[match.end() - 1:_closing(text, match.end() - 1) + 1][1:-1]
+        for element in _split_top(body):
+            constraint = _TABLE_CONSTRAINT.match(element)
+            if constraint:
+                self._table_constraint(table, constraint, element, source)
+            elif re.match(r"^LIKE\b", element, re.I):
+                table.known_columns = False
+            else:
+                self._add_column(table, element, source)
+
+    def _create_matview(self, match, text: str, source: str) -> None:
+        name = _table_name(match.group("table"))
+        self.tables.setdefault(name, Table(name, source=source, known_columns=False))
+
+    def _add_column(self, table: Table, element: str, source: str) -> None:
+        parts = element.split(None, 1)
+        if len(parts) < 2:
+            return
+        name, rest = _ident(parts[0]), parts[1]
+        stop = _COLUMN_STOP.search(rest)
+        column_type = re.sub(r"\s+", " ", (rest[:stop.start()] if stop else rest).strip().lower())
+        constraints = rest[stop.start():] if stop else ""
+        # Defaults and checks may contain anything; drop them before looking for keywords
+        constraints = re.sub(r"'[^']*'", "''", constraints)
+        constraints = re.sub(r"\b(CHECK|DEFAULT)\s*\(", lambda m: m.group(1) + " (", constraints, flags=re.I)
+        while True:
+            paren = re.search(r"\b(?:CHECK|DEFAULT)\s+\(", constraints, re.I)
+            if not paren:
+                break
+            open_at = constraints.index("(", paren.start())
+            constraints = constraints[:paren.start()] + constraints[_closing(constraints, open_at) + 1:]
+        primary = re.search(r"\bPRIMARY\s+KEY\b", constraints, re.I)
+        table.columns[name] = Column(name, column_type,
+                                     bool(primary or re.search(r"\bNOT\s+NULL\b", constraints, re.I)))
+        if primary:
+            self._constraint_index(table, f"{table.name.split('.')[-1]}_pkey", [name], "primary key", source)
+        elif re.search(r"\bUNIQUE\b", constraints, re.I):
+            self._constraint_index(table, f"{table.name.split('.')[-1]}_{name}_key", [name],
+                                   "unique constraint", source)
+
+    def _table_constraint(self, table: Table, match, element: str, source: str) -> None:
+        kind = re.sub(r"\s+", " ", match.group("kind").upper())
+        if kind not in ("PRIMARY KEY", "UNIQUE"):
+            return
+        open_at = element.find("(", match.end())
+        if open_at == -1:
+            return
+        columns = [_ident(c) for c in _split_top(element[open_at + 1:_closing(element, open_at)])]
+        short = table.name.split(".")[-1]
+        if kind == "PRIMARY KEY":
+            for column in columns:
+                if column in table.columns:
+                    table.columns[column].not_null = True
+            name = _ident(match.group("name")) if match.group("name") else f"{short}_pkey"
+            self._constraint_index(table, name, columns, "primary key", source)
+        else:
+            name = _ident(match.group("name")) if match.group("name") else f"{short}_{'_'.join(columns)}_key"
+            self._constraint_index(table, name, columns, "unique constraint", source)
+
+    def _constraint_index(self, table: Table, name: str, columns: List[str], kind: str, source: str) -> None:
+        if kind == "primary key":
+            for existing in [i for i in self.indexes.values()
+                             if i.table == table.name and i.constraint == "primary key"]:
+                del self.indexes[self._key(table.name, existing.name)]
+        self.indexes[self._key(table.name, name)] = Index(
+            name, table.name, [IndexKey(c) for c in columns], unique=True, constraint=kind, source=source)
+
+    @staticmethod
+    def _key(table: str, index: str) -> str:
+        return f"{table.split('.')[0]}.{index}"
+
+    def _create_index(self, match, text: str, source: str) -> None:
+        table = _table_name(match.group("table"))
+        open_at = match.end() - 1
+        close_at = _closing(text, open_at)
+        keys = []
+        for part in _split_top(text[open_at + 1:close_at]):
+            descending = bool(re.search(r"\s+DESC(\s+NULLS\s+(FIRST|LAST))?$", part, re.I))
+            part = re.sub(r"\s+(ASC|DESC)(\s+NULLS\s+(FIRST|LAST))?$", "", part, flags=re.I)
+            part = re.sub(r"\s+NULLS\s+(FIRST|LAST)$", "", part, flags=re.I)
+            keys.append(IndexKey(_strip_parens(_normalize(part)), descending))
+        rest = text[close_at + 1:]
+        include = []
+        include_match = re.match(r"\s*INCLUDE\s*\(", rest, re.I)
+        if include_match:
+            end = _closing(rest, include_match.end() - 1)
+            include = [_ident(c) for c in _split_top(rest[include_match.end():end])]
+            rest = rest[end + 1:]
+        where = re.search(r"\bWHERE\b(?P<predicate>.*)$", rest, re.I | re.S)
+        predicate = _strip_parens(_normalize(where.group("predicate"))) if where else None
+        method = (match.group("method") or "btree").lower()
+        name = _ident(match.group("name")) if match.group("name") else \
+            f"{table.split('.')[-1]}_{'_'.join(k.column or 'expr' for k in keys)}_idx"
+        index = Index(name, table, keys, method, bool(match.group("unique")), predicate, include, source=source)
+
+        key = self._key(table, name)
+        existing = self.indexes.get(key)
+        if existing:
+            if existing.definition() != index.definition():
+                self.findings.append(Finding(
+                    "conflict", name, table,
+                    f"declared as {existing.definition()} ({existing.source}) and as "
+                    f"{index.definition()} ({source}); the first applied wins",
+                    source))
+            return
+        self.indexes[key] = index
+
+    def _drop_index(self, match, text: str, source: str) -> None:
+        for name in _split_top(match.group("names")):
+            name = _ident(name)
+            qualified = name if "." in name else f"public.{name}"
+            self.indexes.pop(qualified, None)
+
+    def _drop_table(self, match, text: str, source: str) -> None:
+        for name in _split_top(match.group("names")):
+            table = _table_name(name)
+            self.tables.pop(table, None)
+            for key in [k for k, index in self.indexes.items() if index.table == table]:
+                del self.indexes[key]
+
+    def _alter_table(self, match, text: str, source: str) -> None:
+        table = self.tables.get(_table_name(match.group("table")))
+        if table is None:
+            return
+        for action in _split_top(match.group("actions")):
+            add_column = re.match(r"^ADD\s+(?:COLUMN\s+)?(?:IF\s+NOT\s+EXISTS\s+)?(?P<def>.+)$", action, re.I | re.S)
+            constraint = re.match(r"^ADD\s+(?P<def>(?:CONSTRAINT\s+\S+\s+)?(?:PRIMARY\s+KEY|UNIQUE)\b.*)$",
+                                  action, re.I | re.S)
+            if constraint:
+                self._table_constraint(table, _TABLE_CONSTRAINT.match(constraint.group("def")),
+                                       constraint.group("def"), source)
+            elif add_column and not re.match(r"^ADD\s+(CONSTRAINT|FOREIGN|CHECK|EXCLUDE)\b", action, re.I):
+                column = add_column.group("def").split(None, 1)[0]
+                if _ident(column) not in table.columns:
+                    self._add_column(table, add_column.group("def"), source)
+            elif re.match(r"^DROP\s+COLUMN\b", action, re.I):
+                column = _ident(re.sub(r"^DROP\s+COLUMN\s+(IF\s+EXISTS\s+)?", "", action, flags=re.I).split()[0])
+                table.columns.pop(column, None)
+                for key in [k for k, index in self.indexes.items()
+                            if index.table == table.name and any(key.column == column for key in index.keys)]:
+                    del self.indexes[key]
+            elif re.match(r"^DROP\s+CONSTRAINT\b", action, re.I):
+                name = _ident(re.sub(r"^DROP\s+CONSTRAINT\s+(IF\s+EXISTS\s+)?", "", action, flags=re.I).split()[0])
+                index = self.indexes.get(self._key(table.name, name))
+                if index and index.constraint:
+                    del self.indexes[self._key(table.name, name)]
+            else:
+                not_null = re.match(r"^ALTER\s+(?:COLUMN\s+)?(\S+)\s+(SET|DROP)\s+NOT\s+NULL$", action, re.I)
+                if not_null and _ident(not_null.group(1)) in table.columns:
+                    table.columns[_ident(not_null.group(1))].not_null = not_null.group(2).upper() == "SET"
+
+    def _partition_by_month(self, match, text: str, source: str) -> None:
+        table = _table_name(match.group("table"))
+        if table not in self.tables:
+            return
+        # The rebuilt list replaces whichever earlier definition won
+        self.findings = [f for f in self.findings if not (f.kind == "conflict" and f.table == table)]
+        for key in [k for k, index in self.indexes.items() if index.table == table and not index.constraint]:
+            del self.indexes[key]
+        self._constraint_index(self.tables[table], f"{table.split('.')[-1]}_pkey", ["id", "created_at"],
+                               "primary key", source)
+        columns = self.tables[table].columns
+        for literal in re.findall(r"'((?:[^']|'')*)'", match.group("indexes")):
+            before = set(self.indexes)
+            self.apply(literal.replace("''", "'"), source)
+            # As in the migration, an index on a column the table lacks is skipped
+            for key in set(self.indexes) - before:
+                if any(k.column and k.column not in columns for k in self.indexes[key].keys):
+                    del self.indexes[key]
+
+    # --- checks -----------------------------------------------------------
+
+    def lint(self) -> List[Finding]:
+        findings = list(self.findings)
+        by_table: Dict[str, List[Index]] = {}
+        for index in self.indexes.values():
+            by_table.setdefault(index.table, []).append(index)
+
+        for table_name, indexes in sorted(by_table.items()):
+            table = self.tables.get(table_name)
+            for index in sorted(indexes, key=lambda i: i.name):
+                if index.constraint:
+                    continue
+                findings += self._validity(index, table)
+                findings += self._redundancy(index, indexes)
+        return findings
+
+    def _validity(self, index: Index, table: Optional[Table]) -> List[Finding]:
+        found = []
+        if table is None:
+            return [Finding("invalid", index.name, index.table, "table does not exist", index.source)]
+        for text, where in ([(k.expression, "expression") for k in index.keys if not k.column]
+                            + ([(index.predicate, "predicate")] if index.predicate else [])):
+            volatile = _VOLATILE.search(text)
+            if volatile:
+                found.append(Finding(
+                    "invalid", index.name, index.table,
+                    f"{where} uses {volatile.group(0).rstrip('(').strip()}(), which is not IMMUTABLE; "
+                    "PostgreSQL refuses the index", index.source))
+        if table.known_columns:
+            missing = [k.column for k in index.keys if k.column and k.column not in table.columns]
+            missing += [c for c in index.include if c not in table.columns]
+            if missing:
+                found.append(Finding("invalid", index.name, index.table,
+                                     f"no column {', '.join(missing)} in {table.name}", index.source))
+        if index.predicate:
+            null_check = re.fullmatch(r"([a-z_][a-z0-9_]*) is not null", index.predicate)
+            column = table.columns.get(null_check.group(1)) if null_check else None
+            if column and column.not_null:
+                found.append(Finding(
+                    "predicate", index.name, index.table,
+                    f"WHERE {index.predicate} is always true ({column.name} is NOT NULL), so the index is "
+                    "not partial at all", index.source))
+        return found
+
+    def _redundancy(self, index: Index, indexes: List[Index]) -> List[Finding]:
+        predicate = self._effective_predicate(index)
+        for other in sorted(indexes, key=lambda i: (not i.constraint, i.name)):
+            if other is index or other.method != index.method or index.method not in ("btree", "hash"):
+                continue
+            same_predicate = self._effective_predicate(other) == predicate
+            if not same_predicate:
+                continue
+            mine = [(k.expression, k.descending) for k in index.keys]
+            theirs = [(k.expression, k.descending) for k in other.keys]
+            if mine == theirs:
+                if index.unique and not other.unique:
+                    continue
+                # Of two identical plain indexes only report the later name
+                if not other.constraint and not index.unique and not other.unique and other.name > index.name:
+                    continue
+                what = f"the {other.constraint}" if other.constraint else f"index {other.name}"
+                return [Finding("duplicate", index.name, index.table,
+                                f"same as {what}: {other.definition()}", index.source)]
+            if index.unique or index.method != "btree" or len(mine) >= len(theirs):
+                continue
+            # A btree can be read backwards, so a single leading key matches either direction
+            prefix = theirs[:len(mine)]
+            if prefix == mine or (len(mine) == 1 and prefix[0][0] == mine[0][0]) or \
+                    [(e, not d) for e, d in prefix] == mine:
+                what = f"the {other.constraint}" if other.constraint else f"index {other.name}"
+                return [Finding("redundant", index.name, index.table,
+                                f"its keys lead {what} ({other.definition()}), which serves the same lookups",
+                                index.source)]
+        return []
+
+    def _effective_predicate(self, index: Index) -> Optional[str]:
+        """The predicate, or None if it is a NOT NULL column's IS NOT NULL"""
+        if index.predicate:
+            null_check = re.fullmatch(r"([a-z_][a-z0-9_]*) is not null", index.predicate)
+            table = self.tables.get(index.table)
+            if null_check and table and table.columns.get(null_check.group(1), Column("", "")).not_null:
+                return None
+        return index.predicate
+
+    # --- cost -------------------------------------------------------------
+
+    def insert_cost(self, table_name: str, findings: List[Finding]) -> Optional[InsertCost]:
+        table = self.tables.get(table_name)
+        if table is None:
+            return None
+        flagged = {f.index for f in findings if f.table == table_name and f.kind in ("duplicate", "redundant")}
+        indexes = [i for i in self.indexes.values() if i.table == table_name]
+        entries = conditional = summarized = size = 0
+        for index in indexes:
+            if index.method == "brin":
+                summarized += 1
+                continue
+            if index.predicate and self._effective_predicate(index):
+                conditional += 1
+            else:
+                entries += 1
+            size += _INDEX_TUPLE_OVERHEAD + sum(self._width(table, key) for key in index.keys)
+        return InsertCost(table_name, len(indexes), entries, conditional, summarized, size,
+                          len([i for i in indexes if i.name in flagged]))
+
+    @staticmethod
+    def _width(table: Table, key: IndexKey) -> int:
+        column = table.columns.get(key.column or "")
+        if column is None:
+            return 8
+        base = re.sub(r"\(.*", "", column.type).replace(" with time zone", "").replace(" without time zone", "")
+        if base == "timestamp" and "with time zone" in column.type:
+            base = "timestamptz"
+        return _TYPE_WIDTHS.get(base.strip(), 8)
+
+
+def build_model(sources: List[Migration]) -> SchemaModel:
+    model = SchemaModel()
+    for source in sources:
+        for statement in source.statements():
+            model.apply(statement, source.name)
+    return model
+
+
+def lint_sources(sources: List[Migration]) -> Tuple[SchemaModel, List[Finding], List[InsertCost]]:
+    """Model, findings and the hot tables' insert costs for the given sources"""
+    model = build_model(sources)
+    findings = model.lint()
+    costs = [cost for cost in (model.insert_cost(table, findings) for table in HOT_TABLES) if cost]
+    return model, findings, costs
@@ -0,0 +1,261 @@
+"""
+Vectorised RTP simulation of the standard-play spin path
+
+Spins are generated in batches as NumPy arrays: every spin's seededRandom
+state advances in lock-step, symbols are picked with searchsorted over the
+cumulative weights, and calculateWin is evaluated column by column. Spin i
+of a run uses the seed f"{prefix}{i:012d}", so any simulated spin can be
+replayed through slot_engine.generate_spin_outcome and gives the same grid.
+
+NumPy is optional for the rest of supabase_tools and imported lazily.
+"""
+
+import hashlib
+import json
+import math
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from supabase_tools.config import PROJECT_DIR
+from supabase_tools.slot_engine import (
+    PAYLINE_MULTIPLIERS, SCATTER_MIN_COUNT, SCATTER_MULTIPLIER, TWO_POW_32, UINT32_MASK,
+    cumulative_weights, generate_spin_outcome, get_game_config, seed_hash, spin_weights
+)
+
+DEFAULT_BATCH_SIZE = 200_000
+SEED_INDEX_WIDTH = 12
+VECTORS_PATH = Path(__file__).resolve().parent / "data" / "spin_vectors.json"
+
+# Upper bounds of the per-spin standard deviation (in units of stake) per band
+VOLATILITY_BANDS = (("Low", 3.0), ("Medium", 6.0), ("High", 12.0), ("Extreme", float("inf")))
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise RuntimeError("NumPy is required for simulation - run: pip install numpy") from None
+    return numpy
+
+
+def simulation_seed(prefix: str, index: int) -> str:
+    """The seed string spin `index` of a run uses"""
+    return f"{prefix}{index:0{SEED_INDEX_WIDTH}d}"
+
+
+@dataclass
+class SimulationStats:
+    """Mergeable payout tallies; payouts are multiples of the stake"""
+    spins: int = 0
+    total_return: float = 0.0
+    total_return_sq: float = 0.0
+    hits: int = 0
+    feature_triggers: int = 0
+    max_multiplier: float = 0.0
+    payouts: Dict[float, int] = field(default_factory=dict)
+
+    @property
+    def rtp(self) -> float:
+        """Return to player, in percent"""
+        return 100 * self.total_return / self.spins if self.spins else 0.0
+
+    @property
+    def hit_frequency(self) -> float:
+        return self.hits / self.spins if self.spins else 0.0
+
+    @property
+    def variance(self) -> float:
+        """Sample variance of the per-spin payout multiplier"""
+        if self.spins < 2:
+            return 0.0
+        mean = self.total_return / self.spins
+        return max((self.total_return_sq - self.spins * mean * mean) / (self.spins - 1), 0.0)
+
+    @property
+    def std_dev(self) -> float:
+        return self.variance ** 0.5
+
+    def rtp_interval(self, z: float = 1.96) -> Tuple[float, float]:
+        """Normal-approximation confidence interval for the RTP, in percent"""
+        if not self.spins:
+            return 0.0, 0.0
+        margin = 100 * z * self.std_dev / math.sqrt(self.spins)
+        return self.rtp - margin, self.rtp + margin
+
+    def exceedance(self, threshold: float) -> float:
+        """Share of spins paying at least `threshold` times the stake"""
+        if not self.spins:
+            return 0.0
+        return sum(count for payout, count in self.payouts.items() if payout >= threshold) / self.spins
+
+    @property
+    def volatility(self) -> str:
+        return classify_volatility(self.std_dev)
+
+    def merge(self, other: "SimulationStats") -> None:
+        self.spins += other.spins
+        self.total_return += other.total_return
+        self.total_return_sq += other.total_return_sq
+        self.hits += other.hits
+        self.feature_triggers += other.feature_triggers
+        self.max_multiplier = max(self.max_multiplier, other.max_multiplier)
+        for payout, count in other.payouts.items():
+            self.payouts[payout] = self.payouts.get(payout, 0) + count
+
+    def to_dict(self) -> dict:
+        return {
+            "spins": self.spins,
+            "rtp": self.rtp,
+            "hit_frequency": self.hit_frequency,
+            "std_dev": self.std_dev,
+            "volatility": self.volatility,
+            "feature_triggers": self.feature_triggers,
+            "max_multiplier": self.max_multiplier,
+        }
+
+
+def classify_volatility(std_dev: float) -> str:
+    for label, upper in VOLATILITY_BANDS:
+        if std_dev < upper:
+            return label
+    return VOLATILITY_BANDS[-1][0]
+
+
+def seed_states(prefix: str, start: int, count: int):
+    """Initial seededRandom state of spins start..start+count-1, as uint32"""
+    np = _numpy()
+    states = np.full(count, seed_hash(prefix), dtype=np.uint64)
+    index = np.arange(start, start + count, dtype=np.uint64)
+    for power in range(SEED_INDEX_WIDTH - 1, -1, -1):
+        digit = (index // np.uint64(10 ** power)) % np.uint64(10)
+        states = (states * np.uint64(31) + np.uint64(ord("0")) + digit) & np.uint64(UINT32_MASK)
+    return states.astype(np.uint32)
+
+
+def _advance(states) -> None:
+    """seededRandom's step applied in place to every state"""
+    np = _numpy()
+    states ^= states >> np.uint32(16)
+    states *= np.uint32(2246822507)
+    states ^= states >> np.uint32(13)
+    states *= np.uint32(3266489909)
+    states ^= states >> np.uint32(16)
+
+
+def draw_grids(game_id: str, states):
+    """
+    Symbol indices (into DEFAULT_SYMBOLS) shaped (spins, reels, rows), one
+    spin per initial RNG state; `states` is consumed.
+    """
+    np = _numpy()
+    config = get_game_config(game_id)
+    cumulative, total = cumulative_weights(spin_weights())
+    bounds = np.array(cumulative, dtype=np.float64)
+
+    grids = np.empty((len(states), config.reels, config.rows), dtype=np.uint8)
+    for reel in range(config.reels):
+        for row in range(config.rows):
+            _advance(states)
+            roll = (states.astype(np.float64) / TWO_POW_32) * total
+            picked = np.searchsorted(bounds, roll, side="left")
+            picked[picked == len(bounds)] = 0  # selectSymbol's fallback
+            grids[:, reel, row] = picked
+    return grids
+
+
+def generate_grids(game_id: str, prefix: str, start: int, count: int):
+    """Grids of spins start..start+count-1 of a run"""
+    return draw_grids(game_id, seed_states(prefix, start, count))
+
+
+def grid_multipliers(grids):
+    """calculateWin for a batch: payout multiplier and scatter count per spin"""
+    np = _numpy()
+    ids = [s.id for s in spin_weights()]
+    wild, scatter = ids.index("wild"), ids.index("scatter")
+
+    middle = grids[:, :, 1]
+    match = middle[:, 0].copy()
+    matches = np.ones(len(grids), dtype=np.int64)
+    alive = np.ones(len(grids), dtype=bool)
+    for reel in range(1, grids.shape[1]):
+        symbol = middle[:, reel]
+        continues = alive & ((symbol == match) | (symbol == wild) | (match == wild))
+        matches += continues
+        match = np.where(continues & (match == wild), symbol, match)
+        alive = continues
+
+    table = np.array(PAYLINE_MULTIPLIERS, dtype=np.float64)
+    payline = np.where(matches >= 3, table[np.minimum(matches - 1, len(table) - 1)], 0.0)
+    scatters = (grids == scatter).sum(axis=(1, 2))
+    scatter_pay = np.where(scatters >= SCATTER_MIN_COUNT, scatters * SCATTER_MULTIPLIER, 0)
+    return payline + scatter_pay, scatters
+
+
+def simulate(game_id: str, spins: int, prefix: str = "sim-",
+             start: int = 0, batch_size: int = DEFAULT_BATCH_SIZE) -> SimulationStats:
+    """Simulate spins start..start+spins-1 of a game's standard play"""
+    np = _numpy()
+    stats = SimulationStats()
+    for offset in range(start, start + spins, batch_size):
+        count = min(batch_size, start + spins - offset)
+        multipliers, scatters = grid_multipliers(generate_grids(game_id, prefix, offset, count))
+        values, counts = np.unique(multipliers, return_counts=True)
+        stats.merge(SimulationStats(
+            spins=count,
+            total_return=float(multipliers.sum()),
+            total_return_sq=float(np.square(multipliers).sum()),
+            hits=int(np.count_nonzero(multipliers)),
+            feature_triggers=int(np.count_nonzero(scatters >= SCATTER_MIN_COUNT)),
+            max_multiplier=float(multipliers.max()) if count else 0.0,
+            payouts={float(v): int(c) for v, c in zip(values, counts)},
+        ))
+    return stats
+
+
+def vectors_stale(path: Path = VECTORS_PATH) -> bool:
+    """True if spin/index.ts changed since the vectors were recorded"""
+    recorded = json.loads(Path(path).read_text())
+    source = PROJECT_DIR / recorded["source"]
+    return hashlib.sha256(source.read_bytes()).hexdigest() != recorded["source_sha256"]
+
+
+def check_vectors(path: Path = VECTORS_PATH) -> List[str]:
+    """
+    Replay outcomes recorded from the TypeScript engine.
+
+    Returns a description of every mismatch; standard-play vectors are also
+    checked through the vectorised path.
+    """
+    recorded = json.loads(Path(path).read_text())
+    problems = []
+    for vector in recorded["vectors"]:
+        label = f"{vector['gameId']} seed={vector['seed']!r}"
+        outcome = generate_spin_outcome(
+            vector["gameId"], vector["wager"], vector["seed"],
+            vector["isMaster"], vector["is111Hook"]
+        ).to_json()
+        if outcome != vector["outcome"]:
+            problems.append(f"{label}: scalar port differs")
+    problems.extend(_check_vectorised(recorded["vectors"]))
+    return problems
+
+
+def _check_vectorised(vectors: List[dict]) -> List[str]:
+    """Grids and multipliers from the batch path for the recorded seeds"""
+    np = _numpy()
+    problems = []
+    ids = [s.id for s in spin_weights()]
+    for vector in vectors:
+        if vector["isMaster"] or vector["is111Hook"]:
+            continue
+        grid = draw_grids(vector["gameId"], np.array([seed_hash(vector["seed"])], dtype=np.uint32))[0]
+        expected = vector["outcome"]
+        multiplier, _ = grid_multipliers(grid[np.newaxis])
+        if [[ids[i] for i in reel] for reel in grid.tolist()] != expected["reels"] \
+                or not math.isclose(float(multiplier[0]) * vector["wager"], expected["winAmount"],
+                                    rel_tol=1e-12):
+            problems.append(f"{vector['gameId']} seed={vector['seed']!r}: vectorised path differs")
+    return problems
+
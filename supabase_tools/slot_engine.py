@@ -0,0 +1,342 @@
+"""
+Python port of the spin edge function's standard-play maths
+
+Mirrors supabase/functions/spin/index.ts (seededRandom, selectSymbol,
+generateReels, calculateWin, generateSpinOutcome) so that the same seed
+gives a bit-identical outcome. All arithmetic follows the JavaScript
+semantics: the RNG state is a uint32 and probabilities are doubles.
+
+Note that generateSpinOutcome always draws from DEFAULT_SYMBOLS (scaled
+for Master Mode and the $111 Hook); a game's GAME_CONFIGS entry only
+contributes its reel layout. The per-game symbol weights are kept here
+for reference and analysis, but the live path ignores them, and so does
+spin_weights().
+"""
+
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+UINT32_MASK = 0xFFFFFFFF
+TWO_POW_32 = 4294967296
+
+PAYLINE_MULTIPLIERS = (0, 0, 3, 8, 15)  # by consecutive matches - 1, capped at 5
+SCATTER_MIN_COUNT = 3
+SCATTER_MULTIPLIER = 5  # per scatter on the grid
+FREE_SPINS_AWARDED = 10
+
+
+@dataclass(frozen=True)
+class SymbolWeight:
+    id: str
+    name: str
+    weight: float
+    type: str  # 'normal' | 'wild' | 'scatter' | 'bonus'
+
+
+@dataclass(frozen=True)
+class GameConfig:
+    reels: int
+    rows: int
+    symbol_weights: Tuple[SymbolWeight, ...]
+
+
+def _symbols(*entries) -> Tuple[SymbolWeight, ...]:
+    return tuple(SymbolWeight(*entry) for entry in entries)
+
+
+DEFAULT_SYMBOLS = _symbols(
+    ("wild", "Wild", 5, "wild"), ("scatter", "Scatter", 8, "scatter"),
+    ("high1", "Diamond", 15, "normal"), ("high2", "Seven", 20, "normal"),
+    ("high3", "Bell", 25, "normal"), ("low1", "Cherry", 35, "normal"),
+    ("low2", "Lemon", 40, "normal"), ("low3", "Orange", 45, "normal")
+)
+DEFAULT_LAYOUT = (5, 3)
+
+GAME_CONFIGS: Dict[str, GameConfig] = {
+    "fortune-tiger": GameConfig(5, 3, _symbols(
+        ("wild", "Wild Tiger", 4, "wild"), ("scatter", "Scatter", 6, "scatter"),
+        ("high1", "Tiger", 12, "normal"), ("high2", "Dragon", 15, "normal"),
+        ("high3", "Coin", 18, "normal"), ("low1", "A", 30, "normal"),
+        ("low2", "K", 35, "normal"), ("low3", "Q", 40, "normal")
+    )),
+    "sweet-bonanza": GameConfig(6, 5, _symbols(
+        ("wild", "Wild", 3, "wild"), ("scatter", "Scatter", 5, "scatter"),
+        ("high1", "Bomb", 10, "normal"), ("high2", "Candy", 15, "normal"),
+        ("high3", "Lollipop", 20, "normal"), ("low1", "Cherry", 30, "normal"),
+        ("low2", "Grape", 35, "normal"), ("low3", "Watermelon", 40, "normal")
+    )),
+    "gates-of-olympus": GameConfig(6, 5, _symbols(
+        ("wild", "Zeus", 4, "wild"), ("scatter", "Scatter", 6, "scatter"),
+        ("high1", "Gem", 12, "normal"), ("high2", "Crown", 15, "normal"),
+        ("high3", "Vase", 18, "normal"), ("low1", "A", 30, "normal"),
+        ("low2", "K", 35, "normal"), ("low3", "Q", 40, "normal")
+    )),
+    "gates-of-olympus-super-scatter": GameConfig(6, 5, _symbols(
+        ("wild", "Zeus", 5, "wild"), ("scatter", "Super Scatter", 8, "scatter"),
+        ("high1", "Gem", 12, "normal"), ("high2", "Crown", 15, "normal"),
+        ("high3", "Vase", 18, "normal"), ("low1", "A", 30, "normal"),
+        ("low2", "K", 35, "normal"), ("low3", "Q", 40, "normal")
+    )),
+    "brick-house-bonanza": GameConfig(6, 5, _symbols(
+        ("wild", "Wild", 3, "wild"), ("scatter", "Scatter", 5, "scatter"),
+        ("high1", "Brick", 10, "normal"), ("high2", "House", 15, "normal"),
+        ("high3", "Gold", 20, "normal"), ("low1", "Cherry", 30, "normal"),
+        ("low2", "Grape", 35, "normal"), ("low3", "Watermelon", 40, "normal")
+    )),
+    "sweet-bonanza-1000": GameConfig(6, 5, _symbols(
+        ("wild", "Wild", 3, "wild"), ("scatter", "Scatter", 5, "scatter"),
+        ("high1", "Bomb", 10, "normal"), ("high2", "Candy", 15, "normal"),
+        ("high3", "Lollipop", 20, "normal"), ("low1", "Cherry", 30, "normal"),
+        ("low2", "Grape", 35, "normal"), ("low3", "Watermelon", 40, "normal")
+    )),
+    "sweet-bonanza-super-scatter": GameConfig(6, 5, _symbols(
+        ("wild", "Wild", 3, "wild"), ("scatter", "Super Scatter", 7, "scatter"),
+        ("high1", "Bomb", 10, "normal"), ("high2", "Candy", 15, "normal"),
+        ("high3", "Lollipop", 20, "normal"), ("low1", "Cherry", 30, "normal"),
+        ("low2", "Grape", 35, "normal"), ("low3", "Watermelon", 40, "normal")
+    )),
+    "sweet-rush-bonanza": GameConfig(6, 5, _symbols(
+        ("wild", "Wild", 3, "wild"), ("scatter", "Scatter", 5, "scatter"),
+        ("high1", "Bomb", 10, "normal"), ("high2", "Candy", 15, "normal"),
+        ("high3", "Lollipop", 20, "normal"), ("low1", "Cherry", 30, "normal"),
+        ("low2", "Grape", 35, "normal"), ("low3", "Watermelon", 40, "normal")
+    )),
+    "big-bass-amazon-xtreme": GameConfig(5, 3, _symbols(
+        ("wild", "Wild", 4, "wild"), ("scatter", "Scatter", 6, "scatter"),
+        ("high1", "Fish", 12, "normal"), ("high2", "Bass", 15, "normal"),
+        ("high3", "Amazon", 18, "normal"), ("low1", "A", 30, "normal"),
+        ("low2", "K", 35, "normal"), ("low3", "Q", 40, "normal")
+    )),
+    "big-bass-halloween-3": GameConfig(5, 3, _symbols(
+        ("wild", "Wild", 4, "wild"), ("scatter", "Scatter", 6, "scatter"),
+        ("high1", "Pumpkin", 12, "normal"), ("high2", "Ghost", 15, "normal"),
+        ("high3", "Fish", 18, "normal"), ("low1", "A", 30, "normal"),
+        ("low2", "K", 35, "normal"), ("low3", "Q", 40, "normal")
+    )),
+    "big-bass-reel-repeat": GameConfig(5, 3, _symbols(
+        ("wild", "Wild", 4, "wild"), ("scatter", "Scatter", 6, "scatter"),
+        ("high1", "Fish", 12, "normal"), ("high2", "Bass", 15, "normal"),
+        ("high3", "Reel", 18, "normal"), ("low1", "A", 30, "normal"),
+        ("low2", "K", 35, "normal"), ("low3", "Q", 40, "normal")
+    )),
+    "big-bass-bonanza-1000": GameConfig(5, 3, _symbols(
+        ("wild", "Wild", 4, "wild"), ("scatter", "Scatter", 6, "scatter"),
+        ("high1", "Fish", 12, "normal"), ("high2", "Bass", 15, "normal"),
+        ("high3", "Bonanza", 18, "normal"), ("low1", "A", 30, "normal"),
+        ("low2", "K", 35, "normal"), ("low3", "Q", 40, "normal")
+    )),
+    "sleeping-dragon": GameConfig(5, 3, _symbols(
+        ("wild", "Dragon", 4, "wild"), ("scatter", "Scatter", 6, "scatter"),
+        ("high1", "Gem", 12, "normal"), ("high2", "Crown", 15, "normal"),
+        ("high3", "Treasure", 18, "normal"), ("low1", "A", 30, "normal"),
+        ("low2", "K", 35, "normal"), ("low3", "Q", 40, "normal")
+    )),
+    "chests-of-cai-shen": GameConfig(5, 3, _symbols(
+        ("wild", "Cai Shen", 4, "wild"), ("scatter", "Scatter", 6, "scatter"),
+        ("high1", "Chest", 12, "normal"), ("high2", "Gold", 15, "normal"),
+        ("high3", "Coin", 18, "normal"), ("low1", "A", 30, "normal"),
+        ("low2", "K", 35, "normal"), ("low3", "Q", 40, "normal")
+    )),
+    "3-super-hot-chillies": GameConfig(5, 3, _symbols(
+        ("wild", "Wild", 5, "wild"), ("scatter", "Scatter", 8, "scatter"),
+        ("high1", "Chilli", 15, "normal"), ("high2", "Pepper", 20, "normal"),
+        ("high3", "Fire", 25, "normal"), ("low1", "Cherry", 35, "normal"),
+        ("low2", "Lemon", 40, "normal"), ("low3", "Orange", 45, "normal")
+    )),
+    "3-coin-volcanoes": GameConfig(5, 3, _symbols(
+        ("wild", "Wild", 5, "wild"), ("scatter", "Scatter", 8, "scatter"),
+        ("high1", "Coin", 15, "normal"), ("high2", "Volcano", 20, "normal"),
+        ("high3", "Gem", 25, "normal"), ("low1", "Cherry", 35, "normal"),
+        ("low2", "Lemon", 40, "normal"), ("low3", "Orange", 45, "normal")
+    )),
+    "more-magic-apple": GameConfig(5, 3, _symbols(
+        ("wild", "Wild", 4, "wild"), ("scatter", "Scatter", 6, "scatter"),
+        ("high1", "Apple", 12, "normal"), ("high2", "Magic", 15, "normal"),
+        ("high3", "Star", 18, "normal"), ("low1", "A", 30, "normal"),
+        ("low2", "K", 35, "normal"), ("low3", "Q", 40, "normal")
+    )),
+    "buffalo-power-2-hold-and-win": GameConfig(5, 3, _symbols(
+        ("wild", "Buffalo", 4, "wild"), ("scatter", "Scatter", 6, "scatter"),
+        ("high1", "Buffalo", 12, "normal"), ("high2", "Eagle", 15, "normal"),
+        ("high3", "Wolf", 18, "normal"), ("low1", "A", 30, "normal"),
+        ("low2", "K", 35, "normal"), ("low3", "Q", 40, "normal")
+    )),
+    "thunder-coins-hold-and-win": GameConfig(5, 3, _symbols(
+        ("wild", "Wild", 4, "wild"), ("scatter", "Scatter", 6, "scatter"),
+        ("high1", "Coin", 12, "normal"), ("high2", "Thunder", 15, "normal"),
+        ("high3", "Lightning", 18, "normal"), ("low1", "A", 30, "normal"),
+        ("low2", "K", 35, "normal"), ("low3", "Q", 40, "normal")
+    )),
+    "bonza-bucks-hold-and-win-extreme-10000": GameConfig(5, 3, _symbols(
+        ("wild", "Wild", 4, "wild"), ("scatter", "Scatter", 6, "scatter"),
+        ("high1", "Bucks", 12, "normal"), ("high2", "Gold", 15, "normal"),
+        ("high3", "Diamond", 18, "normal"), ("low1", "A", 30, "normal"),
+        ("low2", "K", 35, "normal"), ("low3", "Q", 40, "normal")
+    )),
+}
+
+
+@dataclass
+class SpinOutcome:
+    reels: List[List[str]]
+    win_amount: float
+    win_lines: List[int]
+    multiplier: float
+    feature_trigger: Optional[dict] = None
+
+    def to_json(self) -> dict:
+        """The object generateSpinOutcome returns, with its camelCase keys"""
+        return {
+            "reels": self.reels,
+            "winAmount": self.win_amount,
+            "winLines": self.win_lines,
+            "multiplier": self.multiplier,
+            "featureTrigger": self.feature_trigger,
+        }
+
+
+def get_game_config(game_id: str) -> GameConfig:
+    """The game's GAME_CONFIGS entry, or DEFAULT_SYMBOLS on a 5x3 layout"""
+    return GAME_CONFIGS.get(game_id) or GameConfig(*DEFAULT_LAYOUT, DEFAULT_SYMBOLS)
+
+
+def _boosted(symbol: SymbolWeight) -> bool:
+    return symbol.type == "wild" or symbol.id in ("high1", "high2", "high3")
+
+
+def spin_weights(is_master: bool = False, is_111_hook: bool = False) -> Tuple[SymbolWeight, ...]:
+    """Weights generateSpinOutcome actually draws from, for every game"""
+    if is_master:
+        factors = (10, 0.5)
+    elif is_111_hook:
+        factors = (3, 0.8)
+    else:
+        return DEFAULT_SYMBOLS
+    return tuple(
+        SymbolWeight(s.id, s.name, s.weight * (factors[0] if _boosted(s) else factors[1]), s.type)
+        for s in DEFAULT_SYMBOLS
+    )
+
+
+def seed_hash(seed: str, initial: int = 0) -> int:
+    """seededRandom's string hash (over UTF-16 code units), as a uint32"""
+    h = initial
+    if seed.isascii():
+        units = seed.encode("ascii")
+    else:
+        raw = seed.encode("utf-16-le")
+        units = [raw[i] | (raw[i + 1] << 8) for i in range(0, len(raw), 2)]
+    for unit in units:
+        h = (h * 31 + unit) & UINT32_MASK
+    return h
+
+
+def mix(h: int) -> int:
+    """One seededRandom step: the next uint32 state"""
+    h = ((h ^ (h >> 16)) * 2246822507) & UINT32_MASK
+    h = ((h ^ (h >> 13)) * 3266489909) & UINT32_MASK
+    return h ^ (h >> 16)
+
+
+def seeded_random(seed: str) -> Callable[[], float]:
+    """Port of seededRandom: a deterministic float stream in [0, 1)"""
+    state = seed_hash(seed)
+
+    def random() -> float:
+        nonlocal state
+        state = mix(state)
+        return state / TWO_POW_32
+
+    return random
+
+
+def cumulative_weights(symbols: Sequence[SymbolWeight]) -> Tuple[List[float], float]:
+    """Running totals in selectSymbol's summation order"""
+    cumulative, total = [], 0
+    for symbol in symbols:
+        total += symbol.weight
+        cumulative.append(total)
+    return cumulative, total
+
+
+def _pick(roll: float, ids: Sequence[str], cumulative: Sequence[float]) -> str:
+    for symbol_id, bound in zip(ids, cumulative):
+        if roll <= bound:
+            return symbol_id
+    return ids[0]
+
+
+def select_symbol(random: Callable[[], float], symbols: Sequence[SymbolWeight]) -> str:
+    cumulative, total = cumulative_weights(symbols)
+    return _pick(random() * total, [s.id for s in symbols], cumulative)
+
+
+def generate_reels(random: Callable[[], float], reels: int, rows: int,
+                   symbols: Sequence[SymbolWeight]) -> List[List[str]]:
+    """Reel-major grid: reels[reel][row] (weights are summed once, not per cell)"""
+    cumulative, total = cumulative_weights(symbols)
+    ids = [s.id for s in symbols]
+    return [[_pick(random() * total, ids, cumulative) for _ in range(rows)] for _ in range(reels)]
+
+
+def payline_matches(middle_row: Sequence[str]) -> Tuple[int, str]:
+    """Consecutive matches from the left, with wilds substituting"""
+    matches = 1
+    match_symbol = middle_row[0]
+    for symbol in middle_row[1:]:
+        if symbol == match_symbol or symbol == "wild" or match_symbol == "wild":
+            matches += 1
+            if match_symbol == "wild":
+                match_symbol = symbol
+        else:
+            break
+    return matches, match_symbol
+
+
+def calculate_win(reels: List[List[str]], wager: float) -> Tuple[float, List[int], float]:
+    """Port of calculateWin: (win_amount, win_lines, multiplier)"""
+    win_lines: List[int] = []
+    win_amount = 0
+
+    matches, match_symbol = payline_matches([reel[1] for reel in reels])
+    if matches >= 3 and any(s.id == match_symbol for s in DEFAULT_SYMBOLS):
+        win_amount = wager * PAYLINE_MULTIPLIERS[min(matches - 1, len(PAYLINE_MULTIPLIERS) - 1)]
+        win_lines.append(1)
+
+    scatter_count = sum(symbol == "scatter" for reel in reels for symbol in reel)
+    if scatter_count >= SCATTER_MIN_COUNT:
+        win_amount += wager * (scatter_count * SCATTER_MULTIPLIER)
+        win_lines.append(0)
+
+    multiplier = win_amount / wager if win_amount > 0 else 0
+    return win_amount, win_lines, multiplier
+
+
+def generate_spin_outcome(game_id: str, wager: float, seed: str,
+                          is_master: bool = False, is_111_hook: bool = False) -> SpinOutcome:
+    """Port of generateSpinOutcome, including the forced-win modes"""
+    random = seeded_random(seed)
+    config = get_game_config(game_id)
+    reels = generate_reels(random, config.reels, config.rows, spin_weights(is_master, is_111_hook))
+    win_amount, win_lines, multiplier = calculate_win(reels, wager)
+
+    mode_check_1 = random()
+    mode_check_2 = random()
+    if is_master and win_amount == 0:
+        if int(mode_check_1 * 10000) % 200 < 196:
+            forced = 2 + int(mode_check_2 * 49)
+            win_amount, multiplier, win_lines = wager * forced, forced, [1]
+    elif is_111_hook and win_amount == 0:
+        if int(mode_check_1 * 10000) % 1000 < 850:
+            forced = 1.5 + (mode_check_2 * 8.5)
+            win_amount, multiplier, win_lines = wager * forced, forced, [1]
+
+    scatter_count = sum(symbol == "scatter" for reel in reels for symbol in reel)
+    feature_trigger = None
+    if scatter_count >= SCATTER_MIN_COUNT:
+        feature_trigger = {
+            "type": "free_spins",
+            "data": {"freeSpins": FREE_SPINS_AWARDED, "scatterCount": scatter_count},
+        }
+
+    return SpinOutcome(reels, win_amount, win_lines, multiplier, feature_trigger)
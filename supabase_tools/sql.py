@@ -0,0 +1,141 @@
+"""
+SQL script splitting that understands PostgreSQL quoting
+
+Splitting on every `;` breaks plpgsql bodies such as check_rate_limit;
+this tokenizer only splits on semicolons outside string literals, quoted
+identifiers, comments and dollar-quoted bodies ($$ ... $$, $fn$ ... $fn$).
+"""
+
+import re
+from typing import List
+
+_DOLLAR_TAG = re.compile(r"\$(?:[A-Za-z_\u0080-\uffff][A-Za-z_0-9\u0080-\uffff]*)?\$")
+_IDENT_CHAR = re.compile(r"[A-Za-z_0-9$\u0080-\uffff]")
+
+
+def _skip_block_comment(text: str, i: int) -> int:
+    """Index just past a (possibly nested) /* ... */ starting at `i`"""
+    depth = 0
+    n = len(text)
+    while i < n:
+        if text.startswith("/*", i):
+            depth += 1
+            i += 2
+        elif text.startswith("*/", i):
+            depth -= 1
+            i += 2
+            if depth == 0:
+                return i
+        else:
+            i += 1
+    return n
+
+
+def _skip_quoted(text: str, i: int, quote: str, backslash: bool) -> int:
+    """Index just past a '...' or "..." token starting at `i`"""
+    n = len(text)
+    i += 1
+    while i < n:
+        c = text[i]
+        if backslash and c == "\\":
+            i += 2
+            continue
+        if c == quote:
+            if i + 1 < n and text[i + 1] == quote:
+                i += 2
+                continue
+            return i + 1
+        i += 1
+    return n
+
+
+def split_sql(text: str) -> List[str]:
+    """Split a script into statements, dropping empty and comment-only ones"""
+    statements: List[str] = []
+    start = 0
+    has_code = False
+    i = 0
+    n = len(text)
+
+    while i < n:
+        c = text[i]
+        if c == "-" and text.startswith("--", i):
+            newline = text.find("\n", i)
+            i = n if newline == -1 else newline + 1
+            continue
+        if c == "/" and text.startswith("/*", i):
+            i = _skip_block_comment(text, i)
+            continue
+        if c == ";":
+            if has_code:
+                statements.append(text[start:i].strip())
+            start = i + 1
+            has_code = False
+            i += 1
+            continue
+        if c.isspace():
+            i += 1
+            continue
+
+        has_code = True
+        prev = text[i - 1] if i > 0 else ""
+        if c == "'":
+            escape_string = prev in ("E", "e") and (i < 2 or not _IDENT_CHAR.match(text[i - 2]))
+            i = _skip_quoted(text, i, "'", backslash=escape_string)
+        elif c == '"':
+            i = _skip_quoted(text, i, '"', backslash=False)
+        elif c == "$" and not _IDENT_CHAR.match(prev):
+            match = _DOLLAR_TAG.match(text, i)
+            if match:
+                tag = match.group(0)
+                close = text.find(tag, match.end())
+                i = n if close == -1 else close + len(tag)
+            else:
+                i += 1
+        else:
+            i += 1
+
+    if has_code:
+        statements.append(text[start:].strip())
+    return statements
+
+
+
+def strip_comments(text: str) -> str:
+    """
+    Remove -- and /* */ comments, leaving string literals, quoted
+    identifiers and dollar-quoted bodies untouched. Each comment becomes a
+    single space so neighbouring tokens stay apart.
+    """
+    out: List[str] = []
+    start = 0
+    i = 0
+    n = len(text)
+
+    while i < n:
+        c = text[i]
+        prev = text[i - 1] if i > 0 else ""
+        if c == "-" and text.startswith("--", i):
+            out.append(text[start:i] + " ")
+            newline = text.find("\n", i)
+            i = start = n if newline == -1 else newline
+        elif c == "/" and text.startswith("/*", i):
+            out.append(text[start:i] + " ")
+            i = start = _skip_block_comment(text, i)
+        elif c == "'":
+            escape_string = prev in ("E", "e") and (i < 2 or not _IDENT_CHAR.match(text[i - 2]))
+            i = _skip_quoted(text, i, "'", backslash=escape_string)
+        elif c == '"':
+            i = _skip_quoted(text, i, '"', backslash=False)
+        elif c == "$" and not _IDENT_CHAR.match(prev):
+            match = _DOLLAR_TAG.match(text, i)
+            if match:
+                close = text.find(match.group(0), match.end())
+                i = n if close == -1 else close + len(match.group(0))
+            else:
+                i += 1
+        else:
+            i += 1
+
+    out.append(text[start:])
+    return "".join(out)
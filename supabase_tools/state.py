@@ -0,0 +1,37 @@
+"""
+Small JSON state files under .deploy-state/
+"""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any
+
+from supabase_tools.config import STATE_DIR
+
+
+def state_path(name: str) -> Path:
+    return STATE_DIR / name
+
+
+def load_json(path: Path, default: Any = None) -> Any:
+    """Read a state file, falling back to `default` if missing or corrupt"""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def save_json(path: Path, data: Any) -> None:
+    """Write a state file atomically so an interrupted run never truncates it"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
@@ -0,0 +1,664 @@
+"""
+Synthetic production-scale datasets streamed in with COPY
+
+Every table is generated in fixed-size chunks. Chunk c of a table draws from
+a NumPy generator seeded with (seed, table, c), so a dataset depends only on
+the spec, never on how many workers loaded it. Chunks are grouped into
+partitions; each partition is one worker process with its own connection,
+formatting rows as COPY text and streaming them through COPY ... FROM STDIN.
+
+Row ids are derived from the seed and the row number (see synthetic_uuid), so
+foreign keys line up across processes without any coordination: spin n's
+player is user k for a k drawn in spin n's chunk, and provably_fair_verification
+rows regenerate the spin chunk they sample from to reuse its user, game and id.
+
+Distributions: player activity is a power law (user index u^skew), game
+popularity is Zipf over game_definitions.json with hot/featured games boosted,
+wagers are log-normal on a 0.20 bet ladder, wins hit with a fixed frequency
+and pay exponentially so each game returns its advertised RTP, and
+timestamps follow a diurnal curve.
+
+NumPy is optional for the rest of supabase_tools and imported lazily.
+"""
+
+import hashlib
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+from supabase_tools.catalogue import load_game_definitions
+from supabase_tools.db import connect
+from supabase_tools.state import save_json, state_path
+
+CHUNK_ROWS = 50_000
+DEFAULT_PARTITION_CHUNKS = 20
+COPY_BUFFER = 1 << 20
+
+# Load order: auth.users and users before anything that references them
+TABLES = (
+    "auth.users",
+    "users",
+    "game_spins",
+    "provably_fair_verification",
+    "game_sessions",
+    "transactions",
+    "user_bonuses",
+    "rate_limit_logs",
+)
+# Stable per-table RNG stream ids; never renumber, or every dataset changes
+_STREAMS = {table: number for number, table in enumerate(TABLES)}
+# Tables load tier by tier, each tier's partitions in parallel, so with
+# triggers kept every foreign key's target has committed before its rows
+LOAD_TIERS = (
+    ("auth.users",),
+    ("users",),
+    ("game_spins", "game_sessions", "transactions", "user_bonuses", "rate_limit_logs"),
+    ("provably_fair_verification",),
+)
+# Definitions of the indexes a deferred-index load dropped, until rebuilt
+DEFERRED_INDEXES_PATH = state_path("deferred-indexes.json")
+
+COLUMNS = {
+    "auth.users": ("id", "email", "raw_user_meta_data", "created_at"),
+    "users": ("id", "display_name", "referral_code", "total_balance_aud", "is_kyc_verified",
+              "bonus_balance", "created_at"),
+    "game_spins": ("id", "user_id", "game_id", "spin_index", "wager", "outcome_json",
+                   "win_amount", "rng_seed", "balance_before", "balance_after", "created_at"),
+    "provably_fair_verification": ("user_id", "spin_id", "game_id", "server_seed", "client_seed",
+                                   "nonce", "outcome_hash", "outcome_json", "created_at"),
+    "game_sessions": ("user_id", "game_id", "start_time", "end_time", "wager_amount",
+                      "payout_amount"),
+    "transactions": ("user_id", "type", "amount", "status", "transaction_hash", "created_at"),
+    "user_bonuses": ("user_id", "bonus_type", "bonus_amount", "status", "wagering_requirement",
+                     "wagered_amount", "expires_at", "claimed_at", "created_at"),
+    "rate_limit_logs": ("user_id", "action_type", "ip_address", "created_at"),
+}
+
+TRANSACTION_TYPES = (("wager", 0.40), ("payout", 0.30), ("deposit", 0.15),
+                     ("bonus", 0.10), ("withdrawal", 0.05))
+TRANSACTION_STATUSES = (("completed", 0.95), ("pending", 0.03), ("failed", 0.02))
+BONUS_TYPES = (("sign_up", 0.4), ("deposit_match", 0.3), ("free_spins", 0.2), ("cashback", 0.1))
+BONUS_STATUSES = (("claimed", 0.45), ("active", 0.25), ("expired", 0.2),
+                  ("pending", 0.07), ("cancelled", 0.03))
+RATE_LIMIT_ACTIONS = (("spin", 0.9), ("claim_bonus", 0.05), ("deposit", 0.05))
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise RuntimeError("NumPy is required for synthetic data - run: pip install numpy") from None
+    return numpy
+
+
+@dataclass(frozen=True)
+class Distributions:
+    activity_skew: float = 3.0      # user index = users * u^skew; 1.0 = uniform
+    game_skew: float = 1.1          # Zipf exponent over the game catalogue
+    hot_boost: float = 3.0          # popularity multiplier for is_hot/featured games
+    wager_median: float = 1.0
+    wager_sigma: float = 1.2        # log-normal shape; larger = heavier tail
+    min_wager: float = 0.20
+    max_wager: float = 1000.0
+    hit_rate: float = 0.28
+    days: int = 90                  # history window ending at the spec's anchor
+    peak_hour_utc: int = 10         # 20:00 AEST
+    diurnal_amplitude: float = 0.6  # 0 = flat day, 1 = dead at the trough
+
+
+@dataclass(frozen=True)
+class DatasetSpec:
+    seed: int
+    users: int
+    spins: int
+    sessions: int
+    transactions: int
+    bonuses: int
+    rate_limit_logs: int
+    verify_ratio: float
+    # (slug, rtp as a fraction, popularity weight) drawn from game_definitions.json
+    games: Tuple[Tuple[str, float, float], ...]
+    anchor: int                     # epoch seconds the history window ends at
+    distributions: Distributions = field(default_factory=Distributions)
+
+    def rows(self, table: str) -> int:
+        """Rows the spec asks for (verification rows are sampled, so approximate)"""
+        return {
+            "auth.users": self.users,
+            "users": self.users,
+            "game_spins": self.spins,
+            "provably_fair_verification": int(self.spins * self.verify_ratio),
+            "game_sessions": self.sessions,
+            "transactions": self.transactions,
+            "user_bonuses": self.bonuses,
+            "rate_limit_logs": self.rate_limit_logs,
+        }[table]
+
+    def chunks(self, table: str) -> int:
+        # Verification rows are sampled from the spin chunks
+        source = "game_spins" if table == "provably_fair_verification" else table
+        return math.ceil(self.rows(source) / CHUNK_ROWS)
+
+
+def catalogue_games(distributions: Distributions, seed: int,
+                    definitions: Optional[List[dict]] = None) -> Tuple[Tuple[str, float, float], ...]:
+    """game_definitions.json entries with Zipf popularity over a seeded ranking"""
+    np = _numpy()
+    definitions = definitions if definitions is not None else load_game_definitions()
+    order = np.random.default_rng([seed, len(_STREAMS)]).permutation(len(definitions))
+    games = []
+    for rank, index in enumerate(order.tolist(), 1):
+        game = definitions[index]
+        weight = rank ** -distributions.game_skew
+        if game.get("is_hot") or game.get("featured"):
+            weight *= distributions.hot_boost
+        games.append((game["slug"], float(game.get("rtp") or 96.0) / 100, weight))
+    total = sum(weight for _, _, weight in games)
+    return tuple((slug, rtp, weight / total) for slug, rtp, weight in games)
+
+
+def default_anchor() -> int:
+    """Midnight UTC today, so one day's runs share timestamps"""
+    today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    return int(today.timestamp())
+
+
+def _prefix(seed: int, tag: str, length: int) -> str:
+    return hashlib.sha256(f"synthetic:{seed}:{tag}".encode()).hexdigest()[:length]
+
+
+def synthetic_uuid(seed: int, tag: str, n: int) -> str:
+    """Row n's id: a seed-derived version 4 UUID prefix and n in the last 12 digits"""
+    return _uuid_template(seed, tag) % n
+
+
+def _uuid_template(seed: int, tag: str) -> str:
+    p = _prefix(seed, tag, 19)
+    return f"{p[:8]}-{p[8:12]}-4{p[12:15]}-8{p[15:18]}-%012x"
+
+
+def _rng(spec: DatasetSpec, table: str, chunk: int):
+    return _numpy().random.default_rng([spec.seed, _STREAMS[table], chunk])
+
+
+def _chunk_range(spec: DatasetSpec, table: str, chunk: int) -> Tuple[int, int]:
+    start = chunk * CHUNK_ROWS
+    return start, min(start + CHUNK_ROWS, spec.rows(table))
+
+
+def _pick(rng, choices, size):
+    names = [name for name, _ in choices]
+    weights = [weight for _, weight in choices]
+    return [names[i] for i in rng.choice(len(names), size=size, p=weights).tolist()]
+
+
+def _players(rng, spec: DatasetSpec, size: int):
+    """Power-law player indices: low numbers are the whales"""
+    skew = spec.distributions.activity_skew
+    return (spec.users * rng.random(size) ** skew).astype("int64").clip(0, spec.users - 1)
+
+
+def _timestamps(rng, spec: DatasetSpec, size: int):
+    """Epoch seconds over the window with a sinusoidal day curve"""
+    np = _numpy()
+    d = spec.distributions
+    hours = np.arange(24)
+    weights = 1 + d.diurnal_amplitude * np.cos(2 * np.pi * (hours - d.peak_hour_utc) / 24)
+    hour = rng.choice(24, size=size, p=weights / weights.sum())
+    day = rng.integers(1, d.days + 1, size=size)
+    return spec.anchor - day * 86_400 + hour * 3_600 + rng.integers(0, 3_600, size=size)
+
+
+def _iso(np, epoch):
+    return (np.datetime_as_string(epoch.astype("datetime64[s]"), unit="s")).tolist()
+
+
+def _wagers(rng, spec: DatasetSpec, size: int):
+    np = _numpy()
+    d = spec.distributions
+    raw = rng.lognormal(math.log(d.wager_median), d.wager_sigma, size)
+    return np.clip(np.round(raw / d.min_wager) * d.min_wager, d.min_wager, d.max_wager)
+
+
+def _spin_arrays(spec: DatasetSpec, chunk: int) -> dict:
+    """Every column of spin chunk `chunk` as arrays (formatting happens later)"""
+    np = _numpy()
+    start, stop = _chunk_range(spec, "game_spins", chunk)
+    size = stop - start
+    rng = _rng(spec, "game_spins", chunk)
+    d = spec.distributions
+    popularity = np.array([weight for _, _, weight in spec.games])
+    rtps = np.array([rtp for _, rtp, _ in spec.games])
+
+    game = rng.choice(len(spec.games), size=size, p=popularity)
+    wager = _wagers(rng, spec, size)
+    hit = rng.random(size) < d.hit_rate
+    # Exponential pays with mean rtp / hit_rate give each game its RTP
+    multiplier = np.where(hit, rng.exponential(rtps[game] / d.hit_rate), 0.0)
+    win = np.round(wager * multiplier, 2)
+    before = np.maximum(np.round(rng.lognormal(math.log(200), 1.0, size), 2), wager)
+    return {
+        "n": np.arange(start, stop),
+        "user": _players(rng, spec, size),
+        "game": game,
+        "wager": wager,
+        "multiplier": multiplier,
+        "win": win,
+        "before": before,
+        "after": before - wager + win,
+        "seed": rng.integers(0, 2 ** 63, size=(size, 2)),
+        "created": _timestamps(rng, spec, size),
+    }
+
+
+def generate_chunk(spec: DatasetSpec, table: str, chunk: int) -> str:
+    """Chunk `chunk` of `table` as COPY text rows"""
+    np = _numpy()
+    seed = spec.seed
+    user_id = _uuid_template(seed, "users")
+    slugs = [slug for slug, _, _ in spec.games]
+
+    if table == "game_spins":
+        s = _spin_arrays(spec, chunk)
+        row = (_uuid_template(seed, "game_spins") + "\t" + user_id
+               + '\t%s\t%d\t%.2f\t{"multiplier": %.4f}\t%.2f\t%016x%016x\t%.2f\t%.2f\t%s+00\n')
+        return "".join(
+            row % (n, user, slugs[game], n, wager, multiplier, win, s1, s2, before, after, created)
+            for n, user, game, wager, multiplier, win, (s1, s2), before, after, created in zip(
+                s["n"].tolist(), s["user"].tolist(), s["game"].tolist(), s["wager"].tolist(),
+                s["multiplier"].tolist(), s["win"].tolist(), s["seed"].tolist(),
+                s["before"].tolist(), s["after"].tolist(), _iso(np, s["created"])
+            )
+        )
+
+    if table == "provably_fair_verification":
+        s = _spin_arrays(spec, chunk)
+        rng = _rng(spec, table, chunk)
+        picked = np.flatnonzero(rng.random(len(s["n"])) < spec.verify_ratio)
+        hashes = rng.integers(0, 2 ** 63, size=(len(picked), 7))
+        row = (user_id + "\t" + _uuid_template(seed, "game_spins")
+               + '\t%s\t%016x%016x\t%016x\t%d\t%016x%016x%016x%016x\t{"multiplier": %.4f}\t%s+00\n')
+        return "".join(
+            row % (user, n, slugs[game], *h[:3], n % 2_147_483_647, *h[3:], multiplier, created)
+            for user, n, game, h, multiplier, created in zip(
+                s["user"][picked].tolist(), s["n"][picked].tolist(), s["game"][picked].tolist(),
+                hashes.tolist(), s["multiplier"][picked].tolist(), _iso(np, s["created"][picked])
+            )
+        )
+
+    start, stop = _chunk_range(spec, table, chunk)
+    size = stop - start
+    rng = _rng(spec, table, chunk)
+    n = np.arange(start, stop)
+
+    if table == "auth.users":
+        created = _iso(np, spec.anchor - rng.integers(86_400 * spec.distributions.days,
+                                                       86_400 * 3 * spec.distributions.days, size))
+        row = user_id + '\tplayer%d@synthetic.test\t{"display_name": "Player %d"}\t%s+00\n'
+        return "".join(row % (i, i, i, c) for i, c in zip(n.tolist(), created))
+
+    if table == "users":
+        # Same draws as auth.users so both tables agree on created_at
+        created = _iso(np, spec.anchor - _rng(spec, "auth.users", chunk).integers(
+            86_400 * spec.distributions.days, 86_400 * 3 * spec.distributions.days, size))
+        balance = np.round(rng.lognormal(math.log(50), 1.5, size), 2)
+        kyc = rng.random(size) < 0.7
+        bonus = np.where(rng.random(size) < 0.2, 25.0, 0.0)
+        row = user_id + "\tPlayer %d\tSYN%09x\t%.2f\t%s\t%.2f\t%s+00\n"
+        return "".join(
+            row % (i, i, i, b, "t" if k else "f", bb, c)
+            for i, b, k, bb, c in zip(n.tolist(), balance.tolist(), kyc.tolist(), bonus.tolist(), created)
+        )
+
+    if table == "game_sessions":
+        game = rng.choice(len(spec.games), size=size, p=[w for _, _, w in spec.games])
+        start_time = _timestamps(rng, spec, size)
+        duration = rng.exponential(900, size).astype("int64") + 30
+        spins = rng.geometric(1 / 60, size)
+        wagered = np.round(spins * _wagers(rng, spec, size), 2)
+        rtps = np.array([rtp for _, rtp, _ in spec.games])[game]
+        payout = np.round(wagered * rng.normal(rtps, 0.25).clip(0), 2)
+        row = user_id + "\t%s\t%s+00\t%s+00\t%.2f\t%.2f\n"
+        return "".join(
+            row % (u, slugs[g], s, e, w, p) for u, g, s, e, w, p in zip(
+                _players(rng, spec, size).tolist(), game.tolist(), _iso(np, start_time),
+                _iso(np, start_time + duration), wagered.tolist(), payout.tolist()
+            )
+        )
+
+    if table == "transactions":
+        kinds = _pick(rng, TRANSACTION_TYPES, size)
+        amounts = _wagers(rng, spec, size) * np.where(
+            np.isin(kinds, ["deposit", "withdrawal"]), 50.0, 1.0)
+        row = user_id + "\t%s\t%.2f\t%s\t" + "0x" + _prefix(seed, "transactions", 16) + "%016x\t%s+00\n"
+        return "".join(
+            row % (u, kind, amount, status, i, c) for u, kind, amount, status, i, c in zip(
+                _players(rng, spec, size).tolist(), kinds, amounts.tolist(),
+                _pick(rng, TRANSACTION_STATUSES, size), n.tolist(),
+                _iso(np, _timestamps(rng, spec, size))
+            )
+        )
+
+    if table == "user_bonuses":
+        statuses = _pick(rng, BONUS_STATUSES, size)
+        amount = rng.choice([10.0, 25.0, 50.0, 100.0], size=size, p=[0.4, 0.3, 0.2, 0.1])
+        progress = rng.random(size)
+        created = _timestamps(rng, spec, size)
+        claimed = [f"{c}+00" if status == "claimed" else r"\N"
+                   for status, c in zip(statuses, _iso(np, created + rng.integers(60, 86_400, size)))]
+        row = user_id + "\t%s\t%.2f\t%s\t%.2f\t%.2f\t%s+00\t%s\t%s+00\n"
+        return "".join(
+            row % (u, kind, a, status, 30 * a, 30 * a * p, e, cl, c)
+            for u, kind, a, status, p, e, cl, c in zip(
+                rng.integers(0, spec.users, size).tolist(), _pick(rng, BONUS_TYPES, size),
+                amount.tolist(), statuses, progress.tolist(), _iso(np, created + 30 * 86_400),
+                claimed, _iso(np, created)
+            )
+        )
+
+    if table == "rate_limit_logs":
+        users = _players(rng, spec, size)
+        # One address per player, so per-IP queries see realistic cardinality
+        row = user_id + "\t%s\t10.%d.%d.%d\t%s+00\n"
+        return "".join(
+            row % (u, action, (u >> 16) & 255, (u >> 8) & 255, u & 255, c)
+            for u, action, c in zip(users.tolist(), _pick(rng, RATE_LIMIT_ACTIONS, size),
+                                    _iso(np, _timestamps(rng, spec, size)))
+        )
+
+    raise ValueError(f"Unknown table {table}")
+
+
+class _ChunkStream:
+    """File-like reader over generated chunks, for psycopg2's copy_expert"""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._buffer = memoryview(b"")
+        self.rows = 0
+
+    def read(self, size: int = -1) -> bytes:
+        if not self._buffer:
+            for text in self._chunks:
+                if text:
+                    self.rows += text.count("\n")
+                    self._buffer = memoryview(text.encode())
+                    break
+            else:
+                return b""
+        data = self._buffer[:size] if size >= 0 else self._buffer
+        self._buffer = self._buffer[len(data):]
+        return bytes(data)
+
+
+def copy_chunks(conn, table: str, columns: Tuple[str, ...], chunks) -> int:
+    """Stream COPY text chunks into `table`; returns the rows sent"""
+    target = table if "." in table else f"public.{table}"
+    statement = f"COPY {target} ({', '.join(columns)}) FROM STDIN"
+    stream = _ChunkStream(chunks)
+    with conn.cursor() as cur:
+        if hasattr(cur, "copy_expert"):
+            cur.copy_expert(statement, stream, size=COPY_BUFFER)
+        else:
+            with cur.copy(statement) as copy:
+                while True:
+                    data = stream.read(COPY_BUFFER)
+                    if not data:
+                        break
+                    copy.write(data)
+    return stream.rows
+
+
+@dataclass(frozen=True)
+class Partition:
+    table: str
+    first_chunk: int
+    last_chunk: int   # exclusive
+
+
+@dataclass
+class PartitionResult:
+    partition: Partition
+    rows: int
+    seconds: float
+
+
+def plan_partitions(spec: DatasetSpec, tables=TABLES,
+                    partition_chunks: int = DEFAULT_PARTITION_CHUNKS) -> List[Partition]:
+    return [
+        Partition(table, first, min(first + partition_chunks, spec.chunks(table)))
+        for table in tables
+        for first in range(0, spec.chunks(table), partition_chunks)
+    ]
+
+
+def _upsert_users(conn, chunks) -> int:
+    """
+    With triggers on, the signup handler has already created each player's
+    users row from auth.users; stage the generated rows and overwrite those,
+    as the service role so the balance guard lets the balances through
+    """
+    columns = COLUMNS["users"]
+    with conn.cursor() as cur:
+        cur.execute("SELECT set_config('request.jwt.claims', %s, true)", ('{"role": "service_role"}',))
+        cur.execute("CREATE TEMP TABLE users_load (LIKE public.users INCLUDING DEFAULTS) ON COMMIT DROP")
+    rows = copy_chunks(conn, "pg_temp.users_load", columns, chunks)
+    updates = ", ".join(f"{column} = EXCLUDED.{column}" for column in columns if column != "id")
+    with conn.cursor() as cur:
+        cur.execute(
+            f"""INSERT INTO public.users ({', '.join(columns)})
+                SELECT {', '.join(columns)} FROM pg_temp.users_load
+                ON CONFLICT (id) DO UPDATE SET {updates}"""
+        )
+    return rows
+
+
+def load_partition(dsn: str, spec: DatasetSpec, partition: Partition,
+                   skip_triggers: bool = True) -> PartitionResult:
+    started = time.perf_counter()
+    conn = connect(dsn)
+    try:
+        if skip_triggers:
+            with conn.cursor() as cur:
+                # Rows are consistent by construction; skips FK checks and
+                # per-row triggers such as the signup handler
+                cur.execute("SET session_replication_role = replica")
+        chunks = (generate_chunk(spec, partition.table, chunk)
+                  for chunk in range(partition.first_chunk, partition.last_chunk))
+        if partition.table == "users" and not skip_triggers:
+            rows = _upsert_users(conn, chunks)
+        else:
+            rows = copy_chunks(conn, partition.table, COLUMNS[partition.table], chunks)
+        conn.commit()
+    finally:
+        conn.close()
+    return PartitionResult(partition, rows, time.perf_counter() - started)
+
+
+def _load_partition_args(args) -> PartitionResult:
+    return load_partition(*args)
+
+
+def _create_index_args(args) -> float:
+    return create_index(*args)
+
+
+def secondary_indexes(dsn: str, tables) -> List[Tuple[str, str]]:
+    """(name, definition) of the indexes on `tables` that no constraint owns"""
+    names = [table if "." in table else f"public.{table}" for table in tables]
+    conn = connect(dsn, autocommit=True)
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                """SELECT i.indexrelid::regclass::text, pg_get_indexdef(i.indexrelid)
+                   FROM pg_index i
+                   WHERE i.indrelid = ANY(%s::regclass[])
+                     AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = i.indexrelid)
+                   ORDER BY 1""",
+                (names,)
+            )
+            # A partitioned table's index reads "ON ONLY parent"; rebuilt
+            # like that it would cover none of the partitions
+            return [(name, definition.replace(" ON ONLY ", " ON ", 1)) for name, definition in cur.fetchall()]
+    finally:
+        conn.close()
+
+
+def drop_indexes(dsn: str, indexes: List[Tuple[str, str]]) -> None:
+    conn = connect(dsn, autocommit=True)
+    try:
+        with conn.cursor() as cur:
+            for name, _ in indexes:
+                cur.execute(f"DROP INDEX IF EXISTS {name}")
+    finally:
+        conn.close()
+
+
+def create_month_partitions(dsn: str, spec: DatasetSpec, tables) -> None:
+    """
+    Create the monthly partitions of the spec's history window for the
+    tables that are partitioned, so the load does not all land in their
+    DEFAULT partition
+    """
+    since = spec.anchor - 86_400 * spec.distributions.days
+    conn = connect(dsn, autocommit=True)
+    try:
+        with conn.cursor() as cur:
+            for table in (table for table in tables if "." not in table):
+                cur.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", (f"public.{table}",))
+                row = cur.fetchone()
+                if row and row[0] == "p":
+                    cur.execute(
+                        "SELECT public.create_monthly_partitions(%s, to_timestamp(%s), to_timestamp(%s))",
+                        (table, since, spec.anchor + 86_400)
+                    )
+    finally:
+        conn.close()
+
+
+def create_index(dsn: str, definition: str, maintenance_work_mem: str = "512MB") -> float:
+    started = time.perf_counter()
+    conn = connect(dsn, autocommit=True)
+    try:
+        with conn.cursor() as cur:
+            cur.execute(f"SET maintenance_work_mem = '{maintenance_work_mem}'")
+            cur.execute(definition)
+    finally:
+        conn.close()
+    return time.perf_counter() - started
+
+
+def _run_parallel(function, jobs: list, workers: int, on_result: Callable) -> None:
+    if workers <= 1:
+        for job in jobs:
+            on_result(function(job))
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(function, job) for job in jobs]
+        for future in as_completed(futures):
+            on_result(future.result())
+
+
+@dataclass
+class LoadReport:
+    rows: Dict[str, int] = field(default_factory=dict)
+    seconds: Dict[str, float] = field(default_factory=dict)
+    index_seconds: float = 0.0
+    wall_seconds: float = 0.0
+
+    @property
+    def total_rows(self) -> int:
+        return sum(self.rows.values())
+
+
+def generate_dataset(dsn: str, spec: DatasetSpec, tables=TABLES, workers: Optional[int] = None,
+                     partition_chunks: int = DEFAULT_PARTITION_CHUNKS, skip_triggers: bool = True,
+                     defer_indexes: bool = False,
+                     progress: Optional[Callable[[PartitionResult], None]] = None) -> LoadReport:
+    """
+    Load `tables` from `spec`, tier by tier (LOAD_TIERS), running each
+    tier's partitions together across `workers` processes. With
+    defer_indexes the secondary indexes are dropped first and rebuilt, in
+    parallel, after the load, which is much faster than maintaining them row
+    by row. They are rebuilt even if the load fails, and their definitions
+    stay in DEFERRED_INDEXES_PATH until the rebuild has succeeded.
+    """
+    workers = workers or os.cpu_count() or 1
+    tables = [table for table in TABLES if table in tables]
+    report = LoadReport()
+    started = time.perf_counter()
+
+    create_month_partitions(dsn, spec, tables)
+    indexes = secondary_indexes(dsn, tables) if defer_indexes else []
+    if indexes:
+        save_json(DEFERRED_INDEXES_PATH, {"database": dsn.rsplit("@", 1)[-1],
+                                          "indexes": dict(indexes)})
+    drop_indexes(dsn, indexes)
+
+    def on_result(result: PartitionResult) -> None:
+        table = result.partition.table
+        report.rows[table] = report.rows.get(table, 0) + result.rows
+        report.seconds[table] = report.seconds.get(table, 0.0) + result.seconds
+        if progress:
+            progress(result)
+
+    loaded = False
+    try:
+        for tier in LOAD_TIERS:
+            jobs = [(dsn, spec, partition, skip_triggers)
+                    for partition in plan_partitions(spec, [table for table in tables if table in tier],
+                                                     partition_chunks)]
+            _run_parallel(_load_partition_args, jobs, workers, on_result)
+        loaded = True
+    finally:
+        index_started = time.perf_counter()
+        try:
+            _run_parallel(_create_index_args, [(dsn, definition) for _, definition in indexes],
+                          workers, lambda seconds: None)
+        except Exception as e:
+            # After a failed load, let the load's own error propagate
+            if loaded:
+                raise RuntimeError(
+                    f"Rebuilding the deferred indexes failed ({str(e).strip()}); "
+                    f"their definitions are in {DEFERRED_INDEXES_PATH}"
+                ) from e
+        else:
+            if indexes:
+                DEFERRED_INDEXES_PATH.unlink(missing_ok=True)
+        report.index_seconds = time.perf_counter() - index_started
+
+    conn = connect(dsn, autocommit=True)
+    try:
+        with conn.cursor() as cur:
+            for table in tables:
+                cur.execute(f"ANALYZE {table if '.' in table else 'public.' + table}")
+    finally:
+        conn.close()
+    report.wall_seconds = time.perf_counter() - started
+    return report
+
+
+def build_spec(seed: int, users: int, spins: int, sessions: Optional[int] = None,
+               transactions: Optional[int] = None, bonuses: Optional[int] = None,
+               rate_limit_logs: Optional[int] = None, verify_ratio: float = 0.1,
+               anchor: Optional[int] = None, distributions: Optional[Distributions] = None,
+               definitions: Optional[List[dict]] = None) -> DatasetSpec:
+    """A spec with the other tables sized relative to the spin count"""
+    distributions = distributions or Distributions()
+    return DatasetSpec(
+        seed=seed,
+        users=users,
+        spins=spins,
+        sessions=sessions if sessions is not None else spins // 50,
+        transactions=transactions if transactions is not None else spins // 5,
+        bonuses=bonuses if bonuses is not None else users * 2,
+        rate_limit_logs=rate_limit_logs if rate_limit_logs is not None else spins // 10,
+        verify_ratio=verify_ratio,
+        games=catalogue_games(distributions, seed, definitions),
+        anchor=anchor if anchor is not None else default_anchor(),
+        distributions=distributions,
+    )
@@ -0,0 +1,284 @@
+"""
+Responsive thumbnail builds for public/game-tiles
+
+Each source tile is resized to a few widths and encoded as AVIF, WebP and
+JPEG across a process pool. Output names carry a hash of the encoded bytes
+(`{game_code}-{width}w.{hash}.{ext}`), so they can be served with an
+immutable, year-long cache lifetime and a changed tile always gets a new
+URL.
+
+manifest.json in the output directory records each tile's source SHA-256,
+the settings it was built with and its variants; a rebuild only re-encodes tiles whose
+source or settings changed and removes the variants they replaced.
+
+The output is committed with the sources: the site build only copies
+public/, so a hashed URL is live once the commit that added its file is
+deployed, and publishing refuses while any built file is uncommitted.
+
+Pillow is optional and only needed when something has to be encoded.
+"""
+
+import hashlib
+import io
+import os
+import subprocess
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from supabase_tools.config import PROJECT_DIR
+from supabase_tools.state import load_json, save_json
+
+SOURCE_DIR = PROJECT_DIR / "public" / "game-tiles"
+OUTPUT_DIR = SOURCE_DIR / "optimized"
+MANIFEST_NAME = "manifest.json"
+PUBLIC_DIR = PROJECT_DIR / "public"
+SOURCE_SUFFIXES = (".jpg", ".jpeg", ".png", ".webp")
+
+WIDTHS = (160, 320, 640)
+# (format, file extension, Pillow save options), best compression first
+FORMATS = (
+    ("avif", "avif", {"quality": 50, "speed": 6}),
+    ("webp", "webp", {"quality": 75, "method": 6}),
+    ("jpeg", "jpg", {"quality": 80, "optimize": True, "progressive": True}),
+)
+# Variant written to licensed_games.thumbnail_url: decodable everywhere and
+# sharp on a 2x card
+DEFAULT_FORMAT = "jpeg"
+DEFAULT_WIDTH = 320
+HASH_LENGTH = 10
+
+
+def _pillow():
+    try:
+        from PIL import Image
+    except ImportError:
+        raise RuntimeError(
+            "Building thumbnails needs Pillow: pip install Pillow"
+        ) from None
+    return Image
+
+
+def supported_formats(formats: Sequence[str] = tuple(f for f, _, _ in FORMATS)) -> List[str]:
+    """The requested formats this Pillow build can encode"""
+    Image = _pillow()
+    if "avif" in formats:
+        try:
+            import pillow_avif  # noqa: F401  (registers AVIF on Pillow < 11.2)
+        except ImportError:
+            pass
+    Image.init()
+    return [name for name in formats if name.upper() in Image.SAVE]
+
+
+def settings_key(widths: Sequence[int], formats: Sequence[str]) -> str:
+    """Fingerprint of everything that changes the encoded output"""
+    options = [(name, ext, sorted(opts.items())) for name, ext, opts in FORMATS if name in formats]
+    return hashlib.sha256(repr((sorted(widths), options)).encode()).hexdigest()[:16]
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def public_url(path: Path) -> str:
+    return "/" + path.relative_to(PUBLIC_DIR).as_posix()
+
+
+@dataclass(frozen=True)
+class TileTask:
+    game_code: str
+    source: Path
+    source_sha256: str
+    output_dir: Path
+    widths: Tuple[int, ...]
+    formats: Tuple[str, ...]
+    settings: str
+
+
+def build_tile(task: TileTask) -> dict:
+    """Worker entry point: encode every variant of one tile, return its manifest entry"""
+    Image = _pillow()
+    options = {name: (ext, opts) for name, ext, opts in FORMATS}
+    variants = []
+    with Image.open(task.source) as image:
+        image = image.convert("RGB")
+        source_width, source_height = image.size
+        # Never upscale: widths above the source collapse to the source width
+        widths = sorted({min(width, source_width) for width in task.widths})
+        for width in widths:
+            height = max(1, round(source_height * width / source_width))
+            resized = image if width == source_width else image.resize((width, height), Image.LANCZOS)
+            for name in task.formats:
+                ext, opts = options[name]
+                buffer = io.BytesIO()
+                resized.save(buffer, format=name.upper(), **opts)
+                data = buffer.getvalue()
+                digest = hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+                path = task.output_dir / f"{task.game_code}-{width}w.{digest}.{ext}"
+                if not path.exists():
+                    path.write_bytes(data)
+                variants.append({
+                    "format": name, "width": width, "height": height,
+                    "bytes": len(data), "url": public_url(path),
+                })
+    return {
+        "source": public_url(task.source),
+        "source_sha256": task.source_sha256,
+        "settings": task.settings,
+        "source_bytes": task.source.stat().st_size,
+        "variants": variants,
+    }
+
+
+@dataclass
+class BuildReport:
+    built: List[str] = field(default_factory=list)
+    skipped: List[str] = field(default_factory=list)
+    failed: Dict[str, str] = field(default_factory=dict)
+    removed: int = 0
+    formats: List[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.failed
+
+
+def source_tiles(source_dir: Path = SOURCE_DIR) -> Dict[str, Path]:
+    """game_code -> source image, from the top level of the tiles directory"""
+    return {
+        path.stem: path
+        for path in sorted(source_dir.iterdir())
+        if path.is_file() and path.suffix.lower() in SOURCE_SUFFIXES
+    }
+
+
+def load_manifest(output_dir: Path = OUTPUT_DIR) -> dict:
+    return load_json(output_dir / MANIFEST_NAME, {"tiles": {}})
+
+
+def _up_to_date(entry: Optional[dict], sha256: str, settings: str) -> bool:
+    if not entry or entry.get("source_sha256") != sha256 or entry.get("settings") != settings:
+        return False
+    return all((PUBLIC_DIR / v["url"].lstrip("/")).exists() for v in entry["variants"])
+
+
+def build_thumbnails(source_dir: Path = SOURCE_DIR, output_dir: Path = OUTPUT_DIR,
+                     widths: Sequence[int] = WIDTHS, formats: Optional[Sequence[str]] = None,
+                     workers: Optional[int] = None, force: bool = False,
+                     game_codes: Optional[Iterable[str]] = None,
+                     progress: Optional[Callable[[int, int], None]] = None) -> BuildReport:
+    """
+    Encode every tile whose source or the build settings changed since the
+    last build, then drop variants no manifest entry refers to any more.
+    """
+    report = BuildReport(formats=supported_formats() if formats is None else supported_formats(formats))
+    settings = settings_key(widths, report.formats)
+    manifest = load_manifest(output_dir)
+    tiles = source_tiles(source_dir)
+    if game_codes is not None:
+        wanted = set(game_codes)
+        tiles = {code: path for code, path in tiles.items() if code in wanted}
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    entries = dict(manifest.get("tiles", {}))
+    tasks = []
+    for code, path in tiles.items():
+        sha256 = file_sha256(path)
+        if not force and _up_to_date(entries.get(code), sha256, settings):
+            report.skipped.append(code)
+        else:
+            tasks.append(TileTask(code, path, sha256, output_dir, tuple(widths), tuple(report.formats),
+                                  settings))
+
+    def absorb(task: TileTask, entry: Optional[dict], error: Optional[BaseException]) -> None:
+        if error is not None:
+            report.failed[task.game_code] = str(error)
+            entries.pop(task.game_code, None)
+        else:
+            entries[task.game_code] = entry
+            report.built.append(task.game_code)
+        if progress:
+            progress(len(report.built) + len(report.failed), len(tasks))
+
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(tasks) <= 1:
+        for task in tasks:
+            try:
+                absorb(task, build_tile(task), None)
+            except Exception as e:
+                absorb(task, None, e)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(build_tile, task): task for task in tasks}
+            for future in as_completed(futures):
+                error = future.exception()
+                absorb(futures[future], None if error else future.result(), error)
+
+    # Sources that disappeared lose their entry (only on full builds)
+    if game_codes is None:
+        for code in set(entries) - set(tiles):
+            del entries[code]
+
+    referenced = {Path(v["url"]).name for entry in entries.values() for v in entry["variants"]}
+    for path in output_dir.iterdir():
+        if path.name != MANIFEST_NAME and path.is_file() and path.name not in referenced:
+            path.unlink()
+            report.removed += 1
+
+    save_json(output_dir / MANIFEST_NAME, {"tiles": entries})
+    return report
+
+
+def variant_url(entry: dict, format: str = DEFAULT_FORMAT, width: int = DEFAULT_WIDTH) -> Optional[str]:
+    """URL of the built variant closest to `width` (at or above it if possible)"""
+    candidates = [v for v in entry.get("variants", []) if v["format"] == format]
+    if not candidates:
+        return None
+    at_least = [v for v in candidates if v["width"] >= width]
+    chosen = min(at_least, key=lambda v: v["width"]) if at_least else max(candidates, key=lambda v: v["width"])
+    return chosen["url"]
+
+
+def uncommitted_outputs(output_dir: Path = OUTPUT_DIR) -> List[str]:
+    """Built files git would not ship: untracked, modified or deleted since the last commit"""
+    try:
+        result = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=all", "--", str(output_dir)],
+            cwd=PROJECT_DIR, capture_output=True, text=True
+        )
+    except FileNotFoundError:
+        raise RuntimeError("git is not installed - cannot tell whether the built tiles are committed") from None
+    if result.returncode != 0:
+        raise RuntimeError(f"git status failed: {result.stderr.strip()}")
+    return [line[3:] for line in result.stdout.splitlines()]
+
+
+@lru_cache(maxsize=1)
+def built_urls(output_dir: Path = OUTPUT_DIR) -> Dict[str, str]:
+    """game_code -> default hashed thumbnail URL from the last build"""
+    urls = {}
+    for code, entry in load_manifest(output_dir).get("tiles", {}).items():
+        url = variant_url(entry)
+        if url:
+            urls[code] = url
+    return urls
+
+
+def manifest_totals(manifest: dict) -> Tuple[int, Dict[str, int]]:
+    """(source bytes, encoded bytes per format at the default width)"""
+    source = 0
+    encoded: Dict[str, int] = {}
+    for entry in manifest.get("tiles", {}).values():
+        source += entry.get("source_bytes", 0)
+        for name in {v["format"] for v in entry["variants"]}:
+            url = variant_url(entry, name)
+            size = next(v["bytes"] for v in entry["variants"] if v["url"] == url)
+            encoded[name] = encoded.get(name, 0) + size
+    return source, encoded
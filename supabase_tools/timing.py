@@ -0,0 +1,200 @@
+"""
+Timing spans and run reports for the deploy scripts
+
+A deploy is a tree of steps: phases (credentials, sql, functions, verify)
+and the sub-calls inside them (the `npx supabase projects list` check,
+each SQL file, each function, each probe). Every step becomes a Span with
+its duration, outcome and attempt count. Steps run inline are timed with
+`span()`; steps timed elsewhere (function deploys and probes on a worker
+pool) are added afterwards with `record()`.
+
+At the end the spans are written as a JSON or OpenMetrics report, and a
+one-line summary of the run is appended to .deploy-state/, so deploy time
+can be compared across releases and the slowest stage picked out.
+"""
+
+import json
+import statistics
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from supabase_tools.state import state_path
+
+HISTORY_PATH = state_path("deploy-history.jsonl")
+REPORT_FORMATS = (".json", ".prom")
+
+
+@dataclass
+class Span:
+    """One timed step; `path` is its name under its parents', e.g. sql/x.sql"""
+    path: str
+    offset: float                 # seconds from the start of the run
+    seconds: float = 0.0
+    outcome: str = "ok"           # ok, skipped or failed
+    attempts: int = 1
+    detail: str = ""
+
+    @property
+    def name(self) -> str:
+        return self.path.rsplit("/", 1)[-1]
+
+    @property
+    def depth(self) -> int:
+        return self.path.count("/")
+
+    @property
+    def ok(self) -> bool:
+        return self.outcome != "failed"
+
+
+class RunTimer:
+    """Collects the spans of one run; safe to record into from worker threads"""
+
+    def __init__(self, run: str = "deploy"):
+        self.run = run
+        self.started_at = datetime.now(timezone.utc).isoformat()
+        self.spans: List[Span] = []
+        self.totals: Dict[str, int] = {}
+        self._started = time.perf_counter()
+        self._stack: List[str] = []
+        self._lock = threading.Lock()
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self._started
+
+    def _path(self, name: str) -> str:
+        return "/".join(self._stack + [name.replace("/", "_")])
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[Span]:
+        """
+        Time the block as a child of the enclosing span. The block may set
+        the span's outcome, attempts and detail; an exception marks it failed
+        and propagates.
+        """
+        span = Span(self._path(name), self.elapsed)
+        with self._lock:
+            self.spans.append(span)
+        self._stack.append(span.path.rsplit("/", 1)[-1])
+        try:
+            yield span
+        except BaseException as e:
+            span.outcome = "failed"
+            span.detail = span.detail or f"{type(e).__name__}: {e}".strip()
+            raise
+        finally:
+            self._stack.pop()
+            span.seconds = self.elapsed - span.offset
+
+    def record(self, name: str, seconds: float, outcome: str = "ok", attempts: int = 1,
+               detail: str = "") -> Span:
+        """Add a step timed elsewhere, as a child of the enclosing span"""
+        span = Span(self._path(name), max(self.elapsed - seconds, 0.0), seconds, outcome, attempts, detail)
+        with self._lock:
+            self.spans.append(span)
+        return span
+
+    @property
+    def outcome(self) -> str:
+        """Failed if any phase failed; a failed attempt inside one may be recovered"""
+        return "ok" if all(span.ok for span in self.spans if span.depth == 0) else "failed"
+
+    def report(self) -> dict:
+        return {
+            "run": self.run,
+            "started_at": self.started_at,
+            "seconds": round(self.elapsed, 3),
+            "outcome": self.outcome,
+            "totals": dict(self.totals),
+            "spans": [dict(asdict(span), seconds=round(span.seconds, 3), offset=round(span.offset, 3))
+                      for span in self.spans],
+        }
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def openmetrics(report: dict) -> str:
+    """The report in OpenMetrics text format, for a node_exporter textfile"""
+    run = _label(report["run"])
+    lines = [
+        "# TYPE deploy_run_seconds gauge",
+        f'deploy_run_seconds{{run="{run}"}} {report["seconds"]}',
+        "# TYPE deploy_run_success gauge",
+        f'deploy_run_success{{run="{run}"}} {int(report["outcome"] == "ok")}',
+    ]
+    for total, value in sorted(report["totals"].items()):
+        lines += [f"# TYPE deploy_run_{total} gauge", f'deploy_run_{total}{{run="{run}"}} {value}']
+    for metric, key in (("deploy_step_seconds", "seconds"), ("deploy_step_attempts", "attempts")):
+        lines.append(f"# TYPE {metric} gauge")
+        for span in report["spans"]:
+            lines.append(f'{metric}{{run="{run}",step="{_label(span["path"])}",'
+                         f'outcome="{span["outcome"]}"}} {span[key]}')
+    lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+def write_report(report: dict, path: Path) -> None:
+    """Write the report as OpenMetrics for a .prom path, JSON for .json"""
+    if path.suffix not in REPORT_FORMATS:
+        raise ValueError(f"{path.name}: expected a .json or .prom report name")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    text = openmetrics(report) if path.suffix == ".prom" else json.dumps(report, indent=2) + "\n"
+    path.write_text(text)
+
+
+def append_history(report: dict, path: Path = HISTORY_PATH, **extra) -> None:
+    """Append one line per run: total, outcome and every step's seconds"""
+    entry = {
+        "run": report["run"],
+        "started_at": report["started_at"],
+        "seconds": report["seconds"],
+        "outcome": report["outcome"],
+        "totals": report["totals"],
+        "steps": {span["path"]: span["seconds"] for span in report["spans"]},
+        **extra,
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a") as f:
+        f.write(json.dumps(entry) + "\n")
+
+
+def load_history(path: Path = HISTORY_PATH, run: Optional[str] = None,
+                 last: Optional[int] = None) -> List[dict]:
+    """Past runs, oldest first; unreadable lines are skipped"""
+    entries = []
+    try:
+        with open(path) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if run is None or entry.get("run") == run:
+                    entries.append(entry)
+    except OSError:
+        return []
+    return entries[-last:] if last else entries
+
+
+def step_medians(entries: List[dict], depth: Optional[int] = None) -> Dict[str, float]:
+    """Median seconds per step over past runs (depth 0: phases only)"""
+    samples: Dict[str, List[float]] = {}
+    for entry in entries:
+        for path, seconds in entry.get("steps", {}).items():
+            if depth is None or path.count("/") == depth:
+                samples.setdefault(path, []).append(seconds)
+    return {path: statistics.median(values) for path, values in samples.items()}
+
+
+def slowest(entries: List[dict], depth: int = 1, count: int = 5) -> List[tuple]:
+    """The `count` steps at `depth` with the highest median, slowest first"""
+    medians = step_medians(entries, depth)
+    return sorted(medians.items(), key=lambda item: item[1], reverse=True)[:count]
@@ -0,0 +1,539 @@
+"""
+Signed provider-callback replay for game-webhook
+
+Game aggregators report every bet, win, refund and session end to the
+game-webhook function, signed with HMAC-SHA256 over the raw body (hex, in
+X-Signature). They deliver at least once: after an outage a provider
+re-sends its backlog as fast as we answer, with retries of callbacks we may
+already have processed and little regard for order.
+
+This module builds such streams - generated provider rounds, or events
+replayed from a JSON-lines capture - signs them, mixes in redeliveries and
+local reordering, and delivers them open-loop at a target rate (or as a
+flood) while recording latency per event type. Afterwards the ledger is
+checked against the database: every accepted transaction must be recorded
+exactly once, and every player's balance must have moved by the sum of the
+distinct transactions, however often and in whatever order they arrived.
+
+WebhookStandIn serves the function's contract locally over a connection
+pool, doing the same database work per event, so the ceiling can be found
+without deploying. Like the function it does not deduplicate by default;
+`dedupe=True` models idempotent handling keyed on the transaction id.
+
+aiohttp is optional and only needed to deliver events.
+"""
+
+import asyncio
+import hashlib
+import hmac
+import json
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from supabase_tools.db import connect
+from supabase_tools.loadgen import (
+    DEFAULT_MAX_IN_FLIGHT, DEFAULT_TIMEOUT, WAGERS, EndpointStats, StageResult, _aiohttp
+)
+from supabase_tools.rest_shim import DEFAULT_POOL_SIZE, ConnectionPool
+
+EVENT_TYPES = ("bet", "win", "refund", "balance_update", "session_end")
+# Event types that move a balance by their amount, and the sign they move it with
+BALANCE_SIGN = {"bet": -1, "win": 1, "refund": 1}
+SIGNATURE_HEADERS = ("X-Signature", "X-Webhook-Signature")
+DEFAULT_DUPLICATE_RATE = 0.05
+DEFAULT_REORDER_WINDOW = 8
+STARTING_BALANCE = Decimal("100000.00")
+WIN_RATE = 0.35
+REFUND_RATE = 0.01
+WIN_MULTIPLIERS = (0.5, 1, 2, 5, 10)
+SESSION_NAMESPACE = uuid.UUID("0d6c3a4e-5b1f-4f8e-9a27-6e3b1c5d7f90")
+SERVICE_CLAIMS = json.dumps({"role": "service_role"})
+
+
+def sign(body: bytes, secret: str) -> str:
+    """Lower-case hex HMAC-SHA256 of the raw body, as verifyWebhookSignature computes it"""
+    return hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+def session_id(user_id: str) -> str:
+    """The one provider session each synthetic player plays in"""
+    return str(uuid.uuid5(SESSION_NAMESPACE, user_id))
+
+
+@dataclass
+class Delivery:
+    event: dict
+    body: bytes
+    signature: str
+    redelivery: bool = False      # an event already delivered earlier in the stream
+    early: bool = False           # delivered before an event the provider sent first
+
+    @property
+    def transaction_id(self) -> str:
+        return self.event["transaction_id"]
+
+    @property
+    def label(self) -> str:
+        return "redelivery" if self.redelivery else self.event.get("event_type", "?")
+
+
+def generate_events(user_ids: Sequence[str], count: int, rng: random.Random,
+                    run_id: Optional[str] = None, game_id: str = "webhook-test") -> List[dict]:
+    """
+    `count` events in provider order: rounds of a bet followed by a win
+    (WIN_RATE) or a refund (REFUND_RATE), then a session_end for every
+    player who played. Transaction ids start with `run_id`, so each run's
+    rows can be told apart.
+    """
+    run_id = run_id or uuid.uuid4().hex[:12]
+    events: List[dict] = []
+    played = []
+    started = time.time()
+
+    def event(event_type: str, user_id: str, amount: float) -> dict:
+        return {
+            "event_type": event_type,
+            "transaction_id": f"{run_id}-{len(events)}",
+            "user_id": user_id,
+            "game_id": game_id,
+            "session_id": session_id(user_id),
+            "amount": round(amount, 2),
+            "currency": "AUD",
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(started + len(events) / 1000)),
+        }
+
+    while len(events) < count:
+        user_id = rng.choice(user_ids)
+        if user_id not in played:
+            played.append(user_id)
+        wager = rng.choice(WAGERS)
+        events.append(event("bet", user_id, wager))
+        roll = rng.random()
+        if roll < REFUND_RATE:
+            events.append(event("refund", user_id, wager))
+        elif roll < REFUND_RATE + WIN_RATE:
+            events.append(event("win", user_id, wager * rng.choice(WIN_MULTIPLIERS)))
+        if len(events) >= count - len(played):
+            break
+    for user_id in played:
+        events.append(event("session_end", user_id, 0))
+    return events
+
+
+def load_events(path: Path) -> List[dict]:
+    """Events from a capture, one JSON object per line (blank lines and # comments ignored)"""
+    events = []
+    for line in Path(path).read_text().splitlines():
+        line = line.strip()
+        if line and not line.startswith("#"):
+            events.append(json.loads(line))
+    return events
+
+
+def schedule(events: Sequence[dict], secret: str, rng: random.Random,
+             duplicate_rate: float = DEFAULT_DUPLICATE_RATE,
+             reorder_window: int = DEFAULT_REORDER_WINDOW) -> List[Delivery]:
+    """
+    Sign each event and decide its delivery order: every event moves by up
+    to `reorder_window` places, and `duplicate_rate` of them are delivered
+    again later with the same body and signature, as a provider retry is.
+    Events repeated in a capture are marked as redeliveries too.
+    """
+    keyed = []
+    seen = set()
+    for position, event in enumerate(events):
+        body = json.dumps(event, separators=(",", ":")).encode()
+        delivery = Delivery(event, body, sign(body, secret), event.get("transaction_id") in seen)
+        seen.add(event.get("transaction_id"))
+        key = position + rng.uniform(0, reorder_window)
+        keyed.append((key, position, delivery))
+        if rng.random() < duplicate_rate:
+            retry = Delivery(event, body, delivery.signature, redelivery=True)
+            keyed.append((key + rng.uniform(1, 4 * max(reorder_window, 1)), position, retry))
+    keyed.sort(key=lambda item: item[0])
+
+    deliveries = []
+    latest = -1
+    for _, position, delivery in keyed:
+        if not delivery.redelivery:
+            delivery.early = position < latest
+            latest = max(latest, position)
+        deliveries.append(delivery)
+    return deliveries
+
+
+async def _post(session, url: str, headers: dict, delivery: Delivery, started: float,
+                stats: EndpointStats, statuses: List[Optional[int]], index: int) -> None:
+    aiohttp = _aiohttp()
+    status = None
+    try:
+        async with session.post(url, data=delivery.body,
+                                headers={**headers, SIGNATURE_HEADERS[0]: delivery.signature}) as response:
+            await response.read()
+            status = response.status
+            stats.statuses[status] = stats.statuses.get(status, 0) + 1
+    except asyncio.TimeoutError:
+        stats.errors["timeout"] = stats.errors.get("timeout", 0) + 1
+    except aiohttp.ClientError as e:
+        name = type(e).__name__
+        stats.errors[name] = stats.errors.get(name, 0) + 1
+    stats.latency.record(time.perf_counter() - started)
+    statuses[index] = status
+
+
+async def _deliver(url: str, headers: dict, deliveries: Sequence[Delivery], rps: float,
+                   max_in_flight: int, timeout: float, rng: random.Random) -> Tuple[StageResult, list]:
+    aiohttp = _aiohttp()
+    result = StageResult(target_rps=rps, duration=len(deliveries) / rps if rps else 0.0)
+    statuses: List[Optional[int]] = [None] * len(deliveries)
+    connector = aiohttp.TCPConnector(limit=max_in_flight)
+    async with aiohttp.ClientSession(connector=connector,
+                                     timeout=aiohttp.ClientTimeout(total=timeout)) as session:
+        pending = set()
+        started = time.perf_counter()
+        due = started
+        for index, delivery in enumerate(deliveries):
+            if rps:
+                due += rng.expovariate(rps)
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            else:
+                # A flood: keep max_in_flight outstanding and measure the drain
+                while len(pending) >= max_in_flight:
+                    await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                due = time.perf_counter()
+            result.scheduled += 1
+            if len(pending) >= max_in_flight:
+                result.dropped += 1
+                continue
+            stats = result.endpoints.setdefault(delivery.label, EndpointStats())
+            task = asyncio.ensure_future(_post(session, url, headers, delivery, due, stats, statuses, index))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+        if pending:
+            await asyncio.gather(*pending)
+        result.wall_seconds = time.perf_counter() - started
+    return result, statuses
+
+
+def deliver(url: str, deliveries: Sequence[Delivery], rps: float = 0.0, api_key: Optional[str] = None,
+            max_in_flight: int = DEFAULT_MAX_IN_FLIGHT, timeout: float = DEFAULT_TIMEOUT,
+            seed: int = 0) -> Tuple[StageResult, List[Optional[int]]]:
+    """
+    Deliver in order at `rps` (Poisson arrivals; 0 for as fast as
+    `max_in_flight` allows). Returns the stage and each delivery's HTTP
+    status, None where it got no answer.
+    """
+    headers = {"Content-Type": "application/json"}
+    if api_key:
+        headers["apikey"] = api_key
+        headers["Authorization"] = f"Bearer {api_key}"
+    return asyncio.run(_deliver(url, headers, deliveries, rps, max_in_flight, timeout, random.Random(seed)))
+
+
+def prepare_players(dsn: str, user_ids: Sequence[str], balance: Decimal = STARTING_BALANCE,
+                    game_id: str = "webhook-test") -> None:
+    """Players and their provider sessions; existing rows are left as they are"""
+    conn = connect(dsn)
+    try:
+        with conn.cursor() as cur:
+            # Skip the signup trigger and the balance guard, as seeding does
+            cur.execute("SET LOCAL session_replication_role = replica")
+            cur.execute(
+                """SELECT column_name FROM information_schema.columns
+                   WHERE table_schema = 'public' AND table_name = 'game_sessions'"""
+            )
+            session_columns = {row[0] for row in cur.fetchall()}
+            for user_id in user_ids:
+                cur.execute(
+                    """INSERT INTO auth.users (id, email) VALUES (%s, %s)
+                       ON CONFLICT (id) DO NOTHING""",
+                    (user_id, f"{user_id}@webhook.test")
+                )
+                cur.execute(
+                    """INSERT INTO public.users (id, display_name, referral_code, total_balance_aud)
+                       VALUES (%s, %s, %s, %s) ON CONFLICT (id) DO NOTHING""",
+                    (user_id, f"Webhook {user_id[:8]}", f"W{user_id[:8]}", balance)
+                )
+                # The schema has had two game_sessions shapes; fill whichever this one is
+                columns = ["id", "user_id", "game_id"] + (["wager_amount"] if "wager_amount" in session_columns else [])
+                values = [session_id(user_id), user_id, game_id] + ([0] if "wager_amount" in session_columns else [])
+                cur.execute(
+                    f"""INSERT INTO public.game_sessions ({', '.join(columns)})
+                        VALUES ({', '.join(['%s'] * len(values))}) ON CONFLICT (id) DO NOTHING""",
+                    values
+                )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def balances(dsn: str, user_ids: Sequence[str]) -> Dict[str, Decimal]:
+    conn = connect(dsn, autocommit=True)
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT id::text, total_balance_aud FROM public.users WHERE id = ANY(%s::uuid[])",
+                        (list(user_ids),))
+            return {user_id: Decimal(str(balance)) for user_id, balance in cur.fetchall()}
+    finally:
+        conn.close()
+
+
+@dataclass
+class LedgerCheck:
+    transactions: int = 0         # distinct transaction ids delivered
+    redeliveries: int = 0
+    early: int = 0                # delivered ahead of an event sent before them
+    accepted: int = 0             # distinct transactions with a 2xx answer
+    rejected: int = 0             # distinct transactions never answered 2xx
+    recorded_twice: List[str] = field(default_factory=list)
+    not_recorded: List[str] = field(default_factory=list)
+    balance_mismatches: Dict[str, Tuple[str, str]] = field(default_factory=dict)  # user -> (expected, actual) delta
+
+    @property
+    def drift(self) -> Decimal:
+        return sum((Decimal(actual) - Decimal(expected) for expected, actual in self.balance_mismatches.values()),
+                   Decimal(0))
+
+    @property
+    def ok(self) -> bool:
+        return not (self.recorded_twice or self.not_recorded or self.balance_mismatches)
+
+    def to_dict(self) -> dict:
+        return {
+            "ok": self.ok,
+            "transactions": self.transactions,
+            "redeliveries": self.redeliveries,
+            "early": self.early,
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "recorded_twice": self.recorded_twice,
+            "not_recorded": self.not_recorded,
+            "balance_mismatches": self.balance_mismatches,
+            "drift": str(self.drift),
+        }
+
+
+def check_ledger(dsn: str, deliveries: Sequence[Delivery], statuses: Sequence[Optional[int]],
+                 before: Dict[str, Decimal]) -> LedgerCheck:
+    """
+    Compare the database with what the answers promise: each accepted bet,
+    win and refund recorded once in game_transactions, and each player's
+    balance moved by their distinct accepted transactions. Players with a
+    balance_update are not balance-checked, as it sets the balance outright.
+    """
+    check = LedgerCheck(redeliveries=sum(d.redelivery for d in deliveries), early=sum(d.early for d in deliveries))
+    events: Dict[str, dict] = {}
+    accepted = set()
+    for delivery, status in zip(deliveries, statuses):
+        events.setdefault(delivery.transaction_id, delivery.event)
+        if status is not None and 200 <= status < 300:
+            accepted.add(delivery.transaction_id)
+    check.transactions = len(events)
+    check.accepted = len(accepted)
+    check.rejected = len(events) - len(accepted)
+
+    expected: Dict[str, Decimal] = {}
+    overwritten = set()
+    for transaction_id in accepted:
+        event = events[transaction_id]
+        if event.get("event_type") == "balance_update":
+            overwritten.add(event["user_id"])
+        sign_ = BALANCE_SIGN.get(event.get("event_type"))
+        if sign_:
+            expected[event["user_id"]] = expected.get(event["user_id"], Decimal(0)) + \
+                sign_ * Decimal(str(event["amount"]))
+
+    conn = connect(dsn, autocommit=True)
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                """SELECT provider_transaction_id, count(*) FROM public.game_transactions
+                   WHERE provider_transaction_id = ANY(%s) GROUP BY 1""",
+                (list(events),)
+            )
+            recorded = dict(cur.fetchall())
+    finally:
+        conn.close()
+    for transaction_id in sorted(events):
+        count = recorded.get(transaction_id, 0)
+        if count > 1:
+            check.recorded_twice.append(transaction_id)
+        elif count == 0 and transaction_id in accepted and events[transaction_id].get("event_type") in BALANCE_SIGN:
+            check.not_recorded.append(transaction_id)
+
+    after = balances(dsn, list(before))
+    for user_id, start in before.items():
+        if user_id in overwritten or user_id not in after:
+            continue
+        want = expected.get(user_id, Decimal(0))
+        got = after[user_id] - start
+        if got != want:
+            check.balance_mismatches[user_id] = (str(want), str(got))
+    return check
+
+
+class WebhookStandIn:
+    """
+    game-webhook's contract over a local database: the same signature check,
+    validation and per-event writes, each event in one transaction. Writes
+    the function doesn't check the result of (session totals, the
+    game_transactions log) are attempted the same way and their failures
+    counted in `ignored_errors` instead of failing the request.
+    """
+
+    def __init__(self, dsn: str, secret: Optional[str], pool_size: int = DEFAULT_POOL_SIZE,
+                 dedupe: bool = False):
+        self.pool = ConnectionPool(dsn, pool_size)
+        self.secret = secret
+        self.dedupe = dedupe
+        self.ignored_errors: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def _unchecked(self, cur, name: str, sql: str, params: tuple) -> None:
+        cur.execute("SAVEPOINT unchecked")
+        try:
+            cur.execute(sql, params)
+            cur.execute("RELEASE SAVEPOINT unchecked")
+        except Exception as e:
+            cur.execute("ROLLBACK TO SAVEPOINT unchecked")
+            key = f"{name}: {str(e).strip().splitlines()[0]}"
+            with self._lock:
+                self.ignored_errors[key] = self.ignored_errors.get(key, 0) + 1
+
+    def _apply(self, cur, event: dict) -> bool:
+        """The event's writes; False if it was a duplicate and skipped"""
+        cur.execute("SELECT set_config('request.jwt.claims', %s, true)", (SERVICE_CLAIMS,))
+        transaction_id = event["transaction_id"]
+        if self.dedupe:
+            cur.execute("SELECT pg_advisory_xact_lock(hashtext(%s))", (transaction_id,))
+            cur.execute("SELECT EXISTS (SELECT 1 FROM public.game_transactions WHERE provider_transaction_id = %s)",
+                        (transaction_id,))
+            if cur.fetchone()[0]:
+                return False
+
+        event_type, user_id, amount = event["event_type"], event["user_id"], event.get("amount", 0)
+        session = event.get("session_id")
+        if event_type == "bet":
+            # deduct_balance
+            cur.execute(
+                """UPDATE public.users SET total_balance_aud = total_balance_aud - %s
+                   WHERE id = %s AND total_balance_aud >= %s RETURNING 1""",
+                (amount, user_id, amount)
+            )
+            if cur.fetchone() is None:
+                raise ValueError("Insufficient balance or unknown user")
+            if session:
+                self._unchecked(cur, "session totals",
+                                "UPDATE public.game_sessions SET total_wagered = total_wagered + %s WHERE id = %s",
+                                (amount, session))
+        elif event_type in ("win", "refund"):
+            # add_balance
+            cur.execute("UPDATE public.users SET total_balance_aud = total_balance_aud + %s WHERE id = %s RETURNING 1",
+                        (amount, user_id))
+            if cur.fetchone() is None:
+                raise ValueError("Unknown user")
+            if session and event_type == "win":
+                self._unchecked(cur, "session totals",
+                                "UPDATE public.game_sessions SET total_won = total_won + %s WHERE id = %s",
+                                (amount, session))
+        elif event_type == "balance_update":
+            cur.execute("UPDATE public.users SET total_balance_aud = %s WHERE id = %s", (amount, user_id))
+        elif event_type == "session_end" and session:
+            self._unchecked(cur, "session end",
+                            "UPDATE public.game_sessions SET end_time = now(), status = 'completed' WHERE id = %s",
+                            (session,))
+        self._unchecked(
+            cur, "transaction log",
+            """INSERT INTO public.game_transactions
+                 (user_id, game_id, session_id, transaction_type, amount, currency, provider_transaction_id, status)
+               VALUES (%s, %s, %s, %s, %s, %s, %s, 'completed')""",
+            (user_id, event.get("game_id"), session, event_type, amount, event.get("currency"), transaction_id)
+        )
+        return True
+
+    def handle(self, headers, body: bytes) -> Tuple[int, dict]:
+        signature = next((headers.get(name) for name in SIGNATURE_HEADERS if headers.get(name)), None)
+        if self.secret and signature and not hmac.compare_digest(sign(body, self.secret), signature):
+            return 401, {"error": "Invalid webhook signature"}
+        try:
+            event = json.loads(body)
+        except ValueError as e:
+            return 500, {"error": "Webhook processing failed", "message": str(e)}
+        if not isinstance(event, dict) or not all(event.get(key) for key in ("event_type", "transaction_id", "user_id")):
+            return 400, {"error": "Invalid webhook payload"}
+
+        conn = self.pool.acquire()
+        broken = False
+        try:
+            with conn.cursor() as cur:
+                applied = self._apply(cur, event)
+            conn.commit()
+        except Exception as e:
+            try:
+                conn.rollback()
+            except Exception:
+                broken = True
+            return 500, {"error": "Webhook processing failed", "message": str(e).strip().splitlines()[0]}
+        finally:
+            self.pool.release(conn, broken)
+        if not applied:
+            return 200, {"success": True, "message": "Duplicate webhook ignored"}
+        return 200, {"success": True, "message": "Webhook processed"}
+
+    def _handler_class(self):
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _respond(self, status: int, payload: Optional[dict]) -> None:
+                data = json.dumps(payload).encode() if payload is not None else b""
+                self.send_response(status)
+                self.send_header("Access-Control-Allow-Origin", "*")
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                self._respond(*stand_in.handle(self.headers, body))
+
+            def do_OPTIONS(self):
+                self._respond(200, None)
+
+        return Handler
+
+    def serve(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start serving in a daemon thread; returns the function URL"""
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self.url
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/functions/v1/game-webhook"
+
+    def stop(self) -> None:
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+        self.pool.close()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Sync licensed_games from game_definitions.json
+Reads the table once, diffs it field by field and writes only the inserts,
+updates and deactivations that are needed
+"""
+
+import os
+import sys
+import argparse
+from pathlib import Path
+
+from supabase_tools.bulk import DEFAULT_CHUNK_SIZE
+from supabase_tools.catalogue import GAME_DEFINITIONS_PATH, load_game_definitions, print_bulk_result
+from supabase_tools.catalogue_sync import sync_catalogue
+from supabase_tools.client import SupabaseClient
+from supabase_tools.concurrency import add_concurrency_argument
+from supabase_tools.paging import DEFAULT_PAGE_SIZE
+
+SHOW_CHANGES = 25
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sync licensed_games from game_definitions.json")
+    parser.add_argument("--definitions", type=Path, default=GAME_DEFINITIONS_PATH,
+                        help="Catalogue file (default: game_definitions.json)")
+    parser.add_argument("--dry-run", action="store_true", help="Show the diff without writing")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows per upsert")
+    parser.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE,
+                        help="Rows per licensed_games read")
+    add_concurrency_argument(parser)
+    args = parser.parse_args()
+
+    service_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+    if not service_key:
+        print("❌ SUPABASE_SERVICE_ROLE_KEY not set")
+        return 1
+
+    print("🗂️  CATALOGUE SYNC")
+    print("=" * 60)
+    definitions = load_game_definitions(args.definitions)
+    print(f"📄 {len(definitions)} games in {args.definitions.name}")
+
+    with SupabaseClient(service_key, pool_size=args.concurrency) as client:
+        try:
+            diff, result = sync_catalogue(
+                client, definitions, args.dry_run, args.chunk_size,
+                args.concurrency, args.page_size
+            )
+        except (RuntimeError, ValueError) as e:
+            print(f"❌ {e}")
+            return 1
+
+    print(f"\n📊 {len(diff.inserts)} to insert, {len(diff.updates)} to update, "
+          f"{len(diff.deactivations)} to disable, {diff.unchanged} unchanged")
+    for slug, columns in list(diff.changes.items())[:SHOW_CHANGES]:
+        changes = ", ".join(f"{column}: {old!r} → {new!r}" for column, (old, new) in columns.items())
+        print(f"   - {slug}: {changes}")
+    if len(diff.changes) > SHOW_CHANGES:
+        print(f"   ... and {len(diff.changes) - SHOW_CHANGES} more")
+
+    if diff.empty:
+        print("\n✅ licensed_games already matches the definitions")
+    elif args.dry_run:
+        print("\n🔍 Dry run - nothing written")
+    else:
+        print_bulk_result(result, diff.writes, "catalogue rows")
+
+    print("=" * 60)
+    return 0 if result.ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Offline provably-fair verification
+Replays every provably_fair_verification row's seed through the spin engine
+and reports rows whose reels, win or outcome_hash do not reproduce
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+
+from supabase_tools.client import SupabaseClient
+from supabase_tools.fairness import (
+    DEFAULT_BATCH_SIZE, iter_csv, iter_jsonl, iter_rest, verify_rows
+)
+from supabase_tools.paging import DEFAULT_PAGE_SIZE
+
+SHOW_MISMATCHES = 20
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify provably-fair spin records offline")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--csv", type=Path, help="CSV export of provably_fair_verification (.gz ok)")
+    source.add_argument("--jsonl", type=Path, help="JSON Lines export (.gz ok)")
+    source.add_argument("--rest", action="store_true",
+                        help="Read the table live (needs SUPABASE_SERVICE_ROLE_KEY)")
+    parser.add_argument("--game", help="--rest only: limit to one game_id")
+    parser.add_argument("--since", help="--rest only: rows created at or after this timestamp")
+    parser.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE, help="--rest page size")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                        help="Rows per worker task")
+    parser.add_argument("--mismatches", type=Path, help="Write every mismatch to this JSONL file")
+    args = parser.parse_args()
+
+    print("🔐 PROVABLY-FAIR VERIFICATION")
+    print("=" * 60)
+
+    client = None
+    if args.rest:
+        service_key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+        if not service_key:
+            print("❌ SUPABASE_SERVICE_ROLE_KEY not set")
+            return 1
+        filters = {}
+        if args.game:
+            filters["game_id"] = f"eq.{args.game}"
+        if args.since:
+            filters["created_at"] = f"gte.{args.since}"
+        client = SupabaseClient(service_key=service_key)
+        rows = iter_rest(client, args.page_size, filters)
+        print(f"📡 Reading provably_fair_verification live, {args.page_size} rows per page")
+    elif args.csv:
+        rows = iter_csv(args.csv)
+        print(f"📄 Reading {args.csv}")
+    else:
+        rows = iter_jsonl(args.jsonl)
+        print(f"📄 Reading {args.jsonl}")
+
+    shown = []
+    out = args.mismatches.open("w", encoding="utf-8") if args.mismatches else None
+
+    def on_mismatch(mismatch: dict) -> None:
+        if len(shown) < SHOW_MISMATCHES:
+            shown.append(mismatch)
+        if out:
+            out.write(json.dumps(mismatch) + "\n")
+
+    started = time.perf_counter()
+
+    def progress(report) -> None:
+        rate = report.checked / max(time.perf_counter() - started, 1e-9)
+        print(f"\r   {report.checked:,} rows, {report.mismatched:,} mismatched ({rate:,.0f} rows/s)",
+              end="", flush=True)
+
+    try:
+        report = verify_rows(rows, args.workers, args.batch_size, on_mismatch, progress)
+    except (RuntimeError, OSError, ValueError) as e:
+        print(f"\n❌ {e}")
+        return 1
+    finally:
+        if out:
+            out.close()
+        if client:
+            client.close()
+    elapsed = time.perf_counter() - started
+    print()
+
+    print(f"\n📊 {report.checked:,} rows checked in {elapsed:.1f}s on {args.workers} workers")
+    for mode, count in sorted(report.by_mode.items()):
+        print(f"   ✅ {mode:<10} {count:,}")
+    for reason, count in sorted(report.by_reason.items()):
+        print(f"   ❌ {reason:<10} {count:,}")
+
+    if shown:
+        print(f"\n⚠️  First {len(shown)} mismatched spins:")
+        for mismatch in shown:
+            print(f"   {mismatch['spin_id']}: {'; '.join(mismatch['reasons'])}")
+    if args.mismatches:
+        print(f"📝 Mismatches written to {args.mismatches}")
+
+    print("=" * 60)
+    if not report.ok:
+        print(f"❌ {report.mismatched:,} rows failed verification")
+        return 1
+    print("✅ Every row reproduces from its seed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())